@@ -0,0 +1,573 @@
+#!/usr/bin/env python3
+"""
+cert_monitor.py
+
+Expiry-monitor voor CyNiT Tools: scant periodiek certificaat-mappen en
+(optioneel) de DCBaaS org-export, houdt alle vervaldata bij in een gesorteerde
+index en stuurt een melding wanneer een certificaat onder een drempel zakt
+(bv. 60/30/14/7/1/0 dagen).
+
+- Mappen: enkel bestanden waarvan mtime/grootte én SHA-256 veranderd zijn
+  worden opnieuw gedecodeerd (cert_viewer.decode_cert_from_bytes, met cache).
+- DCBaaS: /certificate/search per org-code via dcb_org_export.
+- Meldingen: Signal via cynit_notify en/of dsw/notify.py (Telegram, Pushover, ...).
+  Per certificaat wordt elke drempel maar één keer gemeld.
+- Status blijft bewaard in runtime/cert_monitor_state.json, zodat een herstart
+  niets opnieuw moet decoderen of melden.
+
+Gebruik:
+
+    python cert_monitor.py                # daemon (stoppen met Ctrl+C)
+    python cert_monitor.py --once         # één pass en stoppen
+    python cert_monitor.py --status       # eerstvolgende vervaldata tonen
+    python cert_monitor.py --folder C:\\certs --once --no-notify
+
+Config: config/cert_monitor.json (wordt aangemaakt met defaults).
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import importlib.util
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import cynit_cache
+import cynit_theme
+
+BASE_DIR = cynit_theme.BASE_DIR
+CONFIG_DIR = cynit_theme.CONFIG_DIR
+MONITOR_CFG_PATH = CONFIG_DIR / "cert_monitor.json"
+RUNTIME_DIR = BASE_DIR / "runtime"
+STATE_PATH = RUNTIME_DIR / "cert_monitor_state.json"
+
+DAY = 86400.0
+MAX_LINES_PER_MESSAGE = 25
+
+
+def log(msg: str) -> None:
+    print(f"[MONITOR] {msg}", flush=True)
+
+
+# ==============================
+# Config
+# ==============================
+
+def _default_monitor_config() -> Dict[str, Any]:
+    return {
+        "interval_sec": 3600,
+        "folders": [],
+        "recursive": True,
+        "thresholds_days": [60, 30, 14, 7, 1, 0],
+        "channels": ["signal"],
+        "dsw_notify_path": "../dsw/notify.py",
+        "dcbaas": {
+            "enabled": False,
+            "env": "",
+            "org_codes": [],
+            "interval_sec": 21600,
+        },
+    }
+
+
+def load_monitor_config() -> Dict[str, Any]:
+    """
+    Leest config/cert_monitor.json.
+    - Bestaat hij niet -> aanmaken met defaults (geen mappen, DCBaaS uit).
+    """
+    CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+    cfg = _default_monitor_config()
+
+    if not MONITOR_CFG_PATH.exists():
+        MONITOR_CFG_PATH.write_text(json.dumps(cfg, indent=2, ensure_ascii=False), encoding="utf-8")
+        return cfg
+
+    try:
+        raw = json.loads(MONITOR_CFG_PATH.read_text(encoding="utf-8"))
+    except Exception as exc:
+        log(f"cert_monitor.json onleesbaar ({exc}), defaults gebruikt.")
+        return cfg
+
+    if isinstance(raw, dict):
+        dcb = dict(cfg["dcbaas"])
+        if isinstance(raw.get("dcbaas"), dict):
+            dcb.update(raw["dcbaas"])
+        cfg.update(raw)
+        cfg["dcbaas"] = dcb
+    cfg["thresholds_days"] = sorted({int(t) for t in cfg.get("thresholds_days") or [0]}, reverse=True)
+    return cfg
+
+
+def _resolve_folder(folder: str) -> Path:
+    p = Path(os.path.expandvars(os.path.expanduser(folder)))
+    return p if p.is_absolute() else BASE_DIR / p
+
+
+# ==============================
+# Index op vervaldatum
+# ==============================
+
+@dataclass
+class Entry:
+    key: str            # "file:<pad>#<thumbprint>" of "dcbaas:<env>:<org>:<serial>"
+    valid_to_ts: float
+    valid_to: str
+    label: str          # subject / applicatienaam
+    source: str         # pad of "DCBaaS <env> / <org>"
+
+
+class ExpiryIndex:
+    """
+    Alle gekende certificaten, gesorteerd op vervaldatum.
+
+    _order is een gesorteerde lijst (valid_to_ts, key): toevoegen/verwijderen
+    via bisect, en "alles wat vervalt vóór X" is een slice vooraan.
+    """
+
+    def __init__(self) -> None:
+        self._order: List[Tuple[float, str]] = []
+        self._entries: Dict[str, Entry] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def put(self, entry: Entry) -> None:
+        self.remove(entry.key)
+        self._entries[entry.key] = entry
+        bisect.insort(self._order, (entry.valid_to_ts, entry.key))
+
+    def remove(self, key: str) -> None:
+        old = self._entries.pop(key, None)
+        if old is None:
+            return
+        i = bisect.bisect_left(self._order, (old.valid_to_ts, key))
+        if i < len(self._order) and self._order[i] == (old.valid_to_ts, key):
+            del self._order[i]
+
+    def expiring_before(self, ts: float) -> Iterator[Entry]:
+        """Certificaten met valid_to_ts < ts, vroegste eerst (ook al vervallen)."""
+        end = bisect.bisect_left(self._order, (ts, ""))
+        for _, key in self._order[:end]:
+            yield self._entries[key]
+
+    def first(self, n: int) -> List[Entry]:
+        return [self._entries[key] for _, key in self._order[:n]]
+
+    def next_crossing(self, now: float, thresholds: List[int]) -> Optional[float]:
+        """
+        Eerstvolgend tijdstip (> now) waarop een certificaat onder een drempel
+        zakt: per drempel t het eerste cert met valid_to_ts - t dagen > now.
+        """
+        best: Optional[float] = None
+        for t in thresholds:
+            i = bisect.bisect_right(self._order, (now + t * DAY, "\uffff"))
+            if i < len(self._order):
+                when = self._order[i][0] - t * DAY
+                if best is None or when < best:
+                    best = when
+        return best
+
+
+def _parse_ts(value: Any) -> Optional[float]:
+    if not value or value == "-":
+        return None
+    text = str(value).strip().replace("Z", "+00:00")
+    try:
+        dt = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+# ==============================
+# Monitor
+# ==============================
+
+class CertMonitor:
+    def __init__(self, cfg: Dict[str, Any], state_path: Path = STATE_PATH):
+        self.cfg = cfg
+        self.state_path = state_path
+        self.index = ExpiryIndex()
+        # pad -> {"mtime_ns", "size", "sha256", "entries": [Entry-dicts]}
+        self.files: Dict[str, Dict[str, Any]] = {}
+        # org -> [Entry-dicts] van de laatste geslaagde DCBaaS-call
+        self.dcbaas: Dict[str, List[Dict[str, Any]]] = {}
+        self.dcbaas_last = 0.0
+        # key -> laagste drempel (dagen) die al gemeld is
+        self.fired: Dict[str, int] = {}
+        self._load_state()
+
+    # --- state ---
+
+    def _load_state(self) -> None:
+        try:
+            raw = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        self.files = raw.get("files") or {}
+        self.dcbaas = raw.get("dcbaas") or {}
+        self.dcbaas_last = float(raw.get("dcbaas_last") or 0)
+        self.fired = {k: int(v) for k, v in (raw.get("fired") or {}).items()}
+        for rec in list(self.files.values()) + [{"entries": e} for e in self.dcbaas.values()]:
+            for e in rec.get("entries") or []:
+                self.index.put(Entry(**e))
+        log(f"Status geladen: {len(self.index)} certificaten, {len(self.files)} bestanden.")
+
+    def save_state(self) -> None:
+        data = {
+            "files": self.files,
+            "dcbaas": self.dcbaas,
+            "dcbaas_last": self.dcbaas_last,
+            "fired": self.fired,
+        }
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.state_path)
+
+    def _replace(self, old: List[Dict[str, Any]], new: List[Entry]) -> None:
+        for e in old or []:
+            self.index.remove(e["key"])
+        for e in new:
+            self.index.put(e)
+
+    # --- mappen ---
+
+    def scan_folders(self) -> Dict[str, int]:
+        """
+        Eén pass over de geconfigureerde mappen.
+        Return: tellers {"unchanged", "touched", "decoded", "errors", "removed"}.
+        """
+        import cert_viewer
+
+        stats = {"unchanged": 0, "touched": 0, "decoded": 0, "errors": 0, "removed": 0}
+        seen = set()
+
+        for folder in self.cfg.get("folders") or []:
+            root = _resolve_folder(folder)
+            if not root.is_dir():
+                log(f"Map bestaat niet: {root}")
+                continue
+            for path in cert_viewer.iter_cert_files(root, recursive=bool(self.cfg.get("recursive", True))):
+                name = str(path)
+                seen.add(name)
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                rec = self.files.get(name)
+                if rec and rec["mtime_ns"] == st.st_mtime_ns and rec["size"] == st.st_size:
+                    stats["unchanged"] += 1
+                    continue
+                if st.st_size > cert_viewer.BATCH_MAX_FILE_SIZE:
+                    continue
+
+                try:
+                    data = path.read_bytes()
+                except OSError as exc:
+                    log(f"Kan {name} niet lezen: {exc}")
+                    stats["errors"] += 1
+                    continue
+                digest = cynit_cache.content_key(data)
+                if rec and rec["sha256"] == digest:
+                    # enkel aangeraakt (copy/sync): inhoud dezelfde, niet opnieuw decoderen
+                    rec["mtime_ns"], rec["size"] = st.st_mtime_ns, st.st_size
+                    stats["touched"] += 1
+                    continue
+
+                try:
+                    info = cert_viewer.decode_cert_from_bytes(data, path)
+                    entries = self._entries_from_info(name, info)
+                except ValueError as exc:
+                    log(f"Geen certificaat: {name}: {exc}")
+                    entries = []
+                    stats["errors"] += 1
+                else:
+                    stats["decoded"] += 1
+
+                self._replace(rec["entries"] if rec else [], entries)
+                self.files[name] = {
+                    "mtime_ns": st.st_mtime_ns,
+                    "size": st.st_size,
+                    "sha256": digest,
+                    "entries": [asdict(e) for e in entries],
+                }
+
+        for name in set(self.files) - seen:
+            self._replace(self.files.pop(name)["entries"], [])
+            stats["removed"] += 1
+        return stats
+
+    @staticmethod
+    def _entries_from_info(name: str, info: Dict[str, Any]) -> List[Entry]:
+        props = info["properties"]
+        objects = info.get("bundle") or [{
+            "subject": props["Subject"],
+            "valid_to": props["Valid To"],
+            "thumbprint": props["Thumbprint"],
+        }]
+        entries = []
+        for obj in objects:
+            ts = _parse_ts(obj["valid_to"])
+            if ts is None:                          # CSR: geen vervaldatum
+                continue
+            entries.append(Entry(
+                key=f"file:{name}#{obj['thumbprint']}",
+                valid_to_ts=ts,
+                valid_to=obj["valid_to"],
+                label=obj["subject"],
+                source=name,
+            ))
+        return entries
+
+    # --- DCBaaS ---
+
+    def scan_dcbaas(self, force: bool = False) -> Optional[Dict[str, int]]:
+        """
+        /certificate/search voor elke geconfigureerde org-code, maximaal één keer
+        per dcbaas.interval_sec. Bij een fout voor een org blijven de vorige
+        resultaten van die org in de index.
+        """
+        dcb_cfg = self.cfg.get("dcbaas") or {}
+        org_codes = [str(o).strip() for o in dcb_cfg.get("org_codes") or [] if str(o).strip()]
+        if not dcb_cfg.get("enabled") or not org_codes:
+            return None
+        if not force and time.time() - self.dcbaas_last < float(dcb_cfg.get("interval_sec", 21600)):
+            return None
+
+        import dcb_org_export as dcb
+
+        envs, default_env = dcb.load_env_configs_from_dcbaas_api()
+        env = envs.get(dcb_cfg.get("env") or default_env or "")
+        if env is None:
+            log(f"DCBaaS: omgeving '{dcb_cfg.get('env')}' niet gevonden in dcbaas_api.json.")
+            return None
+
+        tokens = dcb.get_token_manager(env)
+        token, err = tokens.get()
+        if err or not token:
+            log(f"DCBaaS: geen access token voor {env.name}: {err}")
+            return None
+
+        stats = {"orgs": 0, "certificates": 0, "errors": 0}
+        results, errors = dcb.fetch_certificates_for_orgs(env, org_codes, token, tokens=tokens)
+
+        for org in org_codes:
+            items, err = results.get(org, []), errors.get(org)
+            if err:
+                log(f"DCBaaS {env.name}/{org}: {err}")
+                stats["errors"] += 1
+                continue
+
+            entries = []
+            for row in items:
+                if str(row.get("status", "")).lower() == "revoked":
+                    continue
+                ts = _parse_ts(row.get("end_date"))
+                if ts is None:
+                    continue
+                ident = row.get("serial_number") or row.get("application_name") or ""
+                entries.append(Entry(
+                    key=f"dcbaas:{env.name}:{org}:{ident}",
+                    valid_to_ts=ts,
+                    valid_to=str(row.get("end_date")),
+                    label=str(row.get("application_name") or ident),
+                    source=f"DCBaaS {env.name} / {org}",
+                ))
+            self._replace(self.dcbaas.get(org, []), entries)
+            self.dcbaas[org] = [asdict(e) for e in entries]
+            stats["orgs"] += 1
+            stats["certificates"] += len(entries)
+
+        for org in set(self.dcbaas) - set(org_codes):
+            self._replace(self.dcbaas.pop(org), [])
+        self.dcbaas_last = time.time()
+        return stats
+
+    # --- meldingen ---
+
+    def due_alerts(self, now: Optional[float] = None) -> List[Tuple[Entry, float, int]]:
+        """
+        (entry, dagen_over, drempel) voor elk cert dat een nieuwe (lagere)
+        drempel bereikt heeft. Enkel het begin van de index wordt bekeken.
+        """
+        now = time.time() if now is None else now
+        thresholds = self.cfg["thresholds_days"]
+        horizon = now + thresholds[0] * DAY
+        due = []
+        for entry in self.index.expiring_before(horizon):
+            days = (entry.valid_to_ts - now) / DAY
+            level = min((t for t in thresholds if days <= t), default=thresholds[-1])
+            prev = self.fired.get(entry.key)
+            if prev is not None and prev <= level:
+                continue
+            due.append((entry, days, level))
+        return due
+
+    def notify(self, due: List[Tuple[Entry, float, int]]) -> bool:
+        if not due:
+            return True
+        lines = ["🔔 CyNiT cert monitor – certificaten die (bijna) vervallen:"]
+        for entry, days, _ in due[:MAX_LINES_PER_MESSAGE]:
+            when = "VERVALLEN" if days < 0 else f"nog {int(days)} d"
+            lines.append(f"- {when}: {entry.label} ({entry.valid_to[:10]}) – {entry.source}")
+        if len(due) > MAX_LINES_PER_MESSAGE:
+            lines.append(f"... en nog {len(due) - MAX_LINES_PER_MESSAGE} andere.")
+        message = "\n".join(lines)
+
+        sent = send_alert(message, self.cfg)
+        if sent:
+            for entry, _, level in due:
+                self.fired[entry.key] = level
+        return sent
+
+    def prune_fired(self) -> None:
+        for key in [k for k in self.fired if k not in self.index]:
+            del self.fired[key]
+
+    # --- pass ---
+
+    def run_once(self, notify: bool = True, force_dcbaas: bool = False) -> Dict[str, Any]:
+        t0 = time.perf_counter()
+        result: Dict[str, Any] = {"folders": self.scan_folders()}
+        dcb = self.scan_dcbaas(force=force_dcbaas)
+        if dcb is not None:
+            result["dcbaas"] = dcb
+
+        due = self.due_alerts()
+        result["alerts"] = len(due)
+        if notify and due:
+            result["notified"] = self.notify(due)
+        self.prune_fired()
+        self.save_state()
+        log(f"Pass klaar in {time.perf_counter() - t0:.2f}s: {result}, {len(self.index)} certificaten in index.")
+        return result
+
+    def seconds_until_next_pass(self) -> float:
+        """Volgende scan-interval, of vroeger als er intussen een drempel gekruist wordt."""
+        interval = float(self.cfg.get("interval_sec", 3600))
+        now = time.time()
+        crossing = self.index.next_crossing(now, self.cfg["thresholds_days"])
+        if crossing is not None:
+            interval = min(interval, crossing - now + 1)
+        return max(interval, 5.0)
+
+
+# ==============================
+# Notificatie-kanalen
+# ==============================
+
+_DSW_NOTIFY = None
+
+
+def _load_dsw_notify(path: str):
+    """dsw/notify.py als module laden (los project, niet op sys.path)."""
+    global _DSW_NOTIFY
+    if _DSW_NOTIFY is None:
+        full = _resolve_folder(path)
+        spec = importlib.util.spec_from_file_location("dsw_notify", full)
+        if spec is None or spec.loader is None:
+            raise ImportError(f"dsw notify niet gevonden: {full}")
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _DSW_NOTIFY = module
+    return _DSW_NOTIFY
+
+
+def send_alert(message: str, cfg: Dict[str, Any]) -> bool:
+    """Bericht naar alle geconfigureerde kanalen; True als minstens één lukte."""
+    channels = cfg.get("channels") or []
+    ok = False
+
+    if "signal" in channels:
+        import cynit_notify
+        try:
+            cynit_notify.send_signal_message(message)
+            ok = True
+        except cynit_notify.SignalError as exc:
+            log(f"Signal-melding mislukt: {exc}")
+
+    if "dsw" in channels:
+        try:
+            _load_dsw_notify(cfg.get("dsw_notify_path") or "../dsw/notify.py").send_notifications(message)
+            ok = True
+        except Exception as exc:
+            log(f"dsw-melding mislukt: {exc}")
+
+    if not channels:
+        log("Geen kanalen geconfigureerd; melding enkel in de log:\n" + message)
+    return ok
+
+
+# ==============================
+# CLI / daemon
+# ==============================
+
+def _print_status(monitor: CertMonitor, n: int = 20) -> None:
+    now = time.time()
+    print(f"{len(monitor.index)} certificaten in index, {len(monitor.files)} bestanden.")
+    for entry in monitor.index.first(n):
+        days = (entry.valid_to_ts - now) / DAY
+        print(f"{days:8.1f} d  {entry.valid_to[:19]}  {entry.label}  [{entry.source}]")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="CyNiT certificaat expiry-monitor")
+    parser.add_argument("--once", action="store_true", help="één pass en stoppen")
+    parser.add_argument("--status", action="store_true", help="eerstvolgende vervaldata tonen")
+    parser.add_argument("--folder", action="append", default=[], help="extra map (herhaalbaar)")
+    parser.add_argument("--no-notify", action="store_true", help="geen meldingen versturen")
+    parser.add_argument("--force-dcbaas", action="store_true", help="DCBaaS nu ophalen, interval negeren")
+    args = parser.parse_args()
+
+    cfg = load_monitor_config()
+    cfg["folders"] = list(cfg.get("folders") or []) + args.folder
+    monitor = CertMonitor(cfg)
+
+    if args.status:
+        _print_status(monitor)
+        return
+
+    if args.once:
+        monitor.run_once(notify=not args.no_notify, force_dcbaas=args.force_dcbaas)
+        return
+
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+
+    log(f"Daemon gestart: {len(cfg['folders'])} map(pen), drempels {cfg['thresholds_days']} dagen.")
+    force = args.force_dcbaas
+    while not stop.is_set():
+        try:
+            monitor.run_once(notify=not args.no_notify, force_dcbaas=force)
+        except Exception as exc:                        # daemon blijft draaien
+            log(f"Pass mislukt: {type(exc).__name__}: {exc}")
+        force = False
+        wait = monitor.seconds_until_next_pass()
+        log(f"Volgende pass over {wait:.0f}s.")
+        stop.wait(wait)
+
+        # config opnieuw inlezen zodat mappen/drempels zonder herstart wijzigen
+        cfg = load_monitor_config()
+        cfg["folders"] = list(cfg.get("folders") or []) + args.folder
+        monitor.cfg = cfg
+    log("Gestopt.")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,6 +8,12 @@ Certificate / CSR viewer module voor CyNiT Tools.
     python cert_viewer.py         -> http://127.0.0.1:5001/cert
 - Standalone GUI:
     python cert_viewer.py --gui
+- Batch (mappen met duizenden certs/CSRs, JSON-lines naar stdout):
+    python cert_viewer.py --batch <map|bestanden...> [--workers N] [--out f.jsonl]
+- Live TLS (keten van host:poort ophalen, zie cynit_tls.py):
+    POST /cert/tls  targets=www.voorbeeld.be:443
+  settings.json "tls_fetch": {"max_targets": 50, "allow": ["*.voorbeeld.be", "10.0.0.0/8"]}
+  begrenst wat de server mag contacteren (lege allow = alles).
 
 - In CyNiT Tools hub (ctools.py):
     import cert_viewer
@@ -29,34 +35,43 @@ from __future__ import annotations
 
 import sys
 import os
+import itertools
 import json
+import secrets
 import subprocess
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from io import BytesIO
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional
 from datetime import datetime, timedelta
 
 import tkinter as tk
-from tkinter import filedialog, messagebox
+from tkinter import filedialog, messagebox, simpledialog
 
 from flask import (
     Flask,
+    Response,
     request,
-    render_template_string,
     send_file,
     make_response,
+    session,
+    has_request_context,
+    stream_with_context,
 )
 
 from PIL import Image, ImageTk
 
-from cryptography import x509
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.asymmetric import rsa, dsa, ec
-from cryptography.x509.oid import NameOID
-
 import cynit_theme
+import cynit_cache
+import cynit_certcore
+import cynit_chain
+import cynit_config
 import cynit_layout
 import cynit_exports
+import cynit_inventory
+import cynit_metrics
+import cynit_tls
 
 
 # ------------------------------------------------------------
@@ -69,231 +84,473 @@ LOGO_PATH: Path = cynit_theme.LOGO_PATH
 # Laat export-map & styles volledig door cynit_exports beheren
 EXPORTS_DIR: Path = cynit_exports.EXPORTS_DIR
 
-LAST_INFO: Optional[Dict[str, Any]] = None   # voor web-downloads
+LAST_INFO: Optional[Dict[str, Any]] = None   # fallback buiten request (GUI / scripts)
+
+# Laatste decode per browser-sessie. Met meerdere workers (gunicorn) kan de
+# download op een ander proces binnenkomen dan de decode, dus naast een kleine
+# LRU in geheugen schrijven we elke sessie ook naar runtime/cert_sessions/.
+SESSION_DIR: Path = BASE_DIR / "runtime" / "cert_sessions"
+SESSION_MAX_AGE = 12 * 3600          # seconden
+SESSION_CACHE_SIZE = 256             # sessies in geheugen per worker
+_SESSION_LOCK = threading.Lock()
+_SESSION_CACHE: "OrderedDict[str, tuple]" = OrderedDict()   # sid -> (mtime_ns, info)
+_LAST_PRUNE = 0.0
+
+# Decode-cache op inhoud-hash: opnieuw uploaden/openen van hetzelfde bestand
+# parset niets opnieuw. Disk-tier (runtime/decode_cache) deelt resultaten
+# tussen workers en herstarts; uitzetten met CYNIT_DECODE_CACHE_DISK=0.
+DECODE_CACHE = cynit_cache.LRUCache(
+    "cert_decode",
+    maxsize=1024,
+    disk_dir=None if os.environ.get("CYNIT_DECODE_CACHE_DISK") == "0"
+    else BASE_DIR / "runtime" / "decode_cache",
+)
+
+EXPORT_MIMETYPES = {
+    "json": "application/json",
+    "csv": "text/csv",
+    "html": "text/html",
+    "md": "text/markdown",
+}
+
+CERT_DECODES = cynit_metrics.counter(
+    "cynit_tools_cert_decodes_total",
+    "Aantal certificaat/CSR decodes in cert_viewer.",
+    ["type", "result"],
+)
 
 
 # ------------------------------------------------------------
 #  X.509 / CSR decode logica
 # ------------------------------------------------------------
 
-def load_cert_or_csr(data: bytes):
+# Format-sniffing loader (PEM-bundles, DER, PKCS#7, PKCS#12) staat in
+# cynit_certcore, gedeeld met de dcbaas-scripts.
+load_cert_or_csr = cynit_certcore.load_cert_or_csr
+
+# Veld-helpers (één RDN-walk per Name, SHA-1 + SHA-256 in één pass) komen
+# ook uit cynit_certcore; hier enkel nog als namen voor bestaande callers.
+subject_fields = cynit_certcore.subject_fields
+issuer_fields = cynit_certcore.issuer_fields
+format_name = cynit_certcore.format_name
+get_key_info = cynit_certcore.get_key_info
+get_signature_algorithm = cynit_certcore.get_signature_algorithm
+compute_thumbprint = cynit_certcore.compute_thumbprint
+get_validity_utc = cynit_certcore.get_validity_utc
+
+
+def decode_cert_from_bytes(
+    data: bytes,
+    fake_path: Path,
+    password: Optional[str] = None,
+) -> Dict[str, Any]:
     """
-    Probeert PEM/DER te detecteren als Certificate of CSR.
-
-    Return:
-        ("cert", x509.Certificate) of ("csr", x509.CertificateSigningRequest)
-    Raise:
-        ValueError bij mislukking.
+    Decode via DECODE_CACHE (sleutel = SHA-256 van decode-versie + bytes).
+    Enkel filename verschilt per upload, de rest van de info is gedeeld: niet aanpassen.
+    Met wachtwoord (.p12) cachen we niet, zodat er niets van op schijf komt.
     """
-    text: Optional[str] = None
+    key = None if password else cynit_cache.content_key(cynit_certcore.DECODE_VERSION, data)
+    cached = DECODE_CACHE.get(key) if key else None
+    if cached is not None:
+        CERT_DECODES.inc(type=cached["type"], result="cached")
+        return _with_chain_status(cached["info"], fake_path)
+
     try:
-        text = data.decode("utf-8", errors="ignore")
-    except Exception:
-        pass
-
-    if text:
-        stripped = text.strip()
-
-        # PEM CSR (iets robuuster, incl. extra whitespace)
-        if "BEGIN CERTIFICATE REQUEST" in stripped or "BEGIN NEW CERTIFICATE REQUEST" in stripped:
-            # Normaliseer lege regels / whitespace
-            lines = [ln.strip() for ln in stripped.splitlines() if ln.strip()]
-            norm = "\n".join(lines) + "\n"
-            try:
-                csr = x509.load_pem_x509_csr(norm.encode("ascii", errors="ignore"))
-                return "csr", csr
-            except Exception:
-                # fallback: probeer originele bytes
-                try:
-                    csr = x509.load_pem_x509_csr(data)
-                    return "csr", csr
-                except Exception:
-                    pass
+        obj_type, info = _decode_info(data, fake_path, password)
+    except ValueError:
+        CERT_DECODES.inc(type="unknown", result="error")
+        raise
+    CERT_DECODES.inc(type=obj_type, result="ok")
+    if key:
+        DECODE_CACHE.put(key, {"type": obj_type, "info": info})
+    return _with_chain_status(info, fake_path)
 
-        # PEM CERT (maar geen CSR)
-        if "BEGIN CERTIFICATE" in stripped and "REQUEST" not in stripped:
-            try:
-                cert = x509.load_pem_x509_certificate(data)
-                return "cert", cert
-            except Exception:
-                pass
 
-    # DER CERT
-    try:
-        cert = x509.load_der_x509_certificate(data)
-        return "cert", cert
-    except Exception:
-        pass
+def _with_chain_status(info: Dict[str, Any], fake_path: Path) -> Dict[str, Any]:
+    """
+    Kopie van een (gedeelde) info met eigen filename; een eventuele keten
+    krijgt zijn geldigheid/status op dit moment (cynit_chain.evaluate).
+    """
+    out = dict(info, filename=str(fake_path))
+    if out.get("chain"):
+        out["chain"] = cynit_chain.evaluate(out["chain"])
+    return out
 
-    # DER CSR
-    try:
-        csr = x509.load_der_x509_csr(data)
-        return "csr", csr
-    except Exception:
-        pass
 
-    raise ValueError("Bestand is geen geldige X.509 certificate of CSR (PEM/DER).")
+def _object_info(obj_type: str, obj, fake_path: Path) -> Dict[str, Any]:
+    return cynit_certcore.decode_object(obj_type, obj).to_info(fake_path)
 
 
-def get_name_attr(name: x509.Name, oid) -> str:
-    try:
-        attrs = name.get_attributes_for_oid(oid)
-        if attrs:
-            return attrs[0].value
-    except Exception:
-        pass
-    return "-"
-
-
-def subject_fields(name: x509.Name) -> Dict[str, str]:
-    return {
-        "Common Name":         get_name_attr(name, NameOID.COMMON_NAME),
-        "emailAddress":        get_name_attr(name, NameOID.EMAIL_ADDRESS),
-        "Organizational Unit": get_name_attr(name, NameOID.ORGANIZATIONAL_UNIT_NAME),
-        "Organization":        get_name_attr(name, NameOID.ORGANIZATION_NAME),
-        "Locality":            get_name_attr(name, NameOID.LOCALITY_NAME),
-        "State or Province":   get_name_attr(name, NameOID.STATE_OR_PROVINCE_NAME),
-        "Country":             get_name_attr(name, NameOID.COUNTRY_NAME),
-    }
-
-
-def issuer_fields(name: x509.Name) -> Dict[str, str]:
-    return {
-        "Issuer Common Name":       get_name_attr(name, NameOID.COMMON_NAME),
-        "Issuer emailAddress":      get_name_attr(name, NameOID.EMAIL_ADDRESS),
-        "Issuer Organization":      get_name_attr(name, NameOID.ORGANIZATION_NAME),
-        "Issuer Locality":          get_name_attr(name, NameOID.LOCALITY_NAME),
-        "Issuer State or Province": get_name_attr(name, NameOID.STATE_OR_PROVINCE_NAME),
-        "Issuer Country":           get_name_attr(name, NameOID.COUNTRY_NAME),
-    }
-
-
-def format_name(name: x509.Name) -> str:
-    parts = []
-    for rdn in name.rdns:
-        for attr in rdn:
-            parts.append(f"{attr.oid._name}={attr.value}")
-    return ", ".join(parts) if parts else "-"
-
-
-def get_key_info(public_key):
-    if isinstance(public_key, rsa.RSAPublicKey):
-        return "RSA", str(public_key.key_size)
-    if isinstance(public_key, dsa.DSAPublicKey):
-        return "DSA", str(public_key.key_size)
-    if isinstance(public_key, ec.EllipticCurvePublicKey):
-        try:
-            size = public_key.key_size
-        except Exception:
-            size = "-"
-        return f"EC ({public_key.curve.name})", str(size)
-    return public_key.__class__.__name__, "-"
+def _decode_info(data: bytes, fake_path: Path, password: Optional[str] = None):
+    """
+    Eigenlijke decode zonder metrics (ook gebruikt in batch-workerprocessen).
+
+    Bevat het bestand meerdere objecten (PEM-chain, CA-bundle, .p7b, .p12),
+    dan beschrijft info het EERSTE object en staat onder info["bundle"] een
+    samenvatting van alle objecten (incl. het eerste). Met minstens twee
+    certificaten komt onder info["chain"] de keten van de leaf binnen de set:
+    het eerste object als dat een leaf is, anders de eerste leaf (een .p7b
+    staat DER-gesorteerd, vaak root eerst). Zonder tijdsafhankelijke velden,
+    zie _with_chain_status.
+    Return: (obj_type, info)
+    """
+    objects = cynit_certcore.load_all(data, password)
+    obj_type, obj = objects[0]
+    info = _object_info(obj_type, obj, fake_path)
+
+    if len(objects) > 1:
+        bundle = []
+        for index, (kind, item) in enumerate(objects, start=1):
+            sub = info if index == 1 else _object_info(kind, item, fake_path)
+            props = sub["properties"]
+            bundle.append({
+                "index": index,
+                "type": sub["type"],
+                "subject": props["Subject"],
+                "issuer": props["Issuer"],
+                "valid_to": props["Valid To"],
+                "thumbprint": props["Thumbprint"],
+            })
+        info["bundle"] = bundle
+
+        certs = [item for kind, item in objects if kind == "cert"]
+        if len(certs) > 1:
+            index = cynit_chain.ChainIndex(certs)
+            hint = obj if obj_type == "cert" else None
+            info["chain"] = cynit_chain.chain_info(certs, leaf=hint, index=index)
+    return obj_type, info
 
 
-def get_signature_algorithm(obj) -> str:
-    try:
-        sig_hash = obj.signature_hash_algorithm.name
-    except Exception:
-        sig_hash = "-"
+def decode_cert_from_file(path: Path) -> Dict[str, Any]:
+    return decode_cert_from_bytes(path.read_bytes(), path)
 
-    algo_name = "-"
-    try:
-        algo_name = obj.signature_algorithm_oid._name
-    except Exception:
-        pass
 
-    if algo_name == "-":
-        return sig_hash if sig_hash != "-" else "-"
-    if sig_hash != "-":
-        return f"{algo_name} ({sig_hash})"
-    return algo_name
+def decode_tls_result(result: "cynit_tls.TlsResult") -> Dict[str, Any]:
+    """
+    Opgehaalde TLS-keten decoderen zoals een geüploade bundle; de
+    handshake-gegevens (endpoint, SNI, versie, cipher) komen onder info["tls"].
+    """
+    target = result.target
+    info = decode_cert_from_bytes(result.pem_bundle(), Path(f"{target.host}_{target.port}.pem"))
+    return dict(info, tls=result.summary())
+
+
+def _write_export(dest: Path, content) -> None:
+    """Resultaat van cynit_exports.render_export() wegschrijven (str of bytes)."""
+    if isinstance(content, bytes):
+        dest.write_bytes(content)
+    else:
+        dest.write_text(content, encoding="utf-8")
 
 
-def compute_thumbprint(cert: x509.Certificate) -> str:
+# ------------------------------------------------------------
+#  Batch decode (process pool)
+# ------------------------------------------------------------
+#
+# Voor audits van mappen met duizenden certificaten:
+#
+#   python cert_viewer.py --batch C:\certs --workers 8 > result.jsonl
+#
+#   for rec in cert_viewer.decode_batch(cert_viewer.iter_cert_files(folder)):
+#       ...
+#
+# Elk resultaat is één dict (= één JSON-lijn):
+#   {"index": 0, "file": "...", "ok": true,  "type": "cert", "info": {...}}
+#   {"index": 1, "file": "...", "ok": false, "error": "..."}
+# Een fout in één bestand stopt de batch nooit.
+
+TLS_WEB_MAX_TARGETS = 50                  # default voor settings.json tls_fetch.max_targets
+
+BATCH_EXTS = (".cer", ".crt", ".pem", ".csr", ".der", ".req", ".p7b", ".p7c")
+BATCH_MAX_FILE_SIZE = 1 * 1024 * 1024     # grotere bestanden zijn geen cert/CSR
+BATCH_INLINE_LIMIT = 64                   # kleine batches: geen pool opstarten
+BATCH_CHUNK = 32                          # bestanden per pool-taak (minder IPC-overhead)
+
+_POOL_LOCK = threading.Lock()
+_POOL = None
+_POOL_WORKERS = 0
+
+
+def iter_cert_files(folder: Path, recursive: bool = True):
+    """Alle cert/CSR-bestanden in een map (op extensie), gesorteerd per map."""
+    folder = Path(folder)
+    pattern = "**/*" if recursive else "*"
+    for p in sorted(folder.glob(pattern)):
+        if p.is_file() and p.suffix.lower() in BATCH_EXTS:
+            yield p
+
+
+def _batch_job(job) -> Dict[str, Any]:
+    """
+    Worker: job = (index, naam, bytes | None | Exception). Bij None lezen we het pad
+    zelf in, zodat we geen bestandsinhoud over de pipe moeten sturen.
+    Draait in een apart proces -> enkel picklebare data terug.
+    """
+    index, name, data = job
     try:
-        fp = cert.fingerprint(hashes.SHA1())
-        return fp.hex().upper()
-    except Exception:
-        return "-"
+        if isinstance(data, Exception):
+            raise data
+        if data is None:
+            path = Path(name)
+            if path.stat().st_size > BATCH_MAX_FILE_SIZE:
+                raise ValueError("Bestand te groot voor een certificaat/CSR.")
+            data = path.read_bytes()
+        obj_type, info = _decode_info(data, Path(name))
+        if info.get("chain"):
+            info["chain"] = cynit_chain.evaluate(info["chain"])
+        return {"index": index, "file": name, "ok": True, "type": obj_type, "info": info}
+    except Exception as exc:
+        return {"index": index, "file": name, "ok": False, "error": f"{type(exc).__name__}: {exc}"}
+
+
+def _batch_chunk(jobs) -> List[Dict[str, Any]]:
+    return [_batch_job(job) for job in jobs]
+
+
+def _get_pool(workers: int):
+    """
+    Gedeelde ProcessPoolExecutor per proces (opstarten kost tijd).
+    'spawn' i.p.v. fork: veilig vanuit een multi-threaded webserver.
+    """
+    global _POOL, _POOL_WORKERS
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_WORKERS != workers:
+            if _POOL is not None:
+                _POOL.shutdown(wait=False, cancel_futures=True)
+            _POOL = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _POOL_WORKERS = workers
+        return _POOL
 
 
-def get_validity_utc(obj):
+def decode_batch(items, workers: Optional[int] = None):
     """
-    Geeft (valid_from_iso, valid_to_iso) terug.
-    Gebruikt *_utc als die bestaan (nieuwe cryptography),
-    anders de oude not_valid_before / not_valid_after.
+    Decodeer veel bestanden parallel en yield per bestand een resultaat-dict
+    zodra het klaar is (volgorde = voltooiing, 'index' = invoervolgorde).
+
+    items: paden (str/Path) en/of (naam, bytes)-tuples; een Exception i.p.v.
+           bytes wordt als fout voor dat bestand gerapporteerd.
+    workers: aantal processen (default: CPU-aantal). 1 = alles in dit proces.
+
+    Een decode kost maar ~0.2 ms, het opstarten van een worker (spawn) een
+    paar honderd ms; de pool loont dus pas vanaf grote mappen en meerdere cores.
     """
-    start = getattr(obj, "not_valid_before_utc", None)
-    end = getattr(obj, "not_valid_after_utc", None)
+    global _POOL
+    from concurrent.futures import FIRST_COMPLETED, wait
+    from concurrent.futures.process import BrokenProcessPool
+
+    def _jobs():
+        for index, item in enumerate(items):
+            if isinstance(item, tuple):
+                name, data = item
+                if not isinstance(data, Exception):
+                    data = bytes(data)
+                yield (index, str(name), data)
+            else:
+                yield (index, str(item), None)
+
+    jobs = _jobs()
+    workers = max(1, int(workers or os.cpu_count() or 1))
+
+    # Eerst een klein stukje inlezen: kleine batches doen we gewoon inline
+    head = []
+    for job in jobs:
+        head.append(job)
+        if len(head) > BATCH_INLINE_LIMIT:
+            break
+
+    def _count(rec):
+        CERT_DECODES.inc(type=rec.get("type", "unknown"), result="ok" if rec["ok"] else "error")
+        return rec
+
+    if workers == 1 or len(head) <= BATCH_INLINE_LIMIT:
+        for job in head:
+            yield _count(_batch_job(job))
+        for job in jobs:
+            yield _count(_batch_job(job))
+        return
+
+    pool = _get_pool(workers)
+    window = workers * 2          # begrens wat er tegelijk in de pipe zit
+    source = itertools.chain(head, jobs)
+    pending = set()
 
-    if start is None:
-        start = obj.not_valid_before
-    if end is None:
-        end = obj.not_valid_after
+    try:
+        while True:
+            while len(pending) < window:
+                chunk = list(itertools.islice(source, BATCH_CHUNK))
+                if not chunk:
+                    break
+                pending.add(pool.submit(_batch_chunk, chunk))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                for rec in fut.result():
+                    yield _count(rec)
+    except BrokenProcessPool:
+        # Worker gecrasht: pool weggooien zodat de volgende batch opnieuw start
+        with _POOL_LOCK:
+            _POOL = None
+        raise
+    finally:
+        for fut in pending:
+            fut.cancel()
+
+
+def iter_zip_members(data: bytes):
+    """
+    (naam, bytes) voor elk cert/CSR-bestand in een ZIP-upload.
+    Te grote entries (zip-bommen) worden niet uitgepakt maar als fout gemeld.
+    """
+    import zipfile
 
-    return start.isoformat(), end.isoformat()
+    with zipfile.ZipFile(BytesIO(data)) as zf:
+        for zi in zf.infolist():
+            if zi.is_dir() or Path(zi.filename).suffix.lower() not in BATCH_EXTS:
+                continue
+            if zi.file_size > BATCH_MAX_FILE_SIZE:
+                yield zi.filename, ValueError("Bestand te groot voor een certificaat/CSR.")
+                continue
+            yield zi.filename, zf.read(zi)
 
 
-def decode_cert_from_bytes(data: bytes, fake_path: Path) -> Dict[str, Any]:
-    obj_type, obj = load_cert_or_csr(data)
+def run_batch_cli(argv: List[str]) -> int:
+    """python cert_viewer.py --batch <map|bestanden...> [--workers N] [--out f.jsonl]"""
+    import argparse
 
-    subj_map = subject_fields(obj.subject)
+    parser = argparse.ArgumentParser(prog="cert_viewer.py --batch")
+    parser.add_argument("paths", nargs="+", help="mappen en/of bestanden")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="-", help="JSON-lines bestand (default: stdout)")
+    parser.add_argument("--no-recursive", action="store_true")
+    opts = parser.parse_args(argv)
 
-    if obj_type == "cert":
-        issuer_map = issuer_fields(obj.issuer)
-        valid_from, valid_to = get_validity_utc(obj)
-        serial = hex(obj.serial_number).upper().replace("X", "x")
-        thumb = compute_thumbprint(obj)
-        issuer_str = format_name(obj.issuer)
-    else:
-        issuer_map = None
-        valid_from = "-"
-        valid_to = "-"
-        serial = "-"
-        thumb = "-"
-        issuer_str = "-"
-
-    pub = obj.public_key()
-    key_algo, key_size = get_key_info(pub)
-    sig_algo = get_signature_algorithm(obj)
-
-    props = {
-        "Subject":        format_name(obj.subject),
-        "Issuer":         issuer_str,
-        "Valid From":     valid_from,
-        "Valid To":       valid_to,
-        "Key Size":       key_size,
-        "Key Algorithm":  key_algo,
-        "Sig. Algorithm": sig_algo,
-        "Serial Number":  serial,
-        "Thumbprint":     thumb,
-    }
-
-    info: Dict[str, Any] = {
-        "filename": str(fake_path),
-        "type": "Certificate" if obj_type == "cert" else "CSR",
-        "subject": subj_map,
-        "issuer": issuer_map,
-        "properties": props,
-    }
-    return info
+    def _items():
+        for raw in opts.paths:
+            p = Path(raw)
+            if p.is_dir():
+                yield from iter_cert_files(p, recursive=not opts.no_recursive)
+            else:
+                yield p
 
+    out = sys.stdout if opts.out == "-" else open(opts.out, "w", encoding="utf-8")
+    ok = failed = 0
+    started = datetime.now()
+    try:
+        for rec in decode_batch(_items(), workers=opts.workers):
+            out.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            if rec["ok"]:
+                ok += 1
+            else:
+                failed += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
 
-def decode_cert_from_file(path: Path) -> Dict[str, Any]:
-    return decode_cert_from_bytes(path.read_bytes(), path)
+    secs = (datetime.now() - started).total_seconds()
+    print(f"[BATCH] {ok} ok, {failed} fouten in {secs:.1f}s", file=sys.stderr)
+    return 0 if failed == 0 else 1
 
 
 # ------------------------------------------------------------
 #  Simpele helpers voor web
 # ------------------------------------------------------------
 
+def _session_id(create: bool = False) -> Optional[str]:
+    """
+    Sessie-id uit de Flask-session (cookie). Buiten een request: None.
+    """
+    if not has_request_context():
+        return None
+    sid = session.get("cert_sid")
+    if not sid and create:
+        sid = secrets.token_hex(16)
+        session["cert_sid"] = sid
+    return sid
+
+
+def _session_path(sid: str) -> Path:
+    return SESSION_DIR / f"{sid}.json"
+
+
+def _prune_sessions() -> None:
+    """Oude sessiebestanden opruimen (hoogstens 1x per 10 minuten)."""
+    global _LAST_PRUNE
+    now = datetime.now().timestamp()
+    if now - _LAST_PRUNE < 600:
+        return
+    _LAST_PRUNE = now
+    for f in SESSION_DIR.glob("*.json"):
+        try:
+            if now - f.stat().st_mtime > SESSION_MAX_AGE:
+                f.unlink()
+        except OSError:
+            pass
+
+
 def set_last_info(info: Dict[str, Any]) -> None:
     global LAST_INFO
-    LAST_INFO = info
+    sid = _session_id(create=True)
+    if sid is None:
+        LAST_INFO = info
+        return
+
+    path = _session_path(sid)
+    try:
+        SESSION_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(info, default=str), encoding="utf-8")
+        os.replace(tmp, path)
+        mtime = path.stat().st_mtime_ns
+    except OSError as exc:
+        print(f"[WARN] Kon sessie {sid} niet wegschrijven: {exc}")
+        mtime = 0
+
+    with _SESSION_LOCK:
+        _SESSION_CACHE[sid] = (mtime, info)
+        _SESSION_CACHE.move_to_end(sid)
+        while len(_SESSION_CACHE) > SESSION_CACHE_SIZE:
+            _SESSION_CACHE.popitem(last=False)
+        _prune_sessions()
 
 
 def get_last_info() -> Optional[Dict[str, Any]]:
-    return LAST_INFO
+    sid = _session_id()
+    if sid is None:
+        return None if has_request_context() else LAST_INFO
+
+    path = _session_path(sid)
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        mtime = None
+
+    with _SESSION_LOCK:
+        cached = _SESSION_CACHE.get(sid)
+        # Geheugenkopie enkel gebruiken als geen andere worker intussen schreef
+        if cached is not None and (mtime is None or cached[0] == mtime):
+            _SESSION_CACHE.move_to_end(sid)
+            return cached[1]
+
+    if mtime is None:
+        return None
+    try:
+        info = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+    with _SESSION_LOCK:
+        _SESSION_CACHE[sid] = (mtime, info)
+        _SESSION_CACHE.move_to_end(sid)
+        while len(_SESSION_CACHE) > SESSION_CACHE_SIZE:
+            _SESSION_CACHE.popitem(last=False)
+    return info
 
 
 # ------------------------------------------------------------
@@ -309,156 +566,427 @@ def register_web_routes(app: Flask, settings: Dict[str, Any], tools=None) -> Non
     - gebruikt cynit_layout.header_html() + footer_html()
     - toont wafelmenu links (modules)
     - toont hamburger export-menu rechts op /cert als er 'info' is
-    """
-    colors = settings["colors"]
-
-    BG = colors["background"]
-    FG = colors["general_fg"]
-    COL1_BG = colors["table_col1_bg"]
-    COL1_FG = colors["table_col1_fg"]
-    COL2_BG = colors["table_col2_bg"]
-    COL2_FG = colors["table_col2_fg"]
-
-    base_css = cynit_layout.common_css(settings)
-    common_js = cynit_layout.common_js()
-
-    extra_css = f"""
-    .error {{
-      color: #ff0000;
-      font-weight: bold;
-    }}
-    table {{
-      border-collapse: collapse;
-      margin-bottom: 20px;
-      min-width: 500px;
-    }}
-    th, td {{
-      border: 1px solid #555;
-      padding: 4px 8px;
-    }}
-    th {{
-      background: {COL1_BG};
-      color: {COL1_FG};
-    }}
-    td {{
-      background: {COL2_BG};
-      color: {COL2_FG};
-    }}
+    - bouwt de pagina's opnieuw op bij elke nieuwe config-snapshot
     """
 
-    # Hamburger rechts op /cert
-    export_menu_html = """
-      {% if info %}
-      <div class="hamburger-wrapper">
-        <div class="hamburger-icon" onclick="toggleExport()">☰</div>
-        <div id="export-menu" class="hamburger-dropdown">
-          <a href="/cert/download/json">⬇ JSON</a>
-          <a href="/cert/download/csv">⬇ CSV</a>
-          <a href="/cert/download/xlsx">⬇ XLSX</a>
-          <a href="/cert/download/html">⬇ HTML</a>
-          <a href="/cert/download/md">⬇ Markdown</a>
-          <a href="/cert/download/zip_all">⬇ ZIP (alles)</a>
-          <a href="/cert/zip_select">⬇ ZIP (selectie)</a>
-          <a href="/cert/save_md">💾 Bewaar MD in exports/</a>
-        </div>
-      </div>
-      {% endif %}
-    """
+    def _build_pages(settings: Dict[str, Any], tools) -> Dict[str, str]:
+        """Alle settings-afhankelijke HTML/templates in één keer opbouwen."""
+        colors = settings["colors"]
 
-    header_cert = cynit_layout.header_html(
-        settings,
-        tools=tools,
-        title="CyNiT Certificate / CSR Viewer",
-        right_html=export_menu_html,
-    )
-    footer = cynit_layout.footer_html()
+        BG = colors["background"]
+        FG = colors["general_fg"]
+        COL1_BG = colors["table_col1_bg"]
+        COL1_FG = colors["table_col1_fg"]
+        COL2_BG = colors["table_col2_bg"]
+        COL2_FG = colors["table_col2_fg"]
+
+        base_css = cynit_layout.common_css(settings)
+        common_js = cynit_layout.common_js()
+
+        extra_css = f"""
+        .error {{
+          color: #ff0000;
+          font-weight: bold;
+        }}
+        table {{
+          border-collapse: collapse;
+          margin-bottom: 20px;
+          min-width: 500px;
+        }}
+        th, td {{
+          border: 1px solid #555;
+          padding: 4px 8px;
+        }}
+        th {{
+          background: {COL1_BG};
+          color: {COL1_FG};
+        }}
+        td {{
+          background: {COL2_BG};
+          color: {COL2_FG};
+        }}
+        """
 
-    # -----------------------------
-    # Hoofd-template voor /cert
-    # -----------------------------
-    def _build_main_template() -> str:
-        additional_js = """
-    function toggleExport() {
-      var el = document.getElementById('export-menu');
-      if (!el) return;
-      el.style.display = (el.style.display === 'block') ? 'none' : 'block';
-    }
+        # Hamburger rechts op /cert
+        export_menu_html = """
+          {% if info %}
+          <div class="hamburger-wrapper">
+            <div class="hamburger-icon" onclick="toggleExport()">☰</div>
+            <div id="export-menu" class="hamburger-dropdown">
+              <a href="/cert/download/json">⬇ JSON</a>
+              <a href="/cert/download/csv">⬇ CSV</a>
+              <a href="/cert/download/xlsx">⬇ XLSX</a>
+              <a href="/cert/download/html">⬇ HTML</a>
+              <a href="/cert/download/md">⬇ Markdown</a>
+              <a href="/cert/download/zip_all">⬇ ZIP (alles)</a>
+              <a href="/cert/zip_select">⬇ ZIP (selectie)</a>
+              <a href="/cert/save_md">💾 Bewaar MD in exports/</a>
+            </div>
+          </div>
+          {% endif %}
         """
-        template = (
+
+        header_cert = cynit_layout.header_html(
+            settings,
+            tools=tools,
+            title="CyNiT Certificate / CSR Viewer",
+            right_html=export_menu_html,
+        )
+        footer = cynit_layout.footer_html()
+
+        # -----------------------------
+        # Hoofd-template voor /cert
+        # -----------------------------
+        def _build_main_template() -> str:
+            additional_js = """
+        function toggleExport() {
+          var el = document.getElementById('export-menu');
+          if (!el) return;
+          el.style.display = (el.style.display === 'block') ? 'none' : 'block';
+        }
+            """
+            template = (
+                "<!doctype html>\n"
+                "<html lang=\"nl\">\n"
+                "<head>\n"
+                "  <meta charset=\"utf-8\">\n"
+                "  <title>CyNiT Certificate / CSR Viewer</title>\n"
+                "  <link rel=\"icon\" type=\"image/x-icon\" href=\"/favicon.ico\">\n"
+                "  <style>\n"
+                + base_css
+                + extra_css
+                + "\n  </style>\n"
+                "  <script>\n"
+                + common_js
+                + additional_js
+                + "\n  </script>\n"
+                "</head>\n"
+                "<body>\n"
+                + header_cert
+                + "\n"
+                "  <div class=\"page\">\n"
+                "    <h1>Certificate / CSR Viewer</h1>\n"
+                "\n"
+                "    <form method=\"post\" enctype=\"multipart/form-data\">\n"
+                "      <label>Upload certificaat, CSR of bundle (.pem/.p7b/.p12):\n"
+                "        <input type=\"file\" name=\"file\">\n"
+                "      </label>\n"
+                "      <label>Wachtwoord (.p12):\n"
+                "        <input type=\"password\" name=\"password\" autocomplete=\"off\">\n"
+                "      </label>\n"
+                "      <button type=\"submit\">Decode</button>\n"
+                "    </form>\n"
+                "    <p><a href=\"/cert/batch\">Batch: meerdere bestanden of een ZIP decoderen →</a></p>\n"
+                "\n"
+                "    <h2>Live TLS endpoint</h2>\n"
+                "    <form method=\"post\" action=\"/cert/tls\">\n"
+                "      <label>host[:poort] [SNI], één per regel:<br>\n"
+                "        <textarea name=\"targets\" rows=\"4\" cols=\"60\" "
+                "placeholder=\"www.voorbeeld.be&#10;10.0.0.5:8443 api.voorbeeld.be\">{{ tls_targets or '' }}</textarea>\n"
+                "      </label><br>\n"
+                "      <label><input type=\"radio\" name=\"output\" value=\"view\" checked> Tonen</label>\n"
+                "      <label><input type=\"radio\" name=\"output\" value=\"zip\"> ZIP met exports:</label>\n"
+                "      {% for f in ['json', 'csv', 'xlsx', 'html', 'md'] %}\n"
+                "      <label><input type=\"checkbox\" name=\"fmt\" value=\"{{ f }}\" "
+                "{% if f in ['json', 'md'] %}checked{% endif %}> {{ f|upper }}</label>\n"
+                "      {% endfor %}\n"
+                "      <button type=\"submit\">Ophalen</button>\n"
+                "    </form>\n"
+                "\n"
+                "    {% if error %}<p class=\"error\">{{ error }}</p>{% endif %}\n"
+                "\n"
+                "    {% if tls_results %}\n"
+                "      <h2>TLS endpoints ({{ tls_results|length }})</h2>\n"
+                "      <table>\n"
+                "        <thead><tr><th>Endpoint</th><th>SNI</th><th>TLS</th><th>Chain</th><th>Subject</th>"
+                "<th>Valid To</th><th>ms</th></tr></thead>\n"
+                "        <tbody>\n"
+                "          {% for r in tls_results %}\n"
+                "          <tr><td><form method=\"post\" action=\"/cert/tls\" style=\"display:inline\">"
+                "<input type=\"hidden\" name=\"targets\" value=\"{{ r.query }}\">"
+                "<button type=\"submit\">{{ r.label }}</button></form></td>"
+                "<td>{{ r.sni }}</td>\n"
+                "          {% if r.info %}<td>{{ r.tls_version }}</td><td>{{ r.chain_length }}</td>"
+                "<td>{{ r.info.properties.Subject }}</td><td>{{ r.info.properties['Valid To'] }}</td>\n"
+                "          {% else %}<td colspan=\"4\" class=\"error\">{{ r.error }}</td>{% endif %}\n"
+                "          <td>{{ r.elapsed_ms }}</td></tr>\n"
+                "          {% endfor %}\n"
+                "        </tbody>\n"
+                "      </table>\n"
+                "    {% endif %}\n"
+                "\n"
+                "    {% if info %}\n"
+                "      <h2>Resultaat</h2>\n"
+                "      <p><strong>Bestand:</strong> {{ info.filename }}</p>\n"
+                "      <p><strong>Type:</strong> {{ info.type }}</p>\n"
+                "\n"
+                "      <h3>Certificate Subject</h3>\n"
+                "      <table>\n"
+                "        <tbody>\n"
+                "          {% for k, v in info.subject.items() %}\n"
+                "          <tr><th>{{ k }}</th><td>{{ v }}</td></tr>\n"
+                "          {% endfor %}\n"
+                "        </tbody>\n"
+                "      </table>\n"
+                "\n"
+                "      <h3>Certificate Issuer</h3>\n"
+                "      {% if info.issuer %}\n"
+                "      <table>\n"
+                "        <tbody>\n"
+                "          {% for k, v in info.issuer.items() %}\n"
+                "          <tr><th>{{ k }}</th><td>{{ v }}</td></tr>\n"
+                "          {% endfor %}\n"
+                "        </tbody>\n"
+                "      </table>\n"
+                "      {% else %}\n"
+                "      <p>CSR heeft geen issuer; dit wordt pas ingevuld na uitgifte van het certificaat.</p>\n"
+                "      {% endif %}\n"
+                "\n"
+                "      <h3>Certificate Properties</h3>\n"
+                "      <table>\n"
+                "        <tbody>\n"
+                "          {% for k, v in info.properties.items() %}\n"
+                "          <tr><th>{{ k }}</th><td>{{ v }}</td></tr>\n"
+                "          {% endfor %}\n"
+                "        </tbody>\n"
+                "      </table>\n"
+                "\n"
+                "      {% if info.tls %}\n"
+                "      <h3>TLS endpoint</h3>\n"
+                "      <table>\n"
+                "        <tbody>\n"
+                "          {% for k, v in info.tls.items() %}\n"
+                "          <tr><th>{{ k }}</th><td>{{ v }}</td></tr>\n"
+                "          {% endfor %}\n"
+                "        </tbody>\n"
+                "      </table>\n"
+                "      {% endif %}\n"
+                "\n"
+                "      {% if info.chain %}\n"
+                "      <h3>Certificaatketen: {{ info.chain.status }}</h3>\n"
+                "      <p>{{ info.chain.summary }}</p>\n"
+                "      {% if info.chain.problems|length > 1 %}<ul>{% for p in info.chain.problems %}<li>{{ p }}</li>{% endfor %}</ul>{% endif %}\n"
+                "      <table>\n"
+                "        <thead><tr><th>#</th><th>Rol</th><th>Subject</th><th>Valid To</th>"
+                "<th>Handtekening</th><th>Geldigheid</th></tr></thead>\n"
+                "        <tbody>\n"
+                "          {% for l in info.chain.links %}\n"
+                "          <tr><td>{{ l.depth }}</td><td>{{ l.role }}</td><td>{{ l.subject }}</td>"
+                "<td>{{ l.valid_to }}</td><td>{{ l.signature }}</td><td>{{ l.validity }}</td></tr>\n"
+                "          {% endfor %}\n"
+                "        </tbody>\n"
+                "      </table>\n"
+                "      {% endif %}\n"
+                "\n"
+                "      {% if info.bundle %}\n"
+                "      <h3>Alle objecten in dit bestand ({{ info.bundle|length }})</h3>\n"
+                "      <table>\n"
+                "        <thead><tr><th>#</th><th>Type</th><th>Subject</th><th>Issuer</th>"
+                "<th>Valid To</th><th>Thumbprint</th></tr></thead>\n"
+                "        <tbody>\n"
+                "          {% for b in info.bundle %}\n"
+                "          <tr><td>{{ b.index }}</td><td>{{ b.type }}</td><td>{{ b.subject }}</td>"
+                "<td>{{ b.issuer }}</td><td>{{ b.valid_to }}</td><td>{{ b.thumbprint }}</td></tr>\n"
+                "          {% endfor %}\n"
+                "        </tbody>\n"
+                "      </table>\n"
+                "      {% endif %}\n"
+                "    {% endif %}\n"
+                "  </div>\n"
+                "\n"
+                + footer +
+                "\n</body>\n</html>\n"
+            )
+            return template
+
+        main_template = _build_main_template()
+
+        # Selectie-formulier voor /cert/zip_select
+        shell2 = cynit_layout.page_shell(settings, tools=tools, title="CyNiT Certificate / CSR Viewer")
+
+        zip_select_template = (
             "<!doctype html>\n"
             "<html lang=\"nl\">\n"
             "<head>\n"
             "  <meta charset=\"utf-8\">\n"
-            "  <title>CyNiT Certificate / CSR Viewer</title>\n"
+            "  <title>Selecteer formaten - CyNiT Cert Viewer</title>\n"
             "  <link rel=\"icon\" type=\"image/x-icon\" href=\"/favicon.ico\">\n"
             "  <style>\n"
-            + base_css
-            + extra_css
+            + shell2.css
             + "\n  </style>\n"
             "  <script>\n"
-            + common_js
-            + additional_js
+            + shell2.js
             + "\n  </script>\n"
             "</head>\n"
             "<body>\n"
-            + header_cert
+            + shell2.header
             + "\n"
             "  <div class=\"page\">\n"
-            "    <h1>Certificate / CSR Viewer</h1>\n"
+            "    <h1>Selecteer export-formaten</h1>\n"
+            "    <p>Bestand: {{ filename }}</p>\n"
+            "    <form method=\"post\">\n"
+            "      <label><input type=\"checkbox\" name=\"fmt\" value=\"json\" checked> JSON</label><br>\n"
+            "      <label><input type=\"checkbox\" name=\"fmt\" value=\"csv\" checked> CSV</label><br>\n"
+            "      <label><input type=\"checkbox\" name=\"fmt\" value=\"xlsx\" checked> XLSX</label><br>\n"
+            "      <label><input type=\"checkbox\" name=\"fmt\" value=\"html\" checked> HTML</label><br>\n"
+            "      <label><input type=\"checkbox\" name=\"fmt\" value=\"md\" checked> Markdown</label><br><br>\n"
+            "      <button type=\"submit\">Download ZIP</button>\n"
+            "    </form>\n"
+            "    <p><a href=\"/cert\">← Terug naar Cert Viewer</a></p>\n"
+            "  </div>\n"
             "\n"
+            + shell2.footer +
+            "\n</body>\n</html>\n"
+        )
+
+        # Batch-upload formulier voor /cert/batch
+        batch_template = (
+            "<!doctype html>\n"
+            "<html lang=\"nl\">\n"
+            "<head>\n"
+            "  <meta charset=\"utf-8\">\n"
+            "  <title>Batch decode - CyNiT Cert Viewer</title>\n"
+            "  <link rel=\"icon\" type=\"image/x-icon\" href=\"/favicon.ico\">\n"
+            "  <style>\n"
+            + shell2.css
+            + "\n  </style>\n"
+            "  <script>\n"
+            + shell2.js
+            + "\n  </script>\n"
+            "</head>\n"
+            "<body>\n"
+            + shell2.header
+            + "\n"
+            "  <div class=\"page\">\n"
+            "    <h1>Batch decode</h1>\n"
+            "    <p>Upload meerdere certificaten/CSRs en/of ZIP-bestanden. "
+            "Resultaat: één JSON-lijn per bestand (fouten per bestand, de batch loopt door).</p>\n"
             "    <form method=\"post\" enctype=\"multipart/form-data\">\n"
-            "      <label>Upload certificaat of CSR:\n"
-            "        <input type=\"file\" name=\"file\">\n"
-            "      </label>\n"
-            "      <button type=\"submit\">Decode</button>\n"
+            "      <input type=\"file\" name=\"files\" multiple><br><br>\n"
+            "      <label><input type=\"checkbox\" name=\"download\" value=\"1\" checked> "
+            "Download als .jsonl</label><br>\n"
+            "      <label><input type=\"radio\" name=\"output\" value=\"jsonl\" checked> JSON-lines</label>\n"
+            "      <label><input type=\"radio\" name=\"output\" value=\"zip\"> ZIP met exports per certificaat:</label>\n"
+            "      {% for f in ['json', 'csv', 'xlsx', 'html', 'md'] %}\n"
+            "      <label><input type=\"checkbox\" name=\"fmt\" value=\"{{ f }}\" "
+            "{% if f in ['json', 'md'] %}checked{% endif %}> {{ f|upper }}</label>\n"
+            "      {% endfor %}<br><br>\n"
+            "      <button type=\"submit\">Decode batch</button>\n"
             "    </form>\n"
+            "    <p><a href=\"/cert\">← Terug naar Cert Viewer</a></p>\n"
+            "  </div>\n"
             "\n"
-            "    {% if error %}<p class=\"error\">{{ error }}</p>{% endif %}\n"
-            "\n"
-            "    {% if info %}\n"
-            "      <h2>Resultaat</h2>\n"
-            "      <p><strong>Bestand:</strong> {{ info.filename }}</p>\n"
-            "      <p><strong>Type:</strong> {{ info.type }}</p>\n"
-            "\n"
-            "      <h3>Certificate Subject</h3>\n"
-            "      <table>\n"
-            "        <tbody>\n"
-            "          {% for k, v in info.subject.items() %}\n"
-            "          <tr><th>{{ k }}</th><td>{{ v }}</td></tr>\n"
-            "          {% endfor %}\n"
-            "        </tbody>\n"
-            "      </table>\n"
-            "\n"
-            "      <h3>Certificate Issuer</h3>\n"
-            "      {% if info.issuer %}\n"
-            "      <table>\n"
-            "        <tbody>\n"
-            "          {% for k, v in info.issuer.items() %}\n"
-            "          <tr><th>{{ k }}</th><td>{{ v }}</td></tr>\n"
-            "          {% endfor %}\n"
-            "        </tbody>\n"
-            "      </table>\n"
-            "      {% else %}\n"
-            "      <p>CSR heeft geen issuer; dit wordt pas ingevuld na uitgifte van het certificaat.</p>\n"
-            "      {% endif %}\n"
+            + shell2.footer +
+            "\n</body>\n</html>\n"
+        )
+
+        header_exports = cynit_layout.header_html(
+            settings,
+            tools=tools,
+            title="Saved Exports",
+            right_html="",
+        )
+
+        exports_css = base_css  # zelfde look & feel
+
+        exports_template = (
+            "<!doctype html>\n"
+            "<html lang=\"nl\">\n"
+            "<head>\n"
+            "  <meta charset=\"utf-8\">\n"
+            "  <title>Saved Exports</title>\n"
+            "  <link rel=\"icon\" type=\"image/x-icon\" href=\"/favicon.ico\">\n"
+            "  <style>\n"
+            + exports_css +
+            "\n    table { border-collapse: collapse; width: 100%; }\n"
+            "    th, td { border: 1px solid #333; padding: 4px 8px; }\n"
+            "    th { text-align: left; }\n"
+            "  </style>\n"
+            "  <script>\n"
+            + common_js +
+            "\n  </script>\n"
+            "</head>\n"
+            "<body>\n"
+            + header_exports +
             "\n"
-            "      <h3>Certificate Properties</h3>\n"
-            "      <table>\n"
-            "        <tbody>\n"
-            "          {% for k, v in info.properties.items() %}\n"
-            "          <tr><th>{{ k }}</th><td>{{ v }}</td></tr>\n"
-            "          {% endfor %}\n"
-            "        </tbody>\n"
-            "      </table>\n"
+            "  <div class=\"page\">\n"
+            "    <h1>Saved Exports</h1>\n"
+            "    <form method=\"get\" style=\"margin-bottom: 10px;\">\n"
+            "      <label>Zoek: <input type=\"text\" name=\"q\" value=\"{{ query }}\" /></label>\n"
+            "      <label style=\"margin-left:10px;\">Van (YYYY-MM-DD): <input type=\"text\" name=\"from\" value=\"{{ date_from }}\" size=\"10\"/></label>\n"
+            "      <label style=\"margin-left:10px;\">Tot (YYYY-MM-DD): <input type=\"text\" name=\"to\" value=\"{{ date_to }}\" size=\"10\"/></label>\n"
+            "      <br><br>\n"
+            "      <label>Subject: <input type=\"text\" name=\"subject\" value=\"{{ subject_q }}\" /></label>\n"
+            "      <label style=\"margin-left:10px;\">Issuer: <input type=\"text\" name=\"issuer\" value=\"{{ issuer_q }}\" /></label>\n"
+            "      <label style=\"margin-left:10px;\">Serial: <input type=\"text\" name=\"serial\" value=\"{{ serial_q }}\" size=\"16\"/></label>\n"
+            "      <label style=\"margin-left:10px;\">Verloopt binnen <input type=\"text\" name=\"expires\" value=\"{{ expires }}\" size=\"4\"/> dagen</label>\n"
+            "      <label style=\"margin-left:6px;\"><input type=\"checkbox\" name=\"expired\" value=\"1\" {% if include_expired %}checked{% endif %}> ook vervallen</label>\n"
+            "      <button type=\"submit\">Filter</button>\n"
+            "    </form>\n"
+            "    {% if files %}\n"
+            "    <table>\n"
+            "      <thead><tr><th>Bestand</th><th>Titel</th><th>Common Name</th><th>Valid To</th><th>Laatste wijziging</th></tr></thead>\n"
+            "      <tbody>\n"
+            "        {% for f in files %}\n"
+            "        <tr>\n"
+            "          <td><a href=\"/exports/view/{{ f.name }}\">{{ f.name }}</a></td>\n"
+            "          <td>{{ f.title }}</td>\n"
+            "          <td>{{ f.common_name }}</td>\n"
+            "          <td>{{ f.valid_to }}</td>\n"
+            "          <td>{{ f.mtime_str }}</td>\n"
+            "        </tr>\n"
+            "        {% endfor %}\n"
+            "      </tbody>\n"
+            "    </table>\n"
+            "    {% else %}\n"
+            "      <p>Er zijn nog geen exports gevonden in de map <code>exports/</code>.</p>\n"
             "    {% endif %}\n"
             "  </div>\n"
             "\n"
             + footer +
             "\n</body>\n</html>\n"
         )
-        return template
 
-    main_template = _build_main_template()
+        # bevestigingspagina van /cert/save_md (los van de layout-shell)
+        saved_css = f"""
+    body {{
+      background: {BG};
+      color: {FG};
+      font-family: Arial, sans-serif;
+      margin: 20px;
+    }}
+    a {{
+      color: {FG};
+    }}
+    code {{
+      background: #222;
+      padding: 2px 4px;
+      border-radius: 3px;
+    }}
+"""
+
+        return {
+            "main": main_template,
+            "saved_css": saved_css,
+            "zip_select": zip_select_template,
+            "batch": batch_template,
+            "exports": exports_template,
+            "base_css": base_css,
+            "common_js": common_js,
+            "header_exports": header_exports,
+            "footer": footer,
+        }
+
+    pages = _build_pages(settings, tools)
+
+    def apply_config(snapshot) -> None:
+        """cynit_config-subscriber: layout/kleuren live bijwerken."""
+        nonlocal settings, tools
+        settings = snapshot.settings
+        tools = snapshot.tools
+        pages.update(_build_pages(settings, tools))
+
+    cynit_config.subscribe(apply_config, name="cert_viewer")
 
     @app.route("/cert", methods=["GET", "POST"])
     @app.route("/cert/", methods=["GET", "POST"])
@@ -473,13 +1001,14 @@ def register_web_routes(app: Flask, settings: Dict[str, Any], tools=None) -> Non
             else:
                 try:
                     data = file.read()
-                    info_obj = decode_cert_from_bytes(data, Path(file.filename))
+                    password = request.form.get("password") or None
+                    info_obj = decode_cert_from_bytes(data, Path(file.filename), password)
                     set_last_info(info_obj)
                 except Exception as e:
                     error = f"Fout bij decoderen: {e}"
 
-        return render_template_string(
-            main_template,
+        return cynit_layout.render_page(
+            pages["main"],
             error=error,
             info=info_obj,
             tools=tools,
@@ -496,58 +1025,30 @@ def register_web_routes(app: Flask, settings: Dict[str, Any], tools=None) -> Non
 
         base_name = Path(info.get("filename", "certificate")).stem or "certificate"
 
-        if fmt == "json":
-            content = json.dumps(info, indent=2, ensure_ascii=False)
-            resp = make_response(content)
-            resp.headers["Content-Type"] = "application/json; charset=utf-8"
-            resp.headers["Content-Disposition"] = f'attachment; filename="{base_name}.json"'
-            return resp
-
-        if fmt == "csv":
-            lines = ["Section;Field;Value"]
-            for section_key, section_name in [
-                ("subject", "Subject"),
-                ("issuer", "Issuer"),
-                ("properties", "Properties"),
-            ]:
-                section = info.get(section_key)
-                if section is None:
-                    continue
-                for k, v in section.items():
-                    value_str = str(v).replace(";", ",")
-                    lines.append(f"{section_name};{k};{value_str}")
-            content = "\n".join(lines)
-            resp = make_response(content)
-            resp.headers["Content-Type"] = "text/csv; charset=utf-8"
-            resp.headers["Content-Disposition"] = f'attachment; filename="{base_name}.csv"'
-            return resp
-
-        if fmt == "html":
-            html = cynit_exports.build_html_export(info, settings)
-            resp = make_response(html)
-            resp.headers["Content-Type"] = "text/html; charset=utf-8"
-            resp.headers["Content-Disposition"] = f'attachment; filename="{base_name}.html"'
-            return resp
-
-        if fmt == "md":
-            md = cynit_exports.build_markdown_export(info, settings)
-            resp = make_response(md)
-            resp.headers["Content-Type"] = "text/markdown; charset=utf-8"
-            resp.headers["Content-Disposition"] = f'attachment; filename="{base_name}.md"'
-            return resp
+        if fmt not in cynit_exports.EXPORT_FORMATS:
+            return make_response("Onbekend exporttype.", 400)
+
+        # xlsx komt bij herhaling uit cynit_exports.EXPORT_CACHE
+        content = cynit_exports.render_export(fmt, info, settings)
 
         if fmt == "xlsx":
-            data = cynit_exports.build_xlsx_export(info, settings)
-            buf = BytesIO(data)
-            buf.seek(0)
             return send_file(
-                buf,
+                BytesIO(content),
                 as_attachment=True,
                 download_name=f"{base_name}.xlsx",
                 mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             )
 
-        return make_response("Onbekend exporttype.", 400)
+        resp = make_response(content)
+        resp.headers["Content-Type"] = f"{EXPORT_MIMETYPES[fmt]}; charset=utf-8"
+        resp.headers["Content-Disposition"] = f'attachment; filename="{base_name}.{fmt}"'
+        return resp
+
+    def _zip_response(chunks, download_name: str) -> Response:
+        """ZIP-chunks rechtstreeks naar de client, zonder volledige ZIP in geheugen."""
+        resp = Response(stream_with_context(chunks), mimetype="application/zip")
+        resp.headers["Content-Disposition"] = f'attachment; filename="{download_name}"'
+        return resp
 
     @app.route("/cert/download/zip_all", methods=["GET"])
     def cert_zip_all():
@@ -556,15 +1057,10 @@ def register_web_routes(app: Flask, settings: Dict[str, Any], tools=None) -> Non
             return make_response("Nog geen certificaat/CSR gedecodeerd in deze sessie.", 400)
 
         formats = ["json", "csv", "xlsx", "html", "md"]
-        zip_bytes = cynit_exports.build_zip_bytes(info, settings, formats)
         base_name = Path(info.get("filename", "certificate")).stem or "certificate"
-        buf = BytesIO(zip_bytes)
-        buf.seek(0)
-        return send_file(
-            buf,
-            as_attachment=True,
-            download_name=f"{base_name}_all.zip",
-            mimetype="application/zip",
+        return _zip_response(
+            cynit_exports.iter_zip_export([info], settings, formats),
+            f"{base_name}_all.zip",
         )
 
     # -----------------------------
@@ -588,8 +1084,13 @@ def register_web_routes(app: Flask, settings: Dict[str, Any], tools=None) -> Non
         filename = f"{slug}_{ts}.md"
         dest = EXPORTS_DIR / filename
 
-        md = cynit_exports.build_markdown_export(info, settings)
+        md = cynit_exports.render_export("md", info, settings)
         dest.write_text(md, encoding="utf-8")
+        try:
+            cynit_inventory.index_file(dest)
+        except Exception as exc:
+            # Index is enkel een versnelling; sync() pikt het later alsnog op
+            print(f"[WARN] Inventory-index voor {filename} faalde: {exc}")
 
         msg_html = f"""<!doctype html>
 <html lang="nl">
@@ -597,22 +1098,7 @@ def register_web_routes(app: Flask, settings: Dict[str, Any], tools=None) -> Non
   <meta charset="utf-8">
   <title>MD export opgeslagen</title>
   <link rel="icon" type="image/x-icon" href="/favicon.ico">
-  <style>
-    body {{
-      background: {BG};
-      color: {FG};
-      font-family: Arial, sans-serif;
-      margin: 20px;
-    }}
-    a {{
-      color: {FG};
-    }}
-    code {{
-      background: #222;
-      padding: 2px 4px;
-      border-radius: 3px;
-    }}
-  </style>
+  <style>{pages["saved_css"]}  </style>
 </head>
 <body>
   <h1>MD export opgeslagen</h1>
@@ -627,6 +1113,144 @@ def register_web_routes(app: Flask, settings: Dict[str, Any], tools=None) -> Non
     # -----------------------------
     # ZIP selectie
     # -----------------------------
+    @app.route("/cert/batch", methods=["GET", "POST"])
+    def cert_batch():
+        """
+        Batch decode: meerdere uploads en/of ZIP's -> NDJSON stream
+        (één resultaat per bestand, zie decode_batch()).
+
+            curl -F files=@a.pem -F files=@certs.zip http://host:5000/cert/batch
+        """
+        if request.method == "GET":
+            return cynit_layout.render_page(pages["batch"], tools=tools)
+
+        # Uploads eerst volledig inlezen: de request-stream is weg zodra we streamen
+        items = []
+        for f in request.files.getlist("files"):
+            if not f or not f.filename:
+                continue
+            data = f.read()
+            if f.filename.lower().endswith(".zip"):
+                try:
+                    items.extend(iter_zip_members(data))
+                except Exception as exc:
+                    items.append((f.filename, ValueError(f"Ongeldige ZIP: {exc}")))
+            else:
+                items.append((f.filename, data))
+
+        if not items:
+            return make_response("Geen bestanden ontvangen.", 400)
+
+        if (request.form.get("output") or request.args.get("output")) == "zip":
+            formats = [f for f in request.form.getlist("fmt") if f in cynit_exports.EXPORT_FORMATS]
+            return _zip_response(_batch_zip(items, formats or ["json", "md"]), "cert_batch.zip")
+
+        def _stream():
+            for rec in decode_batch(items):
+                yield json.dumps(rec, ensure_ascii=False) + "\n"
+
+        resp = Response(stream_with_context(_stream()), mimetype="application/x-ndjson")
+        if request.form.get("download") or request.args.get("download"):
+            resp.headers["Content-Disposition"] = "attachment; filename=cert_batch.jsonl"
+        return resp
+
+    def _exports_zip(infos, errors: List[Dict[str, Any]], formats):
+        """
+        Exports van alle infos in één ZIP-stroom; elk certificaat wordt pas
+        gerenderd als zijn beurt komt. 'errors' wordt gevuld terwijl infos
+        loopt en komt op het einde in _errors.jsonl.
+        """
+        def _entries():
+            yield from cynit_exports.bulk_export_entries(infos, settings, formats)
+            if errors:
+                yield "_errors.jsonl", "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in errors)
+
+        return cynit_exports.iter_zip_chunks(_entries())
+
+    def _batch_zip(items, formats):
+        errors: List[Dict[str, Any]] = []
+
+        def _infos():
+            for rec in decode_batch(items):
+                if rec["ok"]:
+                    yield rec["info"]
+                else:
+                    errors.append(rec)
+
+        return _exports_zip(_infos(), errors, formats)
+
+    # -----------------------------
+    # Live TLS endpoints
+    # -----------------------------
+    def _tls_rows(results) -> Iterator[Dict[str, Any]]:
+        for r in results:
+            row = {
+                "label": r.target.label,
+                "query": f"{r.target.label} {r.target.sni or ''}".strip(),
+                "sni": r.target.sni or "-",
+                "tls_version": r.tls_version,
+                "chain_length": len(r.chain),
+                "elapsed_ms": r.elapsed_ms,
+                "error": r.error,
+                "info": None,
+            }
+            if r.ok:
+                try:
+                    row["info"] = decode_tls_result(r)
+                except ValueError as exc:
+                    row["error"] = f"Keten niet decodeerbaar: {exc}"
+            yield row
+
+    @app.route("/cert/tls", methods=["POST"])
+    def cert_tls():
+        """
+        Live TLS: gepresenteerde keten ophalen bij host:poort-targets (parallel,
+        met SNI) en decoderen.
+
+        POST targets=...  -> één endpoint in detail (exports via het menu), een
+                             tabel bij meerdere, of output=zip voor exports van alle endpoints
+
+        Enkel POST (geen uitgaande verbindingen vanuit een link of <img>), max.
+        tls_fetch.max_targets targets en enkel hosts uit tls_fetch.allow.
+        """
+        text = request.form.get("targets") or ""
+        tls_cfg = settings.get("tls_fetch") or {}
+
+        def _render(**ctx):
+            return cynit_layout.render_page(pages["main"], tls_targets=text, tools=tools, **ctx)
+
+        try:
+            max_targets = int(tls_cfg.get("max_targets", TLS_WEB_MAX_TARGETS))
+            targets = cynit_tls.parse_targets(text, max_targets=min(max_targets, cynit_tls.MAX_TARGETS))
+            cynit_tls.check_allowed(targets, tls_cfg.get("allow") or [])
+        except ValueError as exc:
+            return _render(error=str(exc))
+        if not targets:
+            return _render(error="Geen TLS-targets opgegeven.")
+
+        if request.form.get("output") == "zip":
+            formats = [f for f in request.form.getlist("fmt") if f in cynit_exports.EXPORT_FORMATS]
+            errors: List[Dict[str, Any]] = []
+
+            def _infos():
+                for row in _tls_rows(cynit_tls.fetch_many(targets)):
+                    if row["info"]:
+                        yield row["info"]
+                    else:
+                        errors.append({"target": row["label"], "ok": False, "error": row["error"]})
+
+            return _zip_response(_exports_zip(_infos(), errors, formats or ["json", "md"]), "cert_tls.zip")
+
+        rows = list(_tls_rows(cynit_tls.fetch_many(targets)))
+        if len(rows) > 1:
+            return _render(tls_results=rows)
+
+        row = rows[0]
+        if row["info"] is None:
+            return _render(error=f"{row['label']}: {row['error']}")
+        set_last_info(row["info"])
+        return _render(info=row["info"])
+
     @app.route("/cert/zip_select", methods=["GET", "POST"])
     def cert_zip_select():
         info = get_last_info()
@@ -641,64 +1265,14 @@ def register_web_routes(app: Flask, settings: Dict[str, Any], tools=None) -> Non
             if not selected:
                 return make_response("Geen formaten geselecteerd.", 400)
 
-            zip_bytes = cynit_exports.build_zip_bytes(info, settings, selected)
             base_name = Path(info.get("filename", "certificate")).stem or "certificate"
-            buf = BytesIO(zip_bytes)
-            buf.seek(0)
-            return send_file(
-                buf,
-                as_attachment=True,
-                download_name=f"{base_name}_selected.zip",
-                mimetype="application/zip",
+            return _zip_response(
+                cynit_exports.iter_zip_export([info], settings, selected),
+                f"{base_name}_selected.zip",
             )
 
-        base_css2 = cynit_layout.common_css(settings)
-        common_js2 = cynit_layout.common_js()
-        header2 = cynit_layout.header_html(
-            settings,
-            tools=tools,
-            title="CyNiT Certificate / CSR Viewer",
-            right_html="",
-        )
-        footer2 = cynit_layout.footer_html()
-
-        form_html = (
-            "<!doctype html>\n"
-            "<html lang=\"nl\">\n"
-            "<head>\n"
-            "  <meta charset=\"utf-8\">\n"
-            "  <title>Selecteer formaten - CyNiT Cert Viewer</title>\n"
-            "  <link rel=\"icon\" type=\"image/x-icon\" href=\"/favicon.ico\">\n"
-            "  <style>\n"
-            + base_css2
-            + "\n  </style>\n"
-            "  <script>\n"
-            + common_js2
-            + "\n  </script>\n"
-            "</head>\n"
-            "<body>\n"
-            + header2
-            + "\n"
-            "  <div class=\"page\">\n"
-            "    <h1>Selecteer export-formaten</h1>\n"
-            "    <p>Bestand: {{ filename }}</p>\n"
-            "    <form method=\"post\">\n"
-            "      <label><input type=\"checkbox\" name=\"fmt\" value=\"json\" checked> JSON</label><br>\n"
-            "      <label><input type=\"checkbox\" name=\"fmt\" value=\"csv\" checked> CSV</label><br>\n"
-            "      <label><input type=\"checkbox\" name=\"fmt\" value=\"xlsx\" checked> XLSX</label><br>\n"
-            "      <label><input type=\"checkbox\" name=\"fmt\" value=\"html\" checked> HTML</label><br>\n"
-            "      <label><input type=\"checkbox\" name=\"fmt\" value=\"md\" checked> Markdown</label><br><br>\n"
-            "      <button type=\"submit\">Download ZIP</button>\n"
-            "    </form>\n"
-            "    <p><a href=\"/cert\">← Terug naar Cert Viewer</a></p>\n"
-            "  </div>\n"
-            "\n"
-            + footer2 +
-            "\n</body>\n</html>\n"
-        )
-
-        return render_template_string(
-            form_html,
+        return cynit_layout.render_page(
+            pages["zip_select"],
             filename=info.get("filename", ""),
             tools=tools,
         )
@@ -708,71 +1282,17 @@ def register_web_routes(app: Flask, settings: Dict[str, Any], tools=None) -> Non
     # --------------------------------------------------------
     cynit_exports.ensure_exports_dir()
 
-    header_exports = cynit_layout.header_html(
-        settings,
-        tools=tools,
-        title="Saved Exports",
-        right_html="",
-    )
-
-    exports_css = base_css  # zelfde look & feel
-
-    exports_template = (
-        "<!doctype html>\n"
-        "<html lang=\"nl\">\n"
-        "<head>\n"
-        "  <meta charset=\"utf-8\">\n"
-        "  <title>Saved Exports</title>\n"
-        "  <link rel=\"icon\" type=\"image/x-icon\" href=\"/favicon.ico\">\n"
-        "  <style>\n"
-        + exports_css +
-        "\n    table { border-collapse: collapse; width: 100%; }\n"
-        "    th, td { border: 1px solid #333; padding: 4px 8px; }\n"
-        "    th { text-align: left; }\n"
-        "  </style>\n"
-        "  <script>\n"
-        + common_js +
-        "\n  </script>\n"
-        "</head>\n"
-        "<body>\n"
-        + header_exports +
-        "\n"
-        "  <div class=\"page\">\n"
-        "    <h1>Saved Exports</h1>\n"
-        "    <form method=\"get\" style=\"margin-bottom: 10px;\">\n"
-        "      <label>Zoek: <input type=\"text\" name=\"q\" value=\"{{ query }}\" /></label>\n"
-        "      <label style=\"margin-left:10px;\">Van (YYYY-MM-DD): <input type=\"text\" name=\"from\" value=\"{{ date_from }}\" size=\"10\"/></label>\n"
-        "      <label style=\"margin-left:10px;\">Tot (YYYY-MM-DD): <input type=\"text\" name=\"to\" value=\"{{ date_to }}\" size=\"10\"/></label>\n"
-        "      <button type=\"submit\">Filter</button>\n"
-        "    </form>\n"
-        "    {% if files %}\n"
-        "    <table>\n"
-        "      <thead><tr><th>Bestand</th><th>Titel</th><th>Laatste wijziging</th></tr></thead>\n"
-        "      <tbody>\n"
-        "        {% for f in files %}\n"
-        "        <tr>\n"
-        "          <td><a href=\"/exports/view/{{ f.name }}\">{{ f.name }}</a></td>\n"
-        "          <td>{{ f.title }}</td>\n"
-        "          <td>{{ f.mtime_str }}</td>\n"
-        "        </tr>\n"
-        "        {% endfor %}\n"
-        "      </tbody>\n"
-        "    </table>\n"
-        "    {% else %}\n"
-        "      <p>Er zijn nog geen exports gevonden in de map <code>exports/</code>.</p>\n"
-        "    {% endif %}\n"
-        "  </div>\n"
-        "\n"
-        + footer +
-        "\n</body>\n</html>\n"
-    )
-
     @app.route("/exports", methods=["GET"])
     @app.route("/exports/", methods=["GET"])
     def exports_index():
         q = request.args.get("q", "").strip()
         date_from_str = request.args.get("from", "").strip()
         date_to_str = request.args.get("to", "").strip()
+        subject_q = request.args.get("subject", "").strip()
+        issuer_q = request.args.get("issuer", "").strip()
+        serial_q = request.args.get("serial", "").strip()
+        exp_days_str = request.args.get("expires", "").strip()
+        include_expired = request.args.get("expired") == "1"
 
         dt_from = None
         dt_to = None
@@ -790,43 +1310,46 @@ def register_web_routes(app: Flask, settings: Dict[str, Any], tools=None) -> Non
             if dt_to:
                 dt_to = dt_to + timedelta(days=1)  # inclusief einddag
 
-        files_info = []
-        for p in sorted(EXPORTS_DIR.glob("*.md"), key=lambda x: x.stat().st_mtime, reverse=True):
-            stat = p.stat()
-            mtime = datetime.fromtimestamp(stat.st_mtime)
-
-            if dt_from and mtime < dt_from:
-                continue
-            if dt_to and mtime >= dt_to:
-                continue
-
-            text = p.read_text(encoding="utf-8", errors="ignore")
-            if q:
-                if q.lower() not in p.name.lower() and q.lower() not in text.lower():
-                    continue
-
-            title_line = ""
-            for line in text.splitlines():
-                if line.strip().startswith("#"):
-                    title_line = line.lstrip("# ").strip()
-                    break
-            if not title_line:
-                title_line = "(geen titel in MD)"
-
-            files_info.append(
-                {
-                    "name": p.name,
-                    "title": title_line,
-                    "mtime_str": mtime.strftime("%Y-%m-%d %H:%M:%S"),
-                }
-            )
+        exp_days = None
+        if exp_days_str:
+            try:
+                exp_days = int(exp_days_str)
+            except ValueError:
+                exp_days = None
+
+        # Index-lookup i.p.v. elk .md-bestand te stat()'en en in te lezen
+        rows = cynit_inventory.search(
+            q=q,
+            subject=subject_q,
+            issuer=issuer_q,
+            serial=serial_q,
+            mtime_from=dt_from.timestamp() if dt_from else None,
+            mtime_to=dt_to.timestamp() if dt_to else None,
+            expires_within_days=exp_days,
+            include_expired=include_expired,
+        )
+        files_info = [
+            {
+                "name": row["name"],
+                "title": row["title"],
+                "common_name": row["common_name"] or "-",
+                "valid_to": row["valid_to"] or "-",
+                "mtime_str": datetime.fromtimestamp(row["mtime"]).strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            for row in rows
+        ]
 
-        return render_template_string(
-            exports_template,
+        return cynit_layout.render_page(
+            pages["exports"],
             files=files_info,
             query=q,
             date_from=date_from_str,
             date_to=date_to_str,
+            subject_q=subject_q,
+            issuer_q=issuer_q,
+            serial_q=serial_q,
+            expires=exp_days_str,
+            include_expired=include_expired,
             tools=tools,
         )
 
@@ -854,14 +1377,14 @@ def register_web_routes(app: Flask, settings: Dict[str, Any], tools=None) -> Non
             f"  <title>Export: {safe_path.name}</title>\n"
             "  <link rel=\"icon\" type=\"image/x-icon\" href=\"/favicon.ico\">\n"
             "  <style>\n"
-            + base_css +
+            + pages["base_css"] +
             "\n  </style>\n"
             "  <script>\n"
-            + common_js +
+            + pages["common_js"] +
             "\n  </script>\n"
             "</head>\n"
             "<body>\n"
-            + header_exports +
+            + pages["header_exports"] +
             "\n"
             "  <div class=\"page\">\n"
             f"    <h1>{safe_path.name}</h1>\n"
@@ -871,7 +1394,7 @@ def register_web_routes(app: Flask, settings: Dict[str, Any], tools=None) -> Non
             "    <p><a href=\"/exports\">← Terug naar Saved Exports</a></p>\n"
             "  </div>\n"
             "\n"
-            + footer +
+            + pages["footer"] +
             "\n</body>\n</html>\n"
         )
         return page
@@ -1060,8 +1583,9 @@ class CertViewerGUI(tk.Tk):
 
     def choose_file(self) -> None:
         filetypes = [
-            ("Alle ondersteunde bestanden", "*.crt *.cer *.pem *.csr"),
-            ("Certificates", "*.crt *.cer *.pem"),
+            ("Alle ondersteunde bestanden", "*.crt *.cer *.pem *.der *.csr *.p7b *.p7c *.p12 *.pfx"),
+            ("Certificates", "*.crt *.cer *.pem *.der"),
+            ("Bundles (PKCS#7 / PKCS#12)", "*.p7b *.p7c *.p12 *.pfx"),
             ("CSRs", "*.csr"),
             ("Alle bestanden", "*.*"),
         ]
@@ -1075,7 +1599,16 @@ class CertViewerGUI(tk.Tk):
         path = Path(filename)
         self.lbl_file.config(text=str(path))
         try:
-            info = decode_cert_from_file(path)
+            data = path.read_bytes()
+            password = None
+            if cynit_certcore.sniff_format(data) == cynit_certcore.FMT_PKCS12:
+                try:
+                    cynit_certcore.load_all(data)
+                except ValueError:
+                    password = simpledialog.askstring(
+                        "PKCS#12", "Wachtwoord voor dit bestand:", show="*", parent=self
+                    )
+            info = decode_cert_from_bytes(data, path, password)
         except Exception as e:
             messagebox.showerror("Fout", f"Kon bestand niet decoderen:\n{e}")
             self.set_export_state(tk.DISABLED)
@@ -1167,6 +1700,20 @@ class CertViewerGUI(tk.Tk):
         for k, v in info.get("properties", {}).items():
             kv(k, v)
 
+        bundle = info.get("bundle")
+        if bundle:
+            separator()
+            section_title(f"Alle objecten in dit bestand ({len(bundle)})")
+            for item in bundle:
+                kv(f"#{item['index']} {item['type']}", f"{item['subject']}  (geldig tot {item['valid_to']})")
+
+        chain = info.get("chain")
+        if chain:
+            separator()
+            section_title(f"Certificaatketen: {chain['status']}")
+            for k, v in cynit_chain.chain_mapping(chain).items():
+                kv(k, v)
+
     def export_current(self, fmt: str) -> None:
         if not self.current_info:
             messagebox.showwarning("Geen data", "Er is nog geen certificaat/CSR geladen.")
@@ -1184,35 +1731,11 @@ class CertViewerGUI(tk.Tk):
                 return
             base_path = Path(base).with_suffix("")
             try:
-                # JSON
-                base_name = base_path
-                base_name.with_suffix(".json").write_text(
-                    json.dumps(self.current_info, indent=2, ensure_ascii=False),
-                    encoding="utf-8",
-                )
-                # CSV
-                lines = ["Section;Field;Value"]
-                for section_key, section_name in [
-                    ("subject", "Subject"),
-                    ("issuer", "Issuer"),
-                    ("properties", "Properties"),
-                ]:
-                    section = self.current_info.get(section_key)
-                    if section is None:
-                        continue
-                    for k, v in section.items():
-                        value_str = str(v).replace(";", ",")
-                        lines.append(f"{section_name};{k};{value_str}")
-                base_name.with_suffix(".csv").write_text("\n".join(lines), encoding="utf-8")
-                # XLSX
-                xlsx_bytes = cynit_exports.build_xlsx_export(self.current_info, settings)
-                base_name.with_suffix(".xlsx").write_bytes(xlsx_bytes)
-                # HTML
-                html = cynit_exports.build_html_export(self.current_info, settings)
-                base_name.with_suffix(".html").write_text(html, encoding="utf-8")
-                # MD
-                md = cynit_exports.build_markdown_export(self.current_info, settings)
-                base_name.with_suffix(".md").write_text(md, encoding="utf-8")
+                for ext in cynit_exports.EXPORT_FORMATS:
+                    _write_export(
+                        base_path.with_suffix(f".{ext}"),
+                        cynit_exports.render_export(ext, self.current_info, settings),
+                    )
             except Exception as e:
                 messagebox.showerror("Export-fout", f"Export is mislukt:\n{e}")
                 return
@@ -1246,34 +1769,7 @@ class CertViewerGUI(tk.Tk):
             return
         dest = Path(filename)
         try:
-            if fmt == "json":
-                dest.write_text(
-                    json.dumps(self.current_info, indent=2, ensure_ascii=False),
-                    encoding="utf-8",
-                )
-            elif fmt == "csv":
-                lines = ["Section;Field;Value"]
-                for section_key, section_name in [
-                    ("subject", "Subject"),
-                    ("issuer", "Issuer"),
-                    ("properties", "Properties"),
-                ]:
-                    section = self.current_info.get(section_key)
-                    if section is None:
-                        continue
-                    for k, v in section.items():
-                        value_str = str(v).replace(";", ",")
-                        lines.append(f"{section_name};{k};{value_str}")
-                dest.write_text("\n".join(lines), encoding="utf-8")
-            elif fmt == "xlsx":
-                xlsx_bytes = cynit_exports.build_xlsx_export(self.current_info, settings)
-                dest.write_bytes(xlsx_bytes)
-            elif fmt == "html":
-                html = cynit_exports.build_html_export(self.current_info, settings)
-                dest.write_text(html, encoding="utf-8")
-            elif fmt == "md":
-                md = cynit_exports.build_markdown_export(self.current_info, settings)
-                dest.write_text(md, encoding="utf-8")
+            _write_export(dest, cynit_exports.render_export(fmt, self.current_info, settings))
         except Exception as e:
             messagebox.showerror("Export-fout", f"Export is mislukt:\n{e}")
             return
@@ -1303,9 +1799,11 @@ def run_gui() -> None:
 def run_web() -> None:
     settings = cynit_theme.load_settings()
     app = Flask(__name__)
+    # Nodig voor de sessie-cookie van set_last_info()
+    app.secret_key = settings.get("secret_key", "cynit-dev-key")
     register_web_routes(app, settings, tools=None)
 
-    @app.route("/restart")
+    @app.route("/restart", methods=["POST"])
     def restart_route():
         restart_program()
         return ""  # wordt niet bereikt
@@ -1314,7 +1812,11 @@ def run_web() -> None:
 
 
 if __name__ == "__main__":
-    if "--gui" in sys.argv:
+    if "--batch" in sys.argv:
+        args = sys.argv[1:]
+        args.remove("--batch")
+        sys.exit(run_batch_cli(args))
+    elif "--gui" in sys.argv:
         run_gui()
     else:
         run_web()
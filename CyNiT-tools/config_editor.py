@@ -18,8 +18,9 @@ import json
 from pathlib import Path
 from typing import List, Dict, Any
 
-from flask import Blueprint, render_template_string, request, redirect, url_for, flash
+from flask import Blueprint, request, redirect, url_for, flash
 
+import cynit_config
 import cynit_layout
 import cynit_theme
 
@@ -33,6 +34,17 @@ TOOLS_CFG = cynit_theme.load_tools()
 TOOLS = TOOLS_CFG.get("tools", [])
 
 
+def apply_config(snapshot) -> None:
+    """cynit_config-subscriber: editor-layout volgt de actuele settings/tools."""
+    global SETTINGS, TOOLS_CFG, TOOLS
+    SETTINGS = snapshot.settings
+    TOOLS_CFG = snapshot.tools_cfg
+    TOOLS = TOOLS_CFG.get("tools", [])
+
+
+cynit_config.subscribe(apply_config, name="config_editor")
+
+
 TEMPLATE = """
 <!doctype html>
 <html lang="nl">
@@ -209,19 +221,6 @@ def _write_file(path: Path, content: str) -> str | None:
 
 @bp.route("/config-editor", methods=["GET", "POST"])
 def edit():
-    colors = SETTINGS.get("colors", {})
-    ui = SETTINGS.get("ui", {})
-    base_css = cynit_layout.common_css(SETTINGS)
-    common_js = cynit_layout.common_js()
-
-    header_html = cynit_layout.header_html(
-        SETTINGS,
-        tools=TOOLS,
-        title="Config & Theme Editor",
-        right_html="",
-    )
-    footer_html = cynit_layout.footer_html()
-
     files = _list_config_files()
     if not files:
         # geen configmap of geen files
@@ -243,16 +242,23 @@ def edit():
             flashes.append((error, "error"))
         else:
             flashes.append((f"{current_file} opgeslagen.", "ok"))
+            # Niet wachten op de watcher: deze request toont al de nieuwe config
+            cynit_config.reload()
 
     # altijd opnieuw inlezen (zeker na save)
     content = _read_file(current_path)
 
-    return render_template_string(
+    # na een save kan de layout al veranderd zijn -> pas hier opbouwen
+    colors = SETTINGS.get("colors", {})
+    ui = SETTINGS.get("ui", {})
+    shell = cynit_layout.page_shell(SETTINGS, tools=TOOLS, title="Config & Theme Editor")
+
+    return cynit_layout.render_page(
         TEMPLATE,
-        base_css=base_css,
-        common_js=common_js,
-        header=header_html,
-        footer=footer_html,
+        base_css=shell.css,
+        common_js=shell.js,
+        header=shell.header,
+        footer=shell.footer,
         colors=colors,
         ui=ui,
         files=files,
@@ -9,34 +9,51 @@ CyNiT Tools webhub:
 - Icons per tool instelbaar via tools.json -> icon_web / icon_gui.
 - Web-only tools: volledige card is klikbaar.
 - Web+GUI / GUI-tools: aparte knoppen.
-- Registreert web-routes van:
+- Registreert web-routes van (lazy via cynit_plugins, op basis van tools.json):
   * cert_viewer
   * voica1
   * config_editor
   * dcb_org_export
+- /debug/startup: startup-profiel (of `python ctools.py --startup-report`).
 - /start/ route om GUI-tools te starten (type 'gui' of 'web+gui').
 - /yt-launch: PIN-beveiligde launcher voor SP-YT/yt.py.
+- /metrics: Prometheus metrics (zie cynit_metrics.py).
+- Config hot-reload: cynit_config watcht config/ en pusht snapshots naar
+  alle tools (/restart forceert enkel een extra reload).
+
+Starten:
+  python ctools.py                  -> Flask dev-server (threaded, 1 proces)
+  python ctools.py --serve prod     -> gunicorn (Linux) / waitress (Windows)
+                                       met meerdere workers + threads
+  gunicorn -c gunicorn.conf.py wsgi:application
 """
 
 from __future__ import annotations
 
+import time
+
+_IMPORT_START = time.perf_counter()
+
+import argparse
 import json
+import os
+import signal
 import subprocess
 import sys
 import socket
-import time
+import threading
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
 from flask import (
     Flask,
+    abort,
     render_template_string,
     request,
     redirect,
     url_for,
     send_from_directory,
     session,
-    g,
 )
 
 import logging
@@ -44,18 +61,20 @@ import logging
 logging.basicConfig(level=logging.DEBUG)
 
 import cynit_theme
+import cynit_config
 import cynit_layout
-import cert_viewer
-import voica1
-import config_editor
-import dcb_org_export
-import cynit_notify  # nieuwe helper
-from cynit_notify import send_signal_message, SignalError
+import cynit_metrics
+import cynit_plugins
+
+# Tool-modules (cert_viewer, voica1, config_editor, dcb_org_export) en
+# cynit_notify worden NIET hier geïmporteerd: cynit_plugins laadt ze pas
+# bij de eerste request op hun web_path (zie tools.json).
+STARTUP = cynit_plugins.STARTUP
+STARTUP.record("imports (flask + hub)", _IMPORT_START, time.perf_counter() - _IMPORT_START)
 
 BASE_DIR = Path(__file__).parent
 SPYT_DIR = BASE_DIR.parent / "SP-YT"
 START_TIME = time.time()
-REQUEST_COUNT = 0
 
 
 # Fallback PIN als er niets in settings.json staat
@@ -75,8 +94,6 @@ def get_yt_pin() -> str:
     Haal de YT PIN uit SETTINGS['secrets']['yt_pin'] of SETTINGS['yt_pin'],
     met fallback naar YTL_PIN_DEFAULT.
     """
-    global SETTINGS
-
     if not isinstance(SETTINGS, dict):
         return YTL_PIN_DEFAULT
 
@@ -95,29 +112,39 @@ def get_yt_pin() -> str:
     return str(YTL_PIN_DEFAULT)
 
 
-def reload_config() -> None:
+def apply_config(snapshot: "cynit_config.ConfigSnapshot") -> None:
     """
-    Herlaad settings.json en tools.json.
-    Wordt gebruikt bij startup én door /restart.
+    cynit_config-subscriber: zet de nieuwe settings/tools in geheugen.
+    Wordt aangeroepen bij startup, /restart én automatisch zodra een bestand
+    in config/ wijzigt (watcher-thread).
     """
     global SETTINGS, TOOLS_CFG, TOOLS, DEV_MODE
-    print(">>> RELOADING CONFIG")
-    SETTINGS = cynit_theme.load_settings()
-    DEV_MODE = bool(SETTINGS.get("dev_mode", False))
+    SETTINGS = snapshot.settings
+    DEV_MODE = snapshot.dev_mode
+    TOOLS_CFG = snapshot.tools_cfg
+    # Hidden tools zitten enkel in dev_mode in snapshot.tools
+    TOOLS = snapshot.tools
+
+    # Gecachte page-shells (CSS/header/footer) horen bij de oude config
+    cynit_layout.invalidate()
 
-    TOOLS_CFG = cynit_theme.load_tools()
-    raw_tools = TOOLS_CFG.get("tools", [])
 
-    # Hidden tools alleen tonen in dev_mode
-    TOOLS = []
-    for t in raw_tools:
-        if t.get("hidden") and not DEV_MODE:
-            continue
-        TOOLS.append(t)
+def reload_config() -> None:
+    """
+    Forceer een nieuwe config-snapshot en push die naar alle tools.
+    Wordt gebruikt bij startup én door /restart.
+    """
+    print(">>> RELOADING CONFIG")
+    cynit_config.reload(force=True)
 
 
-# eerste keer laden bij start
-reload_config()
+# eerste keer laden bij start: ontbrekende defaults op schijf aanvullen,
+# daarna één snapshot in geheugen (verder enkel via de watcher)
+with STARTUP.measure("config snapshot"):
+    cynit_theme.load_settings()
+    cynit_theme.load_tools()
+    cynit_config.subscribe(apply_config, name="ctools")
+    reload_config()
 
 # ===== FLASK-APP =====
 
@@ -125,6 +152,38 @@ app = Flask(__name__)
 # Secret key voor sessions (PIN onthouden)
 app.secret_key = SETTINGS.get("secret_key", "cynit-dev-key")
 
+# Request-latency, in-flight en error-metrics per route (zie /metrics)
+cynit_metrics.instrument_app(app)
+
+# Lazy tool-plugins (gevuld door init_app)
+PLUGINS: Optional[cynit_plugins.PluginRegistry] = None
+
+# Hub-gauges: worden pas berekend op het moment dat /metrics gescraped wordt
+cynit_metrics.gauge(
+    "cynit_tools_uptime_seconds",
+    "Uptime van de CyNiT Tools hub in seconden.",
+    func=lambda: round(time.time() - START_TIME),
+    multiprocess_mode="max",
+)
+cynit_metrics.gauge(
+    "cynit_tools_tools_loaded",
+    "Aantal geladen tools uit tools.json.",
+    func=lambda: len(TOOLS),
+    multiprocess_mode="max",
+)
+cynit_metrics.gauge(
+    "cynit_tools_plugins_loaded",
+    "Aantal tool-modules dat al (lazy) geladen is.",
+    func=lambda: PLUGINS.loaded_count() if PLUGINS is not None else 0,
+    multiprocess_mode="max",
+)
+cynit_metrics.gauge(
+    "cynit_tools_dev_mode",
+    "Dev mode actief (1) of niet (0).",
+    func=lambda: 1 if DEV_MODE else 0,
+    multiprocess_mode="max",
+)
+
 # ===== HOME-TEMPLATE =====
 
 HOME_TEMPLATE = """
@@ -404,20 +463,40 @@ def _start_gui_tool(tool: Dict[str, Any]) -> None:
 
 # ===== ROUTES =====
 
-@app.before_request
-def _track_request():
-    """Eenvoudige request-teller voor /metrics."""
-    global REQUEST_COUNT
-    REQUEST_COUNT += 1
-    g.request_started = time.time()
+LOCAL_ADDRS = {"127.0.0.1", "::1"}
 
-@app.route("/restart")
+
+def _restart_allowed() -> bool:
+    """
+    Enkel in dev_mode, of rechtstreeks vanaf localhost (niet via een proxy).
+    De header vraagt een same-origin fetch: een formulier of link van een
+    andere site kan hem niet meesturen.
+    """
+    if request.headers.get("X-CyNiT-Reload") != "1":
+        return False
+    if DEV_MODE:
+        return True
+    return request.remote_addr in LOCAL_ADDRS and "X-Forwarded-For" not in request.headers
+
+
+@app.route("/restart", methods=["POST"])
 def restart():
     """
-    Wordt aangeroepen door de 'Reload app' knop in de topbar.
+    Wordt aangeroepen door de 'Reload app' knop in de topbar (POST).
     Herlaadt settings.json en tools.json in geheugen.
+
+    Onder gunicorn krijgt enkel de worker die de request behandelt de
+    nieuwe config; daarom vragen we de master om een graceful reload (HUP):
+    nieuwe workers starten met verse config, oude werken hun requests af.
     """
+    if not _restart_allowed():
+        abort(403)
     reload_config()
+    if os.environ.get("CYNIT_SERVER") == "gunicorn" and hasattr(signal, "SIGHUP"):
+        try:
+            os.kill(os.getppid(), signal.SIGHUP)
+        except OSError as exc:
+            print("[WARN] Graceful reload via SIGHUP mislukt:", exc)
     return "OK"
 
 @app.route("/health")
@@ -523,63 +602,17 @@ def health_full():
 @app.route("/metrics")
 def metrics():
     """
-    Eenvoudige Prometheus-achtige metrics.
-    Tekst-formaat, zodat bv. Prometheus het kan scrapen.
+    Prometheus metrics (tekst-formaat, zodat bv. Prometheus het kan scrapen).
+
+    Bevat o.a. request-latency histogrammen, in-flight gauges en error-counters
+    per route, plus tool-specifieke counters (cert decodes, DCBaaS API-calls,
+    VOICA1 openssl-aanroepen). Zie cynit_metrics.py.
     """
-    uptime = time.time() - START_TIME
-    lines = [
-        "# HELP cynit_tools_uptime_seconds Uptime van de CyNiT Tools hub in seconden.",
-        "# TYPE cynit_tools_uptime_seconds gauge",
-        f"cynit_tools_uptime_seconds {uptime:.0f}",
-        "",
-        "# HELP cynit_tools_requests_total Aantal HTTP requests sinds start.",
-        "# TYPE cynit_tools_requests_total counter",
-        f"cynit_tools_requests_total {REQUEST_COUNT}",
-        "",
-        "# HELP cynit_tools_tools_loaded Aantal geladen tools uit tools.json.",
-        "# TYPE cynit_tools_tools_loaded gauge",
-        f"cynit_tools_tools_loaded {len(TOOLS)}",
-        "",
-        "# HELP cynit_tools_dev_mode Dev mode actief (1) of niet (0).",
-        "# TYPE cynit_tools_dev_mode gauge",
-        f"cynit_tools_dev_mode {1 if DEV_MODE else 0}",
-    ]
-    body = "\n".join(lines) + "\n"
+    body = cynit_metrics.render()
     return body, 200, {"Content-Type": "text/plain; version=0.0.4"}
 
-@app.route("/signal-test", methods=["GET", "POST"])
-def signal_test():
-    colors = SETTINGS.get("colors", {})
-    ui = SETTINGS.get("ui", {})
-    base_css = cynit_layout.common_css(SETTINGS)
-    common_js = cynit_layout.common_js()
-    header_html = cynit_layout.header_html(
-        SETTINGS,
-        tools=TOOLS,
-        title="Signal test",
-        right_html="",
-    )
-    footer_html = cynit_layout.footer_html()
-
-    msg = ""
-    err = None
-    ok = None
-
-    if request.method == "POST":
-        msg = request.form.get("message", "").strip()
-        recips_raw = request.form.get("recipients", "").strip()
-        recips = [r.strip() for r in recips_raw.splitlines() if r.strip()]
-
-        try:
-            if recips:
-                send_signal_message(msg, recips)
-            else:
-                send_signal_message(msg)
-            ok = "Bericht via Signal verzonden."
-        except SignalError as e:
-            err = str(e)
 
-    template = """
+SIGNAL_TEST_TEMPLATE = """
 <!doctype html>
 <html lang="nl">
 <head>
@@ -656,14 +689,41 @@ def signal_test():
   {{ footer|safe }}
 </body>
 </html>
-    """
+"""
+
+
+@app.route("/signal-test", methods=["GET", "POST"])
+def signal_test():
+    colors = SETTINGS.get("colors", {})
+    ui = SETTINGS.get("ui", {})
+    shell = cynit_layout.page_shell(SETTINGS, tools=TOOLS, title="Signal test")
+
+    msg = ""
+    err = None
+    ok = None
+
+    if request.method == "POST":
+        from cynit_notify import send_signal_message, SignalError
+
+        msg = request.form.get("message", "").strip()
+        recips_raw = request.form.get("recipients", "").strip()
+        recips = [r.strip() for r in recips_raw.splitlines() if r.strip()]
+
+        try:
+            if recips:
+                send_signal_message(msg, recips)
+            else:
+                send_signal_message(msg)
+            ok = "Bericht via Signal verzonden."
+        except SignalError as e:
+            err = str(e)
 
-    return render_template_string(
-        template,
-        base_css=base_css,
-        common_js=common_js,
-        header=header_html,
-        footer=footer_html,
+    return cynit_layout.render_page(
+        SIGNAL_TEST_TEMPLATE,
+        base_css=shell.css,
+        common_js=shell.js,
+        header=shell.header,
+        footer=shell.footer,
         colors=colors,
         ui=ui,
         msg=msg,
@@ -690,25 +750,17 @@ def index():
     paths = SETTINGS.get("paths", {})
     logo_url = paths.get("logo", "logo.png")
 
-    base_css = cynit_layout.common_css(SETTINGS)
-    common_js = cynit_layout.common_js()
-    header_html = cynit_layout.header_html(
-        SETTINGS,
-        tools=TOOLS,
-        title="CyNiT Tools",
-        right_html="",
-    )
-    footer_html = cynit_layout.footer_html()
+    shell = cynit_layout.page_shell(SETTINGS, tools=TOOLS, title="CyNiT Tools")
 
-    return render_template_string(
+    return cynit_layout.render_page(
         HOME_TEMPLATE,
         tools=TOOLS,
         colors=colors,
         ui=ui,
-        base_css=base_css,
-        common_js=common_js,
-        header=header_html,
-        footer=footer_html,
+        base_css=shell.css,
+        common_js=shell.js,
+        header=shell.header,
+        footer=shell.footer,
         home_columns=home_columns,
         logo_url=logo_url,
         dev_mode=DEV_MODE,
@@ -812,56 +864,167 @@ def debug_routes():
     for rule in app.url_map.iter_rules():
         output.append(f"<li>{rule}</li>")
     output.append("</ul>")
+    for plugin in (PLUGINS.plugins() if PLUGINS is not None else []):
+        output.append(f"<h2>{plugin.name} ({', '.join(plugin.prefixes)})</h2><ul>")
+        if plugin.app is None:
+            output.append("<li><em>nog niet geladen</em></li>")
+        else:
+            for rule in plugin.app.url_map.iter_rules():
+                output.append(f"<li>{rule}</li>")
+        output.append("</ul>")
     return "\n".join(output)
 
 
+def startup_report() -> str:
+    lines = [STARTUP.report(), "Plugins:"]
+    for plugin in (PLUGINS.plugins() if PLUGINS is not None else []):
+        if plugin.app is not None:
+            state = f"geladen ({plugin.load_seconds * 1000:.0f} ms)"
+        elif plugin.error:
+            state = f"FOUT: {plugin.error}"
+        else:
+            state = "lazy (nog niet geladen)"
+        lines.append(f"  {plugin.name:<18} {', '.join(plugin.prefixes):<32} {state}")
+    return "\n".join(lines) + "\n"
+
+
+@app.route("/debug/startup")
+def debug_startup():
+    """Startup-profiel: hoe lang duurden imports/config/plugins (zie cynit_plugins)."""
+    return startup_report(), 200, {"Content-Type": "text/plain; charset=utf-8"}
+
+
 # ===== EXTERNE TOOL-ROUTES REGISTREREN =====
 
-def register_external_routes(app: Flask) -> None:
+def register_external_routes(app: Flask, eager: bool = False) -> None:
+    """
+    Koppelt de web-tools uit tools.json via cynit_plugins aan de hub.
+    Standaard lazy: een module wordt pas geïmporteerd bij de eerste request
+    op zijn web_path. Met eager=True (of CYNIT_EAGER_TOOLS=1) laden we alles
+    meteen, bv. om de eerste request na een deploy niet te laten wachten.
+    """
+    global PLUGINS
     print(">>> REGISTERING ROUTES")
 
-    try:
-        print(" - Registering CERT VIEWER...")
-        cert_viewer.register_web_routes(app, SETTINGS, TOOLS)
-        print("   OK: cert_viewer routes registered")
-    except Exception as exc:
-        print("   ERROR: cert_viewer.register_web_routes FAILED:")
-        print("   -->", exc)
-
-    print(" - Loading voica1.json...")
-    voica_cfg_path = BASE_DIR / "config" / "voica1.json"
-    try:
-        voica_cfg = json.loads(voica_cfg_path.read_text(encoding="utf-8"))
-        print("   OK: voica1.json loaded")
-    except Exception as exc:
-        print("   ERROR: Could not load voica1.json:", exc)
-        voica_cfg = {}
+    PLUGINS = cynit_plugins.install(app, lambda: SETTINGS, lambda: TOOLS)
+    for plugin in PLUGINS.plugins():
+        print(f" - {plugin.name}: {', '.join(plugin.prefixes)} (lazy)")
 
-    try:
-        print(" - Registering VOICA1...")
-        voica1.register_web_routes(app, SETTINGS, TOOLS, voica_cfg)
-        print("   OK: voica1 routes registered")
-    except Exception as exc:
-        print("   ERROR: voica1.register_web_routes FAILED:", exc)
+    if eager:
+        PLUGINS.load_all()
 
-    try:
-        print(" - Registering CONFIG EDITOR...")
-        config_editor.register_web_routes(app, SETTINGS, TOOLS)
-        print("   OK: config editor registered")
-    except Exception as exc:
-        print("   ERROR: config_editor.register_web_routes FAILED:", exc)
 
-    try:
-        print(" - Registering DCBAAS ORG EXPORT...")
-        dcb_org_export.register_web_routes(app, SETTINGS, TOOLS)
-        print("   OK: dcbaas-org-export routes registered")
-    except Exception as exc:
-        print("   ERROR: dcb_org_export.register_web_routes FAILED:")
-        print("   -->", exc)
+_INIT_LOCK = threading.Lock()
+_INITIALIZED = False
+
+
+def init_app() -> Flask:
+    """
+    Registreert alle tool-routes precies één keer en geeft de app terug.
+    Gebruikt door __main__ en door wsgi.py (gunicorn / waitress).
+    """
+    global _INITIALIZED
+    with _INIT_LOCK:
+        if not _INITIALIZED:
+            eager = os.environ.get("CYNIT_EAGER_TOOLS", "") == "1"
+            with STARTUP.measure("init_app (plugins)"):
+                register_external_routes(app, eager=eager)
+            # Vanaf nu worden wijzigingen in config/ automatisch opgepikt
+            cynit_config.start()
+            _INITIALIZED = True
+            print(f">>> Hub klaar in {(time.perf_counter() - _IMPORT_START) * 1000:.0f} ms "
+                  f"(details: /debug/startup)")
+    return app
+
+
+# ===== SERVING =====
+
+def serve_dev(host: str, port: int) -> None:
+    """Flask dev-server: 1 proces, maar threaded zodat lange requests niet alles blokkeren."""
+    init_app()
+    app.run(host=host, port=port, debug=False, threaded=True)
+
+
+def serve_prod(host: str, port: int, workers: int, threads: int) -> None:
+    """
+    Productie-server:
+    - Linux/macOS: gunicorn (gthread workers), config uit gunicorn.conf.py
+    - Windows: waitress (1 proces, meerdere threads)
+    Is geen van beide geïnstalleerd, dan valt hij terug op serve_dev().
+    """
+    env = dict(os.environ)
+    env["CYNIT_BIND"] = f"{host}:{port}"
+    env["CYNIT_WORKERS"] = str(workers)
+    env["CYNIT_THREADS"] = str(threads)
+
+    if os.name != "nt":
+        try:
+            import gunicorn
+        except ImportError:
+            print("[WARN] gunicorn niet geïnstalleerd (pip install gunicorn), fallback naar dev-server.")
+        else:
+            conf = BASE_DIR / "gunicorn.conf.py"
+            args = [sys.executable, "-m", "gunicorn", "-c", str(conf), "wsgi:application"]
+            print(f">>> START gunicorn {gunicorn.__version__}:", " ".join(args))
+            os.chdir(BASE_DIR)
+            os.execvpe(sys.executable, args, env)
+    else:
+        try:
+            from waitress import serve as waitress_serve
+        except ImportError:
+            print("[WARN] waitress niet geïnstalleerd (pip install waitress), fallback naar dev-server.")
+        else:
+            os.environ["CYNIT_SERVER"] = "waitress"
+            init_app()
+            print(f">>> START waitress op {host}:{port} ({threads} threads)")
+            waitress_serve(app, host=host, port=port, threads=threads)
+            return
+
+    serve_dev(host, port)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="CyNiT Tools webhub")
+    parser.add_argument(
+        "--serve",
+        choices=["dev", "prod"],
+        default=os.environ.get("CYNIT_SERVE", "dev"),
+        help="dev = Flask dev-server, prod = gunicorn/waitress met workers",
+    )
+    parser.add_argument("--host", default=os.environ.get("CYNIT_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("CYNIT_PORT", "5000")))
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get("CYNIT_WORKERS", str(min(4, (os.cpu_count() or 1) * 2)))),
+        help="aantal worker-processen (enkel gunicorn)",
+    )
+    parser.add_argument(
+        "--startup-report",
+        action="store_true",
+        help="print het startup-profiel (lazy én na het laden van alle tools) en stop",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=int(os.environ.get("CYNIT_THREADS", "8")),
+        help="threads per worker",
+    )
+    return parser.parse_args(argv)
 
 
 # ===== MAIN =====
 
 if __name__ == "__main__":
-    register_external_routes(app)
-    app.run(host="0.0.0.0", port=5000, debug=False)
\ No newline at end of file
+    opts = parse_args()
+    if opts.startup_report:
+        init_app()
+        print(startup_report())
+        with STARTUP.measure("alle plugins laden"):
+            PLUGINS.load_all()
+        print(startup_report())
+        sys.exit(0)
+    if opts.serve == "prod":
+        serve_prod(opts.host, opts.port, opts.workers, opts.threads)
+    else:
+        serve_dev(opts.host, opts.port)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+cynit_cache.py
+
+Kleine, thread-safe LRU-cache op inhoud-hash voor CyNiT Tools.
+
+- content_key(*parts)  : SHA-256 over bytes/str-delen (bv. certificaat-bytes).
+- json_key(obj)        : SHA-256 over een JSON-structuur (bv. een info-dict).
+- LRUCache             : in geheugen (OrderedDict) met optionele disk-tier.
+
+De disk-tier (één JSON-bestand per key) overleeft een herstart en wordt
+gedeeld tussen gunicorn-workers; enkel JSON-serialiseerbare waarden komen
+op schijf. Waarden uit de cache zijn GEDEELD: niet aanpassen, kopieer eerst.
+
+Enkel stdlib + cynit_metrics, zodat ook de dcbaas-scripts deze module
+kunnen gebruiken (zie cynit_certcore voor het sys.path-stukje).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import cynit_metrics
+
+CACHE_LOOKUPS = cynit_metrics.counter(
+    "cynit_tools_cache_lookups_total",
+    "Cache lookups per cache en resultaat (memory/disk hit of miss).",
+    ["cache", "result"],
+)
+
+_MISSING = object()
+
+
+def content_key(*parts: bytes | str) -> str:
+    """SHA-256 (hex) over de gegeven delen; str wordt als UTF-8 gehasht."""
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        h.update(len(part).to_bytes(8, "big"))   # 'ab'+'c' != 'a'+'bc'
+        h.update(part)
+    return h.hexdigest()
+
+
+def json_key(obj: Any) -> str:
+    """Stabiele hash van een JSON-structuur (sleutels gesorteerd)."""
+    return content_key(json.dumps(obj, sort_keys=True, default=str, ensure_ascii=False))
+
+
+class LRUCache:
+    """
+    LRU in geheugen, optioneel met een disk-tier eronder.
+
+        cache = LRUCache("cert_decode", maxsize=1024, disk_dir=runtime / "decode_cache")
+        info = cache.get_or_compute(key, lambda: decode(data))
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 256,
+        disk_dir: Optional[Path] = None,
+        disk_max_files: int = 5000,
+    ):
+        self.name = name
+        self.maxsize = maxsize
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_files = disk_max_files
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, Any]" = OrderedDict()
+        self._disk_writes = 0
+
+    # --- geheugen ---
+
+    def _remember(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    # --- disk ---
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def _disk_get(self, key: str) -> Any:
+        if self.disk_dir is None:
+            return _MISSING
+        try:
+            return json.loads(self._disk_path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return _MISSING
+
+    def _disk_put(self, key: str, value: Any) -> None:
+        if self.disk_dir is None:
+            return
+        path = self._disk_path(key)
+        try:
+            text = json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return                          # niet-JSON waarden blijven in geheugen
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as exc:
+            print(f"[CACHE] {self.name}: kon {path.name} niet wegschrijven: {exc}")
+            return
+        self._disk_writes += 1
+        if self._disk_writes % 200 == 0:
+            self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        """Oudste bestanden weg als de disk-tier boven disk_max_files groeit."""
+        try:
+            files = [p for p in self.disk_dir.glob("*/*.json")]
+            if len(files) <= self.disk_max_files:
+                return
+            files.sort(key=lambda p: p.stat().st_mtime)
+            for p in files[: len(files) - self.disk_max_files]:
+                p.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+    # --- publiek ---
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is not _MISSING:
+                self._data.move_to_end(key)
+        if value is not _MISSING:
+            CACHE_LOOKUPS.inc(cache=self.name, result="memory")
+            return value
+
+        value = self._disk_get(key)
+        if value is not _MISSING:
+            CACHE_LOOKUPS.inc(cache=self.name, result="disk")
+            self._remember(key, value)
+            return value
+
+        CACHE_LOOKUPS.inc(cache=self.name, result="miss")
+        return default
+
+    def put(self, key: str, value: Any) -> None:
+        self._remember(key, value)
+        self._disk_put(key, value)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Cache-hit of compute() uitvoeren en bewaren. Exceptions van compute()
+        worden niet gecachet (een kapot bestand kan later wel lukken).
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = len(self._data)
+        return {"name": self.name, "size": size, "maxsize": self.maxsize,
+                "disk": str(self.disk_dir) if self.disk_dir else None}
@@ -0,0 +1,566 @@
+#!/usr/bin/env python3
+"""
+cynit_certcore.py
+
+Gedeelde certificaat-loader voor CyNiT Tools én de losse dcbaas-scripts.
+
+- sniff_format(data) : herkent het formaat aan de eerste bytes
+                       (PEM, DER-cert, DER-CSR, PKCS#7, PKCS#12).
+- load_all(data)     : ALLE objecten uit een bundle/chain/.p7b/.p12 in één pass,
+                       als lijst van ("cert" | "csr", object).
+- load_cert_or_csr() : compatibele variant die enkel het eerste object teruggeeft.
+- decode_object()    : alle velden van één cert/CSR als compacte CertFacts
+                       (__slots__), elke Name in één RDN-walk, SHA-1 en
+                       SHA-256 over één DER-encode.
+- subject_fields(), issuer_fields(), format_name(), get_key_info(),
+  get_signature_algorithm(), compute_thumbprint(), get_validity_utc():
+                       de losse helpers die vroeger in elke decoder gekopieerd stonden.
+
+Micro-benchmark (decode-snelheid in certificaten/s, exit 1 onder --min-rate):
+
+    python cynit_certcore.py --bench [--min-rate 2000]
+
+De default-ondergrens (BENCH_MIN_RATE) ligt ruim onder de gemeten ~8000
+certs/s, zodat enkel een echte regressie de bench laat falen.
+
+Geen afhankelijkheden buiten 'cryptography', zodat scripts buiten de hub
+(dcbaas/…) deze module via sys.path kunnen importeren:
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "CyNiT-tools"))
+    from cynit_certcore import load_all, load_cert_or_csr
+"""
+
+from __future__ import annotations
+
+import binascii
+import hashlib
+import re
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+from cryptography import x509
+from cryptography.hazmat.primitives.asymmetric import dsa, ec, rsa
+from cryptography.hazmat.primitives.serialization import Encoding, pkcs7, pkcs12
+from cryptography.x509.oid import NameOID
+
+# Formaat-namen zoals sniff_format() ze teruggeeft
+FMT_PEM = "pem"
+FMT_CERT = "der-cert"
+FMT_CSR = "der-csr"
+FMT_PKCS7 = "pkcs7"
+FMT_PKCS12 = "pkcs12"
+FMT_UNKNOWN = "unknown"
+
+# PEM-labels -> soort object; andere labels (keys, params, ...) slaan we over
+PEM_CERT_LABELS = {b"CERTIFICATE", b"X509 CERTIFICATE", b"TRUSTED CERTIFICATE"}
+PEM_CSR_LABELS = {b"CERTIFICATE REQUEST", b"NEW CERTIFICATE REQUEST"}
+PEM_PKCS7_LABELS = {b"PKCS7", b"PKCS #7 SIGNED DATA", b"CMS"}
+
+_PEM_RE = re.compile(rb"-----BEGIN ([A-Z0-9 #]+)-----(.*?)-----END \1-----", re.S)
+
+# OID 1.2.840.113549.1.7.2 (pkcs7-signedData), DER-gecodeerd
+_OID_PKCS7_SIGNED = bytes.fromhex("2a864886f70d010702")
+
+# lengte die _der_header teruggeeft voor een BER indefinite length (0x80)
+INDEFINITE = -1
+
+NOT_A_CERT = "Bestand is geen geldige X.509 certificate of CSR (PEM/DER/PKCS#7/PKCS#12)."
+
+
+# ------------------------------------------------------------
+#  Formaat herkennen
+# ------------------------------------------------------------
+
+def _der_header(data: bytes, pos: int) -> Tuple[int, int, int]:
+    """
+    Minimale ASN.1 DER/BER-header: (tag, start inhoud, lengte inhoud).
+    Een BER indefinite length (0x80, bv. PFX-exports van Windows/Java) geeft
+    INDEFINITE als lengte; enkel geldig bij constructed types.
+    Raise ValueError bij afgekapte/ongeldige data.
+    """
+    if pos + 2 > len(data):
+        raise ValueError("afgekapte DER")
+    tag = data[pos]
+    length = data[pos + 1]
+    pos += 2
+    if length == 0x80:
+        if not tag & 0x20:
+            raise ValueError("indefinite length bij een primitive type")
+        return tag, pos, INDEFINITE
+    if length & 0x80:
+        n = length & 0x7F
+        if n > 4 or pos + n > len(data):
+            raise ValueError("ongeldige DER-lengte")
+        length = int.from_bytes(data[pos:pos + n], "big")
+        pos += n
+    return tag, pos, length
+
+
+def _sniff_der(data: bytes) -> str:
+    """
+    Kijk naar de eerste elementen van de buitenste SEQUENCE:
+      PFX          SEQ { INTEGER 3, ContentInfo, ... }
+      PKCS#7       SEQ { OID signedData, [0] ... }
+      Certificate  SEQ { SEQ tbs { [0] versie | INTEGER serial, SEQ algId, ... } }
+      CSR          SEQ { SEQ info { INTEGER 0, SEQ Name { SET ... }, ... } }
+    """
+    try:
+        _, pos, _ = _der_header(data, 0)
+        tag, inner, length = _der_header(data, pos)
+        if tag == 0x02:
+            return FMT_PKCS12
+        if tag == 0x06:
+            return FMT_PKCS7 if data[inner:inner + length] == _OID_PKCS7_SIGNED else FMT_UNKNOWN
+        if tag != 0x30:
+            return FMT_UNKNOWN
+
+        tag, pos, length = _der_header(data, inner)
+        if tag == 0xA0:                       # expliciete versie -> v2/v3 certificaat
+            return FMT_CERT
+        if tag != 0x02:
+            return FMT_UNKNOWN
+        # INTEGER: v1-cert (serial, dan AlgorithmIdentifier) of CSR (versie, dan Name)
+        tag, pos, length = _der_header(data, pos + length)
+        if tag != 0x30:
+            return FMT_UNKNOWN
+        if length == 0 or (length == INDEFINITE and data[pos] == 0x00):   # lege subject-Name
+            return FMT_CSR
+        first = data[pos]
+        if first == 0x06:
+            return FMT_CERT
+        if first == 0x31:
+            return FMT_CSR
+    except (ValueError, IndexError):
+        pass
+    return FMT_UNKNOWN
+
+
+def sniff_format(data: bytes) -> str:
+    """
+    Formaat bepalen aan de eerste bytes (zonder de hele input te decoderen).
+    DER begint altijd met een SEQUENCE (0x30). Tekst die toevallig met "0"
+    (ook 0x30) begint en geen geldige DER is, gaat verder naar de PEM-check.
+    """
+    if data[:1] == b"\x30":
+        fmt = _sniff_der(data)
+        if fmt != FMT_UNKNOWN:
+            return fmt
+    # PEM mag voorafgegaan worden door tekst (bv. 'Bag Attributes' van openssl)
+    if b"-----BEGIN " in data:
+        return FMT_PEM
+    return FMT_UNKNOWN
+
+
+# ------------------------------------------------------------
+#  Laden
+# ------------------------------------------------------------
+
+def _load_pem(data: bytes) -> List[Tuple[str, Any]]:
+    objects: List[Tuple[str, Any]] = []
+    for index, match in enumerate(_PEM_RE.finditer(data), start=1):
+        label, body = match.group(1), match.group(2)
+        if label in PEM_CERT_LABELS:
+            kind = "cert"
+        elif label in PEM_CSR_LABELS:
+            kind = "csr"
+        elif label in PEM_PKCS7_LABELS:
+            kind = "pkcs7"
+        else:
+            continue
+        try:
+            der = binascii.a2b_base64(body)
+            if kind == "cert":
+                objects.append(("cert", x509.load_der_x509_certificate(der)))
+            elif kind == "csr":
+                objects.append(("csr", x509.load_der_x509_csr(der)))
+            else:
+                objects.extend(("cert", c) for c in pkcs7.load_der_pkcs7_certificates(der))
+        except (ValueError, binascii.Error) as exc:
+            raise ValueError(f"PEM-blok {index} ({label.decode()}) is ongeldig: {exc}") from exc
+    return objects
+
+
+def _load_pkcs12(data: bytes, password: Optional[bytes]) -> List[Tuple[str, Any]]:
+    try:
+        bundle = pkcs12.load_pkcs12(data, password)
+    except ValueError as exc:
+        if password is None:
+            raise ValueError("PKCS#12-bestand is beveiligd met een wachtwoord.") from exc
+        raise ValueError("PKCS#12: wachtwoord fout of bestand beschadigd.") from exc
+    objects: List[Tuple[str, Any]] = []
+    if bundle.cert is not None:
+        objects.append(("cert", bundle.cert.certificate))
+    objects.extend(("cert", c.certificate) for c in bundle.additional_certs)
+    return objects
+
+
+def _load_der_fallback(data: bytes, password: Optional[bytes]) -> List[Tuple[str, Any]]:
+    """
+    Ziet eruit als DER/BER maar de sniffer herkent de structuur niet: de
+    parsers van cryptography zijn toleranter (BER), dus die nog proberen.
+    """
+    for loader in (lambda: _load_pkcs12(data, password),
+                   lambda: [("cert", c) for c in pkcs7.load_der_pkcs7_certificates(data)]):
+        try:
+            return loader()
+        except ValueError:
+            continue
+    return []
+
+
+def load_all(data: bytes, password: Optional[bytes | str] = None) -> List[Tuple[str, Any]]:
+    """
+    Alle certificaten/CSRs uit data, in de volgorde van het bestand.
+
+    Ondersteunt PEM (ook bundles/chains, met tekst ertussen), DER cert/CSR,
+    PKCS#7 (.p7b, DER of PEM) en PKCS#12 (.p12/.pfx; eerst het eigen cert,
+    dan de extra certs). Private keys worden genegeerd.
+
+    Raise:
+        ValueError als er niets bruikbaars in zit.
+    """
+    if isinstance(password, str):
+        password = password.encode("utf-8")
+    fmt = sniff_format(data)
+
+    try:
+        if fmt == FMT_PEM:
+            objects = _load_pem(data)
+        elif fmt == FMT_CERT:
+            objects = [("cert", x509.load_der_x509_certificate(data))]
+        elif fmt == FMT_CSR:
+            objects = [("csr", x509.load_der_x509_csr(data))]
+        elif fmt == FMT_PKCS7:
+            objects = [("cert", c) for c in pkcs7.load_der_pkcs7_certificates(data)]
+        elif fmt == FMT_PKCS12:
+            objects = _load_pkcs12(data, password or None)
+        elif data[:1] == b"\x30":
+            objects = _load_der_fallback(data, password or None)
+        else:
+            objects = []
+    except ValueError as exc:
+        if fmt == FMT_PEM or fmt == FMT_PKCS12:
+            raise
+        raise ValueError(f"{NOT_A_CERT} ({fmt}: {exc})") from exc
+
+    if not objects:
+        raise ValueError(NOT_A_CERT)
+    return objects
+
+
+def load_cert_or_csr(data: bytes):
+    """
+    Eerste object uit data.
+
+    Return:
+        ("cert", x509.Certificate) of ("csr", x509.CertificateSigningRequest)
+    Raise:
+        ValueError bij mislukking.
+    """
+    return load_all(data)[0]
+
+
+# ------------------------------------------------------------
+#  Decoderen naar velden
+# ------------------------------------------------------------
+
+# Versie van de info-structuur; mee in de decode-cache-sleutel, zodat een
+# nieuw veld oude cache-entries (ook op schijf) ongeldig maakt.
+DECODE_VERSION = "3"
+
+SUBJECT_FIELDS = (
+    ("Common Name", NameOID.COMMON_NAME),
+    ("emailAddress", NameOID.EMAIL_ADDRESS),
+    ("Organizational Unit", NameOID.ORGANIZATIONAL_UNIT_NAME),
+    ("Organization", NameOID.ORGANIZATION_NAME),
+    ("Locality", NameOID.LOCALITY_NAME),
+    ("State or Province", NameOID.STATE_OR_PROVINCE_NAME),
+    ("Country", NameOID.COUNTRY_NAME),
+)
+
+ISSUER_FIELDS = (
+    ("Issuer Common Name", NameOID.COMMON_NAME),
+    ("Issuer emailAddress", NameOID.EMAIL_ADDRESS),
+    ("Issuer Organization", NameOID.ORGANIZATION_NAME),
+    ("Issuer Locality", NameOID.LOCALITY_NAME),
+    ("Issuer State or Province", NameOID.STATE_OR_PROVINCE_NAME),
+    ("Issuer Country", NameOID.COUNTRY_NAME),
+)
+
+
+def _walk_name(name: x509.Name) -> Tuple[Dict[Any, str], str]:
+    """
+    Eén pass over de RDNs: (eerste waarde per OID, 'oid=waarde, ...').
+    Vervangt get_attributes_for_oid() per veld + een aparte format_name().
+    """
+    first: Dict[Any, str] = {}
+    parts: List[str] = []
+    for rdn in name.rdns:
+        for attr in rdn:
+            oid = attr.oid
+            value = attr.value
+            if oid not in first:
+                first[oid] = value
+            parts.append(f"{oid._name}={value}")
+    return first, (", ".join(parts) if parts else "-")
+
+
+def _pick(values: Dict[Any, str], fields) -> Dict[str, str]:
+    return {label: values.get(oid, "-") for label, oid in fields}
+
+
+def subject_fields(name: x509.Name) -> Dict[str, str]:
+    return _pick(_walk_name(name)[0], SUBJECT_FIELDS)
+
+
+def issuer_fields(name: x509.Name) -> Dict[str, str]:
+    return _pick(_walk_name(name)[0], ISSUER_FIELDS)
+
+
+def format_name(name: x509.Name) -> str:
+    return _walk_name(name)[1]
+
+
+def get_key_info(public_key) -> Tuple[str, str]:
+    """(Key Algorithm, Key Size) als tekst."""
+    if isinstance(public_key, rsa.RSAPublicKey):
+        return "RSA", str(public_key.key_size)
+    if isinstance(public_key, ec.EllipticCurvePublicKey):
+        return f"EC ({public_key.curve.name})", str(public_key.key_size)
+    if isinstance(public_key, dsa.DSAPublicKey):
+        return "DSA", str(public_key.key_size)
+    return public_key.__class__.__name__, "-"
+
+
+def get_signature_algorithm(obj) -> str:
+    """'sha256WithRSAEncryption (sha256)'; bij Ed25519 e.d. zonder hash enkel de naam."""
+    try:
+        sig_hash = obj.signature_hash_algorithm.name
+    except Exception:
+        sig_hash = "-"
+
+    try:
+        algo_name = obj.signature_algorithm_oid._name
+    except Exception:
+        algo_name = "-"
+
+    if algo_name == "-":
+        return sig_hash
+    if sig_hash != "-":
+        return f"{algo_name} ({sig_hash})"
+    return algo_name
+
+
+def _fingerprints(cert: x509.Certificate) -> Tuple[str, str]:
+    """SHA-1 en SHA-256 (hex, hoofdletters) over één DER-encode."""
+    der = cert.public_bytes(Encoding.DER)
+    return hashlib.sha1(der).hexdigest().upper(), hashlib.sha256(der).hexdigest().upper()
+
+
+def compute_thumbprint(cert: x509.Certificate) -> str:
+    try:
+        return _fingerprints(cert)[0]
+    except Exception:
+        return "-"
+
+
+def get_validity_utc(obj) -> Tuple[str, str]:
+    """
+    Geeft (valid_from_iso, valid_to_iso) terug.
+    Gebruikt *_utc als die bestaan (nieuwe cryptography),
+    anders de oude not_valid_before / not_valid_after.
+    """
+    start = getattr(obj, "not_valid_before_utc", None)
+    end = getattr(obj, "not_valid_after_utc", None)
+
+    if start is None:
+        start = obj.not_valid_before
+    if end is None:
+        end = obj.not_valid_after
+
+    return start.isoformat(), end.isoformat()
+
+
+class CertFacts:
+    """
+    Alle weergavevelden van één certificaat of CSR. Compact (__slots__):
+    batch-decodes en bundles met honderden certs houden er veel tegelijk vast.
+    Bij een CSR zijn issuer=None en de cert-only velden "-".
+    """
+
+    __slots__ = (
+        "kind", "subject", "issuer", "subject_str", "issuer_str",
+        "valid_from", "valid_to", "serial", "sha1", "sha256",
+        "key_algo", "key_size", "sig_algo",
+    )
+
+    def __init__(self, kind: str, **fields: Any):
+        self.kind = kind
+        for slot in self.__slots__[1:]:
+            setattr(self, slot, fields.get(slot, "-"))
+
+    @property
+    def type_label(self) -> str:
+        return "Certificate" if self.kind == "cert" else "CSR"
+
+    def properties(self) -> Dict[str, str]:
+        return {
+            "Subject":        self.subject_str,
+            "Issuer":         self.issuer_str,
+            "Valid From":     self.valid_from,
+            "Valid To":       self.valid_to,
+            "Key Size":       self.key_size,
+            "Key Algorithm":  self.key_algo,
+            "Sig. Algorithm": self.sig_algo,
+            "Serial Number":  self.serial,
+            "Thumbprint":     self.sha1,
+            "SHA-256":        self.sha256,
+        }
+
+    def to_info(self, filename: Any) -> Dict[str, Any]:
+        """Het info-dict zoals de viewers en cynit_exports het gebruiken."""
+        return {
+            "filename": str(filename),
+            "type": self.type_label,
+            "subject": self.subject,
+            "issuer": self.issuer,
+            "properties": self.properties(),
+        }
+
+    def __repr__(self) -> str:
+        return f"CertFacts({self.kind}, {self.subject_str!r}, valid_to={self.valid_to})"
+
+
+def decode_object(kind: str, obj) -> CertFacts:
+    """
+    Eén object uit load_all() naar CertFacts. Elke Name wordt één keer
+    doorlopen (velden + volledige string) en beide fingerprints komen uit
+    dezelfde DER-bytes.
+    """
+    subject_values, subject_str = _walk_name(obj.subject)
+    key_algo, key_size = get_key_info(obj.public_key())
+    fields: Dict[str, Any] = {
+        "subject": _pick(subject_values, SUBJECT_FIELDS),
+        "subject_str": subject_str,
+        "issuer": None,
+        "key_algo": key_algo,
+        "key_size": key_size,
+        "sig_algo": get_signature_algorithm(obj),
+    }
+
+    if kind == "cert":
+        issuer_values, issuer_str = _walk_name(obj.issuer)
+        fields["issuer"] = _pick(issuer_values, ISSUER_FIELDS)
+        fields["issuer_str"] = issuer_str
+        fields["valid_from"], fields["valid_to"] = get_validity_utc(obj)
+        fields["serial"] = hex(obj.serial_number).upper().replace("X", "x")
+        try:
+            fields["sha1"], fields["sha256"] = _fingerprints(obj)
+        except Exception:
+            pass                    # één vreemd cert mag een batch niet breken; blijft "-"
+
+    return CertFacts(kind, **fields)
+
+
+def decode_all(data: bytes, password: Optional[bytes | str] = None) -> List[CertFacts]:
+    """load_all() + decode_object() voor elk object."""
+    return [decode_object(kind, obj) for kind, obj in load_all(data, password)]
+
+
+# ------------------------------------------------------------
+#  Micro-benchmark
+# ------------------------------------------------------------
+
+BENCH_MIN_RATE = 2000.0       # certs/s, default voor --min-rate
+
+
+def _bench_samples() -> Dict[str, bytes]:
+    """Vaste testset, in geheugen gegenereerd: leaf (RSA-2048), keten van 3 (EC), CSR."""
+    from datetime import datetime, timedelta, timezone
+    from cryptography.hazmat.primitives import hashes
+
+    now = datetime.now(timezone.utc)
+
+    def _name(cn: str) -> x509.Name:
+        return x509.Name([
+            x509.NameAttribute(NameOID.COUNTRY_NAME, "BE"),
+            x509.NameAttribute(NameOID.ORGANIZATION_NAME, "CyNiT"),
+            x509.NameAttribute(NameOID.ORGANIZATIONAL_UNIT_NAME, "Bench"),
+            x509.NameAttribute(NameOID.COMMON_NAME, cn),
+        ])
+
+    def _cert(subject, issuer, pub, signer):
+        return (
+            x509.CertificateBuilder()
+            .subject_name(subject).issuer_name(issuer).public_key(pub)
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now).not_valid_after(now + timedelta(days=365))
+            .sign(signer, hashes.SHA256())
+        )
+
+    rsa_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    ec_keys = [ec.generate_private_key(ec.SECP256R1()) for _ in range(3)]
+    root = _cert(_name("Bench Root"), _name("Bench Root"), ec_keys[0].public_key(), ec_keys[0])
+    inter = _cert(_name("Bench Inter"), root.subject, ec_keys[1].public_key(), ec_keys[0])
+    leaf = _cert(_name("bench.example.be"), inter.subject, ec_keys[2].public_key(), ec_keys[1])
+    rsa_leaf = _cert(_name("rsa.example.be"), inter.subject, rsa_key.public_key(), ec_keys[1])
+    csr = (x509.CertificateSigningRequestBuilder()
+           .subject_name(_name("csr.example.be")).sign(rsa_key, hashes.SHA256()))
+
+    return {
+        "leaf-der": rsa_leaf.public_bytes(Encoding.DER),
+        "chain-pem": b"".join(c.public_bytes(Encoding.PEM) for c in (leaf, inter, root)),
+        "csr-pem": csr.public_bytes(Encoding.PEM),
+    }
+
+
+def bench(seconds: float = 1.0) -> Dict[str, float]:
+    """Decodes (load_all + decode_object) per seconde, per sample en in totaal."""
+    import time
+
+    rates: Dict[str, float] = {}
+    total_certs = 0
+    total_time = 0.0
+    for label, data in _bench_samples().items():
+        decode_all(data)                                # warm-up
+        n = 0
+        certs = 0
+        t0 = time.perf_counter()
+        while True:
+            certs += len(decode_all(data))
+            n += 1
+            elapsed = time.perf_counter() - t0
+            if elapsed >= seconds:
+                break
+        rates[label] = certs / elapsed
+        total_certs += certs
+        total_time += elapsed
+    rates["total"] = total_certs / total_time
+    return rates
+
+
+def main(argv: List[str]) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="cynit_certcore micro-benchmark")
+    parser.add_argument("--bench", action="store_true", help="decode-snelheid meten")
+    parser.add_argument("--seconds", type=float, default=1.0, help="meetduur per sample")
+    parser.add_argument("--min-rate", type=float, default=BENCH_MIN_RATE,
+                        help=f"exit 1 als het totaal (certs/s) hieronder zakt "
+                             f"(default {BENCH_MIN_RATE:.0f}, 0 = geen controle)")
+    args = parser.parse_args(argv)
+    if not args.bench:
+        parser.print_help()
+        return 0
+
+    rates = bench(args.seconds)
+    for label, rate in rates.items():
+        print(f"{label:<10} {rate:10.0f} certs/s")
+    if args.min_rate and rates["total"] < args.min_rate:
+        print(f"FOUT: {rates['total']:.0f} certs/s < minimum {args.min_rate:.0f}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
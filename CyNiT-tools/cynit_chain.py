@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+cynit_chain.py
+
+Ketens bouwen en valideren voor een set certificaten (PEM-bundle, .p7b, .p12,
+opgehaalde TLS-keten of een volledige map).
+
+- ChainIndex(certs)     : index op subject (DER) en Subject Key Identifier;
+                          de issuer zoeken is een dict-lookup (AKI -> SKI, anders
+                          issuer-naam -> subject), nooit paarsgewijs vergelijken.
+- index.build(cert)     : keten leaf -> intermediates -> root, met per schakel
+                          een handtekening-controle (gecachet per paar).
+- index.leaves()        : certificaten die binnen de set niemand anders uitgeven.
+- index.pick_leaf(hint) : de leaf om de keten van te tonen (bestandsvolgorde
+                          zegt niets: een .p7b staat DER-gesorteerd, root vaak eerst).
+- chain_info(certs)     : JSON-samenvatting voor info["chain"] (/cert + exports).
+- evaluate(chain)       : geldigheid (vervallen / nog niet geldig) + status en
+                          samenvatting op het moment van tonen. Zo blijft een
+                          gecachte decode correct, ook als een cert intussen vervalt.
+
+Er is geen trust store: een keten is "compleet" als ze eindigt op een
+self-signed root uit de set zelf.
+
+CLI (alle leaves uit bestanden/mappen met hun keten):
+
+    python cynit_chain.py certs/ bundle.pem ...
+"""
+
+from __future__ import annotations
+
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from cryptography import x509
+from cryptography.exceptions import InvalidSignature
+
+import cynit_certcore
+
+MAX_DEPTH = 12
+
+# Waarden voor link["signature"] / link["validity"] / chain["status"]
+SIG_OK = "ok"
+SIG_INVALID = "ongeldig"
+SIG_UNCHECKED = "niet gecontroleerd"
+VALID_OK = "ok"
+VALID_EXPIRED = "vervallen"
+VALID_NOT_YET = "nog niet geldig"
+STATUS_OK = "ok"
+STATUS_INCOMPLETE = "onvolledig"
+STATUS_ERROR = "fout"
+
+
+def _utc(dt: datetime) -> datetime:
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def _validity_window(cert: x509.Certificate) -> Tuple[datetime, datetime]:
+    start = getattr(cert, "not_valid_before_utc", None) or _utc(cert.not_valid_before)
+    end = getattr(cert, "not_valid_after_utc", None) or _utc(cert.not_valid_after)
+    return start, end
+
+
+def _ext_value(cert: x509.Certificate, ext_type):
+    try:
+        return cert.extensions.get_extension_for_class(ext_type).value
+    except (x509.ExtensionNotFound, ValueError):
+        return None
+
+
+def _ski(cert: x509.Certificate) -> Optional[bytes]:
+    value = _ext_value(cert, x509.SubjectKeyIdentifier)
+    return value.digest if value is not None else None
+
+
+def _aki(cert: x509.Certificate) -> Optional[bytes]:
+    value = _ext_value(cert, x509.AuthorityKeyIdentifier)
+    return value.key_identifier if value is not None else None
+
+
+def _cn(cert: x509.Certificate) -> str:
+    cn = cynit_certcore.subject_fields(cert.subject)["Common Name"]
+    return cn if cn != "-" else cynit_certcore.format_name(cert.subject)
+
+
+@dataclass
+class ChainLink:
+    cert: x509.Certificate
+    role: str                       # leaf / intermediate / root
+    signature: str                  # SIG_* : handtekening door de volgende schakel
+
+
+@dataclass
+class ChainResult:
+    links: List[ChainLink] = field(default_factory=list)
+    complete: bool = False
+    problems: List[str] = field(default_factory=list)   # structuur: issuer ontbreekt, handtekening, lus
+
+    def to_dict(self) -> Dict[str, Any]:
+        links = []
+        for depth, link in enumerate(self.links):
+            cert = link.cert
+            valid_from, valid_to = cynit_certcore.get_validity_utc(cert)
+            links.append({
+                "depth": depth,
+                "role": link.role,
+                "subject": cynit_certcore.format_name(cert.subject),
+                "issuer": cynit_certcore.format_name(cert.issuer),
+                "valid_from": valid_from,
+                "valid_to": valid_to,
+                "thumbprint": cynit_certcore.compute_thumbprint(cert),
+                "signature": link.signature,
+            })
+        return {"complete": self.complete, "structure_problems": list(self.problems), "links": links}
+
+
+class ChainIndex:
+    """
+    Alle certificaten van een set, geïndexeerd voor issuer-lookups.
+    Handtekening-controles worden per (kind, issuer) gecachet, zodat
+    leaves() + build() voor duizenden certs elk paar hoogstens één keer verifiëren.
+    """
+
+    def __init__(self, certs: Iterable[x509.Certificate] = ()):
+        self._certs: Dict[x509.Certificate, None] = {}       # dict = geordende set
+        self._by_subject: Dict[bytes, List[x509.Certificate]] = defaultdict(list)
+        self._by_ski: Dict[bytes, List[x509.Certificate]] = defaultdict(list)
+        self._verified: Dict[Tuple[x509.Certificate, x509.Certificate], bool] = {}
+        for cert in certs:
+            self.add(cert)
+
+    def __len__(self) -> int:
+        return len(self._certs)
+
+    def add(self, cert: x509.Certificate) -> None:
+        if cert in self._certs:
+            return
+        self._certs[cert] = None
+        self._by_subject[cert.subject.public_bytes()].append(cert)
+        ski = _ski(cert)
+        if ski:
+            self._by_ski[ski].append(cert)
+
+    # --- lookups ---
+
+    def candidates(self, cert: x509.Certificate) -> List[x509.Certificate]:
+        """Mogelijke issuers: via Authority Key Identifier, anders via de issuer-naam."""
+        aki = _aki(cert)
+        if aki:
+            found = self._by_ski.get(aki)
+            if found:
+                return found
+        return self._by_subject.get(cert.issuer.public_bytes(), [])
+
+    def verify(self, child: x509.Certificate, issuer: x509.Certificate) -> bool:
+        key = (child, issuer)
+        ok = self._verified.get(key)
+        if ok is None:
+            try:
+                child.verify_directly_issued_by(issuer)
+                ok = True
+            except (InvalidSignature, ValueError, TypeError):
+                ok = False
+            self._verified[key] = ok
+        return ok
+
+    def is_self_signed(self, cert: x509.Certificate) -> bool:
+        return cert.subject.public_bytes() == cert.issuer.public_bytes() and self.verify(cert, cert)
+
+    def find_issuer(self, cert: x509.Certificate, at: datetime) -> Tuple[Optional[x509.Certificate], bool]:
+        """
+        (issuer, handtekening_ok). Voorkeur: geldige handtekening én geldig op
+        'at' (bv. bij een vernieuwd intermediate met dezelfde naam/sleutel).
+        """
+        fallback = None
+        first = None
+        for cand in self.candidates(cert):
+            if cand == cert:
+                continue
+            first = first or cand
+            if self.verify(cert, cand):
+                start, end = _validity_window(cand)
+                if start <= at <= end:
+                    return cand, True
+                fallback = fallback or cand
+        if fallback is not None:
+            return fallback, True
+        return first, False
+
+    def leaves(self) -> List[x509.Certificate]:
+        """Certs die voor geen enkel ander cert in de set als issuer in aanmerking komen."""
+        issuers = set()
+        for cert in self._certs:
+            for cand in self.candidates(cert):
+                if cand != cert:
+                    issuers.add(cand)
+        return [c for c in self._certs if c not in issuers]
+
+    def pick_leaf(self, preferred: Optional[x509.Certificate] = None) -> Optional[x509.Certificate]:
+        """
+        'preferred' als dat zelf een leaf is, anders de eerste leaf in de set.
+        Zonder leaves (bv. enkel een lus) het eerste cert; None voor een lege set.
+        """
+        leaves = self.leaves()
+        if preferred is not None and preferred in leaves:
+            return preferred
+        if leaves:
+            return leaves[0]
+        return next(iter(self._certs), None)
+
+    # --- keten ---
+
+    def build(self, cert: x509.Certificate, at: Optional[datetime] = None) -> ChainResult:
+        at = at or datetime.now(timezone.utc)
+        result = ChainResult()
+        seen = set()
+        current = cert
+
+        while True:
+            if self.is_self_signed(current):
+                result.links.append(ChainLink(current, "root", SIG_OK))
+                result.complete = True
+                break
+            if current in seen or len(result.links) >= MAX_DEPTH:
+                result.problems.append(f"Lus of te lange keten bij '{_cn(current)}'.")
+                break
+            seen.add(current)
+
+            issuer, sig_ok = self.find_issuer(current, at)
+            role = "leaf" if not result.links else "intermediate"
+            if issuer is None:
+                result.links.append(ChainLink(current, role, SIG_UNCHECKED))
+                result.problems.append(f"Issuer van '{_cn(current)}' zit niet in de set: keten onvolledig.")
+                break
+            result.links.append(ChainLink(current, role, SIG_OK if sig_ok else SIG_INVALID))
+            if not sig_ok:
+                result.problems.append(
+                    f"Handtekening van '{_cn(current)}' klopt niet met de sleutel van '{_cn(issuer)}'."
+                )
+            current = issuer
+
+        return result
+
+
+# ------------------------------------------------------------
+#  JSON-samenvatting voor info["chain"]
+# ------------------------------------------------------------
+
+def chain_info(
+    certs: Iterable[x509.Certificate],
+    leaf: Optional[x509.Certificate] = None,
+    index: Optional[ChainIndex] = None,
+) -> Dict[str, Any]:
+    """
+    Keten van de leaf binnen de set, als JSON. 'leaf' is een voorkeur: enkel
+    gebruikt als het echt een leaf is (zie ChainIndex.pick_leaf). Geef een
+    bestaande 'index' mee om de set niet opnieuw te indexeren.
+    Tijdsafhankelijke velden vult evaluate() in.
+    """
+    index = index or ChainIndex(certs)
+    return index.build(index.pick_leaf(leaf)).to_dict()
+
+
+def _parse(value: str) -> Optional[datetime]:
+    try:
+        return _utc(datetime.fromisoformat(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def evaluate(chain: Dict[str, Any], at: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Kopie van chain met per schakel 'validity' op tijdstip 'at' (default nu),
+    plus 'problems', 'status' en 'summary'.
+    """
+    at = at or datetime.now(timezone.utc)
+    problems = list(chain.get("structure_problems") or [])
+    links = []
+    for link in chain.get("links") or []:
+        start, end = _parse(link["valid_from"]), _parse(link["valid_to"])
+        if end is not None and at > end:
+            validity = VALID_EXPIRED
+        elif start is not None and at < start:
+            validity = VALID_NOT_YET
+        else:
+            validity = VALID_OK
+        if validity != VALID_OK:
+            problems.append(f"{link['role'].capitalize()} '{link['subject']}' is {validity} ({link['valid_to']}).")
+        links.append(dict(link, validity=validity))
+
+    invalid = any(l["signature"] == SIG_INVALID or l["validity"] != VALID_OK for l in links)
+    if invalid:
+        status = STATUS_ERROR
+    elif not chain.get("complete"):
+        status = STATUS_INCOMPLETE
+    else:
+        status = STATUS_OK
+
+    if status == STATUS_OK:
+        summary = f"Compleet en geldig: {len(links)} certificaten tot root '{links[-1]['subject']}'."
+    else:
+        summary = problems[0] if problems else status
+
+    return dict(chain, links=links, problems=problems, status=status, summary=summary)
+
+
+def chain_mapping(chain: Dict[str, Any]) -> Dict[str, str]:
+    """Eén rij per schakel (voor tabellen in /cert en de exports)."""
+    rows = {"Status": f"{chain.get('status', '-')}: {chain.get('summary', '')}"}
+    for link in chain.get("links") or []:
+        rows[f"{link['depth']} {link['role']}"] = (
+            f"{link['subject']} (geldig tot {link['valid_to']}; "
+            f"handtekening {link['signature']}; {link.get('validity', '-')})"
+        )
+    return rows
+
+
+# ------------------------------------------------------------
+#  CLI
+# ------------------------------------------------------------
+
+def main(argv: List[str]) -> int:
+    from pathlib import Path
+
+    if not argv:
+        print("Gebruik: python cynit_chain.py <map|bestand> [...]")
+        return 1
+
+    exts = (".cer", ".crt", ".pem", ".der", ".p7b", ".p7c")
+    index = ChainIndex()
+    for arg in argv:
+        root = Path(arg)
+        paths = sorted(p for p in root.rglob("*") if p.suffix.lower() in exts) if root.is_dir() else [root]
+        for path in paths:
+            try:
+                for kind, obj in cynit_certcore.load_all(path.read_bytes()):
+                    if kind == "cert":
+                        index.add(obj)
+            except (OSError, ValueError) as exc:
+                print(f"[SKIP] {path}: {exc}", file=sys.stderr)
+
+    leaves = index.leaves()
+    print(f"{len(index)} certificaten, {len(leaves)} leaves.")
+    for leaf in leaves:
+        chain = evaluate(index.build(leaf).to_dict())
+        print(f"\n[{chain['status']}] {chain['summary']}")
+        for link in chain["links"]:
+            print(f"  {'  ' * link['depth']}{link['role']}: {link['subject']} "
+                  f"(tot {link['valid_to'][:10]}, handtekening {link['signature']}, {link['validity']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+cynit_config.py
+
+Centrale config-service voor CyNiT Tools.
+
+- Leest ALLE bestanden in config/ (.json, .md, .txt) één keer in.
+- Bouwt daaruit een onveranderlijke ConfigSnapshot met versienummer
+  (settings met actief profiel, tools, helpfiles, notify, export-styles).
+- Een achtergrond-thread pollt elke seconde de mtimes van config/.
+  Wijzigt er iets (bv. via de config-editor of een teksteditor), dan wordt
+  een nieuwe snapshot gebouwd en naar alle subscribers gepusht.
+
+Gebruik in een tool-module:
+
+    import cynit_config
+
+    def apply_config(snapshot):
+        global SETTINGS
+        SETTINGS = snapshot.settings
+
+    cynit_config.subscribe(apply_config, name="mijn_tool")
+
+Hot paths lezen enkel cynit_config.current(); die raakt de schijf nooit.
+Schrijven naar config/ gebeurt hier NIET (anders triggert de watcher zichzelf);
+defaults aanmaken/wegschrijven blijft bij cynit_theme.load_*() bij de start.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import cynit_theme
+
+CONFIG_DIR: Path = cynit_theme.CONFIG_DIR
+WATCH_SUFFIXES = (".json", ".md", ".txt")
+POLL_INTERVAL = 1.0        # seconden
+SETTLE_DELAY = 0.2         # even wachten tot een editor klaar is met schrijven
+
+
+# ------------------------------------------------------------
+#  Onveranderlijke containers
+# ------------------------------------------------------------
+
+def _readonly(*_args, **_kwargs):
+    raise TypeError("Config snapshot is read-only; pas het bestand in config/ aan.")
+
+
+class FrozenDict(dict):
+    """
+    dict die niet meer aangepast kan worden. Blijft een echte dict-subclass,
+    zodat json.dumps, Jinja en isinstance(x, dict) gewoon blijven werken.
+    """
+
+    __setitem__ = _readonly
+    __delitem__ = _readonly
+    __ior__ = _readonly
+    clear = _readonly
+    pop = _readonly
+    popitem = _readonly
+    setdefault = _readonly
+    update = _readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+class FrozenList(list):
+    """list-variant van FrozenDict."""
+
+    __setitem__ = _readonly
+    __delitem__ = _readonly
+    __iadd__ = _readonly
+    __imul__ = _readonly
+    append = _readonly
+    clear = _readonly
+    extend = _readonly
+    insert = _readonly
+    pop = _readonly
+    remove = _readonly
+    reverse = _readonly
+    sort = _readonly
+
+    def __reduce__(self):
+        return (FrozenList, (list(self),))
+
+
+def freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return FrozenDict({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return FrozenList(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Gewone (muteerbare) kopie van een bevroren structuur."""
+    if isinstance(value, dict):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [thaw(v) for v in value]
+    return value
+
+
+# ------------------------------------------------------------
+#  Snapshot
+# ------------------------------------------------------------
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    version: int
+    loaded_at: float
+    settings: FrozenDict
+    tools_cfg: FrozenDict
+    tools: FrozenList            # zichtbare tools (hidden enkel in dev_mode)
+    helpfiles: FrozenDict
+    notify: FrozenDict
+    exports: FrozenDict          # ruwe inhoud van exports.json
+    files: FrozenDict            # bestandsnaam -> geparste JSON of tekst
+    changed: Tuple[str, ...] = field(default_factory=tuple)
+
+    @property
+    def dev_mode(self) -> bool:
+        return bool(self.settings.get("dev_mode", False))
+
+    def get(self, filename: str, default: Any = None) -> Any:
+        return self.files.get(filename, default)
+
+
+def _visible_tools(tools_cfg: Dict[str, Any], dev_mode: bool) -> List[Dict[str, Any]]:
+    out = []
+    for t in tools_cfg.get("tools", []):
+        if t.get("hidden") and not dev_mode:
+            continue
+        out.append(t)
+    return out
+
+
+def build_snapshot(
+    files: Dict[str, Any],
+    version: int,
+    changed: Tuple[str, ...] = (),
+) -> ConfigSnapshot:
+    """Pure functie: geparste bestanden -> snapshot (geen I/O)."""
+    import cynit_notify
+
+    settings = cynit_theme.build_settings(files.get("settings.json") or {})
+    tools_cfg = cynit_theme.build_tools(files.get("tools.json") or {})
+    helpfiles = files.get("helpfiles.json") or cynit_theme.default_helpfiles()
+    notify = cynit_notify.build_notify_config(files.get("notify.json") or {})
+    exports = files.get("exports.json") or {}
+    dev_mode = bool(settings.get("dev_mode", False))
+
+    return ConfigSnapshot(
+        version=version,
+        loaded_at=time.time(),
+        settings=freeze(settings),
+        tools_cfg=freeze(tools_cfg),
+        tools=freeze(_visible_tools(tools_cfg, dev_mode)),
+        helpfiles=freeze(helpfiles),
+        notify=freeze(notify),
+        exports=freeze(exports),
+        files=freeze(files),
+        changed=tuple(changed),
+    )
+
+
+# ------------------------------------------------------------
+#  Service
+# ------------------------------------------------------------
+
+Subscriber = Callable[[ConfigSnapshot], None]
+
+
+class ConfigService:
+    def __init__(self, config_dir: Path = CONFIG_DIR, interval: float = POLL_INTERVAL):
+        self.config_dir = Path(config_dir)
+        self.interval = interval
+        self._lock = threading.RLock()
+        self._snapshot: Optional[ConfigSnapshot] = None
+        self._files: Dict[str, Any] = {}
+        self._stamps: Dict[str, Tuple[int, int]] = {}
+        self._subscribers: List[Tuple[str, Subscriber]] = []
+        self._notify_lock = threading.Lock()
+        self._delivered = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # --- lezen ---
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        stamps: Dict[str, Tuple[int, int]] = {}
+        try:
+            entries = list(self.config_dir.iterdir())
+        except OSError:
+            return stamps
+        for p in entries:
+            if p.suffix.lower() not in WATCH_SUFFIXES:
+                continue
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            stamps[p.name] = (st.st_mtime_ns, st.st_size)
+        return stamps
+
+    def _parse(self, name: str) -> Any:
+        path = self.config_dir / name
+        text = path.read_text(encoding="utf-8")
+        if path.suffix.lower() == ".json":
+            return json.loads(text)
+        return text
+
+    # --- publiek ---
+
+    def snapshot(self) -> ConfigSnapshot:
+        snap = self._snapshot
+        if snap is None:
+            snap = self.reload(force=True)
+        return snap
+
+    def reload(self, force: bool = False) -> ConfigSnapshot:
+        """
+        Herbouw de snapshot als er bestanden gewijzigd zijn (of altijd bij force).
+        Kapotte JSON -> vorige geparste versie van dat bestand blijft actief.
+        """
+        with self._lock:
+            stamps = self._scan()
+            changed = sorted(
+                name for name in set(stamps) | set(self._stamps)
+                if stamps.get(name) != self._stamps.get(name)
+            )
+            if not changed and not force and self._snapshot is not None:
+                return self._snapshot
+
+            files = dict(self._files)
+            for name in changed:
+                if name not in stamps:
+                    files.pop(name, None)
+                    continue
+                try:
+                    files[name] = self._parse(name)
+                except (OSError, ValueError) as exc:
+                    print(f"[CONFIG] {name} niet ingelezen ({exc}); vorige versie blijft actief.")
+
+            version = (self._snapshot.version + 1) if self._snapshot else 1
+            snap = build_snapshot(files, version, tuple(changed))
+            self._files = files
+            self._stamps = stamps
+            self._snapshot = snap
+            subscribers = list(self._subscribers)
+
+        if changed:
+            print(f">>> CONFIG v{snap.version}: {', '.join(changed)}")
+        with self._notify_lock:
+            # Nooit een oudere snapshot na een nieuwere pushen
+            if snap.version > self._delivered:
+                self._delivered = snap.version
+                for name, callback in subscribers:
+                    try:
+                        callback(snap)
+                    except Exception as exc:
+                        print(f"[CONFIG] subscriber {name} faalde: {exc}")
+        return snap
+
+    def subscribe(self, callback: Subscriber, name: str = "", replay: bool = False) -> None:
+        """
+        Registreer een callback die elke nieuwe snapshot krijgt.
+        Met replay=True krijgt hij meteen ook de huidige snapshot.
+        """
+        with self._lock:
+            self._subscribers.append((name or getattr(callback, "__qualname__", "?"), callback))
+            snap = self._snapshot
+        if replay and snap is not None:
+            callback(snap)
+
+    def start(self) -> None:
+        """Start de polling-thread (idempotent)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if self._snapshot is None:
+                self.reload(force=True)
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="cynit-config-watch", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            if self._scan() == self._stamps:
+                continue
+            time.sleep(SETTLE_DELAY)
+            try:
+                self.reload()
+            except Exception as exc:
+                print(f"[CONFIG] reload faalde: {exc}")
+
+
+SERVICE = ConfigService()
+
+
+def current() -> ConfigSnapshot:
+    return SERVICE.snapshot()
+
+
+def running() -> bool:
+    return SERVICE._thread is not None and SERVICE._thread.is_alive()
+
+
+def reload(force: bool = False) -> ConfigSnapshot:
+    return SERVICE.reload(force=force)
+
+
+def subscribe(callback: Subscriber, name: str = "", replay: bool = False) -> None:
+    SERVICE.subscribe(callback, name=name, replay=replay)
+
+
+def start() -> None:
+    SERVICE.start()
@@ -14,10 +14,13 @@ Functies:
 - slugify_filename()
 - load_export_styles()
 
+- build_json_export() / build_csv_export()
 - build_html_export()
 - build_markdown_export()
 - build_xlsx_export()
 - build_zip_bytes()
+- iter_zip_export() : ZIP als stroom van chunks (één of veel certificaten)
+- render_export()   : één formaat; xlsx gecachet op (formaat, info, export-styles)
 
 Alles is centraal zodat het overal identiek werkt.
 """
@@ -25,15 +28,17 @@ Alles is centraal zodat het overal identiek werkt.
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Dict, Any, List, Optional
-from io import BytesIO
-from zipfile import ZipFile
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional, Tuple, Union
+from zipfile import ZipFile, ZipInfo
+import itertools
 import json
+import time
 
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill
-
+import cynit_cache
+import cynit_chain
+import cynit_config
 import cynit_theme
+import cynit_xlsx
 
 
 # ------------------------------------------------------------
@@ -46,6 +51,14 @@ EXPORT_CONFIG_PATH: Path = CONFIG_DIR / "exports.json"
 
 EXPORTS_DIR: Path = BASE_DIR / "exports"
 
+EXPORT_FORMATS = ("json", "csv", "xlsx", "html", "md")
+
+# Gerenderde exports (str/bytes) in geheugen; een xlsx is maar enkele KB
+EXPORT_CACHE = cynit_cache.LRUCache("cert_export", maxsize=256)
+# Enkel formaten die duurder zijn dan de cache-sleutel (info + styles hashen,
+# ~0.8 ms voor een keten van 3): xlsx ~10 ms; json/csv/html/md < 0.7 ms.
+CACHED_FORMATS = ("xlsx",)
+
 
 def ensure_exports_dir() -> None:
     EXPORTS_DIR.mkdir(parents=True, exist_ok=True)
@@ -89,7 +102,28 @@ def default_export_styles(settings: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+_STYLES_CACHE: Dict[str, Any] = {"version": None, "styles": None}
+
+
 def load_export_styles(settings: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Export-opmaak uit config/exports.json, gemerged met defaults.
+
+    Draait de cynit_config watcher (hub), dan komt exports.json uit de
+    in-memory snapshot en wordt het resultaat per config-versie gecachet.
+    Anders (standalone) lezen we het bestand zoals vroeger.
+    """
+    if cynit_config.running():
+        snap = cynit_config.current()
+        if _STYLES_CACHE["version"] != snap.version:
+            merged = cynit_theme.deep_merge(
+                default_export_styles(settings),
+                cynit_config.thaw(snap.exports),
+            )
+            _STYLES_CACHE["styles"] = cynit_config.freeze(merged)
+            _STYLES_CACHE["version"] = snap.version
+        return _STYLES_CACHE["styles"]
+
     defaults = default_export_styles(settings)
 
     if not EXPORT_CONFIG_PATH.exists():
@@ -107,6 +141,52 @@ def load_export_styles(settings: Dict[str, Any]) -> Dict[str, Any]:
     return merged
 
 
+def bundle_mapping(info: Dict[str, Any]) -> Optional[Dict[str, str]]:
+    """
+    Bevat het bestand meerdere objecten (chain, CA-bundle, .p7b, .p12), dan
+    één rij per object voor de exports; anders None.
+    """
+    bundle = info.get("bundle")
+    if not bundle:
+        return None
+    return {
+        f"#{b['index']} {b['type']}": f"{b['subject']} (geldig tot {b['valid_to']})"
+        for b in bundle
+    }
+
+
+def chain_mapping(info: Dict[str, Any]) -> Optional[Dict[str, str]]:
+    """Keten (info["chain"], zie cynit_chain) als rijen: status + één rij per schakel."""
+    chain = info.get("chain")
+    if not chain:
+        return None
+    return cynit_chain.chain_mapping(chain)
+
+
+# ------------------------------------------------------------
+#  JSON / CSV EXPORT
+# ------------------------------------------------------------
+
+def build_json_export(info: Dict[str, Any]) -> str:
+    return json.dumps(info, indent=2, ensure_ascii=False)
+
+
+def build_csv_export(info: Dict[str, Any]) -> str:
+    lines = ["Section;Field;Value"]
+    for sec_key, sec_name in [
+        ("subject", "Subject"),
+        ("issuer", "Issuer"),
+        ("properties", "Properties"),
+        ("tls", "TLS"),
+    ]:
+        section = info.get(sec_key)
+        if not section:
+            continue
+        for k, v in section.items():
+            lines.append(f"{sec_name};{k};{str(v).replace(';', ',')}")
+    return "\n".join(lines)
+
+
 # ------------------------------------------------------------
 #  HTML EXPORT
 # ------------------------------------------------------------
@@ -173,6 +253,9 @@ h1,h2 {{
 {table_block("Subject", info.get("subject"))}
 {table_block("Issuer", info.get("issuer"), is_issuer=True)}
 {table_block("Properties", info.get("properties"))}
+{table_block("TLS endpoint", info.get("tls"))}
+{table_block("Certificaatketen", chain_mapping(info))}
+{table_block("Alle objecten in dit bestand", bundle_mapping(info))}
 
 </body>
 </html>
@@ -219,6 +302,9 @@ def build_markdown_export(info: Dict[str, Any], settings: Dict[str, Any]) -> str
         md_table("Subject", info.get("subject")),
         md_table("Issuer", info.get("issuer"), issuer=True),
         md_table("Properties", info.get("properties")),
+        md_table("TLS endpoint", info.get("tls")),
+        md_table("Certificaatketen", chain_mapping(info)),
+        md_table("Alle objecten in dit bestand", bundle_mapping(info)),
     ]
 
     return "\n".join(md).strip() + "\n"
@@ -232,122 +318,186 @@ def build_xlsx_export(info: Dict[str, Any], settings: Dict[str, Any]) -> bytes:
     styles = load_export_styles(settings)
     cfg = styles["xlsx"]
 
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Certificate"
-
-    default_bg = cfg["sheet"]["default_bg"].lstrip("#")
-
-    fill = PatternFill(start_color=default_bg, end_color=default_bg, fill_type="solid")
-
-    title_font = Font(
-        size=cfg["title"]["font_size"],
-        bold=cfg["title"]["bold"],
-        italic=cfg["title"]["italic"],
-        color=cfg["title"]["color"].lstrip("#"),
-    )
-    field_font = Font(
-        size=cfg["field_col"]["font_size"],
-        bold=cfg["field_col"]["bold"],
-        italic=cfg["field_col"]["italic"],
-        color=cfg["field_col"]["color"].lstrip("#"),
-    )
-    value_font = Font(
-        size=cfg["value_col"]["font_size"],
-        bold=cfg["value_col"]["bold"],
-        italic=cfg["value_col"]["italic"],
-        color=cfg["value_col"]["color"].lstrip("#"),
-    )
-
-    row = 1
-    ws["A1"] = "CyNiT Certificate Export"
-    ws["A1"].font = title_font
-    ws["A1"].fill = fill
-    row += 2
-
-    def write_row(key, value):
-        nonlocal row
-        ws[f"A{row}"] = key
-        ws[f"B{row}"] = value
-        ws[f"A{row}"].font = field_font
-        ws[f"B{row}"].font = value_font
-        ws[f"A{row}"].fill = fill
-        ws[f"B{row}"].fill = fill
-        row += 1
-
-    write_row("Bestand", info.get("filename", ""))
-    write_row("Type", info.get("type", ""))
-    row += 1
+    bg = cfg["sheet"]["default_bg"]
 
-    def write_section(title, mapping, issuer=False):
-        nonlocal row
-        ws[f"A{row}"] = title
-        ws[f"A{row}"].font = title_font
-        ws[f"A{row}"].fill = fill
-        row += 1
+    def style(key: str) -> cynit_xlsx.Style:
+        c = cfg[key]
+        return cynit_xlsx.Style(
+            bold=c["bold"], italic=c["italic"], size=c["font_size"], color=c["color"], bg=bg,
+        )
 
-        if issuer and mapping is None:
-            write_row("Issuer", "CSR heeft geen issuer.")
-            row += 1
-            return
+    title_style = style("title")
+    row_style = [style("field_col"), style("value_col")]
+
+    book = cynit_xlsx.Book()
+    ws = book.sheet("Certificate", widths={1: 35, 2: 60})
 
-        for k, v in (mapping or {}).items():
-            write_row(k, v)
-        row += 1
+    ws.append(["CyNiT Certificate Export"], style=title_style)
+    ws.append([])
+
+    ws.append(["Bestand", info.get("filename", "")], style=row_style)
+    ws.append(["Type", info.get("type", "")], style=row_style)
+    ws.append([])
+
+    def write_section(title, mapping, issuer=False):
+        ws.append([title], style=title_style)
+        if issuer and mapping is None:
+            ws.append(["Issuer", "CSR heeft geen issuer."], style=row_style)
+        else:
+            for k, v in (mapping or {}).items():
+                ws.append([k, v], style=row_style)
+        ws.append([])
 
     write_section("Subject", info.get("subject"))
     write_section("Issuer", info.get("issuer"), issuer=True)
     write_section("Properties", info.get("properties"))
+    if info.get("tls"):
+        write_section("TLS endpoint", info["tls"])
+    if chain_mapping(info):
+        write_section("Certificaatketen", chain_mapping(info))
+    if bundle_mapping(info):
+        write_section("Alle objecten in dit bestand", bundle_mapping(info))
 
-    ws.column_dimensions["A"].width = 35
-    ws.column_dimensions["B"].width = 60
-
-    mem = BytesIO()
-    wb.save(mem)
-    mem.seek(0)
-    return mem.getvalue()
+    return book.to_bytes()
 
 
 # ------------------------------------------------------------
 #  ZIP EXPORT
 # ------------------------------------------------------------
 
+# Een ZIP-entry: (naam in archief, inhoud of functie die de inhoud maakt)
+ZipEntry = Tuple[str, Union[str, bytes, Callable[[], Union[str, bytes]]]]
+
+
+class _ChunkSink:
+    """
+    Niet-seekbaar 'bestand' voor ZipFile: alles wat geschreven wordt, komt in
+    een lijst die iter_zip_chunks() na elke entry leegmaakt. ZipFile schrijft
+    dan data descriptors i.p.v. terug te seeken naar de local headers.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> Iterator[bytes]:
+        chunks, self._chunks = self._chunks, []
+        if chunks:
+            yield b"".join(chunks)
+
+
+def iter_zip_chunks(entries: Iterable[ZipEntry]) -> Iterator[bytes]:
+    """
+    ZIP bouwen als generator: per entry wordt de inhoud pas op dat moment
+    gerenderd (callables) en meteen als chunk doorgegeven. In geheugen zit
+    dus hooguit één gerenderde export tegelijk, nooit het hele archief.
+    """
+    sink = _ChunkSink()
+    with ZipFile(sink, "w") as z:
+        for name, content in entries:
+            if callable(content):
+                content = content()
+            zi = ZipInfo(name, date_time=time.localtime()[:6])
+            z.writestr(zi, content)
+            yield from sink.drain()
+    yield from sink.drain()          # central directory
+
+
+def export_entries(
+    info: Dict[str, Any],
+    settings: Dict[str, Any],
+    formats: Iterable[str],
+    base: Optional[str] = None,
+    cache: bool = True,
+) -> Iterator[ZipEntry]:
+    """(naam, lazy render) per formaat voor één certificaat."""
+    base = base or slugify_filename(info.get("filename", "certificate"))
+    for fmt in formats:
+        fmt = fmt.lower()
+        if fmt in EXPORT_FORMATS:
+            yield f"{base}.{fmt}", (lambda fmt=fmt: render_export(fmt, info, settings, cache=cache))
+
+
+def bulk_export_entries(
+    infos: Iterable[Dict[str, Any]],
+    settings: Dict[str, Any],
+    formats: Iterable[str],
+) -> Iterator[ZipEntry]:
+    """
+    Entries voor veel certificaten (infos mag een generator zijn). Gaat niet
+    via de EXPORT_CACHE (die zou er enkel door leeglopen); dubbele
+    bestandsnamen krijgen een volgnummer.
+    """
+    formats = list(formats)
+    used: Dict[str, int] = {}
+    for info in infos:
+        base = slugify_filename(info.get("filename", "certificate"))
+        used[base] = used.get(base, 0) + 1
+        if used[base] > 1:
+            base = f"{base}_{used[base]}"
+        yield from export_entries(info, settings, formats, base=base, cache=False)
+
+
+def iter_zip_export(
+    infos: Iterable[Dict[str, Any]],
+    settings: Dict[str, Any],
+    formats: List[str],
+) -> Iterator[bytes]:
+    """Streaming ZIP voor één of veel certificaten."""
+    infos = iter(infos)
+    first = next(infos, None)
+    second = next(infos, None) if first is not None else None
+    if second is None:
+        entries = export_entries(first, settings, formats) if first is not None else ()
+        return iter_zip_chunks(entries)
+    return iter_zip_chunks(bulk_export_entries(itertools.chain((first, second), infos), settings, formats))
+
+
 def build_zip_bytes(info: Dict[str, Any], settings: Dict[str, Any], formats: List[str]) -> bytes:
-    base = slugify_filename(info.get("filename", "certificate"))
-    mem = BytesIO()
-
-    with ZipFile(mem, "w") as z:
-        for fmt in formats:
-            fmt = fmt.lower()
-
-            if fmt == "json":
-                z.writestr(f"{base}.json", json.dumps(info, indent=2, ensure_ascii=False))
-
-            elif fmt == "csv":
-                lines = ["Section;Field;Value"]
-                for sec_key, sec_name in [
-                    ("subject", "Subject"),
-                    ("issuer", "Issuer"),
-                    ("properties", "Properties"),
-                ]:
-                    section = info.get(sec_key)
-                    if not section:
-                        continue
-                    for k, v in section.items():
-                        lines.append(f"{sec_name};{k};{str(v).replace(';', ',')}")
-
-                z.writestr(f"{base}.csv", "\n".join(lines))
-
-            elif fmt == "html":
-                html = build_html_export(info, settings)
-                z.writestr(f"{base}.html", html)
-
-            elif fmt == "md":
-                md = build_markdown_export(info, settings)
-                z.writestr(f"{base}.md", md)
-
-            elif fmt == "xlsx":
-                z.writestr(f"{base}.xlsx", build_xlsx_export(info, settings))
-
-    mem.seek(0)
-    return mem.getvalue()
+    """Volledige ZIP in één keer (voor de GUI en scripts); web gebruikt iter_zip_export()."""
+    return b"".join(iter_zip_export([info], settings, formats))
+
+
+# ------------------------------------------------------------
+#  GECACHTE RENDER
+# ------------------------------------------------------------
+
+def render_export(fmt: str, info: Dict[str, Any], settings: Dict[str, Any], cache: bool = True):
+    """
+    Eén export renderen (str voor json/csv/html/md, bytes voor xlsx).
+
+    xlsx: zelfde info + zelfde export-styles -> resultaat uit
+    EXPORT_CACHE, dus herhaalde downloads/ZIPs van hetzelfde certificaat
+    renderen niet opnieuw. De andere formaten worden altijd gerenderd.
+    cache=False: rechtstreeks renderen (bulk-exports van veel certificaten).
+    Raise ValueError bij een onbekend formaat.
+    """
+    fmt = fmt.lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Onbekend exporttype: {fmt}")
+
+    if not cache or fmt not in CACHED_FORMATS:
+        return _render_uncached(fmt, info, settings)
+
+    styles_key = cynit_cache.json_key(load_export_styles(settings))
+    key = cynit_cache.content_key(fmt, cynit_cache.json_key(info), styles_key)
+
+    return EXPORT_CACHE.get_or_compute(key, lambda: _render_uncached(fmt, info, settings))
+
+
+def _render_uncached(fmt: str, info: Dict[str, Any], settings: Dict[str, Any]):
+    if fmt == "json":
+        return build_json_export(info)
+    if fmt == "csv":
+        return build_csv_export(info)
+    if fmt == "html":
+        return build_html_export(info, settings)
+    if fmt == "md":
+        return build_markdown_export(info, settings)
+    return build_xlsx_export(info, settings)
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+cynit_inventory.py
+
+Persistente index (SQLite) van de Markdown-exports in exports/.
+
+- Per export één rij met de geparste velden (titel, type, subject, issuer,
+  serial, thumbprint, geldigheid) + mtime/size om wijzigingen te zien.
+- Volledige-tekst zoeken via FTS5 met trigram-tokenizer: gedraagt zich als
+  de oude hoofdletter-ongevoelige substring-zoektocht, maar zonder elk
+  bestand bij elke request in te lezen. Zoektermen korter dan 3 tekens (of
+  een SQLite zonder FTS5) gaan via LIKE, ook over de volledige tekst.
+- Incrementeel:
+    index_file(path)  -> na /cert/save_md (één bestand)
+    sync()            -> enkel als de map zelf wijzigde (of na SYNC_INTERVAL),
+                         en dan enkel nieuwe/gewijzigde/verwijderde bestanden.
+
+Database: runtime/inventory.sqlite (WAL, dus bruikbaar vanuit meerdere workers).
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import cynit_exports
+import cynit_theme
+
+DB_PATH: Path = cynit_theme.BASE_DIR / "runtime" / "inventory.sqlite"
+EXPORTS_DIR: Path = cynit_exports.EXPORTS_DIR
+SYNC_INTERVAL = 60.0          # seconden: ook zonder map-wijziging af en toe volledig nakijken
+SCHEMA_VERSION = 1
+
+_LOCAL = threading.local()
+_SYNC_LOCK = threading.Lock()
+_LAST_SYNC = {"dir_mtime": None, "at": 0.0}
+_FTS = {"enabled": None}
+
+_ROW_RE = re.compile(r"^\|\s*(.+?)\s*\|\s*(.*?)\s*\|\s*$")
+_META_RE = re.compile(r"^\*\*(Bestand|Type):?\*\*:?\s*(.*?)\s*$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS exports (
+    id          INTEGER PRIMARY KEY,
+    name        TEXT UNIQUE NOT NULL,
+    mtime_ns    INTEGER NOT NULL,
+    size        INTEGER NOT NULL,
+    mtime       REAL NOT NULL,
+    title       TEXT,
+    source      TEXT,
+    obj_type    TEXT,
+    common_name TEXT,
+    subject     TEXT,
+    issuer      TEXT,
+    serial      TEXT,
+    thumbprint  TEXT,
+    valid_from  TEXT,
+    valid_to    TEXT,
+    valid_to_ts REAL
+);
+CREATE INDEX IF NOT EXISTS exports_mtime ON exports (mtime);
+CREATE INDEX IF NOT EXISTS exports_valid_to ON exports (valid_to_ts);
+CREATE INDEX IF NOT EXISTS exports_serial ON exports (serial COLLATE NOCASE);
+"""
+
+
+# ------------------------------------------------------------
+#  Markdown -> velden
+# ------------------------------------------------------------
+
+def _parse_ts(value: str) -> Optional[float]:
+    if not value or value == "-":
+        return None
+    try:
+        dt = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def parse_export(text: str) -> Dict[str, Any]:
+    """
+    Velden uit een cert-export (beide MD-varianten: oude decoder en
+    cynit_exports.build_markdown_export). Onbekende velden -> "".
+    """
+    title = ""
+    meta: Dict[str, str] = {}
+    fields: Dict[str, str] = {}
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not title and stripped.startswith("#"):
+            title = stripped.lstrip("# ").strip()
+            continue
+        m = _META_RE.match(stripped)
+        if m:
+            meta[m.group(1)] = m.group(2).strip("` ")
+            continue
+        m = _ROW_RE.match(stripped)
+        if m:
+            key = m.group(1).strip("* ")
+            if key in ("Field", "---") or key.startswith("---"):
+                continue
+            fields.setdefault(key, m.group(2).strip())
+
+    def field(name: str) -> str:
+        value = fields.get(name, "")
+        return "" if value == "-" else value
+
+    return {
+        "title": title or "(geen titel in MD)",
+        "source": meta.get("Bestand", ""),
+        "obj_type": meta.get("Type", ""),
+        "common_name": field("Common Name"),
+        "subject": field("Subject"),
+        "issuer": field("Issuer"),
+        "serial": field("Serial Number"),
+        "thumbprint": field("Thumbprint"),
+        "valid_from": field("Valid From"),
+        "valid_to": field("Valid To"),
+        "valid_to_ts": _parse_ts(fields.get("Valid To", "")),
+    }
+
+
+# ------------------------------------------------------------
+#  Database
+# ------------------------------------------------------------
+
+def _connect() -> sqlite3.Connection:
+    """Eén connectie per thread (sqlite3-objecten zijn niet thread-safe)."""
+    conn = getattr(_LOCAL, "conn", None)
+    if conn is not None:
+        return conn
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(DB_PATH, timeout=10)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    with conn:
+        conn.executescript(SCHEMA)
+        if _FTS["enabled"] is not False:
+            try:
+                conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS exports_fts USING fts5("
+                    "name, title, subject, issuer, serial, body, tokenize='trigram')"
+                )
+                _FTS["enabled"] = True
+            except sqlite3.OperationalError:
+                _FTS["enabled"] = False
+        if not _FTS["enabled"]:
+            # Oude SQLite zonder FTS5/trigram: gewone tabel, zoeken via LIKE
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS exports_fts ("
+                "name TEXT, title TEXT, subject TEXT, issuer TEXT, serial TEXT, body TEXT)"
+            )
+        if (conn.execute("SELECT EXISTS (SELECT 1 FROM exports)").fetchone()[0]
+                and not conn.execute("SELECT EXISTS (SELECT 1 FROM exports_fts)").fetchone()[0]):
+            # tekst-tabel nieuw (of leeg) naast een bestaande index: volgende sync leest alles opnieuw
+            conn.execute("DELETE FROM exports")
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('schema', ?)",
+            (str(SCHEMA_VERSION),),
+        )
+    _LOCAL.conn = conn
+    return conn
+
+
+def _upsert(conn: sqlite3.Connection, path: Path, st: os.stat_result) -> None:
+    text = path.read_text(encoding="utf-8", errors="ignore")
+    rec = parse_export(text)
+    row = conn.execute("SELECT id FROM exports WHERE name = ?", (path.name,)).fetchone()
+    values = (
+        st.st_mtime_ns, st.st_size, st.st_mtime, rec["title"], rec["source"], rec["obj_type"],
+        rec["common_name"], rec["subject"], rec["issuer"], rec["serial"], rec["thumbprint"],
+        rec["valid_from"], rec["valid_to"], rec["valid_to_ts"],
+    )
+    if row is None:
+        cur = conn.execute(
+            "INSERT INTO exports (mtime_ns, size, mtime, title, source, obj_type, common_name,"
+            " subject, issuer, serial, thumbprint, valid_from, valid_to, valid_to_ts, name)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            values + (path.name,),
+        )
+        rowid = cur.lastrowid
+    else:
+        rowid = row["id"]
+        conn.execute(
+            "UPDATE exports SET mtime_ns=?, size=?, mtime=?, title=?, source=?, obj_type=?,"
+            " common_name=?, subject=?, issuer=?, serial=?, thumbprint=?, valid_from=?,"
+            " valid_to=?, valid_to_ts=? WHERE id=?",
+            values + (rowid,),
+        )
+    conn.execute("DELETE FROM exports_fts WHERE rowid = ?", (rowid,))
+    conn.execute(
+        "INSERT INTO exports_fts (rowid, name, title, subject, issuer, serial, body)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (rowid, path.name, rec["title"], rec["subject"], rec["issuer"], rec["serial"], text),
+    )
+
+
+def _delete(conn: sqlite3.Connection, names: List[str]) -> None:
+    for name in names:
+        row = conn.execute("SELECT id FROM exports WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            continue
+        conn.execute("DELETE FROM exports WHERE id = ?", (row["id"],))
+        conn.execute("DELETE FROM exports_fts WHERE rowid = ?", (row["id"],))
+
+
+def index_file(path: Path) -> None:
+    """Eén (nieuwe of gewijzigde) export indexeren, bv. direct na save_md."""
+    path = Path(path)
+    try:
+        st = path.stat()
+    except OSError:
+        return
+    conn = _connect()
+    with conn:
+        _upsert(conn, path, st)
+
+
+def sync(force: bool = False) -> int:
+    """
+    Index gelijktrekken met exports/. Goedkoop als er niets veranderde: dan
+    kijken we enkel naar de mtime van de map zelf (nieuw/verwijderd bestand)
+    en doen we hooguit elke SYNC_INTERVAL een volledige scandir.
+    Return: aantal toegevoegde/gewijzigde/verwijderde exports.
+    """
+    try:
+        dir_mtime = EXPORTS_DIR.stat().st_mtime_ns
+    except OSError:
+        dir_mtime = None
+
+    now = time.monotonic()
+    if (
+        not force
+        and dir_mtime == _LAST_SYNC["dir_mtime"]
+        and now - _LAST_SYNC["at"] < SYNC_INTERVAL
+    ):
+        return 0
+
+    with _SYNC_LOCK:
+        conn = _connect()
+        known = {
+            row["name"]: (row["mtime_ns"], row["size"])
+            for row in conn.execute("SELECT name, mtime_ns, size FROM exports")
+        }
+        seen = set()
+        changes = 0
+        with conn:
+            if dir_mtime is not None:
+                with os.scandir(EXPORTS_DIR) as entries:
+                    for entry in entries:
+                        if not entry.name.lower().endswith(".md") or not entry.is_file():
+                            continue
+                        seen.add(entry.name)
+                        st = entry.stat()
+                        if known.get(entry.name) != (st.st_mtime_ns, st.st_size):
+                            _upsert(conn, Path(entry.path), st)
+                            changes += 1
+            gone = [name for name in known if name not in seen]
+            _delete(conn, gone)
+            changes += len(gone)
+        _LAST_SYNC["dir_mtime"] = dir_mtime
+        _LAST_SYNC["at"] = now
+    return changes
+
+
+# ------------------------------------------------------------
+#  Zoeken
+# ------------------------------------------------------------
+
+def _like(value: str) -> str:
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def search(
+    q: str = "",
+    subject: str = "",
+    issuer: str = "",
+    serial: str = "",
+    mtime_from: Optional[float] = None,
+    mtime_to: Optional[float] = None,
+    expires_within_days: Optional[int] = None,
+    include_expired: bool = False,
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Exports zoeken (nieuwste eerst).
+
+    q                    : vrije tekst in naam + volledige MD-inhoud
+    subject/issuer/serial: substring (hoofdletter-ongevoelig) op dat veld
+    mtime_from/to        : epoch-seconden op de bestandsdatum (to exclusief)
+    expires_within_days  : enkel certs met Valid To binnen N dagen vanaf nu
+                           (include_expired: ook al vervallen certs)
+    limit                : max. aantal resultaten (None = alles)
+    """
+    sync()
+    conn = _connect()
+    where: List[str] = []
+    params: List[Any] = []
+
+    q = q.strip()
+    if q:
+        if _FTS["enabled"] and len(q) >= 3:
+            # trigram: elke term als letterlijke substring
+            where.append("e.id IN (SELECT rowid FROM exports_fts WHERE exports_fts MATCH ?)")
+            params.append('"' + q.replace('"', '""') + '"')
+        else:
+            # korte term: LIKE over de naam en de volledige MD-tekst
+            where.append(
+                "e.id IN (SELECT rowid FROM exports_fts"
+                " WHERE name LIKE ? ESCAPE '\\' OR body LIKE ? ESCAPE '\\')"
+            )
+            params.extend([_like(q)] * 2)
+
+    for column, value in (("subject", subject), ("issuer", issuer), ("serial", serial)):
+        value = value.strip()
+        if value:
+            where.append(f"e.{column} LIKE ? ESCAPE '\\'")
+            params.append(_like(value))
+
+    if mtime_from is not None:
+        where.append("e.mtime >= ?")
+        params.append(mtime_from)
+    if mtime_to is not None:
+        where.append("e.mtime < ?")
+        params.append(mtime_to)
+
+    if expires_within_days is not None:
+        now = time.time()
+        where.append("e.valid_to_ts IS NOT NULL AND e.valid_to_ts < ?")
+        params.append(now + expires_within_days * 86400)
+        if not include_expired:
+            where.append("e.valid_to_ts >= ?")
+            params.append(now)
+
+    sql = "SELECT e.* FROM exports e"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY e.mtime DESC"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+
+    return [dict(row) for row in conn.execute(sql, params)]
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+cynit_jobs.py
+
+Achtergrond-jobs voor CyNiT Tools: lang werk (bv. een DCBaaS-export over
+honderden organisaties) loopt niet meer binnen één HTTP-request.
+
+- JobQueue(name)          : begrensde pool worker-threads + status op schijf
+                            (runtime/jobs/<name>/<id>.json, resultaat in <id>.result).
+- queue.submit(...)       : start fn(ctx) op de achtergrond, geeft meteen een Job.
+- ctx.item(key, status)   : voortgang per deel (bv. per org-code).
+- ctx.message(text)       : fase-tekst ("Excel bouwen ...").
+- queue.get(job_id)       : status, ook vanuit een ander (gunicorn-)proces: wat
+                            niet in het geheugen zit, wordt van schijf gelezen.
+- queue.result_path(job)  : het afgewerkte bestand om te downloaden.
+
+fn(ctx) geeft (bytes, download_name) terug; een exception zet de job op "error".
+Lopende jobs schrijven elke HEARTBEAT_SEC hun status weg; een job die daarna
+niet meer bijgewerkt werd (proces gestopt/herstart) toont als onderbroken.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import cynit_log
+import cynit_metrics
+import cynit_theme
+
+JOBS_DIR = cynit_theme.BASE_DIR / "runtime" / "jobs"
+
+HEARTBEAT_SEC = 15
+STALE_SEC = 4 * HEARTBEAT_SEC
+WRITE_INTERVAL_SEC = 1.0          # voortgang hoogstens zo vaak naar schijf
+KEEP_SEC = 24 * 3600              # afgewerkte jobs + resultaten zo lang bewaren
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+ERROR = "error"
+
+_ID_RE = re.compile(r"^[0-9a-f]{12}$")
+
+LOG = cynit_log.get_logger("cynit_jobs", tag="JOBS")
+
+JOBS_TOTAL = cynit_metrics.counter(
+    "cynit_tools_jobs_total",
+    "Afgewerkte achtergrond-jobs per queue en resultaat.",
+    ["queue", "status"],
+)
+JOB_SECONDS = cynit_metrics.histogram(
+    "cynit_tools_job_duration_seconds",
+    "Looptijd van achtergrond-jobs (seconden).",
+    ["queue"],
+)
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    title: str
+    status: str = QUEUED
+    created: str = ""
+    started: str = ""
+    finished: str = ""
+    updated_ts: float = 0.0
+    message: str = ""
+    error: str = ""
+    total: int = 0
+    done: int = 0
+    failed: int = 0
+    items: Dict[str, str] = field(default_factory=dict)    # key -> status-tekst
+    meta: Dict[str, Any] = field(default_factory=dict)
+    download_name: str = ""
+    result_size: int = 0
+
+    @property
+    def active(self) -> bool:
+        return self.status in (QUEUED, RUNNING)
+
+    @property
+    def percent(self) -> int:
+        return int(100 * self.done / self.total) if self.total else (100 if self.status == DONE else 0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["active"] = self.active
+        data["percent"] = self.percent
+        return data
+
+
+class JobContext:
+    """Wat een job-functie te zien krijgt: voortgang melden, meta lezen."""
+
+    def __init__(self, queue: "JobQueue", job: Job):
+        self._queue = queue
+        self.job = job
+
+    @property
+    def meta(self) -> Dict[str, Any]:
+        return self.job.meta
+
+    def item(self, key: str, status: str, ok: bool = True) -> None:
+        """Eén deel afgewerkt (thread-safe, mag vanuit een fetch-pool)."""
+        with self._queue._lock:
+            self.job.items[key] = status
+            self.job.done += 1
+            if not ok:
+                self.job.failed += 1
+        self._queue._save(self.job)
+
+    def message(self, text: str) -> None:
+        with self._queue._lock:
+            self.job.message = text
+        self._queue._save(self.job, force=True)
+
+
+class JobQueue:
+    """
+    Jobs van één soort (bv. "dcbaas_export") met maximaal 'workers' tegelijk.
+    Eén instantie per proces; de status op schijf is gedeeld tussen processen.
+    """
+
+    def __init__(self, name: str, workers: int = 2, state_dir: Optional[Path] = None, keep_sec: int = KEEP_SEC):
+        self.name = name
+        self.dir = Path(state_dir) if state_dir else JOBS_DIR / name
+        self.keep_sec = keep_sec
+        self._jobs: Dict[str, Job] = {}
+        self._last_write: Dict[str, float] = {}
+        self._lock = threading.RLock()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix=f"job-{name}")
+        self._heartbeat = threading.Thread(target=self._beat, name=f"job-{name}-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    # --- schijf ---
+
+    def _state_path(self, job_id: str) -> Path:
+        return self.dir / f"{job_id}.json"
+
+    def result_path(self, job: Job) -> Path:
+        return self.dir / f"{job.id}.result"
+
+    def _save(self, job: Job, force: bool = False) -> None:
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_write.get(job.id, 0.0) < WRITE_INTERVAL_SEC:
+                return
+            self._last_write[job.id] = now
+            job.updated_ts = now
+            data = json.dumps(job.to_dict(), ensure_ascii=False)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        tmp = self._state_path(job.id).with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_text(data, encoding="utf-8")
+        os.replace(tmp, self._state_path(job.id))
+
+    def _load(self, job_id: str) -> Optional[Job]:
+        try:
+            raw = json.loads(self._state_path(job_id).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        known = Job.__dataclass_fields__
+        job = Job(**{k: v for k, v in raw.items() if k in known})
+        if job.active and time.time() - job.updated_ts > STALE_SEC:
+            job.status = ERROR
+            job.error = "Onderbroken: het proces dat deze job uitvoerde is gestopt of herstart."
+        return job
+
+    def _beat(self) -> None:
+        while True:
+            time.sleep(HEARTBEAT_SEC)
+            with self._lock:
+                active = [j for j in self._jobs.values() if j.active]
+            for job in active:
+                self._save(job, force=True)
+
+    def cleanup(self) -> int:
+        """Afgewerkte jobs ouder dan keep_sec verwijderen (status + resultaat)."""
+        if not self.dir.exists():
+            return 0
+        removed = 0
+        limit = time.time() - self.keep_sec
+        for path in self.dir.glob("*.json"):
+            job = self._load(path.stem)
+            if job is None or job.active or job.updated_ts > limit:
+                continue
+            for p in (path, self.result_path(job)):
+                try:
+                    p.unlink()
+                except OSError:
+                    pass
+            with self._lock:
+                self._jobs.pop(job.id, None)
+                self._last_write.pop(job.id, None)
+            removed += 1
+        return removed
+
+    # --- API ---
+
+    def submit(
+        self,
+        kind: str,
+        title: str,
+        fn: Callable[[JobContext], Tuple[bytes, str]],
+        keys: Iterable[str] = (),
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> Job:
+        self.cleanup()
+        keys = list(dict.fromkeys(keys))
+        job = Job(
+            id=uuid.uuid4().hex[:12],
+            kind=kind,
+            title=title,
+            created=_now(),
+            total=len(keys),
+            items={k: "wachten" for k in keys},
+            meta=dict(meta or {}),
+            message="In de wachtrij",
+        )
+        with self._lock:
+            self._jobs[job.id] = job
+        self._save(job, force=True)
+        self._pool.submit(self._run, job, fn)
+        LOG.info("%s: job %s ingepland (%s, %d delen)", self.name, job.id, title, job.total)
+        return job
+
+    def _run(self, job: Job, fn: Callable[[JobContext], Tuple[bytes, str]]) -> None:
+        t0 = time.perf_counter()
+        with self._lock:
+            job.status = RUNNING
+            job.started = _now()
+            job.message = "Bezig"
+        self._save(job, force=True)
+        try:
+            data, download_name = fn(JobContext(self, job))
+            self.result_path(job).write_bytes(data)
+            with self._lock:
+                job.download_name = download_name
+                job.result_size = len(data)
+                job.status = DONE
+                job.message = "Klaar"
+        except Exception as exc:
+            with self._lock:
+                job.status = ERROR
+                job.error = f"{type(exc).__name__}: {exc}"
+                job.message = "Mislukt"
+            LOG.exception("%s: job %s mislukt: %s", self.name, job.id, job.error)
+        with self._lock:
+            job.finished = _now()
+        self._save(job, force=True)
+        elapsed = time.perf_counter() - t0
+        JOBS_TOTAL.inc(queue=self.name, status=job.status)
+        JOB_SECONDS.observe(elapsed, queue=self.name)
+        LOG.info("%s: job %s %s na %.1fs", self.name, job.id, job.status, elapsed)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        if not _ID_RE.match(job_id or ""):
+            return None
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return Job(**asdict(job))     # momentopname
+        return self._load(job_id)
+
+    def recent(self, limit: int = 10) -> List[Job]:
+        """Laatste jobs (nieuwste eerst), over alle processen heen."""
+        if not self.dir.exists():
+            return []
+        paths = sorted(self.dir.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+        jobs = []
+        for path in paths[:limit]:
+            job = self.get(path.stem)
+            if job is not None:
+                jobs.append(job)
+        return jobs
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+cynit_jsonstream.py
+
+Incrementeel JSON-arrays lezen uit een stroom bytes-chunks (bv.
+requests' resp.iter_content()), zonder de volledige body als bytes, str
+of geparst document in het geheugen te houden.
+
+- iter_array(chunks, key="response") : yield elk element van de array
+    * top-level array: [ {...}, {...} ]
+    * of de array onder 'key' in een top-level object:
+      {"meta": ..., "response": [ {...}, ... ], ...}
+  Andere velden van het object worden geparst en overgeslagen.
+- ByteCounter(chunks) : telt de gelezen bytes (voor logging zonder resp.text).
+
+Enkel stdlib: json.JSONDecoder.raw_decode op een schuivende buffer. Elk
+element wordt apart gedecodeerd; de buffer bevat hoogstens een paar chunks.
+Ongeldige of afgebroken JSON geeft ValueError.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+from typing import Any, Iterable, Iterator, Optional
+
+_WS = " \t\r\n"
+_DELIMS = _WS + ",]}:"
+_DECODER = json.JSONDecoder()
+
+
+class ByteCounter:
+    """Iterator-wrapper die het aantal doorgegeven bytes bijhoudt."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self.bytes = 0
+
+    def __iter__(self) -> "ByteCounter":
+        return self
+
+    def __next__(self) -> bytes:
+        chunk = next(self._chunks)
+        self.bytes += len(chunk)
+        return chunk
+
+
+class _Reader:
+    """Tekstbuffer boven de chunks met een leespositie."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decode = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self._first = True
+
+    def more(self) -> bool:
+        """Volgende chunk toevoegen (verwerkt deel van de buffer eerst weg)."""
+        if self.eof:
+            return False
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        for chunk in self._chunks:
+            if not chunk:
+                continue
+            text = self._decode.decode(chunk)
+            if self._first:
+                text = text.lstrip("\ufeff")
+                self._first = False
+            if text:
+                self.buf += text
+                return True
+        self.buf += self._decode.decode(b"", final=True)
+        self.eof = True
+        return False
+
+    def peek(self) -> str:
+        """Eerste niet-witruimte teken ('' aan het einde van de stroom)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.more():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        ch = self.peek()
+        if not ch or ch not in chars:
+            raise ValueError(f"JSON: verwacht {' of '.join(repr(c) for c in chars)}, kreeg {ch!r}")
+        self.pos += 1
+        return ch
+
+    def value(self) -> Any:
+        """
+        Eén JSON-waarde vanaf de huidige positie. Een waarde wordt pas
+        aanvaard als er een scheidingsteken op volgt of de stroom gedaan is
+        (anders kan een getal afgekapt zijn: "3" van "3.5e10").
+        """
+        self.peek()
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self.buf, self.pos)
+                if self.eof or (end < len(self.buf) and self.buf[end] in _DELIMS):
+                    self.pos = end
+                    return obj
+            except json.JSONDecodeError as exc:
+                if self.eof:
+                    raise ValueError(f"JSON: {exc}") from None
+            self.more()
+
+
+def _iter_items(reader: _Reader) -> Iterator[Any]:
+    """Elementen van een array; de '[' is al gelezen."""
+    if reader.peek() == "]":
+        reader.pos += 1
+        return
+    while True:
+        yield reader.value()
+        if reader.expect(",]") == "]":
+            return
+
+
+def iter_array(chunks: Iterable[bytes], key: Optional[str] = "response") -> Iterator[Any]:
+    """
+    Yield de elementen van de top-level array, of van de array onder 'key'
+    in een top-level object. Ontbreekt 'key' of is het geen array, dan
+    ValueError (na het volledig lezen van het object).
+    """
+    reader = _Reader(chunks)
+    first = reader.expect("[{")
+    if first == "[":
+        yield from _iter_items(reader)
+    else:
+        found = False
+        if reader.peek() == "}":
+            reader.pos += 1
+        else:
+            while True:
+                name = reader.value()
+                if not isinstance(name, str):
+                    raise ValueError("JSON: object-sleutel is geen string")
+                reader.expect(":")
+                if name == key and not found and reader.peek() == "[":
+                    reader.pos += 1
+                    found = True
+                    yield from _iter_items(reader)
+                else:
+                    reader.value()                      # ander veld: overslaan
+                if reader.expect(",}") == "}":
+                    break
+        if not found:
+            raise ValueError(f"JSON: geen '{key}'-array in het antwoord")
+    if reader.peek():
+        raise ValueError("JSON: extra data na het document")
@@ -10,6 +10,8 @@ Hier definieer je:
 - header_html() : HTML voor de topbar
 - footer_html() : HTML voor de footer
 - common_js()   : JavaScript helpers (toggle wafel, restart app)
+- page_shell()  : gecachte combinatie van bovenstaande (per settings-versie)
+- render_page() : render_template_string, maar met gecompileerde templates
 
 Belangrijk:
 - Kleuren & fonts komen uit settings.json via cynit_theme (profiel-gebonden).
@@ -18,9 +20,9 @@ Belangrijk:
 """
 
 from __future__ import annotations
-from typing import Optional, List, Dict, Any
-
-import cynit_theme
+import threading
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Any, Tuple
 
 
 def common_css(settings: dict) -> str:
@@ -266,7 +268,7 @@ def common_js() -> str:
 
     async function restartApp() {
       try {
-        await fetch('/restart');
+        await fetch('/restart', { method: 'POST', headers: { 'X-CyNiT-Reload': '1' } });
       } catch (e) {
         // tijdens restart kan de fetch mislukken, is oké
       }
@@ -275,3 +277,110 @@ def common_js() -> str:
       }, 1000);
     }
     """
+
+
+# ------------------------------------------------------------
+#  Cache: page-shell + gecompileerde Jinja-templates
+# ------------------------------------------------------------
+#
+# CSS/header/footer/JS veranderen enkel als settings/tools herladen worden.
+# ctools.reload_config() roept invalidate() aan; daarna worden ze bij het
+# volgende request één keer opnieuw opgebouwd.
+
+@dataclass(frozen=True)
+class PageShell:
+    css: str
+    header: str
+    footer: str
+    js: str
+
+
+_CACHE_LOCK = threading.Lock()
+_SETTINGS_VERSION = 0
+_SHELL_CACHE: Dict[Tuple, Tuple[Any, Any, PageShell]] = {}
+_SHELL_CACHE_MAX = 128
+_TEMPLATE_CACHE: Dict[Tuple[int, str], Tuple[Any, Any]] = {}
+_TEMPLATE_CACHE_MAX = 256
+
+
+def settings_version() -> int:
+    """Huidige layout-versie (stijgt bij elke invalidate())."""
+    return _SETTINGS_VERSION
+
+
+def invalidate() -> int:
+    """Gooi alle gecachte page-shells weg (na reload van settings/tools)."""
+    global _SETTINGS_VERSION
+    with _CACHE_LOCK:
+        _SETTINGS_VERSION += 1
+        _SHELL_CACHE.clear()
+        return _SETTINGS_VERSION
+
+
+def page_shell(
+    settings: dict,
+    tools: Optional[List[Dict[str, Any]]] = None,
+    title: str = "CyNiT Tools",
+    right_html: str = "",
+) -> PageShell:
+    """
+    common_css + header_html + footer_html + common_js in één keer, gecachet
+    op (settings-versie, settings-object, tools-object, title, right_html).
+
+    De entry houdt een referentie naar settings/tools vast, zodat id() niet
+    hergebruikt kan worden zolang de entry in de cache zit.
+    """
+    key = (_SETTINGS_VERSION, id(settings), id(tools), title, right_html)
+    entry = _SHELL_CACHE.get(key)
+    if entry is not None and entry[0] is settings and entry[1] is tools:
+        return entry[2]
+
+    shell = PageShell(
+        css=common_css(settings),
+        header=header_html(settings, tools=tools, title=title, right_html=right_html),
+        footer=footer_html(),
+        js=common_js(),
+    )
+    with _CACHE_LOCK:
+        if len(_SHELL_CACHE) >= _SHELL_CACHE_MAX:
+            _SHELL_CACHE.clear()
+        _SHELL_CACHE[key] = (settings, tools, shell)
+    return shell
+
+
+def get_template(source: str):
+    """
+    Compileer een template-string één keer per Flask-app (jinja_env).
+    render_template_string() compileert bij ELKE call opnieuw.
+    """
+    from flask import current_app
+
+    env = current_app.jinja_env
+    key = (id(env), source)
+    entry = _TEMPLATE_CACHE.get(key)
+    if entry is not None and entry[0] is env:
+        return entry[1]
+
+    template = env.from_string(source)
+    with _CACHE_LOCK:
+        if len(_TEMPLATE_CACHE) >= _TEMPLATE_CACHE_MAX:
+            _TEMPLATE_CACHE.clear()
+        _TEMPLATE_CACHE[key] = (env, template)
+    return template
+
+
+def render_page(source: str, **context: Any) -> str:
+    """
+    Drop-in vervanger voor flask.render_template_string(source, **context),
+    met gecompileerde template uit de cache.
+
+    Let op: enkel gebruiken voor VASTE template-bronnen (module-constanten of
+    strings die bij registratie opgebouwd worden), niet voor strings waar
+    request-data in geplakt is.
+    """
+    from flask import current_app
+
+    app = current_app._get_current_object()
+    template = get_template(source)
+    app.update_template_context(context)
+    return template.render(context)
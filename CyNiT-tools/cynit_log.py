@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+cynit_log.py
+
+Niet-blokkerende logging voor CyNiT Tools-modules.
+
+- get_logger(name, tag)   : logging.Logger "cynit.<name>" met één QueueHandler.
+                            Een log-call zet enkel een record op een begrensde
+                            queue; een listener-thread schrijft naar console
+                            en/of een bestand. Zo wacht een request (of een
+                            fetch-worker) nooit op stdout of schijf.
+- configure(name, opts)   : level, console, roterend logbestand (grootte +
+                            aantal backups) live aanpassen.
+- LogOptions.from_dict()  : opties uit een "logging"-blok in een config-JSON.
+
+Records onder het level worden door logging zelf weggegooid vóór er iets
+geformatteerd wordt; gebruik daarom %-argumenten (LOG.debug("org=%s", org))
+i.p.v. f-strings voor berichten in hot paths.
+
+Is de queue vol (console/schijf kan niet volgen), dan wordt het record
+weggegooid en geteld (dropped()) i.p.v. de aanroeper te blokkeren; zodra
+er weer plaats is, verschijnt een waarschuwing met het aantal in de log.
+Bij het afsluiten van het proces wordt de queue nog leeggeschreven.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import cynit_theme
+
+LOG_DIR = cynit_theme.BASE_DIR / "runtime" / "logs"
+QUEUE_SIZE = 10000
+
+_LEVELS = {"DEBUG": logging.DEBUG, "INFO": logging.INFO, "WARNING": logging.WARNING,
+           "ERROR": logging.ERROR, "OFF": logging.CRITICAL + 10}
+
+_TRUE = {"1", "true", "yes", "on"}
+_FALSE = {"0", "false", "no", "off", ""}
+
+
+def _bool(value: Any) -> bool:
+    """JSON-bool of tekst ("false", "off", "0" ...); bool("false") zou True zijn."""
+    text = str(value).strip().lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    raise ValueError(f"Geen geldige boolean: {value!r}")
+
+
+@dataclass
+class LogOptions:
+    level: str = "INFO"                  # DEBUG / INFO / WARNING / ERROR / OFF
+    console: bool = True
+    file: str = ""                       # leeg = geen bestand; relatief = t.o.v. runtime/logs
+    max_bytes: int = 5 * 1024 * 1024     # roteren vanaf deze grootte
+    backups: int = 5                     # aantal oude bestanden (.1 ... .N)
+
+    @classmethod
+    def from_dict(cls, raw: Any, **defaults: Any) -> "LogOptions":
+        """Ontbrekende of ongeldige waarden vallen terug op defaults / de dataclass-defaults."""
+        opts = cls(**defaults)
+        if not isinstance(raw, dict):
+            return opts
+        for name, cast in (("level", str), ("console", _bool), ("file", str),
+                           ("max_bytes", int), ("backups", int)):
+            if name in raw:
+                try:
+                    setattr(opts, name, cast(raw[name]))
+                except (TypeError, ValueError):
+                    pass
+        opts.level = opts.level.upper() if opts.level.upper() in _LEVELS else "INFO"
+        opts.max_bytes = max(0, opts.max_bytes)
+        opts.backups = max(0, opts.backups)
+        return opts
+
+
+class _DropQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler die bij een volle queue het record weggooit i.p.v. te blokkeren."""
+
+    def __init__(self, q: "queue.Queue[logging.LogRecord]"):
+        super().__init__(q)
+        self.dropped = 0
+        self._reported = 0
+        self._lock = threading.Lock()          # dropped/_reported: enqueue komt uit elke thread
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        with self._lock:
+            try:
+                if self.dropped != self._reported:
+                    # eerst melden hoeveel er sinds de vorige melding verloren gingen
+                    lost = self.dropped - self._reported
+                    notice = logging.makeLogRecord({
+                        "name": record.name, "levelno": logging.WARNING, "levelname": "WARNING",
+                        "msg": f"{lost} logregels weggegooid (log-queue vol)",
+                    })
+                    self.queue.put_nowait(notice)
+                    self._reported = self.dropped
+                self.queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+
+
+class _Channel:
+    """Logger + queue + listener van één module."""
+
+    def __init__(self, name: str, tag: str):
+        self.tag = tag
+        self.queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=QUEUE_SIZE)
+        self.handler = _DropQueueHandler(self.queue)
+        self.logger = logging.getLogger(f"cynit.{name}")
+        self.logger.propagate = False          # niet nog eens synchroon via de root-logger
+        self.logger.addHandler(self.handler)
+        self.listener: Optional[logging.handlers.QueueListener] = None
+        self.options = LogOptions()
+
+    def apply(self, opts: LogOptions) -> None:
+        fmt_console = logging.Formatter(f"[{self.tag}] %(message)s")
+        fmt_file = logging.Formatter("%(asctime)s %(levelname)-7s %(threadName)s %(message)s")
+        handlers = []
+        if opts.console:
+            console = logging.StreamHandler(sys.stdout)
+            console.setFormatter(fmt_console)
+            handlers.append(console)
+        if opts.file:
+            path = Path(opts.file)
+            if not path.is_absolute():
+                path = LOG_DIR / path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            rotating = logging.handlers.RotatingFileHandler(
+                path, maxBytes=opts.max_bytes, backupCount=opts.backups, encoding="utf-8", delay=True,
+            )
+            rotating.setFormatter(fmt_file)
+            handlers.append(rotating)
+
+        old = self.listener
+        self.listener = logging.handlers.QueueListener(self.queue, *handlers, respect_handler_level=False)
+        if old is not None:
+            old.stop()                         # schrijft wat nog in de queue zit met de oude handlers
+            for h in old.handlers:
+                h.close()
+        self.logger.setLevel(_LEVELS[opts.level])
+        self.options = opts
+        self.listener.start()
+
+    def stop(self) -> None:
+        if self.listener is not None:
+            self.listener.stop()
+            for h in self.listener.handlers:
+                h.close()
+            self.listener = None
+
+
+_CHANNELS: Dict[str, _Channel] = {}
+_LOCK = threading.Lock()
+
+
+def get_logger(name: str, tag: str = "", options: Optional[LogOptions] = None) -> logging.Logger:
+    """Logger voor een module; de eerste oproep start de listener (default: INFO naar console)."""
+    with _LOCK:
+        channel = _CHANNELS.get(name)
+        if channel is None:
+            channel = _CHANNELS[name] = _Channel(name, tag or name.upper())
+            channel.apply(options or LogOptions())
+        elif options is not None:
+            channel.apply(options)
+        return channel.logger
+
+
+def configure(name: str, options: LogOptions) -> None:
+    """Level/console/bestand van een bestaande (of nieuwe) logger aanpassen."""
+    with _LOCK:
+        channel = _CHANNELS.get(name)
+        if channel is None:
+            channel = _CHANNELS[name] = _Channel(name, name.upper())
+        if channel.options != options or channel.listener is None:
+            channel.apply(options)
+
+
+def set_level(name: str, level: str) -> None:
+    """Enkel het level wijzigen (bv. vanaf de CLI: --verbose)."""
+    with _LOCK:
+        channel = _CHANNELS.get(name)
+    if channel is not None:
+        configure(name, LogOptions.from_dict({**channel.options.__dict__, "level": level}))
+
+
+def dropped(name: str) -> int:
+    """Aantal weggegooide records (queue vol) sinds de start."""
+    channel = _CHANNELS.get(name)
+    return channel.handler.dropped if channel is not None else 0
+
+
+@atexit.register
+def shutdown() -> None:
+    """Alle listeners stoppen; wat nog in de queues zit wordt eerst weggeschreven."""
+    with _LOCK:
+        channels = list(_CHANNELS.values())
+    for channel in channels:
+        channel.stop()
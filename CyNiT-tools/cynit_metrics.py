@@ -0,0 +1,631 @@
+#!/usr/bin/env python3
+"""
+cynit_metrics.py
+
+Kleine, thread-safe metrics-registry voor CyNiT Tools (Prometheus tekst-formaat).
+
+Bevat:
+- Counter   : oplopende tellers (requests, decodes, API-calls, ...)
+- Gauge     : waarden die op en neer gaan (in-flight requests, ...)
+- Histogram : verdeling van durations (request-latency per route, ...)
+- instrument_app(app): hangt request-hooks in een Flask-app zodat elke
+  request automatisch geteld en getimed wordt.
+
+Gebruik in een tool-module:
+
+    import cynit_metrics
+
+    DECODES = cynit_metrics.counter(
+        "cynit_tools_cert_decodes_total",
+        "Aantal certificaat/CSR decodes.",
+        ["type", "result"],
+    )
+    DECODES.inc(type="cert", result="ok")
+
+De registry wordt door ctools.py op /metrics gerenderd.
+Elke metric heeft zijn eigen lock, dus de overhead per increment blijft klein.
+
+Meerdere worker-processen (gunicorn): zet CYNIT_METRICS_DIR op een map die
+alle workers delen. Elke worker schrijft dan periodiek (en bij elke scrape)
+een snapshot naar <map>/metrics_<pid>.json en render() telt alle snapshots
+op, ongeacht welke worker de scrape krijgt:
+- counters en histogrammen: som over alle workers, ook gestopte (die gaan
+  via mark_process_dead() naar archive.json), dus _total daalt nooit;
+- gauges: som (default) of max (multiprocess_mode="max") over levende workers.
+gunicorn.conf.py hangt start_flusher / write_snapshot / mark_process_dead in
+de worker- en master-hooks.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:                 # Windows: geen multi-proces server (waitress)
+    fcntl = None
+
+# Standaard buckets (seconden) voor request-latency
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+MULTIPROC_ENV = "CYNIT_METRICS_DIR"
+FLUSH_INTERVAL_SEC = 5.0
+ARCHIVE_FILE = "archive.json"
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape_label(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    if not parts:
+        return ""
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+# ------------------------------------------------------------
+#  Metric types
+# ------------------------------------------------------------
+
+class _Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames: Tuple[str, ...] = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(
+                f"Metric {self.name} verwacht labels {self.labelnames}, kreeg {tuple(labels)}"
+            )
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        lines.extend(self._render_samples())
+        return lines
+
+    def _render_samples(self) -> List[str]:
+        return []
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-vorm van de huidige waarden (voor multi-proces)."""
+        data = {"type": self.type_name, "help": self.help, "labels": list(self.labelnames)}
+        data.update(self._snapshot_data())
+        return data
+
+    def _snapshot_data(self) -> Dict[str, Any]:
+        return {}
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Counter kan enkel stijgen.")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        key = self._key(labels)
+        with self._lock:
+            return self._values.get(key, 0.0)
+
+    def total(self) -> float:
+        with self._lock:
+            return sum(self._values.values())
+
+    def _snapshot_data(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"samples": [[list(k), v] for k, v in self._values.items()]}
+
+    def _merge(self, data: Dict[str, Any], live: bool) -> None:
+        with self._lock:
+            for key, val in data.get("samples", []):
+                key = tuple(key)
+                self._values[key] = self._values.get(key, 0.0) + val
+
+    def _render_samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        if not items and not self.labelnames:
+            items = [((), 0.0)]
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(val)}"
+            for key, val in items
+        ]
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        func: Optional[Callable[[], float]] = None,
+        multiprocess_mode: str = "sum",
+    ):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        # Optionele callback: waarde wordt pas bij het scrapen berekend
+        self._func = func
+        # Samenvoegen over levende workers: "sum" (in-flight, ...) of "max"
+        # (waarden die elke worker zelf kent: uptime, config, ...)
+        if multiprocess_mode not in ("sum", "max"):
+            raise ValueError(f"Onbekende multiprocess_mode {multiprocess_mode!r} voor {name}.")
+        self.multiprocess_mode = multiprocess_mode
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: str) -> float:
+        key = self._key(labels)
+        with self._lock:
+            return self._values.get(key, 0.0)
+
+    def _snapshot_data(self) -> Dict[str, Any]:
+        if self._func is not None:
+            try:
+                samples = [[[], float(self._func())]]
+            except Exception:
+                samples = []
+        else:
+            with self._lock:
+                samples = [[list(k), v] for k, v in self._values.items()]
+        return {"mode": self.multiprocess_mode, "samples": samples}
+
+    def _merge(self, data: Dict[str, Any], live: bool) -> None:
+        if not live:
+            return                      # gauge van een gestopte worker telt niet meer
+        with self._lock:
+            for key, val in data.get("samples", []):
+                key = tuple(key)
+                if key not in self._values:
+                    self._values[key] = val
+                elif self.multiprocess_mode == "max":
+                    self._values[key] = max(self._values[key], val)
+                else:
+                    self._values[key] += val
+
+    def _render_samples(self) -> List[str]:
+        if self._func is not None:
+            try:
+                val = float(self._func())
+            except Exception:
+                return []
+            return [f"{self.name} {_format_value(val)}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        if not items and not self.labelnames:
+            items = [((), 0.0)]
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(val)}"
+            for key, val in items
+        ]
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help_text, labelnames)
+        self._buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        # per label-key: [bucket_counts..., +Inf count], sum
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        idx = bisect.bisect_left(self._buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = [0] * (len(self._buckets) + 1)
+                self._counts[key] = counts
+                self._sums[key] = 0.0
+            counts[idx] += 1
+            self._sums[key] += value
+
+    def time(self, **labels: str) -> "_Timer":
+        """Context manager: `with HIST.time(route="/x"): ...`"""
+        return _Timer(self, labels)
+
+    def _snapshot_data(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = [[list(k), list(v), self._sums[k]] for k, v in self._counts.items()]
+        return {"buckets": list(self._buckets), "samples": samples}
+
+    def _merge(self, data: Dict[str, Any], live: bool) -> None:
+        with self._lock:
+            for key, counts, total in data.get("samples", []):
+                key = tuple(key)
+                mine = self._counts.get(key)
+                if mine is None:
+                    self._counts[key] = list(counts)
+                    self._sums[key] = total
+                else:
+                    for i, cnt in enumerate(counts):
+                        mine[i] += cnt
+                    self._sums[key] += total
+
+    def _render_samples(self) -> List[str]:
+        with self._lock:
+            snapshot = [(k, list(v), self._sums[k]) for k, v in sorted(self._counts.items())]
+
+        lines: List[str] = []
+        for key, counts, total in snapshot:
+            cumulative = 0
+            for bound, cnt in zip(self._buckets + (float("inf"),), counts):
+                cumulative += cnt
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+                )
+            lbl = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{lbl} {_format_value(total)}")
+            lines.append(f"{self.name}_count{lbl} {cumulative}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, hist: Histogram, labels: Dict[str, str]):
+        self._hist = hist
+        self._labels = labels
+        self._start = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._hist.observe(time.perf_counter() - self._start, **self._labels)
+
+
+# ------------------------------------------------------------
+#  Registry
+# ------------------------------------------------------------
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            existing = self._metrics.get(name)
+            if existing is not None:
+                if not isinstance(existing, cls):
+                    raise ValueError(f"Metric {name} bestaat al als {existing.type_name}.")
+                return existing
+            metric = cls(name, *args, **kwargs)
+            self._metrics[name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help_text, labelnames)
+
+    def gauge(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        func: Optional[Callable[[], float]] = None,
+        multiprocess_mode: str = "sum",
+    ) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text, labelnames, func=func,
+                                   multiprocess_mode=multiprocess_mode)
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        blocks = ["\n".join(m.render()) for m in metrics]
+        return "\n\n".join(blocks) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {m.name: m.snapshot() for m in metrics}
+
+    def merge(self, snapshot: Dict[str, Any], live: bool = True) -> None:
+        """Snapshot van een (andere) worker optellen bij deze registry."""
+        for name, data in snapshot.items():
+            kind = data.get("type")
+            labels = data.get("labels", [])
+            if kind == "counter":
+                metric = self.counter(name, data["help"], labels)
+            elif kind == "gauge":
+                metric = self.gauge(name, data["help"], labels, multiprocess_mode=data.get("mode", "sum"))
+            elif kind == "histogram":
+                metric = self.histogram(name, data["help"], labels, buckets=data["buckets"])
+            else:
+                continue
+            metric._merge(data, live)
+
+
+REGISTRY = MetricsRegistry()
+
+
+def counter(name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.counter(name, help_text, labelnames)
+
+
+def gauge(
+    name: str,
+    help_text: str,
+    labelnames: Sequence[str] = (),
+    func: Optional[Callable[[], float]] = None,
+    multiprocess_mode: str = "sum",
+) -> Gauge:
+    return REGISTRY.gauge(name, help_text, labelnames, func=func, multiprocess_mode=multiprocess_mode)
+
+
+def histogram(
+    name: str,
+    help_text: str,
+    labelnames: Sequence[str] = (),
+    buckets: Sequence[float] = DEFAULT_BUCKETS,
+) -> Histogram:
+    return REGISTRY.histogram(name, help_text, labelnames, buckets=buckets)
+
+
+def render() -> str:
+    """Prometheus-tekst; met CYNIT_METRICS_DIR opgeteld over alle workers."""
+    mp_dir = multiprocess_dir()
+    if mp_dir is None:
+        return REGISTRY.render()
+    write_snapshot()
+    return _collect(mp_dir).render()
+
+
+# ------------------------------------------------------------
+#  Multi-proces (gunicorn workers)
+# ------------------------------------------------------------
+
+_FLUSHER: Optional[threading.Thread] = None
+_FLUSHER_LOCK = threading.Lock()
+
+
+def multiprocess_dir() -> Optional[Path]:
+    value = os.environ.get(MULTIPROC_ENV, "").strip()
+    return Path(value) if value else None
+
+
+def _pid_file(mp_dir: Path, pid: int) -> Path:
+    return mp_dir / f"metrics_{pid}.json"
+
+
+@contextmanager
+def _dir_lock(mp_dir: Path, exclusive: bool):
+    """
+    Archiveren (exclusief) en inlezen (gedeeld) niet door elkaar: anders
+    telt een scrape een gestopte worker dubbel of helemaal niet.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(mp_dir / ".lock", "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _read(path: Path) -> Dict[str, Any]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8")).get("metrics", {})
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+def _write(path: Path, snapshot: Dict[str, Any]) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps({"pid": os.getpid(), "metrics": snapshot}), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def write_snapshot() -> None:
+    """Waarden van dit proces naar <CYNIT_METRICS_DIR>/metrics_<pid>.json (atomisch)."""
+    mp_dir = multiprocess_dir()
+    if mp_dir is None:
+        return
+    mp_dir.mkdir(parents=True, exist_ok=True)
+    _write(_pid_file(mp_dir, os.getpid()), REGISTRY.snapshot())
+
+
+def _collect(mp_dir: Path) -> MetricsRegistry:
+    merged = MetricsRegistry()
+    with _dir_lock(mp_dir, exclusive=False):
+        merged.merge(_read(mp_dir / ARCHIVE_FILE), live=False)
+        for path in sorted(mp_dir.glob("metrics_*.json")):
+            merged.merge(_read(path))
+    return merged
+
+
+def start_flusher(interval: float = FLUSH_INTERVAL_SEC) -> None:
+    """Daemon-thread die de snapshot van dit proces elke 'interval' seconden schrijft."""
+    global _FLUSHER
+    if multiprocess_dir() is None:
+        return
+    with _FLUSHER_LOCK:
+        if _FLUSHER is not None and _FLUSHER.is_alive():
+            return
+
+        def loop() -> None:
+            while True:
+                time.sleep(interval)
+                try:
+                    write_snapshot()
+                except OSError:
+                    pass
+
+        _FLUSHER = threading.Thread(target=loop, name="cynit-metrics-flush", daemon=True)
+        _FLUSHER.start()
+
+
+def mark_process_dead(pid: int) -> None:
+    """
+    Worker 'pid' is gestopt (gunicorn child_exit, in de master): counters en
+    histogrammen naar archive.json, gauges vervallen, pid-bestand weg.
+    """
+    mp_dir = multiprocess_dir()
+    if mp_dir is None:
+        return
+    path = _pid_file(mp_dir, pid)
+    if not path.exists():
+        return
+    with _dir_lock(mp_dir, exclusive=True):
+        archive = MetricsRegistry()
+        archive.merge(_read(mp_dir / ARCHIVE_FILE), live=False)
+        archive.merge(_read(path), live=False)
+        _write(mp_dir / ARCHIVE_FILE, archive.snapshot())
+        path.unlink()
+
+
+def clear_multiprocess_dir() -> None:
+    """Bij het starten van de master: snapshots van een vorige run weg."""
+    mp_dir = multiprocess_dir()
+    if mp_dir is None:
+        return
+    mp_dir.mkdir(parents=True, exist_ok=True)
+    for path in mp_dir.glob("*.json"):
+        path.unlink()
+
+
+# ------------------------------------------------------------
+#  Flask-instrumentatie
+# ------------------------------------------------------------
+
+HTTP_REQUESTS = counter(
+    "cynit_tools_requests_total",
+    "Aantal HTTP requests sinds start, per route/methode/status.",
+    ["route", "method", "status"],
+)
+HTTP_ERRORS = counter(
+    "cynit_tools_request_errors_total",
+    "Aantal HTTP requests met status >= 500 of een onverwachte exception.",
+    ["route", "method", "status"],
+)
+HTTP_IN_FLIGHT = gauge(
+    "cynit_tools_requests_in_flight",
+    "Aantal requests dat op dit moment verwerkt wordt.",
+    ["route"],
+)
+HTTP_LATENCY = histogram(
+    "cynit_tools_request_duration_seconds",
+    "Verwerkingstijd van HTTP requests per route (seconden).",
+    ["route", "method"],
+)
+
+
+def _route_label() -> str:
+    """
+    Gebruik het route-patroon (bv. /exports/view/<path:fname>) i.p.v. het
+    echte pad, zodat het aantal label-combinaties begrensd blijft.
+    """
+    from flask import request
+
+    rule = request.url_rule
+    return rule.rule if rule is not None else "<unmatched>"
+
+
+def instrument_app(app) -> None:
+    """
+    Hangt before/after/teardown hooks in een Flask-app:
+    - in-flight gauge per route
+    - latency-histogram per route + methode
+    - request- en error-counters per route + methode + status
+    """
+    from flask import g, request
+
+    if app.extensions.get("cynit_metrics"):
+        return
+    app.extensions["cynit_metrics"] = True
+
+    @app.before_request
+    def _metrics_before():
+        route = _route_label()
+        g._metrics_route = route
+        g.request_started = time.perf_counter()
+        HTTP_IN_FLIGHT.inc(route=route)
+
+    @app.after_request
+    def _metrics_after(response):
+        g._metrics_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def _metrics_teardown(exc):
+        route = g.pop("_metrics_route", None)
+        started = g.pop("request_started", None)
+        if route is None or started is None:
+            return
+        status = g.pop("_metrics_status", None)
+        if status is None:
+            status = 500 if exc is not None else 200
+
+        method = request.method
+        HTTP_IN_FLIGHT.dec(route=route)
+        HTTP_LATENCY.observe(time.perf_counter() - started, route=route, method=method)
+        HTTP_REQUESTS.inc(route=route, method=method, status=str(status))
+        if exc is not None or status >= 500:
+            HTTP_ERRORS.inc(route=route, method=method, status=str(status))
@@ -24,6 +24,8 @@ import subprocess
 from pathlib import Path
 from typing import Iterable, List, Dict, Any, Optional
 
+import cynit_config
+
 
 BASE_DIR = Path(__file__).resolve().parent
 CONFIG_DIR = BASE_DIR / "config"
@@ -70,6 +72,13 @@ def load_notify_config() -> Dict[str, Any]:
             encoding="utf-8",
         )
 
+    return build_notify_config(raw)
+
+
+def build_notify_config(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Defaults + raw samenvoegen, zonder I/O (ook gebruikt door cynit_config).
+    """
     # heel simpele merge, zodat nieuwe keys niet kapot gaan
     dflt = _default_notify_config()
     dflt.update(raw)
@@ -92,6 +101,15 @@ def reload_notify_config() -> None:
     _NOTIFY_CFG = load_notify_config()
 
 
+def apply_config(snapshot) -> None:
+    """cynit_config-subscriber: nieuwe notify.json zonder schijf-I/O."""
+    global _NOTIFY_CFG
+    _NOTIFY_CFG = snapshot.notify
+
+
+cynit_config.subscribe(apply_config, name="cynit_notify")
+
+
 # ==============================
 # Signal helpers
 # ==============================
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+cynit_plugins.py
+
+Lazy plugin-registry voor de CyNiT Tools hub.
+
+- Leest de web-tools uit tools.json (via de cynit_config snapshot).
+  Plugin = python-module uit 'script' (cert_viewer.py -> cert_viewer);
+  tools met hetzelfde script (bv. /cert en /exports) delen één plugin.
+- De module wordt pas geïmporteerd bij de EERSTE request op één van zijn
+  web_paths (of 'web_prefixes' in tools.json voor extra prefixen).
+- Flask laat geen routes meer toevoegen na de eerste request, daarom krijgt
+  elke plugin een eigen sub-Flask-app (zelfde secret_key, zelfde metrics) en
+  stuurt een WSGI-dispatcher de requests naar de juiste app.
+- Houdt een startup-profiel bij (imports, registratie, eerste request),
+  zichtbaar via /debug/startup of `python ctools.py --startup-report`.
+
+Een plugin-module moet enkel `register_web_routes(app, settings, tools)`
+aanbieden, zoals alle bestaande tools al doen.
+"""
+
+from __future__ import annotations
+
+import importlib
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import cynit_config
+import cynit_metrics
+
+PLUGIN_LOADS = cynit_metrics.counter(
+    "cynit_tools_plugin_loads_total",
+    "Aantal lazy plugin-loads per module en resultaat.",
+    ["plugin", "result"],
+)
+PLUGIN_LOAD_SECONDS = cynit_metrics.histogram(
+    "cynit_tools_plugin_load_seconds",
+    "Tijd om een plugin te importeren en te registreren (seconden).",
+    ["plugin"],
+)
+
+
+# ------------------------------------------------------------
+#  Startup-profiel
+# ------------------------------------------------------------
+
+class StartupProfile:
+    """Verzamelt (fase, seconden) metingen voor het startup-rapport."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.phases: List[Tuple[str, float, float]] = []   # (naam, perf_counter start, duur)
+
+    def record(self, name: str, started: float, duration: float) -> None:
+        with self._lock:
+            self.phases.append((name, started, duration))
+
+    def measure(self, name: str) -> "_Phase":
+        """Context manager: `with STARTUP.measure("config"): ...`"""
+        return _Phase(self, name)
+
+    def report(self) -> str:
+        with self._lock:
+            phases = list(self.phases)
+        origin = min((start for _, start, _ in phases), default=0.0)
+        lines = [
+            "CyNiT Tools startup-profiel",
+            "=" * 60,
+            f"{'fase':<40} {'start':>8} {'duur':>9}",
+        ]
+        for name, start, duration in phases:
+            lines.append(f"{name:<40} {(start - origin) * 1000:7.1f}ms {duration * 1000:8.1f}ms")
+        lines.append("-" * 60)
+        lines.append(f"modules geladen in sys.modules: {len(sys.modules)}")
+        heavy = [m for m in HEAVY_MODULES if m in sys.modules]
+        lines.append("zware libs al geïmporteerd: " + (", ".join(heavy) if heavy else "(geen)"))
+        return "\n".join(lines) + "\n"
+
+
+class _Phase:
+    def __init__(self, profile: StartupProfile, name: str):
+        self._profile = profile
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self) -> "_Phase":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._profile.record(self._name, self._start, time.perf_counter() - self._start)
+
+
+# Libs die we graag pas laden als een tool ze echt nodig heeft
+HEAVY_MODULES = (
+    "cryptography", "openpyxl", "PIL", "tkinter", "jwt", "requests", "xlsxwriter",
+)
+
+STARTUP = StartupProfile()
+
+
+# ------------------------------------------------------------
+#  Registry
+# ------------------------------------------------------------
+
+@dataclass
+class Plugin:
+    name: str                       # module-naam (script zonder .py)
+    prefixes: List[str] = field(default_factory=list)
+    tool_ids: List[str] = field(default_factory=list)
+    app: Any = None                 # sub-Flask-app na laden
+    error: Optional[str] = None
+    load_seconds: float = 0.0
+
+
+def _plugins_from_tools(tools_cfg: Dict[str, Any]) -> Dict[str, Plugin]:
+    plugins: Dict[str, Plugin] = {}
+    for t in tools_cfg.get("tools", []):
+        script = (t.get("script") or "").strip()
+        web_path = (t.get("web_path") or "").strip()
+        if not script.endswith(".py") or not web_path:
+            continue
+        name = script[:-3]
+        plugin = plugins.setdefault(name, Plugin(name=name))
+        for prefix in [web_path, *t.get("web_prefixes", [])]:
+            prefix = "/" + prefix.strip("/")
+            if prefix != "/" and prefix not in plugin.prefixes:
+                plugin.prefixes.append(prefix)
+        plugin.tool_ids.append(t.get("id") or name)
+    return plugins
+
+
+class PluginRegistry:
+    """
+    Houdt bij welke module bij welk pad hoort en laadt ze on demand.
+
+    settings_provider/tools_provider geven de ACTUELE settings/tools van de
+    hub terug op het moment dat een plugin geladen wordt.
+    """
+
+    def __init__(
+        self,
+        hub_app,
+        settings_provider: Callable[[], Dict[str, Any]],
+        tools_provider: Callable[[], List[Dict[str, Any]]],
+    ):
+        self.hub_app = hub_app
+        self._settings = settings_provider
+        self._tools = tools_provider
+        self._lock = threading.RLock()
+        self._plugins: Dict[str, Plugin] = {}
+        self._routes: List[Tuple[str, Plugin]] = []     # langste prefix eerst
+
+    # --- configuratie ---
+
+    def configure(self, tools_cfg: Dict[str, Any]) -> None:
+        """(Her)bouw de prefix-tabel; reeds geladen plugins blijven geladen."""
+        fresh = _plugins_from_tools(tools_cfg)
+        with self._lock:
+            for name, plugin in fresh.items():
+                old = self._plugins.get(name)
+                if old is not None:
+                    old.prefixes = plugin.prefixes
+                    old.tool_ids = plugin.tool_ids
+                    fresh[name] = old
+            self._plugins = fresh
+            routes = [(p, plugin) for plugin in fresh.values() for p in plugin.prefixes]
+            routes.sort(key=lambda item: len(item[0]), reverse=True)
+            self._routes = routes
+
+    def apply_config(self, snapshot) -> None:
+        """cynit_config-subscriber: nieuwe/gewijzigde tools in tools.json."""
+        self.configure(snapshot.tools_cfg)
+
+    # --- lookup ---
+
+    def match(self, path: str) -> Optional[Plugin]:
+        for prefix, plugin in self._routes:
+            if path == prefix or path.startswith(prefix + "/"):
+                return plugin
+        return None
+
+    def plugins(self) -> List[Plugin]:
+        with self._lock:
+            return list(self._plugins.values())
+
+    def loaded_count(self) -> int:
+        return sum(1 for p in self.plugins() if p.app is not None)
+
+    # --- laden ---
+
+    def _make_app(self, plugin: Plugin):
+        from flask import Flask
+
+        sub = Flask(plugin.name, static_folder=None)
+        sub.config.update(self.hub_app.config)
+        sub.secret_key = self.hub_app.secret_key
+        cynit_metrics.instrument_app(sub)
+        return sub
+
+    def load(self, plugin: Plugin):
+        """Importeer + registreer de plugin (één keer, thread-safe)."""
+        if plugin.app is not None:
+            return plugin.app
+        with self._lock:
+            if plugin.app is not None:
+                return plugin.app
+
+            started = time.perf_counter()
+            try:
+                with STARTUP.measure(f"import {plugin.name}"):
+                    module = importlib.import_module(plugin.name)
+                sub = self._make_app(plugin)
+                with STARTUP.measure(f"register {plugin.name}"):
+                    module.register_web_routes(sub, self._settings(), self._tools())
+            except Exception as exc:
+                plugin.error = f"{type(exc).__name__}: {exc}"
+                PLUGIN_LOADS.inc(plugin=plugin.name, result="error")
+                print(f"   ERROR: plugin {plugin.name} laden FAILED: {plugin.error}")
+                return None
+
+            plugin.load_seconds = time.perf_counter() - started
+            plugin.error = None
+            plugin.app = sub
+            PLUGIN_LOADS.inc(plugin=plugin.name, result="ok")
+            PLUGIN_LOAD_SECONDS.observe(plugin.load_seconds, plugin=plugin.name)
+            print(f"   OK: plugin {plugin.name} geladen in {plugin.load_seconds * 1000:.0f} ms")
+            return sub
+
+    def load_all(self) -> None:
+        """Alles meteen laden (bv. CYNIT_EAGER_TOOLS=1 of voor het startup-rapport)."""
+        for plugin in self.plugins():
+            self.load(plugin)
+
+
+class LazyToolDispatcher:
+    """
+    WSGI-middleware rond hub_app.wsgi_app: requests op een plugin-prefix
+    gaan naar de (lazy geladen) sub-app, de rest naar de hub zelf.
+    """
+
+    def __init__(self, hub_wsgi, registry: PluginRegistry):
+        self.hub_wsgi = hub_wsgi
+        self.registry = registry
+        self._first_request_seen = False
+
+    def __call__(self, environ, start_response):
+        if not self._first_request_seen:
+            self._first_request_seen = True
+            STARTUP.record("eerste request", time.perf_counter(), 0.0)
+
+        plugin = self.registry.match(environ.get("PATH_INFO", "") or "/")
+        if plugin is None:
+            return self.hub_wsgi(environ, start_response)
+
+        sub = self.registry.load(plugin)
+        if sub is None:
+            body = f"Tool '{plugin.name}' kon niet geladen worden: {plugin.error}".encode("utf-8")
+            start_response("503 Service Unavailable", [
+                ("Content-Type", "text/plain; charset=utf-8"),
+                ("Content-Length", str(len(body))),
+            ])
+            return [body]
+        return sub.wsgi_app(environ, start_response)
+
+
+def install(
+    hub_app,
+    settings_provider: Callable[[], Dict[str, Any]],
+    tools_provider: Callable[[], List[Dict[str, Any]]],
+) -> PluginRegistry:
+    """Registry opzetten op basis van tools.json en de dispatcher inhaken."""
+    registry = PluginRegistry(hub_app, settings_provider, tools_provider)
+    registry.configure(cynit_config.current().tools_cfg)
+    cynit_config.subscribe(registry.apply_config, name="cynit_plugins")
+    hub_app.wsgi_app = LazyToolDispatcher(hub_app.wsgi_app, registry)
+    return registry
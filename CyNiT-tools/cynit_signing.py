@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+cynit_signing.py
+
+Gedeelde signing-sleutels en JWT-minting voor CyNiT Tools én de losse
+dcbaas-scripts (jwt_gui, token_request, JWT2JWK).
+
+- load_signing_key(path, password) : private key uit .jwk/.json, .pem/.key of
+                                     .pfx/.p12 als SigningKey (key-object, kid,
+                                     default alg). Gecachet op pad + mtime +
+                                     grootte (+ wachtwoord): een gewijzigd
+                                     bestand wordt vanzelf opnieuw ingelezen.
+- load_jwk_ids(path)               : (kid, thumbprint) uit een JWK, ook een
+                                     publieke (zonder 'd'); enkel voor lookups.
+- JwtSigner(signing_key, alg, kid) : header (base64url) en algoritme één keer
+                                     voorbereid; sign(claims) doet enkel nog
+                                     payload-encode + de RSA/EC-handtekening.
+                                     Zelfde output als jwt.encode().
+- signer_for(path, ...)            : gecachete JwtSigner voor een sleutelbestand.
+- signer.assertion(iss, aud)       : client_assertion (iss = sub, iat/exp, optioneel jti).
+- signer.mint_many(iss, aud, n)    : n assertions in één keer (unieke jti per
+                                     token), optioneel over een thread-pool.
+
+JWK's worden rechtstreeks via PyJWT ingelezen (geen jwcrypto -> PEM -> opnieuw
+parsen); een versleutelde PEM/PKCS#12 wordt maar één keer ontsleuteld.
+
+Micro-benchmark (tokens/s, oud pad per token vs. cache vs. bulk; exit 1 als
+de gecachete rate onder --min-rate zakt):
+
+    python cynit_signing.py --bench [--key pad --password ...] [--min-rate 200]
+
+De default-ondergrens (BENCH_MIN_RATE) ligt ruim onder de gemeten ~1500
+tokens/s (RSA-2048), zodat enkel een echte regressie de bench laat falen.
+
+Enkel 'cryptography' en 'PyJWT', zodat de dcbaas-scripts deze module via
+sys.path kunnen importeren (zie cynit_certcore).
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from cryptography.hazmat.primitives.serialization import load_pem_private_key
+from cryptography.hazmat.primitives.serialization.pkcs12 import load_key_and_certificates
+from jwt.algorithms import get_default_algorithms
+
+JWK_EXTS = (".jwk", ".json")
+PEM_EXTS = (".pem", ".key")
+P12_EXTS = (".pfx", ".p12")
+
+_EC_ALGS = {"secp256r1": "ES256", "secp384r1": "ES384", "secp521r1": "ES512"}
+
+
+def _b64url(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    path: str
+    key: Any                 # cryptography private key
+    kid: str                 # "kid" uit de JWK; "" bij PEM/P12 of een JWK zonder kid
+    alg: str                 # default algoritme voor dit sleuteltype (RS256, ES256, ...)
+    mtime: float
+    thumbprint: str = ""     # RFC 7638-thumbprint van een JWK (bv. als kid-fallback)
+
+
+def _default_alg(key: Any) -> str:
+    if isinstance(key, ec.EllipticCurvePrivateKey):
+        return _EC_ALGS.get(key.curve.name, "ES256")
+    return "RS256"
+
+
+def _thumbprint(jwk_dict: Dict[str, Any]) -> str:
+    """RFC 7638 JWK-thumbprint (SHA-256) voor RSA/EC; "" voor andere types."""
+    members = {"RSA": ("e", "kty", "n"), "EC": ("crv", "kty", "x", "y")}.get(jwk_dict.get("kty", ""))
+    if not members or any(m not in jwk_dict for m in members):
+        return ""
+    canonical = json.dumps({m: jwk_dict[m] for m in members}, separators=(",", ":"), sort_keys=True)
+    return _b64url(hashlib.sha256(canonical.encode("utf-8")).digest()).decode("ascii")
+
+
+def _read_key(p: Path, password: Optional[str]) -> Tuple[Any, str, str, str]:
+    """(key, kid, alg, thumbprint) uit een sleutelbestand; ValueError bij een onbekend/ongeldig bestand."""
+    ext = p.suffix.lower()
+    pwd = password.encode("utf-8") if password else None
+    if ext not in JWK_EXTS + PEM_EXTS + P12_EXTS:
+        # andere extensie: aan de inhoud herkennen (JSON -> JWK, PEM-armor -> PEM)
+        head = p.read_bytes()[:64].lstrip()
+        ext = ".json" if head.startswith(b"{") else ".pem" if head.startswith(b"-----BEGIN") else ext
+    if ext in JWK_EXTS:
+        jwk_dict = json.loads(p.read_text(encoding="utf-8"))
+        if not isinstance(jwk_dict, dict) or "d" not in jwk_dict:
+            raise ValueError("JWK bevat geen private key ('d' ontbreekt).")
+        key = jwt.PyJWK(jwk_dict).key
+        alg = str(jwk_dict.get("alg") or _default_alg(key))
+        return key, str(jwk_dict.get("kid") or ""), alg, _thumbprint(jwk_dict)
+    if ext in PEM_EXTS:
+        key = load_pem_private_key(p.read_bytes(), password=pwd)
+        return key, "", _default_alg(key), ""
+    if ext in P12_EXTS:
+        key, _cert, _extra = load_key_and_certificates(p.read_bytes(), pwd)
+        if key is None:
+            raise ValueError("Geen private key gevonden in PKCS#12.")
+        return key, "", _default_alg(key), ""
+    raise ValueError("Onbekend sleuteltype: gebruik .jwk/.json, .pem/.key of .pfx/.p12")
+
+
+def load_jwk_ids(path: str | Path) -> Tuple[str, str]:
+    """
+    (kid, thumbprint) uit een JWK-bestand. Publieke sleutels volstaan: de
+    JWK wordt enkel geparsed (geldige RSA/EC-parameters), niet als
+    signing-key geladen.
+    """
+    jwk_dict = json.loads(Path(path).expanduser().read_text(encoding="utf-8"))
+    if not isinstance(jwk_dict, dict):
+        raise ValueError("Geen geldige JWK (verwacht een JSON-object).")
+    jwt.PyJWK(jwk_dict)
+    return str(jwk_dict.get("kid") or ""), _thumbprint(jwk_dict)
+
+
+# pad -> ((mtime_ns, grootte, wachtwoord-hash), SigningKey)
+_KEYS: Dict[str, Tuple[Tuple[int, int, str], SigningKey]] = {}
+# (pad, alg, kid, typ) -> JwtSigner
+_SIGNERS: Dict[Tuple[str, str, str, str], "JwtSigner"] = {}
+_LOCK = threading.Lock()
+_STATS = {"hits": 0, "loads": 0}
+
+
+def load_signing_key(path: str | Path, password: Optional[str] = None) -> SigningKey:
+    """
+    Private key uit een bestand, gecachet zolang pad, mtime, grootte en
+    wachtwoord gelijk blijven. Kost bij een hit één os.stat().
+    """
+    p = Path(path).expanduser()
+    st = p.stat()
+    pw_hash = hashlib.sha256(password.encode("utf-8")).hexdigest() if password else ""
+    stamp = (st.st_mtime_ns, st.st_size, pw_hash)
+    cache_key = str(p.resolve())
+    with _LOCK:
+        cached = _KEYS.get(cache_key)
+        if cached and cached[0] == stamp:
+            _STATS["hits"] += 1
+            return cached[1]
+    key, kid, alg, thumbprint = _read_key(p, password)
+    signing_key = SigningKey(path=cache_key, key=key, kid=kid, alg=alg, mtime=st.st_mtime, thumbprint=thumbprint)
+    with _LOCK:
+        _KEYS[cache_key] = (stamp, signing_key)
+        _STATS["loads"] += 1
+    return signing_key
+
+
+class JwtSigner:
+    """
+    Mint JWT's met één vaste sleutel + header. De header-encode, algoritme-
+    lookup en key-voorbereiding gebeuren hier één keer i.p.v. per token.
+    Thread-safe: sign() deelt enkel onveranderlijke toestand.
+    """
+
+    def __init__(self, signing_key: SigningKey, alg: Optional[str] = None, kid: Optional[str] = None, typ: str = "JWT"):
+        self.signing_key = signing_key
+        self.alg = alg or signing_key.alg
+        self.kid = signing_key.kid if kid is None else kid
+        algorithms = get_default_algorithms()
+        if self.alg not in algorithms or self.alg == "none":
+            raise ValueError(f"Niet-ondersteund algoritme: {self.alg}")
+        self._algorithm = algorithms[self.alg]
+        self._key = self._algorithm.prepare_key(signing_key.key)
+        # zelfde vorm als jwt.encode: compacte JSON, sleutels gesorteerd
+        self.headers: Dict[str, str] = {"typ": typ, "alg": self.alg}
+        if self.kid:
+            self.headers["kid"] = self.kid
+        header_json = json.dumps(self.headers, separators=(",", ":"), sort_keys=True)
+        self._header_segment = _b64url(header_json.encode("utf-8"))
+
+    def sign(self, claims: Dict[str, Any]) -> str:
+        payload = _b64url(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+        signing_input = self._header_segment + b"." + payload
+        signature = self._algorithm.sign(signing_input, self._key)
+        return (signing_input + b"." + _b64url(signature)).decode("ascii")
+
+    @staticmethod
+    def claims(iss: str, aud: str, lifetime_sec: int = 600, sub: Optional[str] = None,
+               skew_sec: int = 10, now: Optional[int] = None, jti: bool = False) -> Dict[str, Any]:
+        """iss/sub/iat/exp/aud (+ jti); iat een paar seconden terug tegen 'iat in the future'."""
+        iat = (int(time.time()) if now is None else now) - skew_sec
+        claims: Dict[str, Any] = {"iss": iss, "sub": sub or iss, "iat": iat, "exp": iat + lifetime_sec, "aud": aud}
+        if jti:
+            claims["jti"] = uuid.uuid4().hex
+        return claims
+
+    def assertion(self, iss: str, aud: str, lifetime_sec: int = 600, sub: Optional[str] = None,
+                  skew_sec: int = 10, jti: bool = False) -> str:
+        return self.sign(self.claims(iss, aud, lifetime_sec, sub, skew_sec, jti=jti))
+
+    def mint_many(self, iss: str, aud: str, count: int, lifetime_sec: int = 60, sub: Optional[str] = None,
+                  skew_sec: int = 10, workers: int = 1) -> List[str]:
+        """
+        count kortlevende assertions met dezelfde iat/exp en een unieke jti per
+        token (token endpoints weigeren een hergebruikte jti). Met workers > 1
+        wordt over een thread-pool getekend.
+        """
+        base = self.claims(iss, aud, lifetime_sec, sub, skew_sec)
+        jtis = [uuid.uuid4().hex for _ in range(count)]
+        if workers <= 1 or count < 2:
+            return [self.sign(dict(base, jti=j)) for j in jtis]
+        with ThreadPoolExecutor(max_workers=min(workers, count), thread_name_prefix="jwt-mint") as pool:
+            return list(pool.map(lambda j: self.sign(dict(base, jti=j)), jtis))
+
+
+def signer_for(path: str | Path, password: Optional[str] = None, alg: Optional[str] = None,
+               kid: Optional[str] = None, typ: str = "JWT") -> JwtSigner:
+    """Gecachete JwtSigner; wordt opnieuw opgebouwd als het sleutelbestand wijzigt."""
+    signing_key = load_signing_key(path, password)
+    cache_key = (signing_key.path, alg or "", "\0" if kid is None else kid, typ)
+    with _LOCK:
+        signer = _SIGNERS.get(cache_key)
+        if signer is not None and signer.signing_key is signing_key:
+            return signer
+    signer = JwtSigner(signing_key, alg=alg, kid=kid, typ=typ)
+    with _LOCK:
+        _SIGNERS[cache_key] = signer
+    return signer
+
+
+def clear_cache() -> None:
+    with _LOCK:
+        _KEYS.clear()
+        _SIGNERS.clear()
+        _STATS.update(hits=0, loads=0)
+
+
+def stats() -> Dict[str, int]:
+    with _LOCK:
+        return {"keys": len(_KEYS), "signers": len(_SIGNERS), **_STATS}
+
+
+# ------------------------------------------------------------
+#  Micro-benchmark
+# ------------------------------------------------------------
+
+BENCH_MIN_RATE = 200.0        # tokens/s voor de gecachete signer, default voor --min-rate
+
+def _bench_keys(tmp: Path, password: str) -> Dict[str, Tuple[Path, Optional[str]]]:
+    """Tijdelijke RSA-2048 sleutel als JWK en als versleutelde PEM."""
+    from cryptography.hazmat.primitives import serialization
+    from jwt.algorithms import RSAAlgorithm
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk_dict = json.loads(RSAAlgorithm.to_jwk(key))
+    jwk_dict.update(kid="cynit-bench", alg="RS256")
+    jwk_path = tmp / "bench.jwk.json"
+    jwk_path.write_text(json.dumps(jwk_dict), encoding="utf-8")
+    pem_path = tmp / "bench.key.pem"
+    pem_path.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.BestAvailableEncryption(password.encode("utf-8")),
+    ))
+    return {"jwk": (jwk_path, None), "pem-enc": (pem_path, password)}
+
+
+def _rate(fn, seconds: float) -> float:
+    fn()                                                 # warm-up
+    n = 0
+    t0 = time.perf_counter()
+    while True:
+        n += fn()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= seconds:
+            return n / elapsed
+
+
+def bench(seconds: float = 1.0, key_path: Optional[str] = None, password: Optional[str] = None,
+          batch: int = 200, workers: int = 4) -> Dict[str, float]:
+    """Tokens/s: sleutel per token inlezen (oud) vs. gecachete signer vs. mint_many."""
+    import tempfile
+
+    with tempfile.TemporaryDirectory(prefix="cynit_signing_") as tmp:
+        keys = {"key": (Path(key_path), password)} if key_path else _bench_keys(Path(tmp), "bench-wachtwoord")
+        rates: Dict[str, float] = {}
+        for label, (path, pwd) in keys.items():
+            aud = "https://authenticatie-ti.vlaanderen.be/op"
+
+            def uncached() -> int:
+                key, kid, alg, _thumb = _read_key(path, pwd)
+                headers = {"typ": "JWT", "alg": alg, **({"kid": kid} if kid else {})}
+                jwt.encode(JwtSigner.claims("bench", aud), key, algorithm=alg, headers=headers)
+                return 1
+
+            def cached() -> int:
+                signer_for(path, pwd).assertion("bench", aud)
+                return 1
+
+            def bulk() -> int:
+                return len(signer_for(path, pwd).mint_many("bench", aud, batch))
+
+            def bulk_threads() -> int:
+                return len(signer_for(path, pwd).mint_many("bench", aud, batch, workers=workers))
+
+            signer = signer_for(path, pwd)
+            token = signer.assertion("bench", aud)
+            claims = jwt.decode(token, signer.signing_key.key.public_key(), algorithms=[signer.alg], audience=aud)
+            same = jwt.encode(claims, signer.signing_key.key, algorithm=signer.alg, headers=signer.headers)
+            if same != token and not signer.alg.startswith("ES"):    # EC-handtekeningen zijn niet deterministisch
+                raise RuntimeError("JwtSigner-output wijkt af van jwt.encode")
+
+            rates[f"{label} per token"] = _rate(uncached, seconds)
+            rates[f"{label} cached"] = _rate(cached, seconds)
+            rates[f"{label} bulk"] = _rate(bulk, seconds)
+            rates[f"{label} bulk x{workers}"] = _rate(bulk_threads, seconds)
+        clear_cache()
+    return rates
+
+
+def main(argv: List[str]) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="cynit_signing micro-benchmark")
+    parser.add_argument("--bench", action="store_true", help="JWT-mintsnelheid meten")
+    parser.add_argument("--key", default="", help="eigen sleutelbestand i.p.v. tijdelijke JWK + versleutelde PEM")
+    parser.add_argument("--password", default=os.environ.get("CYNIT_KEY_PASSWORD"), help="wachtwoord voor --key")
+    parser.add_argument("--seconds", type=float, default=1.0, help="meetduur per scenario")
+    parser.add_argument("--batch", type=int, default=200, help="tokens per mint_many-oproep")
+    parser.add_argument("--workers", type=int, default=4, help="threads voor de bulk-variant")
+    parser.add_argument("--min-rate", type=float, default=BENCH_MIN_RATE,
+                        help=f"exit 1 als een gecachete rate (tokens/s) hieronder zakt "
+                             f"(default {BENCH_MIN_RATE:.0f}, 0 = geen controle)")
+    args = parser.parse_args(argv)
+    if not args.bench:
+        parser.print_help()
+        return 0
+
+    rates = bench(args.seconds, args.key or None, args.password, args.batch, args.workers)
+    for label, rate in rates.items():
+        print(f"{label:<22} {rate:10.0f} tokens/s")
+    slow = [label for label, rate in rates.items() if label.endswith("cached") and rate < args.min_rate]
+    if args.min_rate and slow:
+        print(f"FOUT: {', '.join(slow)} onder minimum {args.min_rate:.0f} tokens/s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -3,7 +3,8 @@ import json
 from pathlib import Path
 from io import BytesIO
 
-from PIL import Image
+# PIL pas importeren als we echt een logo/icoon nodig hebben
+# (houdt de hub-startup licht, zie cynit_plugins)
 
 # Basis paden
 BASE_DIR = Path(__file__).resolve().parent
@@ -151,26 +152,13 @@ def load_helpfiles() -> dict:
     return raw
 
 
-def load_settings() -> dict:
+def build_settings(raw: dict) -> dict:
     """
-    Laadt settings.json, merged met defaults, en past daarna de actieve profile toe
-    (colors/paths/ui). Resultaat heeft top-level 'colors', 'paths', 'ui' die
-    al het actieve profiel bevatten, plus 'active_profile' en 'profiles' zelf.
+    Pure variant van load_settings(): defaults + raw + actief profiel,
+    zonder iets te lezen of weg te schrijven (gebruikt door cynit_config).
     """
-    CONFIG_DIR.mkdir(parents=True, exist_ok=True)
     base_default = default_settings()
 
-    if not SETTINGS_PATH.exists():
-        SETTINGS_PATH.write_text(json.dumps(base_default, indent=2), encoding="utf-8")
-        return base_default
-
-    try:
-        raw = json.loads(SETTINGS_PATH.read_text(encoding="utf-8"))
-    except Exception:
-        # kapotte settings -> reset naar default
-        SETTINGS_PATH.write_text(json.dumps(base_default, indent=2), encoding="utf-8")
-        return base_default
-
     # Stap 1: defaults + raw samenvoegen
     merged = deep_merge(base_default, raw)
 
@@ -192,6 +180,30 @@ def load_settings() -> dict:
     # Stap 3: profiel-info bijhouden op top-level
     merged["active_profile"] = active_profile
     merged["profiles"] = profiles
+    return merged
+
+
+def load_settings() -> dict:
+    """
+    Laadt settings.json, merged met defaults, en past daarna de actieve profile toe
+    (colors/paths/ui). Resultaat heeft top-level 'colors', 'paths', 'ui' die
+    al het actieve profiel bevatten, plus 'active_profile' en 'profiles' zelf.
+    """
+    CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+    base_default = default_settings()
+
+    if not SETTINGS_PATH.exists():
+        SETTINGS_PATH.write_text(json.dumps(base_default, indent=2), encoding="utf-8")
+        return base_default
+
+    try:
+        raw = json.loads(SETTINGS_PATH.read_text(encoding="utf-8"))
+    except Exception:
+        # kapotte settings -> reset naar default
+        SETTINGS_PATH.write_text(json.dumps(base_default, indent=2), encoding="utf-8")
+        return base_default
+
+    merged = build_settings(raw)
 
     # Terug wegschrijven (zodat nieuwe defaults ook persistent zijn)
     SETTINGS_PATH.write_text(json.dumps(merged, indent=2), encoding="utf-8")
@@ -215,6 +227,13 @@ def load_tools() -> dict:
     return data
 
 
+def build_tools(raw: dict) -> dict:
+    """Pure variant van load_tools(): valideert zonder weg te schrijven."""
+    if not isinstance(raw, dict) or not isinstance(raw.get("tools"), list):
+        return default_tools()
+    return raw
+
+
 ABOUT_DEFAULT = """# CyNiT Tools
 
 Centrale omgeving voor jouw tools:
@@ -284,6 +303,8 @@ def markdown_to_html_simple(text: str) -> str:
         return "\n".join(html_lines)
 
 def _load_logo_image():
+    from PIL import Image
+
     path = LOGO_PATH
     if not path.exists():
         return None
@@ -294,6 +315,8 @@ def _load_logo_image():
 
 
 def generate_ico_bytes():
+    from PIL import Image
+
     img = _load_logo_image()
     if img is None:
         return None
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+cynit_tls.py
+
+Live TLS-fetcher voor CyNiT Tools: haalt de certificaatketen op die een
+server presenteert, zonder openssl.exe.
+
+- parse_targets(text)  : "host", "host:poort", "https://host/pad", "[::1]:8443",
+                         optioneel gevolgd door een SNI-naam ("10.0.0.5:443 www.voorbeeld.be").
+- fetch_chain(target)  : één handshake (met SNI, timeout) -> TlsResult met de
+                         DER-certificaten zoals de server ze stuurt.
+- fetch_many(targets)  : veel targets tegelijk, begrensd aantal threads,
+                         resultaten in dezelfde volgorde als de input.
+- check_allowed(targets, allow) : allowlist (host-globs en IP-netwerken) voor
+                         targets die van buitenaf komen (/cert/tls).
+
+De keten wordt NIET geverifieerd (ook verlopen/self-signed certs willen we
+zien); TlsResult.pem_bundle() gaat rechtstreeks naar
+cert_viewer.decode_cert_from_bytes().
+
+Enkel stdlib + cynit_metrics, zodat ook scripts buiten de hub deze module
+kunnen gebruiken (zie cynit_certcore voor het sys.path-stukje).
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import ipaddress
+import socket
+import ssl
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import cynit_metrics
+
+DEFAULT_PORT = 443
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_WORKERS = 16
+MAX_TARGETS = 500
+
+TLS_FETCHES = cynit_metrics.counter(
+    "cynit_tools_tls_fetches_total",
+    "Live TLS-handshakes per resultaat (ok/timeout/error).",
+    ["result"],
+)
+TLS_SECONDS = cynit_metrics.histogram(
+    "cynit_tools_tls_fetch_seconds",
+    "Duur van connect + TLS-handshake.",
+)
+
+
+@dataclass(frozen=True)
+class TlsTarget:
+    host: str
+    port: int = DEFAULT_PORT
+    sni: Optional[str] = None
+
+    @property
+    def label(self) -> str:
+        host = f"[{self.host}]" if ":" in self.host else self.host
+        return f"{host}:{self.port}"
+
+
+@dataclass
+class TlsResult:
+    target: TlsTarget
+    ok: bool
+    error: str = ""
+    chain: List[bytes] = field(default_factory=list)     # DER, leaf eerst
+    tls_version: str = ""
+    cipher: str = ""
+    peer: str = ""
+    elapsed_ms: int = 0
+    fetched_at: str = ""
+
+    def pem_bundle(self) -> bytes:
+        """De keten als PEM-bundle (input voor decode_cert_from_bytes)."""
+        return "".join(ssl.DER_cert_to_PEM_cert(der) for der in self.chain).encode("ascii")
+
+    def summary(self) -> Dict[str, str]:
+        """Velden voor de 'TLS endpoint'-sectie in /cert en de exports."""
+        return {
+            "Endpoint": self.target.label,
+            "SNI": self.target.sni or "-",
+            "Peer": self.peer or "-",
+            "TLS Version": self.tls_version or "-",
+            "Cipher": self.cipher or "-",
+            "Chain Length": str(len(self.chain)),
+            "Fetched At": self.fetched_at,
+        }
+
+
+# ------------------------------------------------------------
+#  Targets
+# ------------------------------------------------------------
+
+def _is_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+
+def parse_target(text: str, default_port: int = DEFAULT_PORT) -> TlsTarget:
+    """
+    Eén target-regel ontleden. Raise ValueError bij een ongeldige poort/host.
+    SNI = expliciete tweede naam, anders de host (maar nooit een IP-adres).
+    """
+    parts = text.split()
+    if not parts:
+        raise ValueError("Lege target.")
+    spec = parts[0]
+    sni = parts[1] if len(parts) > 1 else None
+
+    if "://" in spec:
+        scheme, spec = spec.split("://", 1)
+        if scheme.lower() not in ("https", "tls", "ldaps", "smtps", "imaps"):
+            raise ValueError(f"Geen TLS-schema: {scheme}")
+    spec = spec.split("/", 1)[0].split("?", 1)[0]
+    if "@" in spec:
+        spec = spec.rsplit("@", 1)[1]
+
+    port = default_port
+    if spec.startswith("["):                         # [IPv6]:poort
+        host, _, rest = spec[1:].partition("]")
+        if rest.startswith(":"):
+            port = int(rest[1:])
+    elif spec.count(":") == 1:
+        host, port_text = spec.split(":")
+        port = int(port_text)
+    else:
+        host = spec                                  # naam, IPv4 of kale IPv6
+
+    host = host.strip().rstrip(".")
+    if not host:
+        raise ValueError(f"Geen host in '{text}'.")
+    if not 0 < port < 65536:
+        raise ValueError(f"Ongeldige poort: {port}")
+    if sni is None and not _is_ip(host):
+        sni = host
+    return TlsTarget(host=host, port=port, sni=sni)
+
+
+def parse_targets(text: str, default_port: int = DEFAULT_PORT, max_targets: int = MAX_TARGETS) -> List[TlsTarget]:
+    """
+    Targets uit vrije tekst: één per regel (of komma-gescheiden), '#' = commentaar.
+    Dubbels vallen weg; ongeldige regels of meer dan max_targets targets geven
+    ValueError (met het regelnummer).
+    """
+    targets: List[TlsTarget] = []
+    seen = set()
+    for lineno, line in enumerate(text.splitlines(), start=1):
+        line = line.split("#", 1)[0]
+        for chunk in line.split(","):
+            if not chunk.strip():
+                continue
+            try:
+                target = parse_target(chunk, default_port)
+            except ValueError as exc:
+                raise ValueError(f"Regel {lineno}: {exc}") from exc
+            if target not in seen:
+                seen.add(target)
+                targets.append(target)
+            if len(targets) > max_targets:
+                raise ValueError(f"Maximaal {max_targets} targets per keer.")
+    return targets
+
+
+def allowed(target: TlsTarget, allow: Iterable[str]) -> bool:
+    """
+    Past de target in de allowlist? Een entry is een host-glob
+    ("*.voorbeeld.be", "intranet") of een IP-netwerk ("10.0.0.0/8", "192.0.2.7").
+    Globs gelden voor namen, netwerken voor IP-adressen; er wordt niets
+    geresolved. Lege allowlist = alles toegestaan.
+    """
+    entries = [a.strip() for a in allow if a and a.strip()]
+    if not entries:
+        return True
+    host = target.host.lower()
+    ip = ipaddress.ip_address(host) if _is_ip(host) else None
+    for entry in entries:
+        try:
+            network = ipaddress.ip_network(entry, strict=False)
+        except ValueError:
+            if ip is None and fnmatch.fnmatchcase(host, entry.lower()):
+                return True
+            continue
+        if ip is not None and ip in network:
+            return True
+    return False
+
+
+def check_allowed(targets: Iterable[TlsTarget], allow: Iterable[str]) -> None:
+    """ValueError met de geweigerde targets als er één buiten de allowlist valt."""
+    allow = list(allow)
+    refused = [t.label for t in targets if not allowed(t, allow)]
+    if refused:
+        raise ValueError("Niet toegestaan (tls_fetch.allow): " + ", ".join(refused))
+
+
+# ------------------------------------------------------------
+#  Handshake
+# ------------------------------------------------------------
+
+def _client_context() -> ssl.SSLContext:
+    ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    ctx.check_hostname = False
+    ctx.verify_mode = ssl.CERT_NONE                  # we willen ook foute ketens zien
+    return ctx
+
+
+def _private_chain(tls: ssl.SSLSocket) -> Optional[List[bytes]]:
+    """
+    Python 3.10-3.12: get_unverified_chain() bestaat enkel op het interne
+    _sslobj en geeft _ssl.Certificate-objecten. Alles wat hier intern is,
+    zit in deze functie; ontbreekt er iets, dan None.
+    """
+    sslobj = getattr(tls, "_sslobj", None)
+    encoding = getattr(getattr(ssl, "_ssl", None), "ENCODING_DER", None)
+    if encoding is None or not hasattr(sslobj, "get_unverified_chain"):
+        return None
+    try:
+        return [c.public_bytes(encoding) for c in sslobj.get_unverified_chain() or []]
+    except (AttributeError, TypeError, ssl.SSLError):
+        return None
+
+
+def _peer_chain(tls: ssl.SSLSocket) -> List[bytes]:
+    """
+    Volledige gepresenteerde keten: de publieke get_unverified_chain()
+    (Python 3.13+), anders _private_chain(). Lukt geen van beide, dan enkel
+    het leaf-certificaat.
+    """
+    chain: Optional[List[bytes]] = None
+    if hasattr(tls, "get_unverified_chain"):
+        try:
+            chain = [bytes(c) for c in tls.get_unverified_chain() or []]
+        except (TypeError, ssl.SSLError):
+            chain = None
+    if chain is None:
+        chain = _private_chain(tls)
+    if chain:
+        return chain
+    leaf = tls.getpeercert(binary_form=True)
+    return [leaf] if leaf else []
+
+
+def fetch_chain(target: TlsTarget, timeout: float = DEFAULT_TIMEOUT) -> TlsResult:
+    """Eén connect + handshake. Fouten komen in TlsResult.error, nooit als exception."""
+    t0 = time.perf_counter()
+    result = TlsResult(target=target, ok=False,
+                       fetched_at=datetime.now(timezone.utc).isoformat(timespec="seconds"))
+    try:
+        with socket.create_connection((target.host, target.port), timeout=timeout) as sock:
+            with _client_context().wrap_socket(sock, server_hostname=target.sni) as tls:
+                result.chain = _peer_chain(tls)
+                result.tls_version = tls.version() or ""
+                result.cipher = (tls.cipher() or ("",))[0]
+                result.peer = tls.getpeername()[0]
+        if not result.chain:
+            raise ssl.SSLError("Server stuurde geen certificaat.")
+        result.ok = True
+        TLS_FETCHES.inc(result="ok")
+    except socket.timeout:
+        result.error = f"Timeout na {timeout:g}s"
+        TLS_FETCHES.inc(result="timeout")
+    except (OSError, ssl.SSLError, ValueError) as exc:
+        result.error = f"{type(exc).__name__}: {exc}"
+        TLS_FETCHES.inc(result="error")
+    elapsed = time.perf_counter() - t0
+    TLS_SECONDS.observe(elapsed)
+    result.elapsed_ms = int(elapsed * 1000)
+    return result
+
+
+def fetch_many(
+    targets: Iterable[TlsTarget],
+    workers: int = DEFAULT_WORKERS,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> Iterator[TlsResult]:
+    """
+    Alle targets parallel (max. 'workers' tegelijk), resultaten in input-volgorde.
+    Threads volstaan: de tijd gaat naar netwerk-wachten, niet naar CPU.
+    """
+    targets = list(targets)
+    if not targets:
+        return
+    if len(targets) == 1:
+        yield fetch_chain(targets[0], timeout)
+        return
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(targets))),
+                            thread_name_prefix="cynit-tls") as pool:
+        yield from pool.map(lambda t: fetch_chain(t, timeout), targets)
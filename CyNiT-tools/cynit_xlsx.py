@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+cynit_xlsx.py
+
+Streaming XLSX-writer voor CyNiT exports (certificaten, DCBaaS org-exports).
+
+- Gebaseerd op XlsxWriter in constant_memory-modus: elke rij gaat meteen
+  naar het sheet-XML op schijf, er blijft geen celmodel in geheugen.
+- Kolombreedtes worden bijgehouden TIJDENS append() (autofit), niet achteraf
+  door elke cel opnieuw op te vragen. XlsxWriter schrijft de <cols> pas bij
+  het sluiten, dus de breedtes mogen na de laatste rij gezet worden.
+- Rijen moeten in volgorde komen (append-only), wat constant_memory vereist.
+
+Gebruik:
+
+    book = cynit_xlsx.Book()
+    sheet = book.sheet("Certificates", autofit=True)
+    sheet.append(["organization_code", "application_name"], style=cynit_xlsx.Style(bold=True))
+    for row in rows:
+        sheet.append(row)
+    data = book.to_bytes()
+"""
+
+from __future__ import annotations
+
+import datetime as _dt
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+DEFAULT_MAX_WIDTH = 60
+DATETIME_FORMAT = "yyyy-mm-dd hh:mm:ss"
+
+WORKBOOK_OPTIONS = {
+    "constant_memory": True,
+    # Celwaarden zijn data, geen formules of hyperlinks.
+    "strings_to_formulas": False,
+    "strings_to_urls": False,
+}
+
+
+@dataclass(frozen=True)
+class Style:
+    """Minimale celopmaak; kleuren als '#RRGGBB' of 'RRGGBB'."""
+    bold: bool = False
+    italic: bool = False
+    size: Optional[float] = None
+    color: Optional[str] = None
+    bg: Optional[str] = None
+
+
+CellStyle = Union[None, Style, Sequence[Optional[Style]]]
+
+
+def _hex(color: str) -> str:
+    return color if color.startswith("#") else "#" + color
+
+
+class Sheet:
+    def __init__(
+        self,
+        book: "Book",
+        ws,
+        title: str,
+        autofit: bool = False,
+        widths: Optional[Dict[int, float]] = None,
+        max_width: float = DEFAULT_MAX_WIDTH,
+    ):
+        self._book = book
+        self._ws = ws
+        self.title = title
+        self.autofit = autofit
+        self.widths: Dict[int, float] = dict(widths or {})   # 1-based kolom -> breedte
+        self.max_width = max_width
+        self.rows = 0
+        self._max_len: List[int] = []
+
+    def append(self, values: Sequence[Any], style: CellStyle = None) -> None:
+        """
+        Eén rij toevoegen. style: één Style voor alle cellen of een lijst met
+        één Style (of None) per cel. Een lege lijst = lege rij.
+        """
+        values = list(values)
+        if self.autofit:
+            max_len = self._max_len
+            if len(max_len) < len(values):
+                max_len.extend([0] * (len(values) - len(max_len)))
+            for i, value in enumerate(values):
+                if value is not None:
+                    n = len(str(value))
+                    if n > max_len[i]:
+                        max_len[i] = n
+        if isinstance(style, Style):
+            style = [style] * len(values)
+        elif style is None:
+            style = ()
+
+        ws, row, fmt = self._ws, self.rows, self._book._format
+        for col, value in enumerate(values):
+            if value is None:
+                continue
+            cell_style = style[col] if col < len(style) else None
+            cell_format = fmt(cell_style) if cell_style is not None else None
+            if isinstance(value, (_dt.datetime, _dt.date, _dt.time)):
+                ws.write_datetime(row, col, value, cell_format or self._book._datetime_format())
+            elif isinstance(value, (str, bool, int, float)):
+                ws.write(row, col, value, cell_format)
+            else:
+                ws.write_string(row, col, str(value), cell_format)
+        self.rows += 1
+
+    def column_widths(self) -> Dict[int, float]:
+        widths: Dict[int, float] = {}
+        if self.autofit:
+            for i, n in enumerate(self._max_len, start=1):
+                widths[i] = min(n + 2, self.max_width)
+        widths.update(self.widths)
+        return widths
+
+    def _apply_widths(self) -> None:
+        for col, width in self.column_widths().items():
+            self._ws.set_column(col - 1, col - 1, width)
+
+
+class Book:
+    def __init__(self) -> None:
+        import xlsxwriter
+
+        self._buf = BytesIO()
+        self._wb = xlsxwriter.Workbook(self._buf, WORKBOOK_OPTIONS)
+        self._sheets: List[Sheet] = []
+        self._formats: Dict[Style, Any] = {}
+        self._date_fmt = None
+        self._data: Optional[bytes] = None
+
+    def sheet(
+        self,
+        title: str,
+        autofit: bool = False,
+        widths: Optional[Dict[int, float]] = None,
+        max_width: float = DEFAULT_MAX_WIDTH,
+    ) -> Sheet:
+        ws = self._wb.add_worksheet(title)
+        sheet = Sheet(self, ws, title, autofit=autofit, widths=widths, max_width=max_width)
+        self._sheets.append(sheet)
+        return sheet
+
+    def _format(self, style: Style):
+        fmt = self._formats.get(style)
+        if fmt is None:
+            props: Dict[str, Any] = {}
+            if style.bold:
+                props["bold"] = True
+            if style.italic:
+                props["italic"] = True
+            if style.size:
+                props["font_size"] = style.size
+            if style.color:
+                props["font_color"] = _hex(style.color)
+            if style.bg:
+                props["bg_color"] = _hex(style.bg)
+                props["pattern"] = 1
+            fmt = self._formats[style] = self._wb.add_format(props)
+        return fmt
+
+    def _datetime_format(self):
+        if self._date_fmt is None:
+            self._date_fmt = self._wb.add_format({"num_format": DATETIME_FORMAT})
+        return self._date_fmt
+
+    def to_bytes(self) -> bytes:
+        if self._data is None:
+            for sheet in self._sheets:
+                sheet._apply_widths()
+            self._wb.close()
+            self._data = self._buf.getvalue()
+            self._buf.close()
+        return self._data
+
+    def save(self, dest: Path) -> None:
+        Path(dest).write_bytes(self.to_bytes())
@@ -0,0 +1,605 @@
+#!/usr/bin/env python3
+"""
+dcb_csr_pipeline.py
+
+VOICA1-batch -> DCBaaS -> .cer terug in de batch-map.
+
+- scan_batch(map)   : alle CN.csr met een CN.key.pem ernaast (output van
+                      voica1.create_key_and_csr) waarvoor nog geen certificaat
+                      in de map staat (voica1.map_certs_by_cn).
+- submit_csrs(...)  : CSR's parallel indienen via application/certificate/add
+                      (zelfde payload als certificates_gui: Base64 van het
+                      CSR-bestand), gedeelde Session + TokenManager uit
+                      dcb_org_export (token-refresh, één retry na 401).
+- poll_pending(...) : ingediende aanvragen opvolgen tot het certificaat
+                      uitgereikt is, en dat als CN.cer naast de key schrijven.
+                      Het certificaat wordt eerst gecontroleerd: CN en public
+                      key moeten overeenkomen met CN.csr / CN.key.pem.
+- run_batch(...)    : scan + indienen + opvolgen; met watch=True blijft de
+                      map bewaakt (nieuwe CSR's worden meegenomen).
+
+Zit het certificaat al in het antwoord van de add-call, dan wordt het meteen
+weggeschreven. Anders wordt de aanvraag-id (request_id / id / ...) bewaard en
+opgevolgd via status_path (POST {"request_id": ...}).
+
+Status per CN staat in <map>/dcbaas_submissions.json: een herstart (of een
+tweede run) dient niets dubbel in en pikt lopende aanvragen weer op.
+Een mislukte CN blijft mislukt (en wordt gemeld): de add kan al uitgevoerd
+zijn. Enkel met --retry-failed worden CN's opnieuw ingediend waarvan de
+add-call de server aantoonbaar nooit bereikte (geen token, geen verbinding).
+Daarna kan VOICA1 stap 2 (voica1_process) de batch afwerken.
+
+Config: blok "dcbaas" in config/voica1.json (omgeving uit dcbaas_api.json,
+organization_code, application_name, template per device-type, ...).
+
+CLI:
+
+    python dcb_csr_pipeline.py <batch-map>                # indienen + wachten
+    python dcb_csr_pipeline.py <batch-map> --watch        # map blijven bewaken
+    python dcb_csr_pipeline.py <batch-map> --no-poll      # enkel indienen
+    python dcb_csr_pipeline.py <batch-map> --dry-run      # tonen wat ingediend zou worden
+    python dcb_csr_pipeline.py <batch-map> --retry-failed # niet-verzonden CSR's opnieuw
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+import urllib3
+from cryptography import x509
+from cryptography.hazmat.primitives import serialization
+from cryptography.x509.oid import NameOID
+
+import cynit_config
+import cynit_theme
+import dcb_org_export
+import voica1
+
+STATE_FILE = "dcbaas_submissions.json"
+PHONE_SUFFIX = "@gidphones.vlaanderen.be"
+
+SUBMITTED = "ingediend"
+ISSUED = "uitgereikt"
+FAILED = "mislukt"
+REJECTED = "geweigerd"
+
+_ID_KEYS = ("request_id", "certificate_request_id", "id", "certificate_id")
+_REJECT_WORDS = ("reject", "denied", "weiger", "error", "failed", "cancel")
+
+Progress = Callable[[str, str, bool], None]
+
+
+def log(msg: str) -> None:
+    print(f"[VOICA1 DCBAAS] {msg}", flush=True)
+
+
+@dataclass
+class PipelineOptions:
+    """Blok "dcbaas" in voica1.json."""
+    env: str = ""                              # omgeving uit dcbaas_api.json (leeg = default_env)
+    organization_code: str = ""
+    application_name: str = ""
+    templates: Dict[str, str] = field(default_factory=lambda: {
+        "pc": "Machine Authenticatie",
+        "ip_phone": "SSL Client",
+    })
+    duration: int = 12                         # maanden
+    submit_path: str = "application/certificate/add"
+    status_path: str = "application/certificate/status"
+    workers: int = 8
+    poll_interval_sec: float = 30.0
+    poll_timeout_sec: float = 3600.0
+    watch_interval_sec: float = 10.0
+
+
+def load_options(voica_cfg: Optional[Dict[str, Any]] = None) -> PipelineOptions:
+    if voica_cfg is None:
+        voica_cfg = cynit_config.current().get("voica1.json")
+    raw = (voica_cfg or {}).get("dcbaas") if isinstance(voica_cfg, dict) else None
+    opts = PipelineOptions()
+    if not isinstance(raw, dict):
+        return opts
+    for name, cast in (("env", str), ("organization_code", str), ("application_name", str),
+                       ("duration", int), ("submit_path", str), ("status_path", str),
+                       ("workers", int), ("poll_interval_sec", float), ("poll_timeout_sec", float),
+                       ("watch_interval_sec", float)):
+        if name in raw:
+            try:
+                setattr(opts, name, cast(raw[name]))
+            except (TypeError, ValueError):
+                log(f"voica1.json dcbaas.{name}={raw[name]!r} ongeldig – default gebruikt.")
+    if isinstance(raw.get("templates"), dict):
+        opts.templates.update({str(k): str(v) for k, v in raw["templates"].items()})
+    opts.workers = max(1, min(opts.workers, dcb_org_export.MAX_WORKERS))
+    opts.poll_interval_sec = max(1.0, opts.poll_interval_sec)
+    return opts
+
+
+def resolve_env(name: str = "") -> dcb_org_export.EnvConfig:
+    envs, default_env = dcb_org_export.load_env_configs_from_dcbaas_api()
+    key = name or default_env or next(iter(envs))
+    if key not in envs:
+        raise ValueError(f"Omgeving {key!r} staat niet in dcbaas_api.json ({', '.join(envs)}).")
+    return envs[key]
+
+
+# ------------------------------------------------------------
+#  Batch-map
+# ------------------------------------------------------------
+
+@dataclass
+class CsrItem:
+    cn: str
+    csr_path: Path
+    key_path: Path
+
+    @property
+    def device_type(self) -> str:
+        return "ip_phone" if self.cn.endswith(PHONE_SUFFIX) else "pc"
+
+    @property
+    def cert_path(self) -> Path:
+        return self.csr_path.with_name(f"{self.cn}.cer")
+
+
+def scan_batch(base_dir: Path) -> Tuple[List[CsrItem], Dict[str, Path]]:
+    """(CSR's met key, bestaande certs per CN) in de batch-map."""
+    items = []
+    for csr_path in sorted(base_dir.glob("*.csr")):
+        cn = csr_path.name[:-len(".csr")]
+        key_path = base_dir / f"{cn}.key.pem"
+        if key_path.exists():
+            items.append(CsrItem(cn, csr_path, key_path))
+    certs = voica1.map_certs_by_cn(base_dir) if items else {}
+    return items, certs
+
+
+class BatchState:
+    """dcbaas_submissions.json: status per CN (thread-safe, atomisch weggeschreven)."""
+
+    def __init__(self, base_dir: Path):
+        self.path = base_dir / STATE_FILE
+        self._lock = threading.Lock()
+        try:
+            self.data: Dict[str, Dict[str, Any]] = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.data = {}
+
+    def get(self, cn: str) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.data.get(cn) or {})
+
+    def update(self, cn: str, **fields: Any) -> None:
+        with self._lock:
+            entry = self.data.setdefault(cn, {})
+            entry.update(fields, updated=datetime.now().isoformat(timespec="seconds"))
+            text = json.dumps(self.data, indent=2, ensure_ascii=False)
+            tmp = self.path.with_suffix(".json.tmp")
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, self.path)
+
+    def pending(self) -> List[str]:
+        with self._lock:
+            return [cn for cn, e in self.data.items() if e.get("status") == SUBMITTED and e.get("request_id")]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            out: Dict[str, int] = {}
+            for e in self.data.values():
+                out[e.get("status", "?")] = out.get(e.get("status", "?"), 0) + 1
+            return out
+
+
+# ------------------------------------------------------------
+#  Antwoorden interpreteren
+# ------------------------------------------------------------
+
+def _walk(obj: Any, depth: int = 0):
+    """Alle (sleutel, waarde)-paren in geneste dicts/lijsten (beperkte diepte)."""
+    if depth > 4:
+        return
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            yield str(k).lower(), v
+            yield from _walk(v, depth + 1)
+    elif isinstance(obj, list):
+        for v in obj:
+            yield from _walk(v, depth + 1)
+
+
+def find_certificate(obj: Any) -> Optional[x509.Certificate]:
+    """Certificaat in een API-antwoord: PEM-tekst, of Base64 (DER/PEM) onder een 'cert'-sleutel."""
+    for key, value in _walk(obj):
+        if not isinstance(value, str) or len(value) < 100:
+            continue
+        if "-----BEGIN CERTIFICATE-----" in value:
+            try:
+                return x509.load_pem_x509_certificate(value.encode("ascii", errors="ignore"))
+            except ValueError:
+                continue
+        if "cert" in key:
+            try:
+                raw = base64.b64decode(value, validate=True)
+            except ValueError:
+                continue
+            for loader in (x509.load_der_x509_certificate, x509.load_pem_x509_certificate):
+                try:
+                    return loader(raw)
+                except ValueError:
+                    pass
+    return None
+
+
+def _request_id(obj: Any) -> str:
+    if isinstance(obj, dict):
+        for key in _ID_KEYS:
+            if obj.get(key):
+                return str(obj[key])
+        for value in obj.values():
+            if isinstance(value, dict):
+                found = _request_id(value)
+                if found:
+                    return found
+    return ""
+
+
+def _status_text(obj: Any) -> str:
+    for key, value in _walk(obj):
+        if key == "status" and isinstance(value, str):
+            return value
+    return ""
+
+
+def _cn(name: x509.Name) -> str:
+    attrs = name.get_attributes_for_oid(NameOID.COMMON_NAME)
+    return str(attrs[0].value) if attrs else ""
+
+
+class NotSent(str):
+    """Foutmelding voor een request dat de server nooit bereikte (geen verbinding)."""
+
+
+def _never_sent(exc: requests.RequestException) -> bool:
+    """
+    True als de verbinding nooit opgezet werd. Een ReadTimeout of een
+    verbroken verbinding na het versturen telt niet: de add kan al gelukt zijn.
+    """
+    if isinstance(exc, requests.ConnectTimeout):
+        return True
+    if not isinstance(exc, requests.ConnectionError):
+        return False
+    reason = getattr(exc.args[0], "reason", None) if exc.args else None
+    return isinstance(reason, urllib3.exceptions.NewConnectionError)
+
+
+def write_certificate(item: CsrItem, cert: x509.Certificate) -> Path:
+    """Controleer CN + public key tegen CSR/key en schrijf CN.cer (PEM) naast de key."""
+    if _cn(cert.subject) != item.cn:
+        raise ValueError(f"certificaat heeft CN {_cn(cert.subject)!r}, verwacht {item.cn!r}")
+    csr = x509.load_pem_x509_csr(item.csr_path.read_bytes())
+    spki = serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo
+    if cert.public_key().public_bytes(*spki) != csr.public_key().public_bytes(*spki):
+        raise ValueError("public key van het certificaat hoort niet bij CN.key.pem/CN.csr")
+    tmp = item.cert_path.with_suffix(".cer.tmp")
+    tmp.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    os.replace(tmp, item.cert_path)
+    return item.cert_path
+
+
+# ------------------------------------------------------------
+#  API-calls
+# ------------------------------------------------------------
+
+def _post(env: dcb_org_export.EnvConfig, path: str, payload: Dict[str, Any], token: str) -> Tuple[Any, Optional[str]]:
+    """(json, fout) voor één POST; een Unauthorized-fout (401) laat TokenManager.call() vernieuwen."""
+    url = f"{env.external_api_base.rstrip('/')}/{path.lstrip('/')}"
+    try:
+        resp = dcb_org_export.get_session().post(
+            url,
+            json=payload,
+            headers={"Accept": "application/json", "Content-Type": "application/json",
+                     "Authorization": token.strip()},
+            timeout=30,
+        )
+    except requests.RequestException as exc:
+        if _never_sent(exc):
+            return None, NotSent(f"Geen verbinding voor {path}: {exc}")
+        return None, f"HTTP-fout bij {path}: {exc}"
+    if resp.status_code == 401:
+        return None, dcb_org_export.Unauthorized(f"401 Unauthorized bij {path}")
+    try:
+        data = resp.json()
+    except ValueError:
+        data = {"raw": resp.text[:500]}
+    if not 200 <= resp.status_code < 300:
+        return data, f"Status {resp.status_code} bij {path}: {json.dumps(data, ensure_ascii=False)[:300]}"
+    return data, None
+
+
+def _payload(item: CsrItem, opts: PipelineOptions) -> Dict[str, Any]:
+    """Zelfde velden als certificates_gui.do_add."""
+    return {
+        "application_name": opts.application_name,
+        "description": f"VOICA1 {item.cn}",
+        "organization_code": opts.organization_code,
+        "duration": opts.duration,
+        "certificate_template": opts.templates.get(item.device_type, ""),
+        "csr": base64.b64encode(item.csr_path.read_bytes()).decode("ascii"),
+    }
+
+
+def _handle_answer(item: CsrItem, data: Any, state: BatchState, progress: Optional[Progress]) -> None:
+    """Antwoord van add of status verwerken: cert wegschrijven, weigering of (nog) wachten."""
+    cert = find_certificate(data)
+    if cert is not None:
+        try:
+            path = write_certificate(item, cert)
+        except ValueError as exc:
+            state.update(item.cn, status=FAILED, message=str(exc))
+            if progress:
+                progress(item.cn, f"fout: {exc}", False)
+            return
+        state.update(item.cn, status=ISSUED, cert_file=path.name, message="")
+        if progress:
+            progress(item.cn, f"uitgereikt → {path.name}", True)
+        return
+
+    status = _status_text(data)
+    if any(word in status.lower() for word in _REJECT_WORDS):
+        state.update(item.cn, status=REJECTED, message=status)
+        if progress:
+            progress(item.cn, f"geweigerd ({status})", False)
+        return
+
+    request_id = _request_id(data) or state.get(item.cn).get("request_id", "")
+    if not request_id:
+        state.update(item.cn, status=FAILED, message="geen certificaat en geen aanvraag-id in het antwoord")
+        if progress:
+            progress(item.cn, "fout: geen aanvraag-id in het antwoord", False)
+        return
+    state.update(item.cn, status=SUBMITTED, request_id=request_id, message=status)
+
+
+def submit_csrs(
+    env: dcb_org_export.EnvConfig,
+    tokens: dcb_org_export.TokenManager,
+    items: List[CsrItem],
+    state: BatchState,
+    opts: PipelineOptions,
+    progress: Optional[Progress] = None,
+) -> None:
+    """Alle items parallel indienen (max. opts.workers tegelijk)."""
+    if not items:
+        return
+
+    def one(item: CsrItem) -> None:
+        errors: List[Optional[str]] = []
+
+        def attempt(token: str) -> Tuple[Any, Optional[str]]:
+            data, err = _post(env, opts.submit_path, _payload(item, opts), token)
+            errors.append(err)
+            return data, err
+
+        data, err = tokens.call(attempt)
+        # sent=False enkel als geen enkele poging de server bereikte (ook: geen token)
+        sent = not all(isinstance(e, NotSent) for e in errors)
+        if err:
+            state.update(item.cn, status=FAILED, message=err, sent=sent)
+            if progress:
+                progress(item.cn, f"fout bij indienen: {err}", False)
+            return
+        state.update(item.cn, sent=True, submitted=datetime.now().isoformat(timespec="seconds"))
+        _handle_answer(item, data, state, progress)
+
+    with ThreadPoolExecutor(max_workers=min(opts.workers, len(items)), thread_name_prefix="csr-submit") as pool:
+        list(pool.map(one, items))
+    log(f"{len(items)} CSR's ingediend bij env={env.name}: {state.counts()}")
+
+
+def poll_once(
+    env: dcb_org_export.EnvConfig,
+    tokens: dcb_org_export.TokenManager,
+    base_dir: Path,
+    state: BatchState,
+    opts: PipelineOptions,
+    progress: Optional[Progress] = None,
+) -> int:
+    """Eén ronde status-opvraging voor alle lopende aanvragen; geeft het aantal dat nog loopt."""
+    pending = state.pending()
+    if not pending:
+        return 0
+
+    def one(cn: str) -> None:
+        item = CsrItem(cn, base_dir / f"{cn}.csr", base_dir / f"{cn}.key.pem")
+        request_id = state.get(cn)["request_id"]
+        data, err = tokens.call(
+            lambda token: _post(env, opts.status_path, {"request_id": request_id}, token)
+        )
+        if err:
+            state.update(cn, message=err)           # blijft ingediend: volgende ronde opnieuw
+            return
+        _handle_answer(item, data, state, progress)
+
+    with ThreadPoolExecutor(max_workers=min(opts.workers, len(pending)), thread_name_prefix="csr-poll") as pool:
+        list(pool.map(one, pending))
+    return len(state.pending())
+
+
+def poll_pending(
+    env: dcb_org_export.EnvConfig,
+    tokens: dcb_org_export.TokenManager,
+    base_dir: Path,
+    state: BatchState,
+    opts: PipelineOptions,
+    progress: Optional[Progress] = None,
+    stop: Optional[threading.Event] = None,
+) -> int:
+    """Opvolgen tot niets meer loopt, poll_timeout_sec verstreken is of stop gezet wordt."""
+    stop = stop or threading.Event()
+    deadline = time.time() + opts.poll_timeout_sec
+    left = poll_once(env, tokens, base_dir, state, opts, progress)
+    while left and time.time() < deadline and not stop.wait(opts.poll_interval_sec):
+        left = poll_once(env, tokens, base_dir, state, opts, progress)
+    if left:
+        log(f"Nog {left} aanvragen lopend in {base_dir} (later opnieuw opvolgen).")
+    return left
+
+
+# ------------------------------------------------------------
+#  Batch
+# ------------------------------------------------------------
+
+def _retryable(entry: Dict[str, Any]) -> bool:
+    """Mislukt zonder dat de add de server bereikte: geen aanvraag-id, geen certificaat."""
+    return (
+        entry.get("status") == FAILED
+        and entry.get("sent") is False
+        and not entry.get("request_id")
+        and not entry.get("cert_file")
+    )
+
+
+def to_submit(
+    base_dir: Path,
+    state: BatchState,
+    retry_failed: bool = False,
+) -> Tuple[List[CsrItem], List[CsrItem], Dict[str, Path]]:
+    """
+    (nieuw in te dienen, al afgehandeld, certs per CN). Enkel CN's zonder
+    status zijn nieuw; mislukte CN's enkel met retry_failed én als de add
+    de server nooit bereikte (zie _retryable).
+    """
+    items, certs = scan_batch(base_dir)
+    new, done = [], []
+    for item in items:
+        entry = state.get(item.cn)
+        if item.cn in certs:
+            done.append(item)
+        elif not entry.get("status") or (retry_failed and _retryable(entry)):
+            new.append(item)
+        else:
+            done.append(item)
+    return new, done, certs
+
+
+def run_batch(
+    base_dir: Path,
+    opts: Optional[PipelineOptions] = None,
+    env: Optional[dcb_org_export.EnvConfig] = None,
+    poll: bool = True,
+    watch: bool = False,
+    dry_run: bool = False,
+    progress: Optional[Progress] = None,
+    stop: Optional[threading.Event] = None,
+    retry_failed: bool = False,
+) -> Dict[str, int]:
+    """
+    Scan + indienen + (optioneel) opvolgen. Geeft de tellingen per status.
+    retry_failed: niet-verzonden CSR's (zie _retryable) één keer opnieuw
+    indienen, bij de start; in watch-modus niet bij elke ronde.
+    """
+    opts = opts or load_options()
+    base_dir = Path(base_dir)
+    if not base_dir.is_dir():
+        raise ValueError(f"Map bestaat niet: {base_dir}")
+    if not dry_run and not (opts.application_name and opts.organization_code):
+        raise ValueError("Vul dcbaas.application_name en dcbaas.organization_code in config/voica1.json in.")
+    env = env or resolve_env(opts.env)
+    tokens = dcb_org_export.get_token_manager(env)
+    state = BatchState(base_dir)
+    stop = stop or threading.Event()
+    first = True
+
+    while True:
+        new, done, certs = to_submit(base_dir, state, retry_failed=retry_failed and first)
+        if first and progress and not dry_run:
+            for item in done:
+                entry = state.get(item.cn)
+                if item.cn in certs:
+                    progress(item.cn, f"certificaat al aanwezig ({certs[item.cn].name})", True)
+                elif entry.get("status") == REJECTED:
+                    progress(item.cn, f"geweigerd ({entry.get('message', '')})", False)
+                elif entry.get("status") == FAILED:
+                    hint = " (--retry-failed dient opnieuw in)" if _retryable(entry) else ""
+                    progress(item.cn, f"mislukt ({entry.get('message', '')}){hint}", False)
+        first = False
+        if dry_run:
+            for item in new:
+                payload = dict(_payload(item, opts), csr=f"<{item.csr_path.name}>")
+                log(f"[dry-run] {item.cn}: POST {opts.submit_path} {payload}")
+            return {"te indienen": len(new), "al afgehandeld": len(done)}
+        if new:
+            log(f"{len(new)} nieuwe CSR's in {base_dir} ({len(done)} al afgehandeld)")
+            submit_csrs(env, tokens, new, state, opts, progress)
+        if not watch:
+            if poll:
+                poll_pending(env, tokens, base_dir, state, opts, progress, stop)
+            break
+        poll_once(env, tokens, base_dir, state, opts, progress)
+        if stop.wait(opts.watch_interval_sec):
+            break
+
+    counts = state.counts()
+    log(f"Batch {base_dir}: {counts}")
+    return counts
+
+
+# ------------------------------------------------------------
+#  CLI
+# ------------------------------------------------------------
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="VOICA1 CSR's indienen bij DCBaaS en certificaten ophalen")
+    parser.add_argument("base_dir", help="VOICA1 batch-map (CN.key.pem + CN.csr)")
+    parser.add_argument("--env", default="", help="omgeving uit dcbaas_api.json")
+    parser.add_argument("--org", default="", help="organization_code (overschrijft voica1.json)")
+    parser.add_argument("--app", default="", help="application_name (overschrijft voica1.json)")
+    parser.add_argument("--watch", action="store_true", help="map blijven bewaken (stoppen met Ctrl+C)")
+    parser.add_argument("--no-poll", action="store_true", help="enkel indienen, niet wachten op certificaten")
+    parser.add_argument("--dry-run", action="store_true", help="tonen wat ingediend zou worden")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="mislukte CSR's opnieuw indienen, enkel als de add de server nooit bereikte")
+    args = parser.parse_args(argv)
+
+    cfg_path = cynit_theme.CONFIG_DIR / "voica1.json"
+    try:
+        voica_cfg = json.loads(cfg_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        voica_cfg = {}
+    opts = load_options(voica_cfg)
+    if args.env:
+        opts.env = args.env
+    if args.org:
+        opts.organization_code = args.org
+    if args.app:
+        opts.application_name = args.app
+    voica1.OPENSSL_BIN = voica_cfg.get("openssl_bin", voica1.OPENSSL_BIN)
+
+    def show(cn: str, text: str, ok: bool) -> None:
+        log(f"{'OK  ' if ok else 'FOUT'} {cn}: {text}")
+
+    try:
+        counts = run_batch(Path(args.base_dir), opts, poll=not args.no_poll, watch=args.watch,
+                           dry_run=args.dry_run, progress=show, retry_failed=args.retry_failed)
+    except KeyboardInterrupt:
+        return 130
+    except ValueError as exc:
+        log(f"FOUT: {exc}")
+        return 2
+    return 1 if counts.get(FAILED) or counts.get(REJECTED) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
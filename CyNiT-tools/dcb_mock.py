@@ -0,0 +1,780 @@
+#!/usr/bin/env python3
+"""
+dcb_mock.py
+
+Offline stand-in voor de DCBaaS API + load-test van de org-export.
+
+Mock-server (stdlib, HTTP/1.1 keep-alive, één thread per connectie):
+
+- POST /op/v1/token                    : client_credentials + client_assertion
+                                          -> {"access_token", "token_type", "expires_in"}
+- POST /certificate/search              : {"organization_code"} -> {"response": [...]}
+                                          deterministisch per org (zelfde seed = zelfde rijen)
+- POST /dev/application/add|update|delegate|delete
+- POST /dev/application/certificate/add : CSR-aanvraag (certificates_gui,
+                                          dcb_csr_pipeline) -> {"request_id", "status": "Pending"}
+- POST /dev/application/certificate/status : {"request_id"} -> "Pending", of na
+                                          --issue-delay-sec "Issued" + "certificate"
+                                          (PEM, getekend door een mock-CA in het geheugen)
+- GET  /dev/health
+- GET  /_mock/stats                     : requests per pad/status, verstuurde bytes
+
+Elk pad werkt ook met of zonder /dev-prefix (org-export gebruikt de base
+zonder, de API-GUI's plakken er /dev/ voor). Tokens van /op/v1/token worden
+gecontroleerd (met of zonder "Bearer "); --no-auth aanvaardt alles.
+
+Instelbaar: latency (+ jitter), foutkansen (503, 429 met Retry-After, 401),
+certificaten per org, extra bytes per rij (payload-grootte), churn (kans
+dat een cert bij een volgende search van status/einddatum wisselt) en de
+levensduur van tokens.
+
+Gebruik:
+
+    python dcb_mock.py serve --port 8765 --latency-ms 80 --error-rate 0.02
+    python dcb_mock.py loadtest --orgs 300 --certs 50 --workers 16
+    python dcb_mock.py loadtest --orgs 200 --certs 20 --runs 2 --snapshots
+
+Met serve: zet in config/dcbaas_api.json een omgeving met
+external_api_base = http://127.0.0.1:8765 en
+token_url = http://127.0.0.1:8765/op/v1/token; de API-GUI's krijgen
+--base-url http://127.0.0.1:8765.
+
+loadtest start de mock als apart proces (eigen GIL, zodat de cijfers de
+client meten), maakt een tijdelijke JWK + token_file en drijft
+dcb_org_export.fetch_certificates_for_orgs / fetch_with_snapshots aan met
+een tijdelijke snapshot-store. Rapport: orgs/s, certs/s, MB, latency per
+org (p50/p95/p99/max), token-requests en serverstatussen per run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+ASSERTION_TYPE = "urn:ietf:params:oauth:client-assertion-type:jwt-bearer"
+WRITE_CHUNK_SIZE = 64 * 1024
+
+_STATUSES = ["Active", "Active", "Active", "Active", "Expired", "Revoked", "Pending"]
+_TYPES = ["SERVER", "CLIENT", "SIGNING"]
+_ISSUERS = ["Vlaamse Overheid Issuing CA", "DCBaaS Intermediate CA G2"]
+
+
+def log(msg: str) -> None:
+    print(f"[DCB MOCK] {msg}", flush=True)
+
+
+@dataclass
+class MockOptions:
+    latency_ms: float = 50.0         # gemiddelde verwerkingstijd per request
+    jitter_ms: float = 20.0          # +/- uniform rond latency_ms
+    error_rate: float = 0.0          # kans op 503 per search-request
+    throttle_rate: float = 0.0       # kans op 429 (met Retry-After)
+    retry_after_sec: int = 1
+    unauthorized_rate: float = 0.0   # kans op 401 ondanks geldig token
+    certs_per_org: int = 25
+    certs_spread: float = 0.5        # aantal per org varieert +/- deze fractie
+    pad_bytes: int = 0               # extra tekst per rij (grotere payloads)
+    churn: float = 0.0               # kans per cert op een gewijzigde status/einddatum per search
+    token_ttl_sec: int = 3600
+    issue_delay_sec: float = 2.0     # CSR-aanvraag -> uitgereikt certificaat
+    no_auth: bool = False
+    seed: int = 1
+
+
+# ------------------------------------------------------------
+#  Data
+# ------------------------------------------------------------
+
+def _rng(*parts: Any) -> random.Random:
+    digest = hashlib.sha256("|".join(str(p) for p in parts).encode("utf-8")).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def org_rows(org_code: str, opts: MockOptions, generation: int = 0) -> List[Dict[str, Any]]:
+    """
+    Certificaten van één org, zoals /certificate/search ze teruggeeft.
+    Zelfde org + seed = zelfde rijen; 'generation' (aantal eerdere searches)
+    laat met opts.churn een deel ervan wijzigen.
+    """
+    rng = _rng(opts.seed, org_code)
+    spread = int(opts.certs_per_org * opts.certs_spread)
+    count = max(0, opts.certs_per_org + rng.randint(-spread, spread))
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    apps = [f"{org_code.lower()}-app-{i:02d}" for i in range(max(1, count // 4))]
+    pad = ("x" * opts.pad_bytes) if opts.pad_bytes else ""
+
+    rows = []
+    for i in range(count):
+        start = base + timedelta(days=rng.randint(0, 900))
+        end = start + timedelta(days=rng.choice([365, 730, 1095]))
+        status = rng.choice(_STATUSES)
+        if opts.churn and generation:
+            change = _rng(opts.seed, org_code, i, generation)
+            if change.random() < opts.churn:
+                status = change.choice(_STATUSES)
+                end = end + timedelta(days=change.randint(1, 365))
+        app = apps[i % len(apps)]
+        rows.append({
+            "application_name": app,
+            "application_status": "Active",
+            "contact_person": [f"{app}@example.invalid"],
+            "description": f"Mock-certificaat {i} van {org_code}" + (f" {pad}" if pad else ""),
+            "type": rng.choice(_TYPES),
+            "issued_by": rng.choice(_ISSUERS),
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat(),
+            "status": status,
+            "serial_number": hashlib.sha1(f"{opts.seed}:{org_code}:{i}".encode()).hexdigest()[:32],
+        })
+    return rows
+
+
+def _iter_response(rows: List[Dict[str, Any]]):
+    """{"response": [...]} in stukken, zoals een server die streamt."""
+    buf = ['{"response": [']
+    size = len(buf[0])
+    for i, row in enumerate(rows):
+        part = ("," if i else "") + json.dumps(row, ensure_ascii=False)
+        buf.append(part)
+        size += len(part)
+        if size >= WRITE_CHUNK_SIZE:
+            yield "".join(buf).encode("utf-8")
+            buf, size = [], 0
+    buf.append(f'], "total": {len(rows)}}}')
+    yield "".join(buf).encode("utf-8")
+
+
+# ------------------------------------------------------------
+#  Server
+# ------------------------------------------------------------
+
+class MockState:
+    """Gedeelde toestand van de mock: tokens, toepassingen, tellers."""
+
+    def __init__(self, opts: MockOptions):
+        self.opts = opts
+        self.lock = threading.Lock()
+        self.tokens: Dict[str, float] = {}                   # access_token -> expires_at
+        self.apps: Dict[str, Dict[str, Any]] = {}
+        self.searches: Dict[str, int] = {}                   # org -> aantal searches
+        self.cert_requests: Dict[str, Dict[str, Any]] = {}   # request_id -> csr, ready_at, certificate
+        self._ca: Optional[Tuple[Any, Any]] = None           # (key, cert), pas aangemaakt bij de eerste signing
+        self.requests: Dict[str, int] = {}                   # "pad status" -> aantal
+        self.bytes_sent = 0
+        self.rng = random.Random(opts.seed)
+
+    def count(self, path: str, status: int, sent: int) -> None:
+        with self.lock:
+            key = f"{path} {status}"
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.bytes_sent += sent
+
+    def roll(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self.lock:
+            return self.rng.random() < rate
+
+    def issue_token(self) -> Tuple[str, int]:
+        token = uuid.uuid4().hex + uuid.uuid4().hex
+        with self.lock:
+            self.tokens[token] = time.time() + self.opts.token_ttl_sec
+        return token, self.opts.token_ttl_sec
+
+    def token_ok(self, header: str) -> bool:
+        if self.opts.no_auth:
+            return True
+        token = header.strip()
+        if token.lower().startswith("bearer "):
+            token = token[7:].strip()
+        with self.lock:
+            expires_at = self.tokens.get(token)
+        return expires_at is not None and expires_at > time.time()
+
+    def sign_csr(self, csr_pem: str, days: int) -> str:
+        """CSR tekenen met de mock-CA (subject + public key uit de CSR) -> PEM."""
+        from cryptography import x509
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import rsa
+        from cryptography.x509.oid import NameOID
+
+        with self.lock:
+            if self._ca is None:
+                key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+                name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "DCBaaS Mock CA")])
+                now = datetime.now(timezone.utc)
+                cert = (
+                    x509.CertificateBuilder()
+                    .subject_name(name).issuer_name(name).public_key(key.public_key())
+                    .serial_number(x509.random_serial_number())
+                    .not_valid_before(now - timedelta(minutes=5)).not_valid_after(now + timedelta(days=3650))
+                    .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+                    .sign(key, hashes.SHA256())
+                )
+                self._ca = (key, cert)
+            ca_key, ca_cert = self._ca
+        csr = x509.load_pem_x509_csr(csr_pem.encode("ascii"))
+        now = datetime.now(timezone.utc)
+        cert = (
+            x509.CertificateBuilder()
+            .subject_name(csr.subject).issuer_name(ca_cert.subject).public_key(csr.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - timedelta(minutes=5)).not_valid_after(now + timedelta(days=days))
+            .sign(ca_key, hashes.SHA256())
+        )
+        return cert.public_bytes(serialization.Encoding.PEM).decode("ascii")
+
+    def generation(self, org: str) -> int:
+        with self.lock:
+            gen = self.searches.get(org, 0)
+            self.searches[org] = gen + 1
+        return gen
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "requests": dict(sorted(self.requests.items())),
+                "bytes_sent": self.bytes_sent,
+                "tokens_issued": len(self.tokens),
+                "applications": len(self.apps),
+                "options": asdict(self.opts),
+            }
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "DCBaaSMock/1.0"
+    state: MockState                                        # gezet door make_server()
+
+    def log_message(self, fmt: str, *args: Any) -> None:    # geen regel per request
+        pass
+
+    # --- helpers ---
+
+    def _body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _json_body(self) -> Dict[str, Any]:
+        try:
+            data = json.loads(self._body() or b"{}")
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _send(self, status: int, payload: Any, path: str, headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+        self.state.count(path, status, len(data))
+
+    def _send_chunked(self, chunks, path: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        sent = 0
+        for chunk in chunks:
+            self.wfile.write(f"{len(chunk):X}\r\n".encode("ascii") + chunk + b"\r\n")
+            sent += len(chunk)
+        self.wfile.write(b"0\r\n\r\n")
+        self.state.count(path, 200, sent)
+
+    def _sleep(self) -> None:
+        opts = self.state.opts
+        delay = opts.latency_ms + random.uniform(-opts.jitter_ms, opts.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+    def _route(self) -> str:
+        path = urlsplit(self.path).path.rstrip("/") or "/"
+        return path[4:] if path.startswith("/dev/") else path
+
+    # --- HTTP ---
+
+    def do_GET(self) -> None:
+        path = self._route()
+        if path == "/health":
+            self._send(200, {"status": "UP"}, path)
+        elif path == "/_mock/stats":
+            self._send(200, self.state.stats(), path)
+        else:
+            self._send(404, {"error": "not_found", "path": path}, path)
+
+    def do_POST(self) -> None:
+        path = self._route()
+        if path == "/op/v1/token":
+            self._token(path)
+            return
+        handler = {
+            "/certificate/search": self._search,
+            "/application/add": self._app_add,
+            "/application/update": self._app_update,
+            "/application/delegate": self._app_delegate,
+            "/application/delete": self._app_delete,
+            "/application/certificate/add": self._cert_add,
+            "/application/certificate/status": self._cert_status,
+        }.get(path)
+        if handler is None:
+            self._body()
+            self._send(404, {"error": "not_found", "path": path}, path)
+            return
+        body = self._json_body()
+        self._sleep()
+        if not self.state.token_ok(self.headers.get("Authorization", "")) or self.state.roll(
+            self.state.opts.unauthorized_rate
+        ):
+            self._send(401, {"error": "unauthorized"}, path, {"WWW-Authenticate": 'Bearer error="invalid_token"'})
+            return
+        handler(path, body)
+
+    # --- endpoints ---
+
+    def _token(self, path: str) -> None:
+        form = {k: v[0] for k, v in parse_qs(self._body().decode("utf-8", errors="replace")).items()}
+        self._sleep()
+        if form.get("grant_type") != "client_credentials":
+            self._send(400, {"error": "unsupported_grant_type"}, path)
+            return
+        if form.get("client_assertion_type") != ASSERTION_TYPE or not _assertion_ok(form.get("client_assertion", "")):
+            self._send(401, {"error": "invalid_client"}, path)
+            return
+        token, ttl = self.state.issue_token()
+        self._send(200, {
+            "access_token": token,
+            "token_type": "Bearer",
+            "expires_in": ttl,
+            "scope": form.get("scope", ""),
+        }, path)
+
+    def _search(self, path: str, body: Dict[str, Any]) -> None:
+        opts = self.state.opts
+        if self.state.roll(opts.throttle_rate):
+            self._send(429, {"error": "too_many_requests"}, path, {"Retry-After": str(opts.retry_after_sec)})
+            return
+        if self.state.roll(opts.error_rate):
+            self._send(503, {"error": "service_unavailable"}, path)
+            return
+        org = str(body.get("organization_code") or "").strip()
+        if not org:
+            self._send(400, {"error": "organization_code ontbreekt"}, path)
+            return
+        self._send_chunked(_iter_response(org_rows(org, opts, self.state.generation(org))), path)
+
+    def _app_add(self, path: str, body: Dict[str, Any]) -> None:
+        name = str(body.get("name") or "").strip()
+        if not name:
+            self._send(400, {"error": "name ontbreekt"}, path)
+            return
+        with self.state.lock:
+            if name in self.state.apps:
+                exists = True
+            else:
+                exists = False
+                self.state.apps[name] = {"name": name, "reason": body.get("reason", ""), "delegations": []}
+        if exists:
+            self._send(409, {"error": f"applicatie '{name}' bestaat al"}, path)
+        else:
+            self._send(200, {"result": "created", "name": name}, path)
+
+    def _app_update(self, path: str, body: Dict[str, Any]) -> None:
+        name = str(body.get("name") or "").strip()
+        with self.state.lock:
+            app = self.state.apps.get(name)
+            if app is not None:
+                app["reason"] = body.get("reason", app.get("reason", ""))
+        if app is None:
+            self._send(404, {"error": f"applicatie '{name}' niet gevonden"}, path)
+        else:
+            self._send(200, {"result": "updated", "name": name}, path)
+
+    def _app_delegate(self, path: str, body: Dict[str, Any]) -> None:
+        name = str(body.get("name") or "").strip()
+        org = str(body.get("organization_code_delegated") or "").strip()
+        if not org:
+            self._send(400, {"error": "organization_code_delegated ontbreekt"}, path)
+            return
+        with self.state.lock:
+            app = self.state.apps.get(name)
+            if app is not None:
+                app["delegations"].append({"organization_code": org, "duration": body.get("duration")})
+        if app is None:
+            self._send(404, {"error": f"applicatie '{name}' niet gevonden"}, path)
+        else:
+            self._send(200, {"result": "delegated", "name": name, "organization_code": org}, path)
+
+    def _app_delete(self, path: str, body: Dict[str, Any]) -> None:
+        name = str(body.get("name") or "").strip()
+        with self.state.lock:
+            app = self.state.apps.pop(name, None)
+        if app is None:
+            self._send(404, {"error": f"applicatie '{name}' niet gevonden"}, path)
+        else:
+            self._send(200, {"result": "deleted", "name": name}, path)
+
+    def _cert_add(self, path: str, body: Dict[str, Any]) -> None:
+        missing = [k for k in ("application_name", "organization_code", "csr") if not body.get(k)]
+        if missing:
+            self._send(400, {"error": "ontbrekende velden: " + ", ".join(missing)}, path)
+            return
+        csr = str(body["csr"])
+        if "BEGIN" not in csr:
+            try:                                   # certificates_gui stuurt Base64 van het bestand
+                csr = base64.b64decode(csr, validate=True).decode("ascii", errors="replace")
+            except ValueError:
+                pass
+        if "BEGIN CERTIFICATE REQUEST" not in csr:
+            self._send(400, {"error": "csr is geen PEM certificate request"}, path)
+            return
+        request_id = uuid.uuid4().hex[:16]
+        try:
+            months = int(body.get("duration") or 12)
+        except (TypeError, ValueError):
+            months = 12
+        with self.state.lock:
+            self.state.cert_requests[request_id] = {
+                "csr": csr,
+                "days": max(1, months) * 30,
+                "ready_at": time.time() + self.state.opts.issue_delay_sec,
+                "certificate": "",
+            }
+        self._send(200, {
+            "result": "requested",
+            "application_name": body["application_name"],
+            "organization_code": body["organization_code"],
+            "request_id": request_id,
+            "status": "Pending",
+        }, path)
+
+    def _cert_status(self, path: str, body: Dict[str, Any]) -> None:
+        request_id = str(body.get("request_id") or "").strip()
+        with self.state.lock:
+            req = self.state.cert_requests.get(request_id)
+        if req is None:
+            self._send(404, {"error": f"aanvraag '{request_id}' niet gevonden"}, path)
+            return
+        if time.time() < req["ready_at"]:
+            self._send(200, {"request_id": request_id, "status": "Pending"}, path)
+            return
+        if not req["certificate"]:
+            try:
+                req["certificate"] = self.state.sign_csr(req["csr"], req["days"])
+            except ValueError as exc:
+                self._send(200, {"request_id": request_id, "status": "Rejected", "reason": str(exc)}, path)
+                return
+        self._send(200, {"request_id": request_id, "status": "Issued", "certificate": req["certificate"]}, path)
+
+
+def _assertion_ok(assertion: str) -> bool:
+    """Vorm-controle van de client_assertion (JWT met iss/sub/aud/exp, niet vervallen)."""
+    try:
+        import jwt
+        claims = jwt.decode(assertion, options={"verify_signature": False})
+    except Exception:
+        return False
+    if not all(claims.get(k) for k in ("iss", "sub", "aud", "exp")):
+        return False
+    return float(claims["exp"]) > time.time()
+
+
+def make_server(host: str, port: int, opts: MockOptions) -> ThreadingHTTPServer:
+    handler = type("BoundMockHandler", (MockHandler,), {"state": MockState(opts)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(host: str, port: int, opts: MockOptions, port_file: str = "") -> int:
+    server = make_server(host, port, opts)
+    if port_file:
+        Path(port_file).write_text(str(server.server_address[1]))
+    log(f"Luistert op http://{host}:{server.server_address[1]} ({asdict(opts)})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+# ------------------------------------------------------------
+#  Load-test
+# ------------------------------------------------------------
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def _start_mock_process(args: argparse.Namespace) -> Tuple[subprocess.Popen, str]:
+    """Mock als apart proces op een vrije poort; wacht tot /health antwoordt."""
+    import requests
+
+    fd, name = tempfile.mkstemp(prefix="dcb_mock_port_")
+    os.close(fd)
+    port_file = Path(name)
+    cmd = [sys.executable, str(Path(__file__).resolve()), "serve", "--host", "127.0.0.1", "--port", "0",
+           "--port-file", str(port_file), *_mock_args(args)]
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL)
+    deadline = time.time() + 15
+    try:
+        while time.time() < deadline:
+            if proc.poll() is not None:
+                raise RuntimeError(f"mock-proces stopte meteen (exit {proc.returncode})")
+            text = port_file.read_text().strip()
+            if text:
+                base = f"http://127.0.0.1:{text}"
+                try:
+                    if requests.get(f"{base}/dev/health", timeout=1).status_code == 200:
+                        return proc, base
+                except requests.RequestException:
+                    pass
+            time.sleep(0.05)
+        proc.terminate()
+        raise RuntimeError("mock-server kwam niet op binnen 15s")
+    finally:
+        port_file.unlink(missing_ok=True)
+
+
+def _mock_args(args: argparse.Namespace) -> List[str]:
+    out = []
+    for name in ("latency_ms", "jitter_ms", "error_rate", "throttle_rate", "retry_after_sec",
+                 "unauthorized_rate", "certs", "certs_spread", "pad_bytes", "churn",
+                 "token_ttl_sec", "issue_delay_sec", "seed"):
+        out += [f"--{name.replace('_', '-')}", str(getattr(args, name))]
+    return out
+
+
+def _make_credentials(tmp: Path) -> Path:
+    """Tijdelijke RSA-JWK + token_file (JSON met jwk_path) voor de token-flow."""
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from jwt.algorithms import RSAAlgorithm
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(RSAAlgorithm.to_jwk(key))
+    jwk["kid"] = "dcb-mock-loadtest"
+    jwk_path = tmp / "loadtest.jwk.json"
+    jwk_path.write_text(json.dumps(jwk), encoding="utf-8")
+    token_file = tmp / "access_token.txt"
+    token_file.write_text(json.dumps({"jwk_path": str(jwk_path)}), encoding="utf-8")
+    return token_file
+
+
+def loadtest(args: argparse.Namespace) -> int:
+    import requests
+    import cynit_log
+    import dcb_org_export
+    import dcb_snapshots
+
+    cynit_log.set_level("dcb_org_export", "DEBUG" if args.verbose else "INFO")
+
+    proc = None
+    base = args.base_url.rstrip("/")
+    if not base:
+        proc, base = _start_mock_process(args)
+        log(f"Mock-proces gestart op {base}")
+
+    tmp = Path(tempfile.mkdtemp(prefix="dcb_loadtest_"))
+    dcb_snapshots.DB_PATH = tmp / "snapshots.sqlite"
+    env = dcb_org_export.EnvConfig(
+        name="MOCK",
+        label="DCBaaS mock",
+        external_api_base=base,
+        access_token=None,
+        token_file=str(_make_credentials(tmp)),
+        auth_audience=f"{base}/op",
+        token_url=f"{base}/op/v1/token",
+        scope="dvl_dcbaas_org_certificate_admin_organization",
+    )
+    opts = dcb_org_export.FetchOptions(
+        workers=max(1, min(args.workers, dcb_org_export.MAX_WORKERS)),
+        retries=args.retries,
+        backoff_sec=args.backoff_sec,
+        max_backoff_sec=max(args.backoff_sec, 5.0),
+        timeout_sec=args.timeout_sec,
+        max_age_sec=args.max_age_sec,
+    )
+    orgs = [f"ORG{i:05d}" for i in range(args.orgs)]
+    tokens = dcb_org_export.get_token_manager(env)
+    reports = []
+
+    try:
+        for run in range(1, args.runs + 1):
+            before = requests.get(f"{base}/_mock/stats", timeout=5).json()
+            t0 = time.perf_counter()
+            token, err = tokens.get()
+            if err or not token:
+                log(f"Geen token van de mock: {err}")
+                return 1
+            latencies: List[float] = []
+            stats: Dict[str, int] = {}
+            if args.snapshots:
+                results, errors, stats = dcb_org_export.fetch_with_snapshots(
+                    env, orgs, token, options=opts, tokens=tokens, latencies=latencies,
+                )
+            else:
+                results, errors = dcb_org_export.fetch_certificates_for_orgs(
+                    env, orgs, token, options=opts, tokens=tokens, latencies=latencies,
+                )
+            fetch_sec = time.perf_counter() - t0
+            excel_sec = 0.0
+            excel_bytes = 0
+            if args.excel:
+                t1 = time.perf_counter()
+                excel_bytes = len(dcb_org_export.build_excel(results, errors))
+                excel_sec = time.perf_counter() - t1
+            after = requests.get(f"{base}/_mock/stats", timeout=5).json()
+
+            certs = sum(len(items) for items in results.values())
+            server = {
+                k: v - before["requests"].get(k, 0)
+                for k, v in after["requests"].items()
+                if v - before["requests"].get(k, 0) and not k.startswith("/_mock")
+            }
+            reports.append({
+                "run": run,
+                "orgs": len(orgs),
+                "certs": certs,
+                "errors": len(errors),
+                "workers": opts.workers,
+                "fetch_sec": round(fetch_sec, 3),
+                "orgs_per_sec": round(len(orgs) / fetch_sec, 1) if fetch_sec else 0.0,
+                "certs_per_sec": round(certs / fetch_sec, 1) if fetch_sec else 0.0,
+                "mb_received": round((after["bytes_sent"] - before["bytes_sent"]) / 1e6, 2),
+                "latency_ms": {
+                    "p50": round(_percentile(latencies, 0.50) * 1000, 1),
+                    "p95": round(_percentile(latencies, 0.95) * 1000, 1),
+                    "p99": round(_percentile(latencies, 0.99) * 1000, 1),
+                    "max": round(max(latencies, default=0.0) * 1000, 1),
+                },
+                "server_requests": server,
+                "snapshots": stats,
+                "excel_sec": round(excel_sec, 3),
+                "excel_bytes": excel_bytes,
+            })
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        for r in reports:
+            lat = r["latency_ms"]
+            print(
+                f"run {r['run']}: {r['orgs']} orgs / {r['certs']} certs in {r['fetch_sec']:.2f}s "
+                f"({r['workers']} workers) -> {r['orgs_per_sec']} orgs/s, {r['certs_per_sec']} certs/s, "
+                f"{r['mb_received']} MB, fouten={r['errors']}"
+            )
+            if lat["max"]:
+                print(f"       latency per org: p50={lat['p50']} ms p95={lat['p95']} ms "
+                      f"p99={lat['p99']} ms max={lat['max']} ms")
+            print("       server: " + (", ".join(f"{k}: {v}" for k, v in r["server_requests"].items()) or "-"))
+            if r["snapshots"]:
+                print("       snapshots: " + ", ".join(f"{k}={v}" for k, v in r["snapshots"].items()))
+            if r["excel_bytes"]:
+                print(f"       excel: {r['excel_bytes'] / 1e6:.2f} MB in {r['excel_sec']:.2f}s")
+    return 1 if any(r["errors"] for r in reports) and args.strict else 0
+
+
+# ------------------------------------------------------------
+#  CLI
+# ------------------------------------------------------------
+
+def _add_mock_arguments(p: argparse.ArgumentParser) -> None:
+    d = MockOptions()
+    p.add_argument("--latency-ms", type=float, default=d.latency_ms, help="gemiddelde latency per request")
+    p.add_argument("--jitter-ms", type=float, default=d.jitter_ms, help="+/- spreiding rond de latency")
+    p.add_argument("--error-rate", type=float, default=d.error_rate, help="kans op 503 per search")
+    p.add_argument("--throttle-rate", type=float, default=d.throttle_rate, help="kans op 429 per search")
+    p.add_argument("--retry-after-sec", type=int, default=d.retry_after_sec, help="Retry-After bij 429")
+    p.add_argument("--unauthorized-rate", type=float, default=d.unauthorized_rate, help="kans op 401")
+    p.add_argument("--certs", type=int, default=d.certs_per_org, help="gemiddeld aantal certs per org")
+    p.add_argument("--certs-spread", type=float, default=d.certs_spread, help="spreiding (fractie) per org")
+    p.add_argument("--pad-bytes", type=int, default=d.pad_bytes, help="extra bytes per rij")
+    p.add_argument("--churn", type=float, default=d.churn, help="kans per cert op wijziging per search")
+    p.add_argument("--token-ttl-sec", type=int, default=d.token_ttl_sec, help="levensduur access tokens")
+    p.add_argument("--issue-delay-sec", type=float, default=d.issue_delay_sec,
+                   help="tijd tussen CSR-aanvraag en uitgereikt certificaat")
+    p.add_argument("--seed", type=int, default=d.seed)
+
+
+def _mock_options(args: argparse.Namespace) -> MockOptions:
+    return MockOptions(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after_sec=args.retry_after_sec,
+        unauthorized_rate=args.unauthorized_rate,
+        certs_per_org=args.certs,
+        certs_spread=args.certs_spread,
+        pad_bytes=args.pad_bytes,
+        churn=args.churn,
+        token_ttl_sec=args.token_ttl_sec,
+        issue_delay_sec=args.issue_delay_sec,
+        no_auth=getattr(args, "no_auth", False),
+        seed=args.seed,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="DCBaaS mock API en load-test")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_serve = sub.add_parser("serve", help="mock-server starten")
+    p_serve.add_argument("--host", default="127.0.0.1")
+    p_serve.add_argument("--port", type=int, default=8765, help="0 = vrije poort")
+    p_serve.add_argument("--port-file", default="", help="gekozen poort naar dit bestand schrijven")
+    p_serve.add_argument("--no-auth", action="store_true", help="elk Authorization-header aanvaarden")
+    _add_mock_arguments(p_serve)
+
+    p_load = sub.add_parser("loadtest", help="org-export tegen de mock meten")
+    p_load.add_argument("--orgs", type=int, default=100, help="aantal organisaties (N)")
+    p_load.add_argument("--workers", type=int, default=8)
+    p_load.add_argument("--retries", type=int, default=3)
+    p_load.add_argument("--backoff-sec", type=float, default=0.2)
+    p_load.add_argument("--timeout-sec", type=float, default=30.0)
+    p_load.add_argument("--runs", type=int, default=1, help="aantal runs na elkaar")
+    p_load.add_argument("--snapshots", action="store_true", help="via fetch_with_snapshots (store + versheid)")
+    p_load.add_argument("--max-age-sec", type=float, default=900.0, help="versheidsvenster met --snapshots")
+    p_load.add_argument("--excel", action="store_true", help="ook build_excel meten")
+    p_load.add_argument("--base-url", default="", help="bestaande mock gebruiken i.p.v. er een te starten")
+    p_load.add_argument("--json", action="store_true", help="rapport als JSON")
+    p_load.add_argument("--strict", action="store_true", help="exit 1 als er orgs mislukten")
+    p_load.add_argument("--verbose", action="store_true", help="debug-output van dcb_org_export")
+    _add_mock_arguments(p_load)
+
+    args = parser.parse_args(argv)
+    if args.cmd == "serve":
+        return serve(args.host, args.port, _mock_options(args), port_file=args.port_file)
+    return loadtest(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
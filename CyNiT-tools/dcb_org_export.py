@@ -8,8 +8,19 @@ CyNiT Tools module:
 - Kan een client_assertion JWT genereren op basis van JWK (zoals JWT2JWK)
 - Kan via client_credentials + client_assertion een nieuw access_token
   opvragen bij authenticatie(-ti).vlaanderen.be /op/v1/token
-- Roept /certificate/search aan per organisatie-code
-- Bouwt een Excel met alle toepassingen + certificaten
+- Houdt per omgeving het access token met zijn vervaltijd in het geheugen
+  bij (TokenManager): refresh op de achtergrond vóór het vervalt, één retry
+  na een 401; JWK (cynit_signing) en client_assertion worden gecachet
+- Roept /certificate/search aan per organisatie-code (parallel, begrensde
+  pool, gedeelde keep-alive Session, retry met backoff op 429/5xx); de
+  body wordt gestreamd en per item geparst (cynit_jsonstream)
+- Bewaart resultaten als snapshots (dcb_snapshots): binnen het
+  versheidsvenster komen preview/export uit de store en worden enkel
+  verouderde orgs opnieuw opgehaald; diff-view toont wat er wijzigde
+- Bouwt een Excel met alle toepassingen + certificaten (als achtergrond-job
+  via cynit_jobs: voortgang per org, download achteraf)
+- Logt via cynit_log (queue + listener-thread, roterend logbestand); level
+  en bestand komen uit het blok "logging" in dcbaas_api.json
 
 Integratie in ctools.py:
     import dcb_org_export
@@ -18,34 +29,63 @@ Integratie in ctools.py:
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from pathlib import Path
-from io import BytesIO
 import os
 import json
+import random
+import threading
 import time
 import datetime as dt
 
 import requests
+from requests.adapters import HTTPAdapter
 import jwt
-from jwt.algorithms import RSAAlgorithm
-from flask import Flask, request, render_template_string, send_file
+from flask import Flask, abort, jsonify, redirect, request, send_file
 
 import cynit_theme
+import cynit_config
+import cynit_jobs
+import cynit_jsonstream
 import cynit_layout
-from openpyxl import Workbook
-from openpyxl.utils import get_column_letter
+import cynit_log
+import cynit_metrics
+import cynit_signing
+import cynit_xlsx
+import dcb_snapshots
 
 
-# ---------------- DEBUG ----------------
+# ---------------- LOGGING ----------------
 
-DEBUG = True  # zet op False als je minder console output wil
+DEBUG = True  # default-level als dcbaas_api.json geen "logging"-blok heeft
 
+LOG = cynit_log.get_logger(
+    "dcb_org_export",
+    tag="DCBAAS ORG EXPORT",
+    options=cynit_log.LogOptions(level="DEBUG" if DEBUG else "INFO"),
+)
 
-def log_debug(msg: str) -> None:
-    if DEBUG:
-        print(f"[DCBAAS ORG EXPORT] {msg}")
+
+def log_debug(msg: str, *args: Any) -> None:
+    """
+    Debug-regel via de log-queue (blokkeert niet). Geef waarden als
+    %-argumenten mee: onder level DEBUG wordt het bericht nooit opgebouwd.
+    """
+    LOG.debug(msg, *args)
+
+
+API_CALLS = cynit_metrics.counter(
+    "cynit_tools_dcbaas_api_calls_total",
+    "Aantal HTTP-calls van de DCBaaS org-export, per omgeving/endpoint/status.",
+    ["env", "endpoint", "status"],
+)
+API_SECONDS = cynit_metrics.histogram(
+    "cynit_tools_dcbaas_api_call_duration_seconds",
+    "Duur van HTTP-calls van de DCBaaS org-export (seconden).",
+    ["endpoint"],
+)
 
 
 # Basis paden
@@ -70,6 +110,22 @@ class EnvConfig:
     scope: Optional[str]
 
 
+@dataclass
+class FetchOptions:
+    """Tuning van /certificate/search (blok "fetch" in dcbaas_api.json)."""
+    workers: int = 8              # gelijktijdige requests
+    retries: int = 3              # extra pogingen per org bij 429/5xx/netwerkfout
+    backoff_sec: float = 1.0      # basis voor exponentiële backoff (1s, 2s, 4s, ...)
+    max_backoff_sec: float = 30.0
+    timeout_sec: float = 30.0
+    max_age_sec: float = 900.0    # versheidsvenster snapshots (0 = altijd ophalen)
+
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+STREAM_CHUNK_SIZE = 64 * 1024
+MAX_WORKERS = 32
+
+
 def _write_skeleton_dcbaas_api() -> None:
     """
     Maak een skeleton dcbaas_api.json aan als hij nog niet bestaat.
@@ -77,6 +133,21 @@ def _write_skeleton_dcbaas_api() -> None:
     """
     skeleton = {
         "default_env": "TI",
+        "fetch": {
+            "workers": 8,
+            "retries": 3,
+            "backoff_sec": 1.0,
+            "max_backoff_sec": 30.0,
+            "timeout_sec": 30,
+            "max_age_sec": 900
+        },
+        "logging": {
+            "level": "INFO",
+            "console": True,
+            "file": "dcb_org_export.log",
+            "max_bytes": 5 * 1024 * 1024,
+            "backups": 5
+        },
         "environments": {
             "DEV": {
                 "label": "DCBaaS DEV",
@@ -109,7 +180,7 @@ def _write_skeleton_dcbaas_api() -> None:
     }
     DCBAAS_API_CFG.parent.mkdir(parents=True, exist_ok=True)
     DCBAAS_API_CFG.write_text(json.dumps(skeleton, indent=2), encoding="utf-8")
-    log_debug(f"Skeleton dcbaas_api.json aangemaakt op {DCBAAS_API_CFG}")
+    log_debug("Skeleton dcbaas_api.json aangemaakt op %s", DCBAAS_API_CFG)
 
 
 def load_env_configs_from_dcbaas_api() -> Tuple[Dict[str, EnvConfig], Optional[str]]:
@@ -122,9 +193,9 @@ def load_env_configs_from_dcbaas_api() -> Tuple[Dict[str, EnvConfig], Optional[s
 
     try:
         raw = json.loads(DCBAAS_API_CFG.read_text(encoding="utf-8"))
-        log_debug(f"dcbaas_api.json geladen: keys={list(raw.keys())}")
+        log_debug("dcbaas_api.json geladen: keys=%s", list(raw.keys()))
     except Exception as exc:
-        log_debug(f"FOUT bij lezen dcbaas_api.json: {exc} – skeleton opnieuw schrijven.")
+        log_debug("FOUT bij lezen dcbaas_api.json: %s – skeleton opnieuw schrijven.", exc)
         _write_skeleton_dcbaas_api()
         raw = json.loads(DCBAAS_API_CFG.read_text(encoding="utf-8"))
 
@@ -146,16 +217,16 @@ def load_env_configs_from_dcbaas_api() -> Tuple[Dict[str, EnvConfig], Optional[s
         )
         envs[env_key] = env_cfg
         log_debug(
-            f"ENV geladen: {env_key} → base={env_cfg.external_api_base!r}, "
-            f"token_file={env_cfg.token_file!r}, aud={env_cfg.auth_audience!r}, "
-            f"token_url={env_cfg.token_url!r}, scope={env_cfg.scope!r}"
+            "ENV geladen: %s → base=%r, token_file=%r, aud=%r, token_url=%r, scope=%r",
+            env_key, env_cfg.external_api_base, env_cfg.token_file, env_cfg.auth_audience,
+            env_cfg.token_url, env_cfg.scope,
         )
 
     default_env = raw.get("default_env")
     if not isinstance(default_env, str):
         default_env = None
     else:
-        log_debug(f"default_env in config: {default_env}")
+        log_debug("default_env in config: %s", default_env)
 
     if not envs:
         log_debug("Geen environments gevonden in dcbaas_api.json – dummy DEV aangemaakt.")
@@ -173,6 +244,49 @@ def load_env_configs_from_dcbaas_api() -> Tuple[Dict[str, EnvConfig], Optional[s
     return envs, default_env
 
 
+def load_fetch_options() -> FetchOptions:
+    """
+    Leest het optionele "fetch"-blok uit dcbaas_api.json. Ontbrekende of
+    ongeldige waarden vallen terug op de defaults van FetchOptions.
+    """
+    opts = FetchOptions()
+    try:
+        raw = json.loads(DCBAAS_API_CFG.read_text(encoding="utf-8")).get("fetch") or {}
+    except Exception:
+        raw = {}
+    if not isinstance(raw, dict):
+        return opts
+
+    for name, cast in (("workers", int), ("retries", int), ("backoff_sec", float),
+                       ("max_backoff_sec", float), ("timeout_sec", float), ("max_age_sec", float)):
+        if name in raw:
+            try:
+                setattr(opts, name, cast(raw[name]))
+            except (TypeError, ValueError):
+                log_debug("dcbaas_api.json fetch.%s=%r ongeldig – default gebruikt.", name, raw[name])
+    opts.workers = max(1, min(opts.workers, MAX_WORKERS))
+    opts.retries = max(0, opts.retries)
+    log_debug("Fetch-opties: %s", opts)
+    return opts
+
+
+def load_log_options() -> cynit_log.LogOptions:
+    """
+    Leest het optionele "logging"-blok uit dcbaas_api.json:
+      level (DEBUG/INFO/WARNING/ERROR/OFF), console, file (relatief t.o.v.
+      runtime/logs), max_bytes en backups voor de rotatie.
+    """
+    try:
+        raw = json.loads(DCBAAS_API_CFG.read_text(encoding="utf-8")).get("logging")
+    except Exception:
+        raw = None
+    return cynit_log.LogOptions.from_dict(raw, level="DEBUG" if DEBUG else "INFO")
+
+
+def apply_log_options() -> None:
+    cynit_log.configure("dcb_org_export", load_log_options())
+
+
 # ------------------------------------------------------------
 #  Token / auth file helpers
 # ------------------------------------------------------------
@@ -191,30 +305,28 @@ def load_auth_file_data(token_file: str | None) -> Dict[str, Any]:
 
     p = Path(token_file)
     if not p.exists():
-        log_debug(f"Token file bestaat niet: {p}")
+        log_debug("Token file bestaat niet: %s", p)
         return data
 
     try:
         raw = p.read_text(encoding="utf-8").strip()
     except Exception as exc:
-        log_debug(f"FOUT bij lezen token file {p}: {exc}")
+        log_debug("FOUT bij lezen token file %s: %s", p, exc)
         return data
 
     if not raw:
-        log_debug(f"Token file {p} is leeg.")
+        log_debug("Token file %s is leeg.", p)
         return data
 
     # Eerst proberen als JSON
     try:
         parsed = json.loads(raw)
         if isinstance(parsed, dict):
-            log_debug(
-                f"Token file {p} bevat JSON met keys={list(parsed.keys())}"
-            )
+            log_debug("Token file %s bevat JSON met keys=%s", p, list(parsed.keys()))
             return parsed
     except Exception:
         # Niet-JSON, beschouwen als plain token
-        log_debug(f"Token file {p} bevat geen geldige JSON – behandeld als plain token.")
+        log_debug("Token file %s bevat geen geldige JSON – behandeld als plain token.", p)
         data["access_token"] = raw
         return data
 
@@ -231,9 +343,9 @@ def save_auth_file_data(token_file: str | None, data: Dict[str, Any]) -> None:
     try:
         p.parent.mkdir(parents=True, exist_ok=True)
         p.write_text(json.dumps(data, indent=2), encoding="utf-8")
-        log_debug(f"Auth data opgeslagen in {p}")
+        log_debug("Auth data opgeslagen in %s", p)
     except Exception as exc:
-        log_debug(f"FOUT bij schrijven auth file {p}: {exc}")
+        log_debug("FOUT bij schrijven auth file %s: %s", p, exc)
 
 
 def load_token_from_file(token_file: str | None) -> str:
@@ -243,9 +355,7 @@ def load_token_from_file(token_file: str | None) -> str:
     data = load_auth_file_data(token_file)
     tok = data.get("access_token")
     if isinstance(tok, str) and tok.strip():
-        log_debug(
-            f"Access token geladen uit token_file (lengte={len(tok.strip())})"
-        )
+        log_debug("Access token geladen uit token_file (lengte=%d)", len(tok.strip()))
         return tok.strip()
     return ""
 
@@ -262,31 +372,28 @@ def load_default_token_for_env(env: EnvConfig) -> str:
     env_specific = os.getenv(f"DCBAAS_TOKEN_{env.name.upper()}")
     if env_specific:
         log_debug(
-            f"Token gevonden via env var DCBAAS_TOKEN_{env.name.upper()} "
-            f"(lengte={len(env_specific)})"
+            "Token gevonden via env var DCBAAS_TOKEN_%s (lengte=%d)",
+            env.name.upper(), len(env_specific),
         )
         return env_specific.strip()
 
     generic = os.getenv("DCBAAS_TOKEN")
     if generic:
-        log_debug(f"Token gevonden via env var DCBAAS_TOKEN (lengte={len(generic)})")
+        log_debug("Token gevonden via env var DCBAAS_TOKEN (lengte=%d)", len(generic))
         return generic.strip()
 
     if env.access_token and env.access_token.strip():
         log_debug(
-            f"Token gevonden in dcbaas_api.json voor {env.name} "
-            f"(lengte={len(env.access_token.strip())})"
+            "Token gevonden in dcbaas_api.json voor %s (lengte=%d)",
+            env.name, len(env.access_token.strip()),
         )
         return env.access_token.strip()
 
     token_from_file = load_token_from_file(env.token_file)
     if token_from_file:
-        log_debug(
-            f"Token geladen uit token_file voor {env.name} "
-            f"(lengte={len(token_from_file)})"
-        )
+        log_debug("Token geladen uit token_file voor %s (lengte=%d)", env.name, len(token_from_file))
     else:
-        log_debug(f"Geen token gevonden voor {env.name} (env vars + config + file leeg).")
+        log_debug("Geen token gevonden voor %s (env vars + config + file leeg).", env.name)
 
     return token_from_file
 
@@ -302,13 +409,26 @@ def _default_audience_for_env(env_name: str) -> str:
     return "https://authenticatie.vlaanderen.be/op"
 
 
-def build_client_assertion_jwt(env: EnvConfig) -> Tuple[Optional[str], Optional[str]]:
+# Uitgegeven assertions per omgeving. De geparste JWK zelf zit in de
+# cynit_signing-cache (pad + mtime); een assertion is 10 minuten geldig en
+# wordt hergebruikt zolang er minstens ASSERTION_MIN_REMAINING_SEC over is.
+ASSERTION_LIFETIME_SEC = 10 * 60
+ASSERTION_MIN_REMAINING_SEC = 5 * 60
+_ASSERTION_CACHE: Dict[Tuple[str, str, float, str], Tuple[str, int]] = {}
+_JWT_LOCK = threading.Lock()
+
+
+def _client_assertion(env: EnvConfig, fresh: bool = False) -> Tuple[Optional[str], Optional[str], bool]:
     """
     Maakt een client_assertion JWT met:
       - JWK pad uit access_token.txt (key 'jwk_path')
       - iss/sub = kid uit JWK
       - aud = env.auth_audience (of fallback)
       - RS256, header.kid = kid
+
+    Zolang de vorige assertion voor deze omgeving/JWK nog lang genoeg geldig
+    is, wordt die teruggegeven (fresh=True forceert een nieuwe).
+    Geeft (jwt, fout, uit_cache).
     """
     data = load_auth_file_data(env.token_file)
     jwk_path = data.get("jwk_path")
@@ -318,60 +438,66 @@ def build_client_assertion_jwt(env: EnvConfig) -> Tuple[Optional[str], Optional[
             "Zorg dat access_token.txt JSON bevat met minstens 'jwk_path'."
         )
         log_debug(msg)
-        return None, msg
+        return None, msg, False
 
     p = Path(jwk_path)
     if not p.exists():
         msg = f"JWK-bestand niet gevonden voor omgeving {env.name}: {p}"
         log_debug(msg)
-        return None, msg
+        return None, msg, False
 
-    try:
-        jwk_dict = json.loads(p.read_text(encoding="utf-8"))
-    except Exception as exc:
-        msg = f"Kon JWK JSON niet lezen voor omgeving {env.name}: {exc}"
-        log_debug(msg)
-        return None, msg
+    aud = env.auth_audience or _default_audience_for_env(env.name)
 
-    kid = jwk_dict.get("kid")
-    if not kid:
-        msg = f"Geen 'kid' gevonden in JWK voor omgeving {env.name}."
-        log_debug(msg)
-        return None, msg
+    with _JWT_LOCK:
+        try:
+            signer = cynit_signing.signer_for(p, alg="RS256")
+            kid = signer.kid
+            if not kid:
+                raise ValueError("Geen 'kid' gevonden in JWK.")
+        except Exception as exc:
+            msg = f"Kon JWK niet laden voor omgeving {env.name}: {exc}"
+            log_debug(msg)
+            return None, msg, False
+
+        cache_key = (env.name, str(p), signer.signing_key.mtime, aud)
+        cached = _ASSERTION_CACHE.get(cache_key)
+        if cached and not fresh and cached[1] - time.time() >= ASSERTION_MIN_REMAINING_SEC:
+            log_debug("client_assertion uit cache voor env=%s (nog %ds geldig)", env.name, cached[1] - time.time())
+            return cached[0], None, True
+
+        log_debug("JWT audience voor env=%s: %s", env.name, aud)
+
+        # kleine negatieve skew om 'iat in the future' te vermijden
+        now = int(time.time()) - 10
+        exp = now + ASSERTION_LIFETIME_SEC
+
+        payload = {
+            "iss": kid,
+            "sub": kid,
+            "iat": now,
+            "exp": exp,
+            "aud": aud,
+        }
+        log_debug("JWT payload voor env=%s: %s", env.name, payload)
 
-    aud = env.auth_audience or _default_audience_for_env(env.name)
-    log_debug(f"JWT audience voor env={env.name}: {aud}")
-
-    # kleine negatieve skew om 'iat in the future' te vermijden
-    now = int(time.time()) - 10
-    exp = now + 10 * 60  # 10 minuten geldig
-
-    payload = {
-        "iss": kid,
-        "sub": kid,
-        "iat": now,
-        "exp": exp,
-        "aud": aud,
-    }
-    log_debug(f"JWT payload voor env={env.name}: {payload}")
+        try:
+            log_debug("JWT headers voor env=%s: %s", env.name, signer.headers)
 
-    try:
-        jwk_json = json.dumps(jwk_dict)
-        key = RSAAlgorithm.from_jwk(jwk_json)
+            token = signer.sign(payload)
+            log_debug("JWT succesvol gegenereerd voor env=%s (lengte=%s)", env.name, len(token))
+        except Exception as exc:
+            msg = f"Fout bij JWT genereren voor omgeving {env.name}: {exc}"
+            log_debug(msg)
+            return None, msg, False
 
-        headers = {"typ": "JWT", "alg": "RS256", "kid": kid}
-        log_debug(f"JWT headers voor env={env.name}: {headers}")
+        _ASSERTION_CACHE[cache_key] = (token, exp)
+        return token, None, False
 
-        token = jwt.encode(payload, key, algorithm="RS256", headers=headers)
-        log_debug(
-            f"JWT succesvol gegenereerd voor env={env.name} "
-            f"(lengte={len(token) if isinstance(token, str) else 'n/a'})"
-        )
-        return token, None
-    except Exception as exc:
-        msg = f"Fout bij JWT genereren voor omgeving {env.name}: {exc}"
-        log_debug(msg)
-        return None, msg
+
+def build_client_assertion_jwt(env: EnvConfig, fresh: bool = False) -> Tuple[Optional[str], Optional[str]]:
+    """(jwt, fout); zie _client_assertion."""
+    token, err, _ = _client_assertion(env, fresh=fresh)
+    return token, err
 
 
 # ------------------------------------------------------------
@@ -385,10 +511,25 @@ def _default_token_url_for_env(env_name: str) -> str:
     return "https://authenticatie.vlaanderen.be/op/v1/token"
 
 
-def request_access_token_for_env(env: EnvConfig) -> Tuple[Optional[str], Optional[str]]:
+ASSERTION_ERRORS = {"invalid_client", "invalid_grant"}     # OAuth-fouten voor een geweigerde assertion
+
+
+def _assertion_rejected(resp: requests.Response) -> bool:
+    """400/401 van de token endpoint omdat de client_assertion geweigerd of vervallen is."""
+    if resp.status_code not in (400, 401):
+        return False
+    try:
+        error = resp.json().get("error")
+    except (ValueError, AttributeError):
+        return False
+    return error in ASSERTION_ERRORS
+
+
+def _request_token(env: EnvConfig, fresh_assertion: bool = False) -> Tuple[Optional[str], Optional[float], Optional[str]]:
     """
     Vraagt een nieuw access_token op bij authenticatie(-ti).vlaanderen.be
     via client_credentials + client_assertion (JWT + JWK).
+    Geeft (token, expires_at_epoch of None, fout).
 
     Formaat volgens documentatie:
       POST /op/v1/token
@@ -399,9 +540,9 @@ def request_access_token_for_env(env: EnvConfig) -> Tuple[Optional[str], Optiona
       client_assertion_type=urn:ietf:params:oauth:client-assertion-type:jwt-bearer
       client_assertion=<JWT>
     """
-    jwt_token, err = build_client_assertion_jwt(env)
+    jwt_token, err, reused = _client_assertion(env, fresh=fresh_assertion)
     if err or not jwt_token:
-        return None, err or "Onbekende fout bij JWT genereren."
+        return None, None, err or "Onbekende fout bij JWT genereren."
 
     token_url = env.token_url or _default_token_url_for_env(env.name)
     scope = env.scope or ""
@@ -420,24 +561,32 @@ def request_access_token_for_env(env: EnvConfig) -> Tuple[Optional[str], Optiona
     }
 
     log_debug(
-        f"POST naar token endpoint {token_url} voor env={env.name}, "
-        f"scope_len={len(scope)}, jwt_len={len(jwt_token)}"
+        "POST naar token endpoint %s voor env=%s, scope_len=%d, jwt_len=%d",
+        token_url, env.name, len(scope), len(jwt_token),
     )
 
     try:
-        resp = requests.post(
-            token_url,
-            data=data,
-            timeout=30,
-        )
+        with API_SECONDS.time(endpoint="token"):
+            resp = get_session().post(
+                token_url,
+                data=data,
+                timeout=30,
+            )
     except Exception as exc:
+        API_CALLS.inc(env=env.name, endpoint="token", status="error")
         msg = f"HTTP-fout bij token endpoint voor env {env.name}: {exc}"
         log_debug(msg)
-        return None, msg
+        return None, None, msg
+    API_CALLS.inc(env=env.name, endpoint="token", status=str(resp.status_code))
 
-    log_debug(
-        f"Token endpoint antwoord status={resp.status_code}, body_len={len(resp.text)}"
-    )
+    log_debug("Token endpoint antwoord status=%s, body_len=%d", resp.status_code, len(resp.content))
+
+    if reused and not fresh_assertion and _assertion_rejected(resp):
+        # Een hergebruikte assertion kan geweigerd worden (replay-check, net
+        # vervallen): één keer opnieuw met een vers gemaakte. Een verse
+        # assertion of een andere fout (scope, ...) wordt niet herhaald.
+        log_debug("Token endpoint weigerde gecachte assertion (%s) – nieuwe assertion.", resp.status_code)
+        return _request_token(env, fresh_assertion=True)
 
     if resp.status_code != 200:
         short = resp.text
@@ -445,14 +594,14 @@ def request_access_token_for_env(env: EnvConfig) -> Tuple[Optional[str], Optiona
             short = short[:300] + "..."
         msg = f"Token endpoint gaf status {resp.status_code} voor env {env.name}: {short}"
         log_debug(msg)
-        return None, msg
+        return None, None, msg
 
     try:
         data_json = resp.json()
     except Exception as exc:
         msg = f"Kon JSON niet parsen van token endpoint voor env {env.name}: {exc}"
         log_debug(msg)
-        return None, msg
+        return None, None, msg
 
     access_token = data_json.get("access_token")
     token_type = data_json.get("token_type", "Bearer")
@@ -462,20 +611,233 @@ def request_access_token_for_env(env: EnvConfig) -> Tuple[Optional[str], Optiona
             f"JSON: {data_json}"
         )
         log_debug(msg)
-        return None, msg
+        return None, None, msg
 
     full_token = f"{token_type} {access_token}".strip()
+    expires_at = None
+    try:
+        expires_at = time.time() + float(data_json["expires_in"])
+    except (KeyError, TypeError, ValueError):
+        expires_at = _token_expiry(full_token)
     log_debug(
-        f"Nieuw access_token ontvangen voor env {env.name} "
-        f"(token_type={token_type}, lengte={len(full_token)})"
+        "Nieuw access_token ontvangen voor env %s (token_type=%s, lengte=%d, expires_in=%ss)",
+        env.name, token_type, len(full_token), int(expires_at - time.time()) if expires_at else "?",
     )
 
     # Opslaan in auth file JSON
     auth_data = load_auth_file_data(env.token_file)
     auth_data["access_token"] = full_token
+    if expires_at:
+        auth_data["expires_at"] = int(expires_at)
+    else:
+        auth_data.pop("expires_at", None)
     save_auth_file_data(env.token_file, auth_data)
 
-    return full_token, None
+    return full_token, expires_at, None
+
+
+def request_access_token_for_env(env: EnvConfig) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Haalt meteen een nieuw access_token op (knop 'get_token') en zet het in
+    de TokenManager van de omgeving, zodat alle volgende API-calls het gebruiken.
+    """
+    return get_token_manager(env).refresh()
+
+
+def _token_expiry(token: str, auth_data: Optional[Dict[str, Any]] = None) -> Optional[float]:
+    """
+    Vervaltijd (epoch) van een token: 'exp' als het een JWT is, anders
+    'expires_at' uit het token_file (indien dat bij dit token hoort), anders None.
+    """
+    raw = token.split(" ", 1)[1] if token.lower().startswith("bearer ") else token
+    try:
+        claims = jwt.decode(raw, options={"verify_signature": False})
+        if isinstance(claims.get("exp"), (int, float)):
+            return float(claims["exp"])
+    except Exception:
+        pass
+    if auth_data and auth_data.get("access_token") == token:
+        try:
+            return float(auth_data["expires_at"])
+        except (KeyError, TypeError, ValueError):
+            pass
+    return None
+
+
+# ------------------------------------------------------------
+#  Token lifecycle per omgeving
+# ------------------------------------------------------------
+
+REFRESH_MARGIN_SEC = 120        # minimaal zo lang voor 'exp' vernieuwen
+REFRESH_FRACTION = 0.1          # ... of 10% van de levensduur als dat meer is
+REFRESH_MAX_FRACTION = 0.5      # ... maar nooit meer dan de helft (kortlevende tokens)
+REFRESH_IDLE_SEC = 15 * 60      # geen achtergrond-refresh als het token zo lang ongebruikt bleef
+
+
+class Unauthorized(str):
+    """
+    Foutmelding voor een HTTP 401. Blijft een gewone str (Excel, JSON, logs),
+    maar callers herkennen een geweigerd token aan het type, niet aan "401"
+    ergens in de tekst (org-codes, request-id's, 5xx-bodies).
+    """
+
+
+class TokenManager:
+    """
+    Access token van één omgeving, in het geheugen met zijn vervaltijd.
+
+    - get()        : token dat nog minstens de refresh-marge geldig is; het
+                     eerste gebruik leest env vars / config / token_file één keer.
+                     Enkel als er niets bruikbaars is, wordt er synchroon vernieuwd.
+    - refresh()    : nieuw token via de token endpoint (single-flight: gelijktijdige
+                     aanvragers wachten op dezelfde refresh).
+    - invalidate() : na een 401; de volgende get() vernieuwt.
+
+    Na elke refresh met bekende levensduur plant een daemon-timer de volgende
+    refresh vóór de vervaltijd, zolang het token recent nog gebruikt werd.
+    API-calls wachten dus normaal nooit op een token-round-trip.
+    """
+
+    def __init__(self, env: EnvConfig):
+        self.env = env
+        self._lock = threading.Lock()               # toestand
+        self._refresh_lock = threading.Lock()       # één token-request tegelijk
+        self._token = ""
+        self._expires_at: Optional[float] = None
+        self._issued_at = 0.0
+        self._seeded = False
+        self._last_used = 0.0
+        self._timer: Optional[threading.Timer] = None
+
+    # --- status ---
+
+    def _usable(self, now: float) -> bool:
+        if not self._token:
+            return False
+        if self._expires_at is None:
+            return True                    # onbekend: bruikbaar tot een 401
+        return self._expires_at - now > self._margin()
+
+    def _margin(self) -> float:
+        lifetime = max(0.0, (self._expires_at or 0) - self._issued_at)
+        return min(max(REFRESH_MARGIN_SEC, lifetime * REFRESH_FRACTION), lifetime * REFRESH_MAX_FRACTION)
+
+    def _seed(self) -> None:
+        """Eénmalig het bestaande token oppikken (env var, config, token_file)."""
+        self._seeded = True
+        token = load_default_token_for_env(self.env)
+        if token:
+            self._token = token
+            self._expires_at = _token_expiry(token, load_auth_file_data(self.env.token_file))
+            self._issued_at = time.time()
+
+    def current(self) -> str:
+        """Huidig token zonder netwerk (voor het formulier); kan vervallen zijn."""
+        with self._lock:
+            if not self._seeded:
+                self._seed()
+            return self._token
+
+    def expires_in(self) -> Optional[int]:
+        with self._lock:
+            return int(self._expires_at - time.time()) if self._expires_at else None
+
+    # --- tokens ---
+
+    def get(self) -> Tuple[Optional[str], Optional[str]]:
+        with self._lock:
+            if not self._seeded:
+                self._seed()
+            self._last_used = time.time()
+            if self._usable(self._last_used):
+                return self._token, None
+        return self.refresh(stale=self._token)
+
+    def refresh(self, stale: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Nieuw token ophalen. Met 'stale' wordt niet vernieuwd als een andere
+        thread intussen al een ander (nieuwer) token heeft gezet.
+        """
+        with self._refresh_lock:
+            with self._lock:
+                if stale is not None and self._token and self._token != stale and self._usable(time.time()):
+                    return self._token, None
+            # Netwerk buiten _lock: get() blijft intussen het oude token geven.
+            token, expires_at, err = _request_token(self.env)
+            if err or not token:
+                return None, err or "Onbekende fout bij token aanvragen."
+            with self._lock:
+                self._token = token
+                self._expires_at = expires_at
+                self._issued_at = time.time()
+                self._seeded = True
+                self._schedule()
+            return token, None
+
+    def invalidate(self, token: str) -> None:
+        """Token werd geweigerd (401): niet meer teruggeven."""
+        with self._lock:
+            if self._token == token:
+                self._expires_at = time.time()
+
+    # --- proactieve refresh ---
+
+    def _schedule(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._expires_at is None:
+            return
+        delay = max(5.0, self._expires_at - self._margin() - time.time())
+        self._timer = threading.Timer(delay, self._background_refresh)
+        self._timer.daemon = True
+        self._timer.name = f"dcb-token-{self.env.name}"
+        self._timer.start()
+        log_debug("Volgende token-refresh voor env=%s over %ds", self.env.name, delay)
+
+    def _background_refresh(self) -> None:
+        lifetime = (self._expires_at or 0) - self._issued_at
+        if time.time() - self._last_used > max(lifetime, REFRESH_IDLE_SEC):
+            log_debug("Token voor env=%s niet meer gebruikt – geen achtergrond-refresh.", self.env.name)
+            return
+        _, err = self.refresh()
+        if err:
+            LOG.warning("Achtergrond-refresh voor env=%s mislukt: %s", self.env.name, err)
+
+    def call(self, fn):
+        """
+        fn(token) -> (resultaat, fout). Is de fout een Unauthorized (401):
+        token ongeldig verklaren, vernieuwen en één keer opnieuw.
+        """
+        token, err = self.get()
+        if err or not token:
+            return None, err
+        result, call_err = fn(token)
+        if isinstance(call_err, Unauthorized):
+            self.invalidate(token)
+            token, err = self.refresh(stale=token)
+            if err or not token:
+                return result, call_err
+            result, call_err = fn(token)
+        return result, call_err
+
+
+_TOKEN_MANAGERS: Dict[str, TokenManager] = {}
+_TOKEN_MANAGERS_LOCK = threading.Lock()
+
+
+def get_token_manager(env: EnvConfig) -> TokenManager:
+    """
+    Eén TokenManager per omgeving (per proces). Wijzigt de config van de
+    omgeving (dcbaas_api.json herladen), dan begint een nieuwe manager.
+    """
+    with _TOKEN_MANAGERS_LOCK:
+        manager = _TOKEN_MANAGERS.get(env.name)
+        if manager is None or manager.env != env:
+            if manager is not None and manager._timer is not None:
+                manager._timer.cancel()
+            manager = _TOKEN_MANAGERS[env.name] = TokenManager(env)
+        return manager
 
 
 # ------------------------------------------------------------
@@ -489,22 +851,82 @@ def build_certificate_search_body(org_code: str) -> Dict[str, Any]:
     body = {
         "organization_code": org_code
     }
-    log_debug(f"Request body voor org={org_code}: {body}")
+    log_debug("Request body voor org=%s: %s", org_code, body)
     return body
 
 
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Gedeelde keep-alive Session voor alle API-calls: TLS-handshake en
+    TCP-connect gebeuren één keer per connectie in de pool i.p.v. per org.
+    Connection pool groot genoeg voor MAX_WORKERS threads.
+    """
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=MAX_WORKERS)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _SESSION = session
+        return _SESSION
+
+
+def _body_snippet(resp: requests.Response, limit: int = 300) -> str:
+    """
+    Begin van een (fout)body, zonder de volledige body in te lezen. Een
+    korte body wordt helemaal gelezen, zodat de connectie herbruikbaar blijft.
+    """
+    data = b""
+    try:
+        for chunk in resp.iter_content(1024):
+            data += chunk
+            if len(data) > limit:
+                break
+    except requests.RequestException:
+        pass
+    finally:
+        resp.close()
+    text = data[:limit].decode(resp.encoding or "utf-8", errors="replace")
+    return text + "..." if len(data) > limit else text
+
+
+def _retry_delay(resp: Optional[requests.Response], attempt: int, opts: FetchOptions) -> float:
+    """Retry-After (seconden) als de server die meegeeft, anders exponentieel met jitter."""
+    if resp is not None:
+        retry_after = resp.headers.get("Retry-After", "")
+        if retry_after.strip().isdigit():
+            return min(float(retry_after), opts.max_backoff_sec)
+    delay = opts.backoff_sec * (2 ** attempt)
+    return min(delay, opts.max_backoff_sec) * random.uniform(0.8, 1.2)
+
+
 def fetch_certificates_for_org(
     env: EnvConfig,
     org_code: str,
     access_token: str,
-    timeout: int = 30,
+    timeout: Optional[float] = None,
+    options: Optional[FetchOptions] = None,
 ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
     """
     Roept /certificate/search aan voor één organisatie-code.
 
     access_token = exacte string die in de Authorization-header moet,
     bv. 'Bearer eyJ...'.
+
+    Bij 429, 5xx of een netwerkfout wordt tot options.retries keer opnieuw
+    geprobeerd (exponentiële backoff, Retry-After wordt gerespecteerd).
+    401 en andere 4xx worden niet herhaald; een 401 geeft als fout een
+    Unauthorized terug.
     """
+    opts = options or FetchOptions()
+    if timeout is None:
+        timeout = opts.timeout_sec
+
     if not env.external_api_base:
         msg = (f"Base URL voor omgeving {env.name} is nog niet ingevuld in dcbaas_api.json. "
                f"(env.external_api_base is leeg)")
@@ -514,10 +936,9 @@ def fetch_certificates_for_org(
     url = env.external_api_base.rstrip("/") + "/certificate/search"
     body = build_certificate_search_body(org_code)
 
-    token_len = len(access_token.strip()) if access_token else 0
     log_debug(
-        f"POST naar {url} voor org={org_code}, env={env.name}, "
-        f"token_len={token_len}"
+        "POST naar %s voor org=%s, env=%s, token_len=%d",
+        url, org_code, env.name, len(access_token.strip()) if access_token else 0,
     )
 
     headers = {
@@ -526,71 +947,285 @@ def fetch_certificates_for_org(
         "Authorization": access_token.strip(),
     }
 
-    try:
-        resp = requests.post(url, json=body, headers=headers, timeout=timeout)
-    except Exception as exc:
-        msg = f"HTTP-fout voor org {org_code} in env {env.name}: {exc}"
-        log_debug(msg)
-        return [], msg
+    session = get_session()
+    resp: Optional[requests.Response] = None
+    items: List[Dict[str, Any]] = []
+    for attempt in range(opts.retries + 1):
+        t0 = time.perf_counter()
+        try:
+            with API_SECONDS.time(endpoint="certificate_search"):
+                resp = session.post(url, json=body, headers=headers, timeout=timeout, stream=True)
+        except (requests.ConnectionError, requests.Timeout) as exc:
+            API_CALLS.inc(env=env.name, endpoint="certificate_search", status="error")
+            if attempt < opts.retries:
+                delay = _retry_delay(None, attempt, opts)
+                log_debug(
+                    "org=%s: netwerkfout na %d ms (%s) – poging %d/%d over %.1fs",
+                    org_code, (time.perf_counter() - t0) * 1000, exc, attempt + 2, opts.retries + 1, delay,
+                )
+                time.sleep(delay)
+                continue
+            msg = f"HTTP-fout voor org {org_code} in env {env.name}: {exc}"
+            log_debug(msg)
+            return [], msg
+        except Exception as exc:
+            API_CALLS.inc(env=env.name, endpoint="certificate_search", status="error")
+            msg = f"HTTP-fout voor org {org_code} in env {env.name}: {exc}"
+            log_debug(msg)
+            return [], msg
 
-    log_debug(
-        f"Antwoord van {url} status={resp.status_code}, "
-        f"body_len={len(resp.text)}"
-    )
+        API_CALLS.inc(env=env.name, endpoint="certificate_search", status=str(resp.status_code))
 
-    if resp.status_code == 401:
-        msg = (
-            f"401 Unauthorized voor omgeving {env.name} (org={org_code}). "
-            "Waarschijnlijk is je access token ongeldig, verlopen of ontbreekt "
-            "de 'Bearer ' prefix."
+        if resp.status_code in RETRY_STATUSES and attempt < opts.retries:
+            _body_snippet(resp)                 # korte body leeglezen: connectie terug in de pool
+            delay = _retry_delay(resp, attempt, opts)
+            log_debug(
+                "org=%s: status %s na %d ms – poging %d/%d over %.1fs",
+                org_code, resp.status_code, (time.perf_counter() - t0) * 1000, attempt + 2, opts.retries + 1, delay,
+            )
+            time.sleep(delay)
+            continue
+
+        if resp.status_code != 200:
+            short = _body_snippet(resp)
+            log_debug(
+                "Antwoord van %s org=%s status=%s, content_length=%s",
+                url, org_code, resp.status_code, resp.headers.get("Content-Length", "?"),
+            )
+            if resp.status_code == 401:
+                msg = Unauthorized(
+                    f"401 Unauthorized voor omgeving {env.name} (org={org_code}). "
+                    "Waarschijnlijk is je access token ongeldig, verlopen of ontbreekt "
+                    "de 'Bearer ' prefix."
+                )
+                log_debug("DETAIL 401-respons: %s", short)
+                return [], msg
+            msg = (f"Status {resp.status_code} bij {url} voor org={org_code}: {short}")
+            log_debug(msg)
+            return [], msg
+
+        # Body rechtstreeks van de socket parsen: geen resp.text/resp.content,
+        # enkel de items zelf blijven in het geheugen.
+        counter = cynit_jsonstream.ByteCounter(resp.iter_content(STREAM_CHUNK_SIZE))
+        try:
+            items = list(cynit_jsonstream.iter_array(counter, key="response"))
+        except (requests.ConnectionError, requests.Timeout,
+                requests.exceptions.ChunkedEncodingError) as exc:
+            API_CALLS.inc(env=env.name, endpoint="certificate_search", status="error")
+            if attempt < opts.retries:
+                delay = _retry_delay(None, attempt, opts)
+                log_debug(
+                    "org=%s: verbinding onderbroken na %d bytes (%s) – poging %d/%d over %.1fs",
+                    org_code, counter.bytes, exc, attempt + 2, opts.retries + 1, delay,
+                )
+                time.sleep(delay)
+                continue
+            msg = f"HTTP-fout voor org {org_code} in env {env.name}: {exc}"
+            log_debug(msg)
+            return [], msg
+        except ValueError as exc:
+            msg = f"Onverwacht antwoord voor org {org_code} (env {env.name}): {exc}"
+            log_debug(msg)
+            return [], msg
+        finally:
+            resp.close()
+
+        log_debug(
+            "Antwoord van %s org=%s status=200, body_bytes=%d, latency=%d ms, poging %d",
+            url, org_code, counter.bytes, (time.perf_counter() - t0) * 1000, attempt + 1,
         )
-        log_debug(f"DETAIL 401-respons: {resp.text}")
-        return [], msg
+        break
 
-    if resp.status_code != 200:
-        short = resp.text
-        if len(short) > 300:
-            short = short[:300] + "..."
-        msg = (f"Status {resp.status_code} bij {url} voor org={org_code}: {short}")
-        log_debug(msg)
-        return [], msg
+    log_debug("Succesvol %d certificaten ontvangen voor org %s in env %s.", len(items), org_code, env.name)
+    return items, None
 
-    try:
-        data = resp.json()
-    except Exception as exc:
-        msg = f"Kon JSON niet parsen voor org {org_code} (env {env.name}): {exc}"
-        log_debug(msg)
-        return [], msg
 
-    items = data.get("response")
-    if not isinstance(items, list):
-        if isinstance(data, list):
-            items = data
+def fetch_certificates_for_orgs(
+    env: EnvConfig,
+    org_codes: List[str],
+    access_token: str,
+    options: Optional[FetchOptions] = None,
+    tokens: Optional[TokenManager] = None,
+    progress: Optional[Callable[[str, List[Dict[str, Any]], Optional[str]], None]] = None,
+    latencies: Optional[List[float]] = None,
+) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, str]]:
+    """
+    /certificate/search voor veel organisaties tegelijk (max. options.workers
+    threads, gedeelde Session).
+
+    Geeft (results_by_org, errors_by_org). results_by_org bevat elke org in
+    de input-volgorde (lege lijst bij een fout), zodat een export met
+    gedeeltelijke resultaten mogelijk blijft.
+
+    Met 'tokens' worden orgs die 401 kregen één keer opnieuw gevraagd met
+    een vernieuwd token.
+
+    progress(org, items, fout) wordt per org opgeroepen zodra die definitief
+    klaar is (vanuit de worker-threads, in willekeurige volgorde).
+
+    Met 'latencies' komt de duur per org (seconden, incl. retries) in die
+    lijst terecht (bv. voor dcb_mock.py loadtest).
+    """
+    opts = options or load_fetch_options()
+    codes = list(dict.fromkeys(org_codes))          # dubbels weg, volgorde behouden
+    results: Dict[str, List[Dict[str, Any]]] = {}
+    errors: Dict[str, str] = {}
+    if not codes:
+        return results, errors
+
+    if latencies is None:
+        latencies = []
+
+    def one(org: str, final: bool = False) -> Tuple[str, List[Dict[str, Any]], Optional[str]]:
+        t0 = time.perf_counter()
+        items, err = fetch_certificates_for_org(env, org, access_token, options=opts)
+        latencies.append(time.perf_counter() - t0)
+        retry_later = tokens is not None and not final and isinstance(err, Unauthorized)
+        if progress is not None and not retry_later:
+            progress(org, items, err)
+        return org, items, err
+
+    workers = max(1, min(opts.workers, len(codes)))
+    t_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dcb-fetch") as pool:
+        for org, items, err in pool.map(one, codes):
+            results[org] = items
+            if err:
+                errors[org] = err
+
+    unauthorized = [org for org, err in errors.items() if isinstance(err, Unauthorized)]
+    if tokens is not None and unauthorized:
+        tokens.invalidate(access_token)
+        new_token, token_err = tokens.refresh(stale=access_token)
+        if new_token:
+            log_debug("401 voor %d orgs – opnieuw met vernieuwd token.", len(unauthorized))
+            access_token = new_token
+            for org in unauthorized:
+                errors.pop(org)
+            with ThreadPoolExecutor(max_workers=max(1, min(workers, len(unauthorized))),
+                                    thread_name_prefix="dcb-fetch") as pool:
+                for org, items, err in pool.map(lambda o: one(o, final=True), unauthorized):
+                    results[org] = items
+                    if err:
+                        errors[org] = err
         else:
-            msg = (
-                f"Onverwacht antwoord voor org {org_code} (env {env.name}): "
-                f"geen 'response' lijst in JSON."
-            )
-            log_debug(msg + f" RAW: {data}")
-            return [], msg
+            LOG.warning("Token vernieuwen na 401 mislukt: %s", token_err)
+            if progress is not None:
+                for org in unauthorized:
+                    progress(org, [], errors[org])
+
+    wall = time.perf_counter() - t_start
+    lat = sorted(latencies)
+    p50 = lat[len(lat) // 2]
+    p95 = lat[min(len(lat) - 1, int(len(lat) * 0.95))]
+    LOG.info(
+        "%d orgs in %.1fs met %d workers (env=%s, fouten=%d, latency per org p50=%.0f ms, "
+        "p95=%.0f ms, max=%.0f ms)",
+        len(codes), wall, workers, env.name, len(errors), p50 * 1000, p95 * 1000, lat[-1] * 1000,
+    )
+    return results, errors
+
 
+def fetch_with_snapshots(
+    env: EnvConfig,
+    org_codes: List[str],
+    access_token: str,
+    options: Optional[FetchOptions] = None,
+    tokens: Optional[TokenManager] = None,
+    progress: Optional[Callable[[str, List[Dict[str, Any]], Optional[str]], None]] = None,
+    force: bool = False,
+    latencies: Optional[List[float]] = None,
+) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, str], Dict[str, int]]:
+    """
+    Zoals fetch_certificates_for_orgs, maar via de snapshot-store:
+
+    - orgs die binnen options.max_age_sec opgehaald werden komen uit de store;
+    - enkel verouderde orgs (of alle, met force=True) gaan naar de API en
+      worden daarna als snapshot bewaard;
+    - mislukt een fetch voor een org die al in de store zit, dan worden de
+      laatst bekende rijen gebruikt (de fout blijft gemeld).
+
+    De store kent geen gebruikers: rijen uit de store worden enkel gegeven
+    als minstens één API-call in deze run met dit token lukte. Is alles
+    vers, dan wordt de oudste org toch opgehaald als controle. Lukt geen
+    enkele call (token geweigerd, API onbereikbaar), dan komt er niets uit
+    de store en krijgen die orgs een fout.
+
+    Geeft (results_by_org, errors_by_org, stats) met stats = aantallen
+    'cached', 'fetched', 'changed' en 'fallback'.
+    """
+    opts = options or load_fetch_options()
+    codes = list(dict.fromkeys(org_codes))
+    to_fetch = codes if force or opts.max_age_sec <= 0 else dcb_snapshots.stale(env.name, codes, opts.max_age_sec)
+    if codes and not to_fetch:
+        # alles vers: één org toch ophalen, zodat het token gecontroleerd is
+        # vóór er iets uit de store komt
+        seen = dcb_snapshots.fetched_at(env.name, codes)
+        to_fetch = [min(codes, key=lambda org: seen.get(org, 0.0))]
+    fetch_set = set(to_fetch)
+    stats = {"cached": len(codes) - len(to_fetch), "fetched": 0, "changed": 0, "fallback": 0}
+
+    fetched, errors = fetch_certificates_for_orgs(
+        env, to_fetch, access_token, options=opts, tokens=tokens, progress=progress, latencies=latencies,
+    ) if to_fetch else ({}, {})
+
+    authenticated = any(org not in errors for org in fetched)
+    if authenticated:
+        stored = dcb_snapshots.load(env.name, [org for org in codes if org not in fetch_set])
+    else:
+        stored = {}
+        reason = next(iter(errors.values()), "geen geslaagde API-call")
+        for org in codes:
+            if org not in fetch_set:
+                errors[org] = f"Snapshot niet gebruikt: token niet bevestigd ({reason})"
+        stats["cached"] = 0
+    if progress is not None:
+        for org, items in stored.items():
+            progress(org, items, None)
+        for org in codes:
+            if org not in fetch_set and org not in stored:
+                progress(org, [], errors[org])
+
+    for org, items in fetched.items():
+        if org in errors:
+            continue
+        stats["fetched"] += 1
+        if dcb_snapshots.save(env.name, org, items):
+            stats["changed"] += 1
+
+    if errors and authenticated:
+        previous = dcb_snapshots.load(env.name, [org for org in errors if org in fetch_set])
+        for org, items in previous.items():
+            fetched[org] = items
+            errors[org] += " (laatst bekende snapshot gebruikt)"
+            stats["fallback"] += 1
+
+    results = {org: stored[org] if org in stored else fetched.get(org, []) for org in codes}
     log_debug(
-        f"Succesvol {len(items)} certificaten ontvangen voor org {org_code} in env {env.name}."
+        "Snapshots env=%s: %d uit store, %d opgehaald (%d gewijzigd), %d fallback, %d fouten.",
+        env.name, stats["cached"], stats["fetched"], stats["changed"], stats["fallback"], len(errors),
     )
-    return items, None
+    return results, errors, stats
 
 
 # ------------------------------------------------------------
 #  Excel export
 # ------------------------------------------------------------
 
-def build_excel(results: Dict[str, List[Dict[str, Any]]]) -> bytes:
+def build_excel(
+    results: Dict[str, List[Dict[str, Any]]],
+    errors: Optional[Dict[str, str]] = None,
+) -> bytes:
     """
     Maakt één XLSX met alle organisaties.
+    Orgs waarvoor de API-call faalde komen op een extra sheet 'Errors'
+    (gedeeltelijke export i.p.v. niets).
+
+    Streaming via cynit_xlsx: rijen gaan zonder celmodel in geheugen naar de
+    sheet en de kolombreedtes (autofit, max 60) worden bij append() bijgehouden.
     """
-    wb = Workbook()
-    ws_cert = wb.active
-    ws_cert.title = "Certificates"
+    book = cynit_xlsx.Book()
+    ws_cert = book.sheet("Certificates", autofit=True)
 
     cert_headers = [
         "organization_code",
@@ -607,20 +1242,13 @@ def build_excel(results: Dict[str, List[Dict[str, Any]]]) -> bytes:
     ]
     ws_cert.append(cert_headers)
 
-    total_rows = 0
     for org_code, items in results.items():
         for row in items:
-            contact = row.get("contact_person") or row.get("contact_persons")
-            if isinstance(contact, list):
-                contact_str = ", ".join(str(c) for c in contact)
-            else:
-                contact_str = str(contact) if contact is not None else ""
-
             ws_cert.append([
                 org_code,
                 row.get("application_name", ""),
                 row.get("application_status", ""),
-                contact_str,
+                _contact_str(row),
                 row.get("description", ""),
                 row.get("type", ""),
                 row.get("issued_by", ""),
@@ -629,11 +1257,10 @@ def build_excel(results: Dict[str, List[Dict[str, Any]]]) -> bytes:
                 row.get("status", ""),
                 row.get("serial_number", ""),
             ])
-            total_rows += 1
 
-    log_debug(f"Excel: {total_rows} certificaat-rijen toegevoegd in 'Certificates'.")
+    log_debug("Excel: %d certificaat-rijen toegevoegd in 'Certificates'.", ws_cert.rows - 1)
 
-    ws_app = wb.create_sheet("Applications")
+    ws_app = book.sheet("Applications", autofit=True)
     app_headers = [
         "organization_code",
         "application_name",
@@ -645,7 +1272,6 @@ def build_excel(results: Dict[str, List[Dict[str, Any]]]) -> bytes:
     ws_app.append(app_headers)
 
     seen = set()
-    app_rows = 0
     for org_code, items in results.items():
         for row in items:
             app_name = row.get("application_name", "")
@@ -654,39 +1280,32 @@ def build_excel(results: Dict[str, List[Dict[str, Any]]]) -> bytes:
                 continue
             seen.add(key)
 
-            contact = row.get("contact_person") or row.get("contact_persons")
-            if isinstance(contact, list):
-                contact_str = ", ".join(str(c) for c in contact)
-            else:
-                contact_str = str(contact) if contact is not None else ""
-
             ws_app.append([
                 org_code,
                 app_name,
                 row.get("application_status", ""),
-                contact_str,
+                _contact_str(row),
                 row.get("description", ""),
                 row.get("type", ""),
             ])
-            app_rows += 1
 
-    log_debug(f"Excel: {app_rows} unieke toepassingen toegevoegd in 'Applications'.")
+    log_debug("Excel: %d unieke toepassingen toegevoegd in 'Applications'.", ws_app.rows - 1)
+
+    if errors:
+        ws_err = book.sheet("Errors", autofit=True)
+        ws_err.append(["organization_code", "error"])
+        for org_code, err in errors.items():
+            ws_err.append([org_code, err])
+        log_debug("Excel: %d mislukte organisaties in 'Errors'.", len(errors))
+
+    return book.to_bytes()
 
-    for ws in (ws_cert, ws_app):
-        for col_idx in range(1, ws.max_column + 1):
-            col_letter = get_column_letter(col_idx)
-            max_len = 0
-            for row_idx in range(1, ws.max_row + 1):
-                val = ws[f"{col_letter}{row_idx}"].value
-                if val is None:
-                    continue
-                max_len = max(max_len, len(str(val)))
-            ws.column_dimensions[col_letter].width = min(max_len + 2, 60)
 
-    buf = BytesIO()
-    wb.save(buf)
-    buf.seek(0)
-    return buf.getvalue()
+def _contact_str(row: Dict[str, Any]) -> str:
+    contact = row.get("contact_person") or row.get("contact_persons")
+    if isinstance(contact, list):
+        return ", ".join(str(c) for c in contact)
+    return str(contact) if contact is not None else ""
 
 
 # ------------------------------------------------------------
@@ -697,245 +1316,458 @@ def register_web_routes(app: Flask, settings: Dict[str, Any], tools=None) -> Non
     """
     Integreer deze tool in de bestaande CyNiT Tools Flask-app.
 
-    Route:
+    Routes:
       - GET/POST /dcbaas-org-export
+      - GET      /dcbaas-org-export/jobs/<id>            (voortgang, ververst zichzelf)
+      - GET      /dcbaas-org-export/jobs/<id>/status     (JSON)
+      - GET      /dcbaas-org-export/jobs/<id>/download   (XLSX als de job klaar is)
     """
     envs, default_env = load_env_configs_from_dcbaas_api()
-    log_debug(f"Environments beschikbaar: {list(envs.keys())}")
-
-    base_css = cynit_layout.common_css(settings)
-    common_js = cynit_layout.common_js()
-
-    colors = settings.get("colors", {})
-    bg = colors.get("background", "#000000")
-    fg = colors.get("general_fg", "#FFFFFF")
-    title_color = colors.get("title", "#00A2FF")
-    t1_bg = colors.get("table_col1_bg", "#333333")
-    t1_fg = colors.get("table_col1_fg", "#000000")
-    t2_bg = colors.get("table_col2_bg", "#111111")
-    t2_fg = colors.get("table_col2_fg", "#00FA00")
-    btn_bg = colors.get("button_bg", "#111111")
-    btn_fg = colors.get("button_fg", "#00B7C3")
-
-    header = cynit_layout.header_html(
-        settings,
-        tools=tools,
-        title="DCBaaS – Export per organisatie",
-        right_html="",
-    )
-    footer = cynit_layout.footer_html()
-
-    extra_css = f"""
-    .card {{
-      max-width: 1100px;
-      margin: 0 auto 20px auto;
-      background: #111111;
-      padding: 20px;
-      border-radius: 16px;
-      box-shadow: 0 10px 30px rgba(0,0,0,0.7);
-      color: {fg};
-    }}
-    h1, h2 {{
-      color: {title_color};
-      margin-top: 0;
-    }}
-    label {{
-      display:block;
-      margin-top:12px;
-      font-weight:600;
-    }}
-    textarea, select, input[type="text"] {{
-      width:100%;
-      padding:8px 10px;
-      border-radius:8px;
-      border:1px solid #444;
-      background:{bg};
-      color:{fg};
-      box-sizing:border-box;
-    }}
-    textarea {{
-      min-height:120px;
-      font-family:Consolas, monospace;
-    }}
-    .btn {{
-      margin-top:16px;
-      padding:8px 16px;
-      border-radius:999px;
-      border:1px solid #333;
-      background:{btn_bg};
-      color:{btn_fg};
-      font-weight:700;
-      cursor:pointer;
-      display:inline-block;
-      margin-right:10px;
-    }}
-    .btn:hover {{
-      filter:brightness(1.15);
-    }}
-    .muted {{
-      color:#aaa;
-      font-size:0.9em;
-    }}
-    .error {{
-      color:#fecaca;
-      background:#7f1d1d;
-      padding:8px 12px;
-      border-radius:8px;
-      margin-bottom:10px;
-    }}
-    table {{
-      border-collapse: collapse;
-      width: 100%;
-      margin-top: 10px;
-      font-size:0.9em;
-    }}
-    th, td {{
-      border: 1px solid #333;
-      padding: 4px 6px;
-    }}
-    th {{
-      background: {t1_bg};
-      color: {t1_fg};
-    }}
-    tbody tr:nth-child(odd) {{
-      background: {t2_bg};
-      color: {t2_fg};
-    }}
-    tbody tr:nth-child(even) {{
-      background: #050505;
-      color: {fg};
-    }}
-    .jwt-box {{
-      width: 100%;
-      min-height: 80px;
-      font-family: Consolas, monospace;
-      background: {bg};
-      color: {fg};
-      border-radius: 8px;
-      border: 1px solid #444;
-      padding: 8px 10px;
-      box-sizing: border-box;
-      word-break: break-all;
-      white-space: pre-wrap;
-    }}
-    """
+    export_jobs = cynit_jobs.JobQueue("dcbaas_export", workers=2)
+    log_debug("Environments beschikbaar: %s", list(envs.keys()))
+
+    def _build_page(settings: Dict[str, Any], tools) -> str:
+        """Pagina-template met layout/kleuren uit de huidige settings."""
+        base_css = cynit_layout.common_css(settings)
+        common_js = cynit_layout.common_js()
+
+        colors = settings.get("colors", {})
+        bg = colors.get("background", "#000000")
+        fg = colors.get("general_fg", "#FFFFFF")
+        title_color = colors.get("title", "#00A2FF")
+        t1_bg = colors.get("table_col1_bg", "#333333")
+        t1_fg = colors.get("table_col1_fg", "#000000")
+        t2_bg = colors.get("table_col2_bg", "#111111")
+        t2_fg = colors.get("table_col2_fg", "#00FA00")
+        btn_bg = colors.get("button_bg", "#111111")
+        btn_fg = colors.get("button_fg", "#00B7C3")
+
+        header = cynit_layout.header_html(
+            settings,
+            tools=tools,
+            title="DCBaaS – Export per organisatie",
+            right_html="",
+        )
+        footer = cynit_layout.footer_html()
+
+        extra_css = f"""
+        .card {{
+          max-width: 1100px;
+          margin: 0 auto 20px auto;
+          background: #111111;
+          padding: 20px;
+          border-radius: 16px;
+          box-shadow: 0 10px 30px rgba(0,0,0,0.7);
+          color: {fg};
+        }}
+        h1, h2 {{
+          color: {title_color};
+          margin-top: 0;
+        }}
+        label {{
+          display:block;
+          margin-top:12px;
+          font-weight:600;
+        }}
+        textarea, select, input[type="text"] {{
+          width:100%;
+          padding:8px 10px;
+          border-radius:8px;
+          border:1px solid #444;
+          background:{bg};
+          color:{fg};
+          box-sizing:border-box;
+        }}
+        textarea {{
+          min-height:120px;
+          font-family:Consolas, monospace;
+        }}
+        .btn {{
+          margin-top:16px;
+          padding:8px 16px;
+          border-radius:999px;
+          border:1px solid #333;
+          background:{btn_bg};
+          color:{btn_fg};
+          font-weight:700;
+          cursor:pointer;
+          display:inline-block;
+          margin-right:10px;
+        }}
+        .btn:hover {{
+          filter:brightness(1.15);
+        }}
+        .muted {{
+          color:#aaa;
+          font-size:0.9em;
+        }}
+        .error {{
+          color:#fecaca;
+          background:#7f1d1d;
+          padding:8px 12px;
+          border-radius:8px;
+          margin-bottom:10px;
+        }}
+        table {{
+          border-collapse: collapse;
+          width: 100%;
+          margin-top: 10px;
+          font-size:0.9em;
+        }}
+        th, td {{
+          border: 1px solid #333;
+          padding: 4px 6px;
+        }}
+        th {{
+          background: {t1_bg};
+          color: {t1_fg};
+        }}
+        tbody tr:nth-child(odd) {{
+          background: {t2_bg};
+          color: {t2_fg};
+        }}
+        tbody tr:nth-child(even) {{
+          background: #050505;
+          color: {fg};
+        }}
+        .progress {{
+          width: 100%;
+          height: 14px;
+          background: #222;
+          border-radius: 999px;
+          overflow: hidden;
+          margin: 8px 0;
+        }}
+        .progress > div {{
+          height: 100%;
+          background: {btn_fg};
+        }}
+        .jwt-box {{
+          width: 100%;
+          min-height: 80px;
+          font-family: Consolas, monospace;
+          background: {bg};
+          color: {fg};
+          border-radius: 8px;
+          border: 1px solid #444;
+          padding: 8px 10px;
+          box-sizing: border-box;
+          word-break: break-all;
+          white-space: pre-wrap;
+        }}
+        """
+
+        page_template = (
+            "<!doctype html>\n"
+            "<html lang='nl'>\n"
+            "<head>\n"
+            "  <meta charset='utf-8'>\n"
+            "  {% if job and job.active %}<meta http-equiv='refresh' content='2'>{% endif %}\n"
+            "  <title>DCBaaS – Export per organisatie</title>\n"
+            "  <style>\n"
+            f"{base_css}\n{extra_css}\n"
+            "  </style>\n"
+            "  <script>\n"
+            f"{common_js}\n"
+            "  </script>\n"
+            "</head>\n"
+            "<body>\n"
+            f"{header}\n"
+            "<div class='page'>\n"
+            "  <div class='card'>\n"
+            "    <h1>DCBaaS – Export per organisatie</h1>\n"
+            "    <p class='muted'>\n"
+            "      1. Vraag (indien nodig) een nieuw access token op via JWT/JWK.<br>\n"
+            "      2. Plak hieronder exact wat je ook in je andere tools als Authorization gebruikt\n"
+            "         (bv. <code>Bearer eyJ...</code>).<br>\n"
+            "      3. Vul één of meerdere organisatie-codes in (één per lijn) en kies Preview of Excel.\n"
+            "         Een Excel-export loopt op de achtergrond; je kan deze pagina sluiten en later\n"
+            "         terugkomen via 'Recente exports'.<br>\n"
+            "      Bij een <strong>401 Unauthorized</strong>-fout is je token waarschijnlijk ongeldig of verlopen.\n"
+            "    </p>\n"
+            "    {% if error %}\n"
+            "      <div class='error'>{{ error }}</div>\n"
+            "    {% endif %}\n"
+            "    <form method='post'>\n"
+            "      <label>Omgeving</label>\n"
+            "      <select name='env'>\n"
+            "        {% for key, env in envs.items() %}\n"
+            "          <option value='{{ key }}' {% if key == current_env %}selected{% endif %}>\n"
+            "            {{ key }} – {{ env.label }} ({{ env.external_api_base }})\n"
+            "          </option>\n"
+            "        {% endfor %}\n"
+            "      </select>\n"
+            "      <label>Access token (Authorization header)</label>\n"
+            "      <input type='text' name='access_token' value='{{ access_token }}' />\n"
+            "      <p class='muted'>Bijvoorbeeld: <code>Bearer eyJ...</code>. Laat dit niet leeg voor API-calls.</p>\n"
+            "      <label>Organisatie-codes</label>\n"
+            "      <textarea name='org_codes' "
+            "placeholder='OVO000082&#10;OVO002949'>{{ org_input }}</textarea>\n"
+            "      <p class='muted'>Lege lijnen worden genegeerd. Copy/paste uit Excel mag.</p>\n"
+            "      <label><input type='checkbox' name='refresh' value='1' {% if refresh %}checked{% endif %}>\n"
+            "        Alles opnieuw ophalen (lokale snapshots negeren)</label>\n"
+            "      <button type='submit' name='action' value='preview' class='btn'>Voorbeeld tonen</button>\n"
+            "      <button type='submit' name='action' value='export' class='btn'>Excel downloaden</button>\n"
+            "      <button type='submit' name='action' value='diff' class='btn'>Wijzigingen sinds vorige snapshot</button>\n"
+            "      <button type='submit' name='action' value='gen_jwt' class='btn'>Genereer client_assertion JWT</button>\n"
+            "      <button type='submit' name='action' value='get_token' class='btn'>Vraag nieuw access_token op</button>\n"
+            "    </form>\n"
+            "  </div>\n"
+            "  {% if job %}\n"
+            "    <div class='card'>\n"
+            "      <h2>Export {{ job.id }} – {{ job.title }}</h2>\n"
+            "      <p class='muted'>Status: <strong>{{ job.status }}</strong> – {{ job.message }}\n"
+            "        ({{ job.done }}/{{ job.total }} organisaties, {{ job.failed }} fouten;\n"
+            "        gestart {{ job.started or job.created }}{% if job.finished %}, klaar {{ job.finished }}{% endif %})</p>\n"
+            "      <div class='progress'><div style='width: {{ job.percent }}%'></div></div>\n"
+            "      {% if job.error %}<div class='error'>{{ job.error }}</div>{% endif %}\n"
+            "      {% if job.status == 'done' %}\n"
+            "        <a class='btn' href='/dcbaas-org-export/jobs/{{ job.id }}/download'>"
+            "Download {{ job.download_name }}</a>\n"
+            "      {% endif %}\n"
+            "      <table>\n"
+            "        <thead><tr><th>Org</th><th>Resultaat</th></tr></thead>\n"
+            "        <tbody>\n"
+            "          {% for org, status in job['items'].items() %}\n"
+            "          <tr><td>{{ org }}</td><td>{{ status }}</td></tr>\n"
+            "          {% endfor %}\n"
+            "        </tbody>\n"
+            "      </table>\n"
+            "    </div>\n"
+            "  {% endif %}\n"
+            "  {% if jobs %}\n"
+            "    <div class='card'>\n"
+            "      <h2>Recente exports</h2>\n"
+            "      <table>\n"
+            "        <thead><tr><th>Job</th><th>Omschrijving</th><th>Status</th>"
+            "<th>Voortgang</th><th>Aangemaakt</th><th></th></tr></thead>\n"
+            "        <tbody>\n"
+            "          {% for j in jobs %}\n"
+            "          <tr>\n"
+            "            <td><a href='/dcbaas-org-export/jobs/{{ j.id }}'>{{ j.id }}</a></td>\n"
+            "            <td>{{ j.title }}</td>\n"
+            "            <td>{{ j.status }}</td>\n"
+            "            <td>{{ j.done }}/{{ j.total }}{% if j.failed %} ({{ j.failed }} fouten){% endif %}</td>\n"
+            "            <td>{{ j.created }}</td>\n"
+            "            <td>{% if j.status == 'done' %}"
+            "<a href='/dcbaas-org-export/jobs/{{ j.id }}/download'>download</a>{% endif %}</td>\n"
+            "          </tr>\n"
+            "          {% endfor %}\n"
+            "        </tbody>\n"
+            "      </table>\n"
+            "    </div>\n"
+            "  {% endif %}\n"
+            "  {% if jwt_output %}\n"
+            "    <div class='card'>\n"
+            "      <h2>Debug – gegenereerde client_assertion (JWT)</h2>\n"
+            "      <p class='muted'>Deze JWT wordt gebruikt richting het token endpoint.</p>\n"
+            "      <div class='jwt-box'>{{ jwt_output }}</div>\n"
+            "    </div>\n"
+            "  {% endif %}\n"
+            "  {% if token_message %}\n"
+            "    <div class='card'>\n"
+            "      <h2>Token status</h2>\n"
+            "      <p class='muted'>{{ token_message }}</p>\n"
+            "    </div>\n"
+            "  {% endif %}\n"
+            "  {% if diff %}\n"
+            "    <div class='card'>\n"
+            "      <h2>Wijzigingen sinds vorige snapshot</h2>\n"
+            "      {% if snapshot_info %}<p class='muted'>{{ snapshot_info }}</p>{% endif %}\n"
+            "      {% if not diff_rows %}\n"
+            "        <p class='muted'>Geen wijzigingen (of nog maar één snapshot per organisatie).</p>\n"
+            "      {% else %}\n"
+            "        <table>\n"
+            "          <thead>\n"
+            "            <tr>\n"
+            "              <th>Org</th><th>Wijziging</th><th>Application</th><th>Serial</th>\n"
+            "              <th>Status</th><th>End</th><th>Tussen</th>\n"
+            "            </tr>\n"
+            "          </thead>\n"
+            "          <tbody>\n"
+            "            {% for row in diff_rows %}\n"
+            "            <tr>\n"
+            "              <td>{{ row.org }}</td>\n"
+            "              <td>{{ row.change }}</td>\n"
+            "              <td>{{ row.app }}</td>\n"
+            "              <td>{{ row.serial }}</td>\n"
+            "              <td>{% if row.change == 'gewijzigd' and row.old_status != row.new_status %}"
+            "{{ row.old_status }} → {{ row.new_status }}{% else %}{{ row.new_status or row.old_status }}{% endif %}</td>\n"
+            "              <td>{% if row.change == 'gewijzigd' and row.old_end != row.end %}"
+            "{{ row.old_end }} → {{ row.end }}{% else %}{{ row.end }}{% endif %}</td>\n"
+            "              <td>{{ row.since }} – {{ row.until }}</td>\n"
+            "            </tr>\n"
+            "            {% endfor %}\n"
+            "          </tbody>\n"
+            "        </table>\n"
+            "      {% endif %}\n"
+            "      {% if errors %}\n"
+            "        <h3>Fouten / waarschuwingen</h3>\n"
+            "        <ul>\n"
+            "          {% for e in errors %}<li>{{ e }}</li>{% endfor %}\n"
+            "        </ul>\n"
+            "      {% endif %}\n"
+            "    </div>\n"
+            "  {% endif %}\n"
+            "  {% if preview %}\n"
+            "    <div class='card'>\n"
+            "      <h2>Preview resultaten</h2>\n"
+            "      {% if snapshot_info %}<p class='muted'>{{ snapshot_info }}</p>{% endif %}\n"
+            "      {% if total == 0 %}\n"
+            "        <p class='muted'>Geen certificaten gevonden voor de opgegeven codes.</p>\n"
+            "      {% else %}\n"
+            "        <p class='muted'>Totaal {{ total }} certificaten voor {{ org_count }} organisaties.</p>\n"
+            "        <table>\n"
+            "          <thead>\n"
+            "            <tr>\n"
+            "              <th>Org</th><th>Application</th><th>App status</th>\n"
+            "              <th>Cert status</th><th>Serial</th><th>Start</th><th>End</th>\n"
+            "            </tr>\n"
+            "          </thead>\n"
+            "          <tbody>\n"
+            "            {% for row in preview_rows %}\n"
+            "            <tr>\n"
+            "              <td>{{ row.org }}</td>\n"
+            "              <td>{{ row.app }}</td>\n"
+            "              <td>{{ row.app_status }}</td>\n"
+            "              <td>{{ row.cert_status }}</td>\n"
+            "              <td>{{ row.serial }}</td>\n"
+            "              <td>{{ row.start }}</td>\n"
+            "              <td>{{ row.end }}</td>\n"
+            "            </tr>\n"
+            "            {% endfor %}\n"
+            "          </tbody>\n"
+            "        </table>\n"
+            "      {% endif %}\n"
+            "      {% if errors %}\n"
+            "        <h3>Fouten / waarschuwingen</h3>\n"
+            "        <ul>\n"
+            "          {% for e in errors %}<li>{{ e }}</li>{% endfor %}\n"
+            "        </ul>\n"
+            "      {% endif %}\n"
+            "    </div>\n"
+            "  {% endif %}\n"
+            "</div>\n"
+            f"{footer}\n"
+            "</body>\n"
+            "</html>\n"
+        )
+        return page_template
 
-    page_template = (
-        "<!doctype html>\n"
-        "<html lang='nl'>\n"
-        "<head>\n"
-        "  <meta charset='utf-8'>\n"
-        "  <title>DCBaaS – Export per organisatie</title>\n"
-        "  <style>\n"
-        f"{base_css}\n{extra_css}\n"
-        "  </style>\n"
-        "  <script>\n"
-        f"{common_js}\n"
-        "  </script>\n"
-        "</head>\n"
-        "<body>\n"
-        f"{header}\n"
-        "<div class='page'>\n"
-        "  <div class='card'>\n"
-        "    <h1>DCBaaS – Export per organisatie</h1>\n"
-        "    <p class='muted'>\n"
-        "      1. Vraag (indien nodig) een nieuw access token op via JWT/JWK.<br>\n"
-        "      2. Plak hieronder exact wat je ook in je andere tools als Authorization gebruikt\n"
-        "         (bv. <code>Bearer eyJ...</code>).<br>\n"
-        "      3. Vul één of meerdere organisatie-codes in (één per lijn) en kies Preview of Excel.<br>\n"
-        "      Bij een <strong>401 Unauthorized</strong>-fout is je token waarschijnlijk ongeldig of verlopen.\n"
-        "    </p>\n"
-        "    {% if error %}\n"
-        "      <div class='error'>{{ error }}</div>\n"
-        "    {% endif %}\n"
-        "    <form method='post'>\n"
-        "      <label>Omgeving</label>\n"
-        "      <select name='env'>\n"
-        "        {% for key, env in envs.items() %}\n"
-        "          <option value='{{ key }}' {% if key == current_env %}selected{% endif %}>\n"
-        "            {{ key }} – {{ env.label }} ({{ env.external_api_base }})\n"
-        "          </option>\n"
-        "        {% endfor %}\n"
-        "      </select>\n"
-        "      <label>Access token (Authorization header)</label>\n"
-        "      <input type='text' name='access_token' value='{{ access_token }}' />\n"
-        "      <p class='muted'>Bijvoorbeeld: <code>Bearer eyJ...</code>. Laat dit niet leeg voor API-calls.</p>\n"
-        "      <label>Organisatie-codes</label>\n"
-        "      <textarea name='org_codes' "
-        "placeholder='OVO000082&#10;OVO002949'>{{ org_input }}</textarea>\n"
-        "      <p class='muted'>Lege lijnen worden genegeerd. Copy/paste uit Excel mag.</p>\n"
-        "      <button type='submit' name='action' value='preview' class='btn'>Voorbeeld tonen</button>\n"
-        "      <button type='submit' name='action' value='export' class='btn'>Excel downloaden</button>\n"
-        "      <button type='submit' name='action' value='gen_jwt' class='btn'>Genereer client_assertion JWT</button>\n"
-        "      <button type='submit' name='action' value='get_token' class='btn'>Vraag nieuw access_token op</button>\n"
-        "    </form>\n"
-        "  </div>\n"
-        "  {% if jwt_output %}\n"
-        "    <div class='card'>\n"
-        "      <h2>Debug – gegenereerde client_assertion (JWT)</h2>\n"
-        "      <p class='muted'>Deze JWT wordt gebruikt richting het token endpoint.</p>\n"
-        "      <div class='jwt-box'>{{ jwt_output }}</div>\n"
-        "    </div>\n"
-        "  {% endif %}\n"
-        "  {% if token_message %}\n"
-        "    <div class='card'>\n"
-        "      <h2>Token status</h2>\n"
-        "      <p class='muted'>{{ token_message }}</p>\n"
-        "    </div>\n"
-        "  {% endif %}\n"
-        "  {% if preview %}\n"
-        "    <div class='card'>\n"
-        "      <h2>Preview resultaten</h2>\n"
-        "      {% if total == 0 %}\n"
-        "        <p class='muted'>Geen certificaten gevonden voor de opgegeven codes.</p>\n"
-        "      {% else %}\n"
-        "        <p class='muted'>Totaal {{ total }} certificaten voor {{ org_count }} organisaties.</p>\n"
-        "        <table>\n"
-        "          <thead>\n"
-        "            <tr>\n"
-        "              <th>Org</th><th>Application</th><th>App status</th>\n"
-        "              <th>Cert status</th><th>Serial</th><th>Start</th><th>End</th>\n"
-        "            </tr>\n"
-        "          </thead>\n"
-        "          <tbody>\n"
-        "            {% for row in preview_rows %}\n"
-        "            <tr>\n"
-        "              <td>{{ row.org }}</td>\n"
-        "              <td>{{ row.app }}</td>\n"
-        "              <td>{{ row.app_status }}</td>\n"
-        "              <td>{{ row.cert_status }}</td>\n"
-        "              <td>{{ row.serial }}</td>\n"
-        "              <td>{{ row.start }}</td>\n"
-        "              <td>{{ row.end }}</td>\n"
-        "            </tr>\n"
-        "            {% endfor %}\n"
-        "          </tbody>\n"
-        "        </table>\n"
-        "      {% endif %}\n"
-        "      {% if errors %}\n"
-        "        <h3>Fouten / waarschuwingen</h3>\n"
-        "        <ul>\n"
-        "          {% for e in errors %}<li>{{ e }}</li>{% endfor %}\n"
-        "        </ul>\n"
-        "      {% endif %}\n"
-        "    </div>\n"
-        "  {% endif %}\n"
-        "</div>\n"
-        f"{footer}\n"
-        "</body>\n"
-        "</html>\n"
-    )
+    page_template = _build_page(settings, tools)
 
     def _render(**ctx):
-        return render_template_string(page_template, tools=tools, **ctx)
+        ctx.setdefault("jobs", [j.to_dict() for j in export_jobs.recent(5)])
+        return cynit_layout.render_page(page_template, tools=tools, **ctx)
+
+    def _pick_initial_env() -> str:
+        if default_env and default_env in envs:
+            return default_env
+        if "DEV" in envs:
+            return "DEV"
+        return next(iter(envs.keys()))
+
+    initial_env = _pick_initial_env()
+    log_debug("Initial environment: %s", initial_env)
+    fetch_options = load_fetch_options()
+    apply_log_options()
+
+    def apply_config(snapshot) -> None:
+        """cynit_config-subscriber: layout en dcbaas_api.json live bijwerken."""
+        nonlocal settings, tools, page_template, envs, default_env, initial_env, fetch_options
+        settings = snapshot.settings
+        tools = snapshot.tools
+        page_template = _build_page(settings, tools)
+        if "dcbaas_api.json" in snapshot.changed:
+            envs, default_env = load_env_configs_from_dcbaas_api()
+            initial_env = _pick_initial_env()
+            fetch_options = load_fetch_options()
+            apply_log_options()
+            log_debug("dcbaas_api.json herladen, initial environment: %s", initial_env)
+
+    cynit_config.subscribe(apply_config, name="dcb_org_export")
+
+    def _submit_export(
+        env: EnvConfig,
+        org_codes: List[str],
+        access_token: str,
+        tokens: Optional[TokenManager],
+        force: bool = False,
+    ) -> cynit_jobs.Job:
+        """Excel-export als achtergrond-job: fetch (via snapshots) per org + build_excel."""
+        options = fetch_options
+        ts = dt.datetime.now().strftime("%Y%m%d-%H%M%S")
+        filename = f"dcbaas_org_export_{env.name}_{ts}.xlsx"
+
+        def run(ctx: cynit_jobs.JobContext):
+            def progress(org: str, items: List[Dict[str, Any]], err: Optional[str]) -> None:
+                if err:
+                    ctx.item(org, f"fout: {err}", ok=False)
+                else:
+                    ctx.item(org, f"{len(items)} certificaten")
+
+            ctx.message("Certificaten ophalen")
+            results_by_org, errors_by_org, _stats = fetch_with_snapshots(
+                env, org_codes, access_token, options=options, tokens=tokens,
+                progress=progress, force=force,
+            )
+            total = sum(len(items) for items in results_by_org.values())
+            ctx.message(f"Excel bouwen ({total} certificaten)")
+            log_debug("Excel-export voor env=%s, totaal=%d certificaten.", env.name, total)
+            return build_excel(results_by_org, errors_by_org), filename
+
+        return export_jobs.submit(
+            "dcbaas_export",
+            f"{env.name}: {len(set(org_codes))} organisaties",
+            run,
+            keys=org_codes,
+            meta={"env": env.name},
+        )
 
-    if default_env and default_env in envs:
-        initial_env = default_env
-    elif "DEV" in envs:
-        initial_env = "DEV"
-    else:
-        initial_env = next(iter(envs.keys()))
-    log_debug(f"Initial environment: {initial_env}")
+    def _job_or_404(job_id: str) -> cynit_jobs.Job:
+        job = export_jobs.get(job_id)
+        if job is None:
+            abort(404)
+        return job
+
+    @app.route("/dcbaas-org-export/jobs/<job_id>")
+    def dcbaas_org_export_job(job_id: str):
+        job = _job_or_404(job_id)
+        env_key = job.meta.get("env")
+        if env_key not in envs:
+            env_key = initial_env
+        return _render(
+            envs=envs,
+            current_env=env_key,
+            error=None,
+            org_input="\n".join(job.items),
+            access_token=get_token_manager(envs[env_key]).current(),
+            preview=False,
+            preview_rows=[],
+            total=0,
+            org_count=0,
+            errors=[],
+            jwt_output="",
+            token_message="",
+            job=job.to_dict(),
+        )
+
+    @app.route("/dcbaas-org-export/jobs/<job_id>/status")
+    def dcbaas_org_export_job_status(job_id: str):
+        return jsonify(_job_or_404(job_id).to_dict())
+
+    @app.route("/dcbaas-org-export/jobs/<job_id>/download")
+    def dcbaas_org_export_job_download(job_id: str):
+        job = _job_or_404(job_id)
+        path = export_jobs.result_path(job)
+        if job.status != cynit_jobs.DONE or not path.exists():
+            abort(404)
+        return send_file(
+            path,
+            as_attachment=True,
+            download_name=job.download_name,
+            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
 
     @app.route("/dcbaas-org-export", methods=["GET", "POST"])
     def dcbaas_org_export():
@@ -953,10 +1785,10 @@ def register_web_routes(app: Flask, settings: Dict[str, Any], tools=None) -> Non
 
         if request.method == "GET":
             env = envs.get(current_env_key, next(iter(envs.values())))
-            access_token_local = load_default_token_for_env(env)
+            access_token_local = get_token_manager(env).current()
             log_debug(
-                f"GET /dcbaas-org-export voor env={env.name}, "
-                f"default_token_len={len(access_token_local) if access_token_local else 0}"
+                "GET /dcbaas-org-export voor env=%s, default_token_len=%d",
+                env.name, len(access_token_local) if access_token_local else 0,
             )
             return _render(
                 envs=envs,
@@ -980,12 +1812,15 @@ def register_web_routes(app: Flask, settings: Dict[str, Any], tools=None) -> Non
         org_input = request.form.get("org_codes", "") or ""
         access_token = request.form.get("access_token", "") or ""
         action = request.form.get("action") or "preview"
+        force_refresh = request.form.get("refresh") == "1"
+        snapshot_info = ""
+        diff_rows: List[Dict[str, Any]] = []
 
         org_codes = [line.strip() for line in org_input.splitlines() if line.strip()]
 
         log_debug(
-            f"POST /dcbaas-org-export action={action}, env={env.name}, "
-            f"#orgs={len(org_codes)}, token_len={len(access_token.strip()) if access_token else 0}"
+            "POST /dcbaas-org-export action=%s, env=%s, #orgs=%d, token_len=%d",
+            action, env.name, len(org_codes), len(access_token.strip()) if access_token else 0,
         )
 
         results_by_org: Dict[str, List[Dict[str, Any]]] = {}
@@ -1013,34 +1848,47 @@ def register_web_routes(app: Flask, settings: Dict[str, Any], tools=None) -> Non
                 )
 
         else:
-            # Validatie voor echte API-calls
+            # Validatie voor echte API-calls. Zonder ingevuld token (of met het
+            # token uit de TokenManager) beheert de manager het token: cache,
+            # refresh vóór vervallen en één retry na een 401.
+            manager = get_token_manager(env)
+            managed = not access_token.strip() or access_token.strip() == manager.current()
+            if managed and org_codes:
+                access_token, token_err = manager.get()
+                if token_err:
+                    errors.append(token_err)
+                access_token = access_token or ""
+
             if not access_token.strip():
                 error = "Geef een access token in (Authorization header waarde)."
             elif not org_codes:
                 error = "Geef minstens één organisatie-code in."
 
+            if not error and action == "export":
+                job = _submit_export(env, org_codes, access_token, manager if managed else None, force_refresh)
+                return redirect(f"/dcbaas-org-export/jobs/{job.id}", code=303)
+
             if not error:
-                for org in org_codes:
-                    items, err = fetch_certificates_for_org(env, org, access_token)
-                    if err:
-                        errors.append(err)
-                    results_by_org[org] = items
-                    total += len(items)
-
-                if action == "export":
-                    log_debug(f"Excel-export gevraagd voor env={env.name}, totaal={total} certificaten.")
-                    xlsx_bytes = build_excel(results_by_org)
-                    buf = BytesIO(xlsx_bytes)
-                    buf.seek(0)
-                    ts = dt.datetime.now().strftime("%Y%m%d-%H%M%S")
-                    filename = f"dcbaas_org_export_{current_env_key}_{ts}.xlsx"
-                    return send_file(
-                        buf,
-                        as_attachment=True,
-                        download_name=filename,
-                        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    )
+                results_by_org, errors_by_org, stats = fetch_with_snapshots(
+                    env, org_codes, access_token, options=fetch_options,
+                    tokens=manager if managed else None, force=force_refresh,
+                )
+                errors.extend(errors_by_org.values())
+                total = sum(len(items) for items in results_by_org.values())
+                snapshot_info = (
+                    f"{stats['cached']} organisaties uit lokale snapshots "
+                    f"(max. {int(fetch_options.max_age_sec // 60)} min oud), "
+                    f"{stats['fetched']} opnieuw opgehaald ({stats['changed']} met wijzigingen)."
+                )
+
+            if not error and action == "diff":
+                for change in dcb_snapshots.diff(env.name, org_codes):
+                    change["since"] = dt.datetime.fromtimestamp(change["since"]).strftime("%Y-%m-%d %H:%M")
+                    change["until"] = dt.datetime.fromtimestamp(change["until"]).strftime("%Y-%m-%d %H:%M")
+                    diff_rows.append(change)
+                log_debug("Diff: %d wijzigingen voor %d organisaties.", len(diff_rows), len(org_codes))
 
+            elif not error:
                 # Preview
                 preview = True
                 max_rows = 50
@@ -1061,8 +1909,8 @@ def register_web_routes(app: Flask, settings: Dict[str, Any], tools=None) -> Non
                         break
 
                 log_debug(
-                    f"Preview: {len(preview_rows)} rijen getoond (totaal={total}) "
-                    f"voor {len(org_codes)} organisaties."
+                    "Preview: %d rijen getoond (totaal=%d) voor %d organisaties.",
+                    len(preview_rows), total, len(org_codes),
                 )
 
         org_count = len({r["org"] for r in preview_rows}) if preview_rows else 0
@@ -1080,6 +1928,10 @@ def register_web_routes(app: Flask, settings: Dict[str, Any], tools=None) -> Non
             errors=errors,
             jwt_output=jwt_output,
             token_message=token_message,
+            snapshot_info=snapshot_info,
+            diff=action == "diff" and not error,
+            diff_rows=diff_rows,
+            refresh=force_refresh,
         )
 
 
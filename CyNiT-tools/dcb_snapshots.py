@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+dcb_snapshots.py
+
+Lokale snapshot-store (SQLite) van DCBaaS /certificate/search-resultaten,
+per omgeving + organisatie-code.
+
+- save(env, org, items)       : nieuwe snapshot, maar enkel als de inhoud
+                                wijzigde; anders wordt enkel fetched_at bijgewerkt.
+- stale(env, orgs, max_age)   : welke orgs ouder zijn dan het versheidsvenster
+                                (of nog nooit opgehaald werden).
+- load(env, orgs)             : huidige rijen per org uit de store.
+- diff(env, orgs)             : toegevoegd / verwijderd / status of einddatum
+                                gewijzigd, huidige snapshot t.o.v. de vorige.
+
+Per org blijven de laatste KEEP_SNAPSHOTS snapshots bewaard.
+
+Database: runtime/dcbaas_snapshots.sqlite (WAL, dus bruikbaar vanuit meerdere
+workers en vanuit achtergrond-jobs).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import cynit_theme
+
+DB_PATH: Path = cynit_theme.BASE_DIR / "runtime" / "dcbaas_snapshots.sqlite"
+KEEP_SNAPSHOTS = 5
+SCHEMA_VERSION = 1
+
+_LOCAL = threading.local()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS orgs (
+    env         TEXT NOT NULL,
+    org_code    TEXT NOT NULL,
+    fetched_at  REAL NOT NULL,
+    snapshot_id INTEGER NOT NULL,
+    PRIMARY KEY (env, org_code)
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    id          INTEGER PRIMARY KEY,
+    env         TEXT NOT NULL,
+    org_code    TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    row_count   INTEGER NOT NULL,
+    digest      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_org ON snapshots (env, org_code, id);
+CREATE TABLE IF NOT EXISTS snapshot_rows (
+    snapshot_id INTEGER NOT NULL,
+    pos         INTEGER NOT NULL,
+    cert_key    TEXT NOT NULL,
+    status      TEXT,
+    end_date    TEXT,
+    row_json    TEXT NOT NULL,
+    PRIMARY KEY (snapshot_id, pos)
+);
+"""
+
+
+# ------------------------------------------------------------
+#  Database
+# ------------------------------------------------------------
+
+def _connect() -> sqlite3.Connection:
+    """Eén connectie per thread (sqlite3-objecten zijn niet thread-safe)."""
+    conn = getattr(_LOCAL, "conn", None)
+    if conn is not None and getattr(_LOCAL, "path", None) == DB_PATH:
+        return conn
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(DB_PATH, timeout=10)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    with conn:
+        conn.executescript(SCHEMA)
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('schema', ?)",
+            (str(SCHEMA_VERSION),),
+        )
+    _LOCAL.conn = conn
+    _LOCAL.path = DB_PATH
+    return conn
+
+
+# (veldnaam, prefix) in volgorde van voorkeur; de eerste ingevulde wint
+KEY_FIELDS = (
+    ("serial_number", "serial"),
+    ("thumbprint", "thumb"),
+    ("sha1", "thumb"),
+    ("id", "id"),
+    ("certificate_id", "id"),
+)
+
+
+def cert_key(row: Dict[str, Any]) -> str:
+    """
+    Stabiele sleutel per certificaat: serienummer, anders thumbprint of id,
+    en pas als laatste toepassing + type + start (twee certs van dezelfde
+    toepassing op dezelfde dag vallen daar samen).
+    """
+    for field, prefix in KEY_FIELDS:
+        value = str(row.get(field) or "").strip()
+        if value:
+            return f"{prefix}:{value.lower()}"
+    return "app:" + "|".join(
+        str(row.get(k) or "") for k in ("application_name", "type", "start_date")
+    )
+
+
+def _encode_rows(items: List[Dict[str, Any]]) -> Tuple[List[str], str]:
+    """
+    Rij-JSON (één keer per rij, ook gebruikt voor de insert) + digest
+    daarover, zonder de hele lijst in één string te serialiseren.
+    """
+    h = hashlib.sha256()
+    encoded = []
+    for row in items:
+        data = json.dumps(row, sort_keys=True, ensure_ascii=False, default=str)
+        h.update(data.encode("utf-8"))
+        h.update(b"\n")
+        encoded.append(data)
+    return encoded, h.hexdigest()
+
+
+# ------------------------------------------------------------
+#  Schrijven
+# ------------------------------------------------------------
+
+def save(env: str, org_code: str, items: List[Dict[str, Any]], fetched_at: Optional[float] = None) -> bool:
+    """
+    Resultaat van één fetch bewaren. Geeft True als er een nieuwe snapshot
+    kwam (inhoud gewijzigd of eerste keer), False als enkel fetched_at
+    werd bijgewerkt.
+    """
+    fetched_at = fetched_at or time.time()
+    encoded, digest = _encode_rows(items)
+    conn = _connect()
+    with conn:
+        current = conn.execute(
+            "SELECT s.id, s.digest FROM orgs o JOIN snapshots s ON s.id = o.snapshot_id"
+            " WHERE o.env = ? AND o.org_code = ?",
+            (env, org_code),
+        ).fetchone()
+        if current is not None and current["digest"] == digest:
+            conn.execute(
+                "UPDATE orgs SET fetched_at = ? WHERE env = ? AND org_code = ?",
+                (fetched_at, env, org_code),
+            )
+            return False
+
+        snap_id = conn.execute(
+            "INSERT INTO snapshots (env, org_code, created_at, row_count, digest) VALUES (?, ?, ?, ?, ?)",
+            (env, org_code, fetched_at, len(items), digest),
+        ).lastrowid
+        conn.executemany(
+            "INSERT INTO snapshot_rows (snapshot_id, pos, cert_key, status, end_date, row_json)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (snap_id, pos, cert_key(row), str(row.get("status") or ""), str(row.get("end_date") or ""), data)
+                for pos, (row, data) in enumerate(zip(items, encoded))
+            ],
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO orgs (env, org_code, fetched_at, snapshot_id) VALUES (?, ?, ?, ?)",
+            (env, org_code, fetched_at, snap_id),
+        )
+        _prune(conn, env, org_code)
+    return True
+
+
+def _prune(conn: sqlite3.Connection, env: str, org_code: str) -> None:
+    old = [
+        r["id"] for r in conn.execute(
+            "SELECT id FROM snapshots WHERE env = ? AND org_code = ? ORDER BY id DESC LIMIT -1 OFFSET ?",
+            (env, org_code, KEEP_SNAPSHOTS),
+        )
+    ]
+    if old:
+        marks = ",".join("?" * len(old))
+        conn.execute(f"DELETE FROM snapshot_rows WHERE snapshot_id IN ({marks})", old)
+        conn.execute(f"DELETE FROM snapshots WHERE id IN ({marks})", old)
+
+
+# ------------------------------------------------------------
+#  Lezen
+# ------------------------------------------------------------
+
+def fetched_at(env: str, org_codes: Iterable[str]) -> Dict[str, float]:
+    """Laatste fetch-tijdstip per org (enkel orgs die in de store zitten)."""
+    codes = list(dict.fromkeys(org_codes))
+    out: Dict[str, float] = {}
+    conn = _connect()
+    for i in range(0, len(codes), 500):
+        chunk = codes[i:i + 500]
+        marks = ",".join("?" * len(chunk))
+        for r in conn.execute(
+            f"SELECT org_code, fetched_at FROM orgs WHERE env = ? AND org_code IN ({marks})",
+            [env, *chunk],
+        ):
+            out[r["org_code"]] = r["fetched_at"]
+    return out
+
+
+def stale(env: str, org_codes: Iterable[str], max_age: float, now: Optional[float] = None) -> List[str]:
+    """Orgs (in input-volgorde) die nooit of langer dan max_age seconden geleden opgehaald werden."""
+    codes = list(dict.fromkeys(org_codes))
+    now = now or time.time()
+    seen = fetched_at(env, codes)
+    return [org for org in codes if org not in seen or now - seen[org] > max_age]
+
+
+def _rows(conn: sqlite3.Connection, snapshot_id: int) -> List[sqlite3.Row]:
+    return conn.execute(
+        "SELECT cert_key, status, end_date, row_json FROM snapshot_rows WHERE snapshot_id = ? ORDER BY pos",
+        (snapshot_id,),
+    ).fetchall()
+
+
+def load(env: str, org_codes: Iterable[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """Huidige rijen per org (orgs zonder snapshot ontbreken in het resultaat)."""
+    conn = _connect()
+    out: Dict[str, List[Dict[str, Any]]] = {}
+    for org in dict.fromkeys(org_codes):
+        r = conn.execute(
+            "SELECT snapshot_id FROM orgs WHERE env = ? AND org_code = ?", (env, org)
+        ).fetchone()
+        if r is not None:
+            out[org] = [json.loads(row["row_json"]) for row in _rows(conn, r["snapshot_id"])]
+    return out
+
+
+def _last_two(conn: sqlite3.Connection, env: str, org: str) -> Tuple[Optional[sqlite3.Row], Optional[sqlite3.Row]]:
+    snaps = conn.execute(
+        "SELECT id, created_at FROM snapshots WHERE env = ? AND org_code = ? ORDER BY id DESC LIMIT 2",
+        (env, org),
+    ).fetchall()
+    current = snaps[0] if snaps else None
+    previous = snaps[1] if len(snaps) > 1 else None
+    return current, previous
+
+
+def diff(env: str, org_codes: Iterable[str]) -> List[Dict[str, Any]]:
+    """
+    Wijzigingen per org tussen de huidige en de vorige snapshot:
+    change = "toegevoegd" / "verwijderd" / "gewijzigd" (status of einddatum).
+    Orgs met maar één snapshot hebben (nog) geen wijzigingen.
+    """
+    conn = _connect()
+    changes: List[Dict[str, Any]] = []
+    for org in dict.fromkeys(org_codes):
+        current, previous = _last_two(conn, env, org)
+        if current is None or previous is None:
+            continue
+        new = {r["cert_key"]: r for r in _rows(conn, current["id"])}
+        old = {r["cert_key"]: r for r in _rows(conn, previous["id"])}
+
+        def entry(change: str, row: sqlite3.Row, before: Optional[sqlite3.Row] = None) -> Dict[str, Any]:
+            data = json.loads(row["row_json"])
+            return {
+                "org": org,
+                "change": change,
+                "app": data.get("application_name", ""),
+                "serial": data.get("serial_number", ""),
+                "old_status": before["status"] if before is not None else "",
+                "new_status": row["status"] if change != "verwijderd" else "",
+                "old_end": before["end_date"] if before is not None else "",
+                "end": row["end_date"],
+                "since": previous["created_at"],
+                "until": current["created_at"],
+            }
+
+        for key, row in new.items():
+            before = old.get(key)
+            if before is None:
+                changes.append(entry("toegevoegd", row))
+            elif (before["status"], before["end_date"]) != (row["status"], row["end_date"]):
+                changes.append(entry("gewijzigd", row, before))
+        for key, row in old.items():
+            if key not in new:
+                changes.append(entry("verwijderd", row, row))
+    return changes
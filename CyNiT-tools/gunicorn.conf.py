@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+gunicorn.conf.py
+
+Gunicorn-config voor CyNiT Tools.
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+    python ctools.py --serve prod            (zet de env-vars hieronder zelf)
+
+Instelbaar via environment:
+- CYNIT_BIND     (default 0.0.0.0:5000)
+- CYNIT_WORKERS  (default 2 x CPU, max 4)
+- CYNIT_THREADS  (default 8 threads per worker)
+- CYNIT_TIMEOUT  (default 300s; een dcbaas-org-export preview kan lang duren,
+                  Excel-exports lopen als achtergrond-job, zie cynit_jobs)
+- CYNIT_EAGER_TOOLS=1  alle tool-modules meteen laden i.p.v. lazy per worker
+- CYNIT_METRICS_DIR  (default runtime/metrics) gedeelde map voor /metrics
+
+Graceful reload: `kill -HUP <master-pid>` of de 'Reload app' knop (POST
+/restart, enkel in dev_mode of vanaf localhost).
+Nieuwe workers laden settings/tools opnieuw, oude werken hun requests af.
+
+Achtergrond-jobs (cynit_jobs) lopen in het worker-proces dat ze startte; hun
+status staat op schijf, dus elke worker kan ze tonen. Workers worden daarom
+NIET periodiek vervangen (geen max_requests): de job-pagina ververst elke 2s
+en een /voica1/dcbaas-job pollt tot een uur, dus een recycle-limiet zou
+lopende jobs afbreken. Enkel een reload (HUP) terwijl een job loopt laat die
+job als onderbroken achter.
+
+Keerzijde: een worker die geheugen lekt, wordt nooit vanzelf vervangen.
+Houd het geheugen van de workers in het oog (ps/top, of MemoryMax= in de
+systemd-unit als harde grens) en doe bij groei een reload (HUP) op een moment
+dat er geen export-job loopt (zie /dcbaas-org-export/jobs/<id>). Een reload
+start verse workers zonder dat lopende requests verloren gaan.
+
+Metrics: elke worker schrijft zijn tellers naar CYNIT_METRICS_DIR en /metrics
+telt die op, welke worker de scrape ook krijgt (zie cynit_metrics). De hooks
+onderaan ruimen bij de start op, starten de flush-thread per worker en
+archiveren de tellers van een gestopte worker (child_exit).
+"""
+
+import os
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent
+sys.path.insert(0, str(BASE_DIR))
+
+# Vóór de fork gezet, zodat master en alle workers dezelfde map gebruiken
+os.environ.setdefault("CYNIT_METRICS_DIR", str(BASE_DIR / "runtime" / "metrics"))
+
+bind = os.environ.get("CYNIT_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("CYNIT_WORKERS", str(min(4, (os.cpu_count() or 1) * 2))))
+threads = int(os.environ.get("CYNIT_THREADS", "8"))
+worker_class = "gthread"
+
+# Lange exports/API-calls niet afbreken, maar wel een bovengrens
+timeout = int(os.environ.get("CYNIT_TIMEOUT", "300"))
+graceful_timeout = 30
+keepalive = 5
+
+chdir = str(BASE_DIR)
+raw_env = ["CYNIT_SERVER=gunicorn"]
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("CYNIT_LOGLEVEL", "info")
+
+
+# --- hooks: metrics over alle workers ---
+
+def on_starting(server):
+    import cynit_metrics
+    cynit_metrics.clear_multiprocess_dir()
+
+
+def post_fork(server, worker):
+    import cynit_metrics
+    cynit_metrics.start_flusher()
+
+
+def worker_exit(server, worker):
+    import cynit_metrics
+    cynit_metrics.write_snapshot()
+
+
+def child_exit(server, worker):
+    import cynit_metrics
+    cynit_metrics.mark_process_dead(worker.pid)
@@ -0,0 +1,47 @@
+"""
+cynit_certcore: de decode-bench haalt de ondergrens, een cert waarvan de
+fingerprint niet lukt breekt decode_object niet, en sniff_format herkent PEM
+achter tekst die met "0" begint.
+
+    python -m pytest CyNiT-tools/tests
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import cynit_certcore  # noqa: E402
+
+
+def test_bench_reaches_default_floor():
+    rates = cynit_certcore.bench(seconds=0.2)
+    assert rates["total"] >= cynit_certcore.BENCH_MIN_RATE, rates
+
+
+def test_main_fails_below_floor(capsys):
+    assert cynit_certcore.main(["--bench", "--seconds", "0.05", "--min-rate", "1e12"]) == 1
+    assert "FOUT" in capsys.readouterr().out
+
+
+def test_decode_object_survives_fingerprint_error(monkeypatch):
+    data = cynit_certcore._bench_samples()["leaf-der"]
+    (kind, cert), = cynit_certcore.load_all(data)
+
+    def broken(cert):
+        raise ValueError("onleesbare DER")
+
+    monkeypatch.setattr(cynit_certcore, "_fingerprints", broken)
+    facts = cynit_certcore.decode_object(kind, cert)
+    assert facts.sha1 == facts.sha256 == "-"
+    assert facts.subject_str != "-"
+
+
+def test_sniff_pem_after_text_starting_with_zero():
+    pem = cynit_certcore._bench_samples()["chain-pem"]
+    data = b"0 = leaf, daarna intermediate en root\n" + pem
+
+    assert cynit_certcore.sniff_format(data) == cynit_certcore.FMT_PEM
+    assert len(cynit_certcore.load_all(data)) == 3
+    der = cynit_certcore._bench_samples()["leaf-der"]
+    assert cynit_certcore.sniff_format(der) != cynit_certcore.FMT_PEM
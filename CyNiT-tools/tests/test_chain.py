@@ -0,0 +1,95 @@
+"""
+Ketenopbouw voor bundles waarin de leaf niet vooraan staat.
+
+Een .p7b staat DER-gesorteerd (SET OF), dus de root komt vaak eerst; de
+keten moet toch vanaf de leaf gebouwd worden.
+
+    python -m pytest CyNiT-tools/tests
+"""
+
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.serialization import pkcs7
+from cryptography.x509.oid import NameOID
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import cert_viewer  # noqa: E402
+import cynit_chain  # noqa: E402
+
+
+def _issue(cn, key, issuer_cert=None, issuer_key=None, ca=False):
+    now = datetime.now(timezone.utc)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, cn)])
+    issuer_name = issuer_cert.subject if issuer_cert is not None else name
+    builder = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(issuer_name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=30))
+        .add_extension(x509.BasicConstraints(ca=ca, path_length=None), critical=True)
+        .add_extension(x509.SubjectKeyIdentifier.from_public_key(key.public_key()), critical=False)
+    )
+    if issuer_cert is not None:
+        builder = builder.add_extension(
+            x509.AuthorityKeyIdentifier.from_issuer_public_key(issuer_key.public_key()), critical=False
+        )
+    return builder.sign(issuer_key or key, hashes.SHA256())
+
+
+def _root_first_chain():
+    root_key, inter_key, leaf_key = (ec.generate_private_key(ec.SECP256R1()) for _ in range(3))
+    root = _issue("Root CA", root_key, ca=True)
+    inter = _issue("Intermediate CA", inter_key, root, root_key, ca=True)
+    leaf = _issue("leaf.example", leaf_key, inter, inter_key)
+    return [root, inter, leaf]
+
+
+def test_chain_info_starts_at_leaf_for_root_first_set():
+    certs = _root_first_chain()
+    chain = cynit_chain.evaluate(cynit_chain.chain_info(certs))
+
+    assert chain["complete"]
+    assert chain["status"] == cynit_chain.STATUS_OK
+    assert [link["role"] for link in chain["links"]] == ["leaf", "intermediate", "root"]
+    assert chain["links"][0]["subject"].endswith("leaf.example")
+
+
+def test_chain_info_ignores_hint_that_is_not_a_leaf():
+    root, inter, leaf = _root_first_chain()
+    index = cynit_chain.ChainIndex([root, inter, leaf])
+    chain = cynit_chain.chain_info([root, inter, leaf], leaf=root, index=index)
+
+    assert len(chain["links"]) == 3
+    assert chain["links"][0]["subject"].endswith("leaf.example")
+
+
+def test_decode_root_first_pem_bundle_builds_full_chain():
+    certs = _root_first_chain()
+    data = b"".join(c.public_bytes(serialization.Encoding.PEM) for c in certs)
+    _, info = cert_viewer._decode_info(data, Path("bundle.pem"))
+
+    links = info["chain"]["links"]
+    assert info["chain"]["complete"]
+    assert len(links) == 3
+    assert links[0]["role"] == "leaf"
+    assert links[0]["subject"].endswith("leaf.example")
+    assert links[0]["signature"] == cynit_chain.SIG_OK
+
+
+def test_decode_p7b_builds_full_chain():
+    certs = _root_first_chain()
+    data = pkcs7.serialize_certificates(certs, serialization.Encoding.DER)
+    _, info = cert_viewer._decode_info(data, Path("chain.p7b"))
+
+    links = info["chain"]["links"]
+    assert info["chain"]["complete"]
+    assert [link["role"] for link in links] == ["leaf", "intermediate", "root"]
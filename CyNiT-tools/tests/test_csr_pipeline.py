@@ -0,0 +1,119 @@
+"""
+dcb_csr_pipeline: een mislukte CN wordt niet opnieuw ingediend, tenzij de
+add-call de server nooit bereikte én --retry-failed gevraagd werd.
+
+    python -m pytest CyNiT-tools/tests
+"""
+
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import dcb_csr_pipeline as pipeline  # noqa: E402
+import dcb_org_export  # noqa: E402
+
+CN = "pc001.example"
+
+
+class _Tokens:
+    def call(self, fn):
+        return fn("Bearer test")
+
+
+class _StopAfter(threading.Event):
+    """stop-event voor watch=True: na n rondes stoppen."""
+
+    def __init__(self, rounds: int):
+        super().__init__()
+        self.rounds = rounds
+
+    def wait(self, timeout=None):
+        self.rounds -= 1
+        return self.rounds <= 0
+
+
+def _cert_pem(cn: str) -> str:
+    key = ec.generate_private_key(ec.SECP256R1())     # andere key dan de CSR
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, cn)])
+    now = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name).issuer_name(name).public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now).not_valid_after(now + timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    return cert.public_bytes(serialization.Encoding.PEM).decode("ascii")
+
+
+@pytest.fixture
+def batch(tmp_path, monkeypatch):
+    key = ec.generate_private_key(ec.SECP256R1())
+    csr = (
+        x509.CertificateSigningRequestBuilder()
+        .subject_name(x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, CN)]))
+        .sign(key, hashes.SHA256())
+    )
+    (tmp_path / f"{CN}.csr").write_bytes(csr.public_bytes(serialization.Encoding.PEM))
+    (tmp_path / f"{CN}.key.pem").write_bytes(key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption(),
+    ))
+    monkeypatch.setattr(dcb_org_export, "get_token_manager", lambda env: _Tokens())
+    return tmp_path
+
+
+def _stub_add(monkeypatch, answer):
+    calls = []
+
+    def fake_post(env, path, payload, token):
+        calls.append(path)
+        return answer()
+
+    monkeypatch.setattr(pipeline, "_post", fake_post)
+    return calls
+
+
+def _run(base_dir, **kwargs):
+    opts = pipeline.PipelineOptions(application_name="app", organization_code="OVO000001")
+    return pipeline.run_batch(base_dir, opts, env=SimpleNamespace(name="TEST"), poll=False, **kwargs)
+
+
+@pytest.mark.parametrize("answer", [
+    lambda: ({"certificate": _cert_pem(CN)}, None),                  # public key klopt niet
+    lambda: ({"status": "ok"}, None),                                # geen aanvraag-id
+    lambda: (None, "HTTP-fout bij add: Read timed out."),             # add mogelijk gelukt
+])
+def test_failure_after_add_is_never_resubmitted(batch, monkeypatch, answer):
+    calls = _stub_add(monkeypatch, answer)
+
+    counts = _run(batch, watch=True, stop=_StopAfter(5))
+    assert calls == ["application/certificate/add"]
+    assert counts == {pipeline.FAILED: 1}
+
+    _run(batch, retry_failed=True)
+    assert len(calls) == 1
+    assert not (batch / f"{CN}.cer").exists()
+
+
+def test_not_sent_is_resubmitted_only_with_retry_failed(batch, monkeypatch):
+    calls = _stub_add(monkeypatch, lambda: (None, pipeline.NotSent("Geen verbinding")))
+
+    _run(batch)
+    entry = pipeline.BatchState(batch).get(CN)
+    assert entry["status"] == pipeline.FAILED and entry["sent"] is False
+
+    _run(batch, watch=True, stop=_StopAfter(3))
+    assert len(calls) == 1
+
+    _run(batch, retry_failed=True)
+    assert len(calls) == 2
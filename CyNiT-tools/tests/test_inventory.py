@@ -0,0 +1,56 @@
+"""
+cynit_inventory.search: geen stille afkapping van de lijst, en korte
+zoektermen vinden ook tekst die enkel in de MD-inhoud staat.
+
+    python -m pytest CyNiT-tools/tests
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import cynit_inventory  # noqa: E402
+
+
+def _export(cn: str, note: str = "") -> str:
+    return (
+        f"# Certificaat {cn}\n\n"
+        f"**Bestand:** `{cn}.cer`\n\n"
+        "| Field | Value |\n|---|---|\n"
+        f"| Common Name | {cn} |\n"
+        f"| Subject | CN={cn} |\n"
+        f"\n{note}\n"
+    )
+
+
+@pytest.fixture(params=[True, False], ids=["fts5", "like"])
+def exports(request, tmp_path, monkeypatch):
+    exports_dir = tmp_path / "exports"
+    exports_dir.mkdir()
+    monkeypatch.setattr(cynit_inventory, "EXPORTS_DIR", exports_dir)
+    monkeypatch.setattr(cynit_inventory, "DB_PATH", tmp_path / "inventory.sqlite")
+    monkeypatch.setattr(cynit_inventory, "_LOCAL", threading.local())
+    monkeypatch.setattr(cynit_inventory, "_LAST_SYNC", {"dir_mtime": None, "at": 0.0})
+    # False: alsof FTS5 ontbreekt (gewone tekst-tabel + LIKE)
+    monkeypatch.setattr(cynit_inventory, "_FTS", {"enabled": None if request.param else False})
+    return exports_dir
+
+
+def test_search_returns_more_than_old_limit(exports):
+    for i in range(520):
+        (exports / f"cert{i:04d}.md").write_text(_export(f"host{i:04d}.example"), encoding="utf-8")
+
+    assert len(cynit_inventory.search()) == 520
+    assert len(cynit_inventory.search(limit=10)) == 10
+
+
+def test_short_query_matches_raw_text(exports):
+    (exports / "a.md").write_text(_export("a.example", note="Opmerking: Qz-sleutel"), encoding="utf-8")
+    (exports / "b.md").write_text(_export("b.example"), encoding="utf-8")
+
+    assert [row["name"] for row in cynit_inventory.search(q="qz")] == ["a.md"]
+    assert [row["name"] for row in cynit_inventory.search(q="qz-sleutel")] == ["a.md"]
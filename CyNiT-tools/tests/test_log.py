@@ -0,0 +1,44 @@
+"""
+cynit_log: booleans uit config-JSON en de teller van weggegooide records.
+
+    python -m pytest CyNiT-tools/tests
+"""
+
+import logging
+import queue
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import cynit_log  # noqa: E402
+
+
+@pytest.mark.parametrize("raw, expected", [
+    (False, False), ("false", False), ("Off", False), ("0", False), ("no", False),
+    (True, True), ("true", True), ("ON", True), (1, True),
+    ("misschien", True),                   # ongeldig -> default
+])
+def test_console_flag_parsing(raw, expected):
+    assert cynit_log.LogOptions.from_dict({"console": raw}).console is expected
+
+
+def test_dropped_counts_every_record_across_threads():
+    handler = cynit_log._DropQueueHandler(queue.Queue(maxsize=1))
+    record = logging.makeLogRecord({"msg": "x"})
+    threads, per_thread = 8, 2000
+
+    def spam():
+        for _ in range(per_thread):
+            handler.enqueue(record)
+
+    workers = [threading.Thread(target=spam) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+
+    assert handler.dropped == threads * per_thread - 1     # enkel het eerste record past
@@ -0,0 +1,61 @@
+"""
+cynit_metrics met CYNIT_METRICS_DIR: /metrics telt alle workers op, en een
+gestopte worker laat counters niet dalen.
+
+    python -m pytest CyNiT-tools/tests
+"""
+
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import cynit_metrics  # noqa: E402
+
+
+def _worker(requests: int, in_flight: int) -> dict:
+    """Snapshot zoals een andere worker die zou schrijven."""
+    reg = cynit_metrics.MetricsRegistry()
+    reg.counter("t_requests_total", "req", ["route"]).inc(requests, route="/x")
+    reg.gauge("t_in_flight", "in flight").inc(in_flight)
+    reg.gauge("t_tools_loaded", "tools", multiprocess_mode="max").set(7)
+    reg.histogram("t_seconds", "lat", buckets=(0.1, 1.0)).observe(0.5)
+    return reg.snapshot()
+
+
+def _value(text: str, sample: str) -> float:
+    match = re.search(rf"^{re.escape(sample)} (\S+)$", text, re.M)
+    assert match, f"{sample} ontbreekt in:\n{text}"
+    return float(match.group(1))
+
+
+def test_render_sums_workers_and_keeps_counters_of_dead_workers(tmp_path, monkeypatch):
+    monkeypatch.setenv(cynit_metrics.MULTIPROC_ENV, str(tmp_path))
+    for pid, (requests, in_flight) in {101: (3, 1), 102: (5, 2)}.items():
+        cynit_metrics._write(cynit_metrics._pid_file(tmp_path, pid), _worker(requests, in_flight))
+
+    text = cynit_metrics._collect(tmp_path).render()
+    assert _value(text, 't_requests_total{route="/x"}') == 8
+    assert _value(text, "t_in_flight") == 3
+    assert _value(text, "t_tools_loaded") == 7
+    assert _value(text, "t_seconds_count") == 2
+    assert _value(text, 't_seconds_bucket{le="1"}') == 2
+
+    cynit_metrics.mark_process_dead(101)
+    text = cynit_metrics._collect(tmp_path).render()
+    assert _value(text, 't_requests_total{route="/x"}') == 8     # daalt niet
+    assert _value(text, "t_seconds_count") == 2
+    assert _value(text, "t_in_flight") == 2                        # gauge van 101 vervallen
+    assert not cynit_metrics._pid_file(tmp_path, 101).exists()
+
+
+def test_render_includes_own_process(tmp_path, monkeypatch):
+    monkeypatch.setenv(cynit_metrics.MULTIPROC_ENV, str(tmp_path))
+    cynit_metrics._write(cynit_metrics._pid_file(tmp_path, 101), _worker(3, 0))
+    own = cynit_metrics.HTTP_REQUESTS.value(route="/t", method="GET", status="200")
+    cynit_metrics.HTTP_REQUESTS.inc(route="/t", method="GET", status="200")
+
+    text = cynit_metrics.render()
+    assert _value(text, 't_requests_total{route="/x"}') == 3
+    assert _value(text, 'cynit_tools_requests_total{route="/t",method="GET",status="200"}') == own + 1
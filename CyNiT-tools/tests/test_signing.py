@@ -0,0 +1,51 @@
+"""
+cynit_signing: de gecachete signer haalt de bench-ondergrens, en de
+kid-lookup werkt ook met een publieke JWK.
+
+    python -m pytest CyNiT-tools/tests
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import cynit_signing  # noqa: E402
+
+
+def test_bench_reaches_default_floor():
+    rates = cynit_signing.bench(seconds=0.1, batch=20)
+    cached = {label: rate for label, rate in rates.items() if label.endswith("cached")}
+    assert cached and min(cached.values()) >= cynit_signing.BENCH_MIN_RATE, rates
+
+
+def _write_jwk(path: Path, private: bool, **extra) -> dict:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk_dict = json.loads(RSAAlgorithm.to_jwk(key if private else key.public_key()))
+    jwk_dict.update(extra)
+    path.write_text(json.dumps(jwk_dict), encoding="utf-8")
+    return jwk_dict
+
+
+def test_jwk_ids_from_public_jwk(tmp_path):
+    path = tmp_path / "public.jwk"
+    _write_jwk(path, private=False, kid="client-123")
+
+    kid, thumbprint = cynit_signing.load_jwk_ids(path)
+    assert kid == "client-123"
+    assert thumbprint
+    with pytest.raises(ValueError):
+        cynit_signing.load_signing_key(path)            # signen vraagt wel 'd'
+
+
+def test_jwk_ids_match_private_key(tmp_path):
+    path = tmp_path / "private.jwk"
+    _write_jwk(path, private=True)
+
+    signing_key = cynit_signing.load_signing_key(path)
+    assert cynit_signing.load_jwk_ids(path) == ("", signing_key.thumbprint)
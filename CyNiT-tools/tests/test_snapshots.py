@@ -0,0 +1,77 @@
+"""
+dcb_org_export.fetch_with_snapshots: rijen uit de store enkel na een
+geslaagde API-call met het token; dcb_snapshots.cert_key zonder serienummer.
+
+    python -m pytest CyNiT-tools/tests
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import dcb_org_export  # noqa: E402
+import dcb_snapshots  # noqa: E402
+
+ENV = SimpleNamespace(name="TEST")
+ORGS = ["ORG1", "ORG2", "ORG3"]
+OPTS = dcb_org_export.FetchOptions(max_age_sec=900)
+
+
+def _rows(org):
+    return [{"serial_number": f"{org}-1", "status": "active"}]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(dcb_snapshots, "DB_PATH", tmp_path / "snapshots.sqlite")
+    for org in ORGS:
+        dcb_snapshots.save(ENV.name, org, _rows(org), fetched_at=1000.0 + int(org[-1]))
+    return tmp_path
+
+
+def _stub_fetch(monkeypatch, error=None):
+    calls = []
+
+    def fake(env, codes, token, **kwargs):
+        calls.append(list(codes))
+        if error is not None:
+            return {org: [] for org in codes}, {org: error for org in codes}
+        return {org: _rows(org) for org in codes}, {}
+
+    monkeypatch.setattr(dcb_org_export, "fetch_certificates_for_orgs", fake)
+    monkeypatch.setattr(dcb_snapshots, "stale", lambda env, codes, max_age: [])
+    return calls
+
+
+def test_fresh_store_still_checks_token_with_oldest_org(store, monkeypatch):
+    calls = _stub_fetch(monkeypatch)
+
+    results, errors, stats = dcb_org_export.fetch_with_snapshots(ENV, ORGS, "Bearer ok", options=OPTS)
+    assert calls == [["ORG1"]]
+    assert not errors
+    assert results == {org: _rows(org) for org in ORGS}
+    assert stats["cached"] == 2 and stats["fetched"] == 1
+
+
+def test_rejected_token_gets_nothing_from_store(store, monkeypatch):
+    _stub_fetch(monkeypatch, error=dcb_org_export.Unauthorized("401 Unauthorized"))
+
+    results, errors, stats = dcb_org_export.fetch_with_snapshots(ENV, ORGS, "Bearer fout", options=OPTS)
+    assert results == {org: [] for org in ORGS}
+    assert set(errors) == set(ORGS)
+    assert stats["cached"] == 0 and stats["fallback"] == 0
+
+
+def test_cert_key_falls_back_to_thumbprint_or_id():
+    base = {"application_name": "app", "type": "SSL", "start_date": "2026-01-01"}
+    one = dict(base, thumbprint="AB12")
+    two = dict(base, thumbprint="CD34")
+
+    assert dcb_snapshots.cert_key(one) != dcb_snapshots.cert_key(two)
+    assert dcb_snapshots.cert_key(dict(base, id=7)) == "id:7"
+    assert dcb_snapshots.cert_key(dict(one, serial_number="0A")) == "serial:0a"
+    assert dcb_snapshots.cert_key(base) == "app:app|SSL|2026-01-01"
@@ -0,0 +1,83 @@
+"""
+cynit_tls + /cert/tls: target-limiet en allowlist, enkel POST, en de keten
+via de publieke API vóór het interne _sslobj.
+
+    python -m pytest CyNiT-tools/tests
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import cert_viewer  # noqa: E402
+import cynit_theme  # noqa: E402
+import cynit_tls  # noqa: E402
+
+
+def test_parse_targets_caps_count():
+    text = "\n".join(f"host{i}.example" for i in range(4))
+    assert len(cynit_tls.parse_targets(text, max_targets=4)) == 4
+    with pytest.raises(ValueError):
+        cynit_tls.parse_targets(text, max_targets=3)
+
+
+@pytest.mark.parametrize("spec, ok", [
+    ("www.voorbeeld.be", True),
+    ("voorbeeld.be", False),
+    ("10.1.2.3:8443", True),
+    ("169.254.169.254", False),
+    ("[::1]:443", False),
+])
+def test_allowlist(spec, ok):
+    allow = ["*.voorbeeld.be", "10.0.0.0/8"]
+    assert cynit_tls.allowed(cynit_tls.parse_target(spec), allow) is ok
+    assert cynit_tls.allowed(cynit_tls.parse_target(spec), []) is True
+
+
+class _Cert:
+    def __init__(self, der):
+        self.der = der
+
+    def public_bytes(self, encoding):
+        return self.der
+
+
+def test_peer_chain_prefers_public_api():
+    tls = SimpleNamespace(
+        get_unverified_chain=lambda: [b"leaf", b"root"],
+        _sslobj=SimpleNamespace(get_unverified_chain=lambda: pytest.fail("intern pad gebruikt")),
+    )
+    assert cynit_tls._peer_chain(tls) == [b"leaf", b"root"]
+
+
+def test_peer_chain_private_fallback_then_leaf():
+    private = SimpleNamespace(_sslobj=SimpleNamespace(get_unverified_chain=lambda: [_Cert(b"leaf"), _Cert(b"ca")]))
+    assert cynit_tls._peer_chain(private) == [b"leaf", b"ca"]
+
+    bare = SimpleNamespace(getpeercert=lambda binary_form: b"leaf")
+    assert cynit_tls._peer_chain(bare) == [b"leaf"]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(cynit_tls, "fetch_many", lambda targets: pytest.fail("verbinding gemaakt"))
+    app = Flask(__name__)
+    app.secret_key = "test"
+    settings = dict(cynit_theme.load_settings(), tls_fetch={"allow": ["*.voorbeeld.be"], "max_targets": 2})
+    cert_viewer.register_web_routes(app, settings, tools=[])
+    return app.test_client()
+
+
+def test_cert_tls_rejects_get_and_unlisted_targets(client):
+    assert client.get("/cert/tls?target=169.254.169.254").status_code == 405
+
+    resp = client.post("/cert/tls", data={"targets": "169.254.169.254"})
+    assert "Niet toegestaan" in resp.get_data(as_text=True)
+
+    resp = client.post("/cert/tls", data={"targets": "a.voorbeeld.be\nb.voorbeeld.be\nc.voorbeeld.be"})
+    assert "Maximaal 2 targets" in resp.get_data(as_text=True)
@@ -6,10 +6,14 @@ VOICA1 device certificaten-tool voor CyNiT Tools.
 
 - Standalone web:  python voica1.py  -> http://127.0.0.1:5445/voica1
 - In CyNiT hub:    import voica1; voica1.register_web_routes(app, settings, tools, voica_cfg)
+- Stap 1b (optioneel): CSR's van de batch indienen bij DCBaaS en de .CER's
+  laten terugschrijven in de map (dcb_csr_pipeline, achtergrond-job).
 """
 
 from __future__ import annotations
 
+import json
+import re
 import string
 import secrets
 import subprocess
@@ -17,9 +21,12 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 
-from flask import Flask, request, render_template_string
+from flask import Flask, abort, jsonify, request
 import cynit_theme
+import cynit_config
+import cynit_jobs
 import cynit_layout
+import cynit_metrics
 
 # ===== CONFIG DEFAULTS (kunnen overschreven worden door voica_cfg) =====
 OPENSSL_BIN = "openssl"
@@ -27,6 +34,17 @@ PASS_LENGTH = 24         # wordt overschreven door voica_cfg["pass_length"] indi
 KEY_SIZE_DEFAULT = 2048  # idem door voica_cfg["default_key_size"]
 CERT_EXTS = (".cer", ".crt", ".pem")
 
+OPENSSL_CALLS = cynit_metrics.counter(
+    "cynit_tools_voica1_openssl_calls_total",
+    "Aantal openssl-aanroepen door VOICA1, per subcommando en resultaat.",
+    ["command", "result"],
+)
+OPENSSL_SECONDS = cynit_metrics.histogram(
+    "cynit_tools_voica1_openssl_duration_seconds",
+    "Duur van openssl-aanroepen door VOICA1 (seconden).",
+    ["command"],
+)
+
 
 # ===== HELPER FUNCTIES =====
 
@@ -36,7 +54,14 @@ class CommandError(Exception):
 
 
 def run_cmd(cmd, cwd=None) -> str:
-    result = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True)
+    command = cmd[1] if len(cmd) > 1 else str(cmd[0])
+    try:
+        with OPENSSL_SECONDS.time(command=command):
+            result = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True)
+    except Exception:
+        OPENSSL_CALLS.inc(command=command, result="error")
+        raise
+    OPENSSL_CALLS.inc(command=command, result="ok" if result.returncode == 0 else "error")
     if result.returncode != 0:
         raise CommandError(
             f"Commando gefaald: {' '.join(cmd)}\n"
@@ -112,16 +137,11 @@ def parse_cert_cn(cert_path: Path) -> Optional[str]:
     except CommandError:
         return None
 
-    line = out.strip()
-    if "CN=" not in line:
+    # oude openssl: "subject= /C=BE/CN=x", 1.1+/3.x: "subject=C = BE, CN = x"
+    match = re.search(r"CN\s*=\s*([^,/\n]+)", out)
+    if not match:
         return None
-    idx = line.find("CN=")
-    cn_part = line[idx + 3:]
-    slash = cn_part.find("/")
-    if slash != -1:
-        cn_part = cn_part[:slash]
-    cn_part = cn_part.strip()
-    return cn_part or None
+    return match.group(1).strip() or None
 
 
 def map_certs_by_cn(base_dir: Path) -> Dict[str, Path]:
@@ -325,13 +345,16 @@ def render_template_text(template: str, devices: str, password: str) -> str:
 
 def register_web_routes(app: Flask, settings: dict, tools=None, voica_cfg=None) -> None:
     """
-    Registreert /voica1 en /voica1/process in een bestaande Flask-app.
+    Registreert /voica1, /voica1/process en /voica1/dcbaas in een bestaande Flask-app.
     Gebruikt cynit_layout header/footer/wafel/menu en kleuren uit settings.
     """
     global OPENSSL_BIN, PASS_LENGTH, KEY_SIZE_DEFAULT
 
     if voica_cfg is None:
-        voica_cfg = {}
+        # via de hub (lazy plugin): config/voica1.json uit de config-snapshot
+        voica_cfg = cynit_config.current().get("voica1.json")
+        if not isinstance(voica_cfg, dict):
+            voica_cfg = {}
 
     # overrides uit config/voica1.json
     OPENSSL_BIN = voica_cfg.get("openssl_bin", OPENSSL_BIN)
@@ -354,263 +377,319 @@ def register_web_routes(app: Flask, settings: dict, tools=None, voica_cfg=None)
 
     messages_path = Path(__file__).parent / "config" / "voica1_messages.md"
 
-    base_css = cynit_layout.common_css(settings)
-    common_js = cynit_layout.common_js()
-
-    colors_cfg = settings.get("colors", {})
-    accent_bg = colors_cfg.get("button_bg", "#facc15")
-    accent_fg = colors_cfg.get("button_fg", "#000000")
-
-    extra_css = f"""
-.card {{
-  max-width: 1000px;
-  margin: 0 auto 20px auto;
-  background: #1e1e1e;
-  padding: 20px;
-  border-radius: 16px;
-  box-shadow: 0 10px 30px rgba(0,0,0,0.6);
-}}
-label {{ display:block; margin-top:12px; font-weight:600; }}
-input[type=text], textarea, select {{
-  width:100%; padding:8px 10px;
-  border-radius:8px; border:1px solid #444;
-  background:#111; color:#eee;
-}}
-textarea {{ min-height:80px; font-family:monospace; }}
-.btn {{
-  display:inline-block;
-  margin-top:16px;
-  padding:8px 16px;
-  border-radius:999px;
-  border:none;
-  background: {accent_bg};
-  color: {accent_fg};
-  font-weight:700;
-  cursor:pointer;
-}}
-.btn:hover {{
-  filter: brightness(1.05);
-}}
-#progress-container {{
-  width:100%;
-  height:10px;
-  border-radius:999px;
-  background:#111;
-  overflow:hidden;
-  margin:8px 0 4px 0;
-}}
-#progress-bar {{
-  height:100%;
-  width:0%;
-  background:{accent_fg};
-  transition: width 0.3s ease-out;
-}}
-.muted {{ color:#aaa; font-size:0.9em; }}
-.flash {{ background:#7f1d1d; color:#fecaca;
-         padding:8px 12px; border-radius:8px; margin-bottom:8px; }}
-.ok {{ color:#bbf7d0; }}
-.err {{ color:#fecaca; }}
-"""
+    def _build_page(settings: dict, tools) -> str:
+        """Pagina-template met layout/kleuren uit de huidige settings."""
+        base_css = cynit_layout.common_css(settings)
+        common_js = cynit_layout.common_js()
+
+        colors_cfg = settings.get("colors", {})
+        accent_bg = colors_cfg.get("button_bg", "#facc15")
+        accent_fg = colors_cfg.get("button_fg", "#000000")
+
+        extra_css = f"""
+    .card {{
+      max-width: 1000px;
+      margin: 0 auto 20px auto;
+      background: #1e1e1e;
+      padding: 20px;
+      border-radius: 16px;
+      box-shadow: 0 10px 30px rgba(0,0,0,0.6);
+    }}
+    label {{ display:block; margin-top:12px; font-weight:600; }}
+    input[type=text], textarea, select {{
+      width:100%; padding:8px 10px;
+      border-radius:8px; border:1px solid #444;
+      background:#111; color:#eee;
+    }}
+    textarea {{ min-height:80px; font-family:monospace; }}
+    .btn {{
+      display:inline-block;
+      margin-top:16px;
+      padding:8px 16px;
+      border-radius:999px;
+      border:none;
+      background: {accent_bg};
+      color: {accent_fg};
+      font-weight:700;
+      cursor:pointer;
+    }}
+    .btn:hover {{
+      filter: brightness(1.05);
+    }}
+    #progress-container {{
+      width:100%;
+      height:10px;
+      border-radius:999px;
+      background:#111;
+      overflow:hidden;
+      margin:8px 0 4px 0;
+    }}
+    #progress-bar {{
+      height:100%;
+      width:0%;
+      background:{accent_fg};
+      transition: width 0.3s ease-out;
+    }}
+    .muted {{ color:#aaa; font-size:0.9em; }}
+    .flash {{ background:#7f1d1d; color:#fecaca;
+             padding:8px 12px; border-radius:8px; margin-bottom:8px; }}
+    .ok {{ color:#bbf7d0; }}
+    .err {{ color:#fecaca; }}
+    """
 
-    js_helpers = """
-async function copyText(id) {
-  const el = document.getElementById(id);
-  if (!el) return;
-  const txt = el.value;
-  try {
-    await navigator.clipboard.writeText(txt);
-  } catch (e) {
-    el.select();
-    document.execCommand("copy");
-  }
-}
-
-function updatePwText() {
-  const kanaal = document.querySelector('input[name="kanaal"]:checked');
-  if (!kanaal) return;
-  const v = kanaal.value;
-  const ots = {{ ots_text | tojson }};
-  const wa = {{ wa_text | tojson }};
-  const sig = {{ signal_text | tojson }};
-  const el = document.getElementById("pw_text");
-  if (!el) return;
-  if (v === "OTS") el.value = ots;
-  else if (v === "WA") el.value = wa;
-  else el.value = sig;
-}
-
-function initProgress() {
-  const container = document.getElementById("progress-container");
-  const bar = document.getElementById("progress-bar");
-  const text = document.getElementById("progress-text");
-  if (!container || !bar || !text) return;
-  const total = parseInt(container.getAttribute("data-total") || "0");
-  const processed = parseInt(container.getAttribute("data-processed") || "0");
-  if (!total) return;
-  text.textContent = processed + "/" + total + " devices verwerkt";
-  let current = 0;
-  const target = Math.round((processed / total) * 100);
-  const interval = setInterval(function() {
-    current += 5;
-    if (current >= target) {
-      current = target;
-      clearInterval(interval);
+        js_helpers = """
+    async function copyText(id) {
+      const el = document.getElementById(id);
+      if (!el) return;
+      const txt = el.value;
+      try {
+        await navigator.clipboard.writeText(txt);
+      } catch (e) {
+        el.select();
+        document.execCommand("copy");
+      }
     }
-    bar.style.width = current + "%";
-  }, 30);
-}
-
-document.addEventListener("DOMContentLoaded", function() {
-  initProgress();
-  updatePwText();
-});
-"""
 
-    header = cynit_layout.header_html(
-        settings,
-        tools=tools,
-        title="CyNiT VOICA1 Device Certs",
-        right_html="",
-    )
-    footer = cynit_layout.footer_html()
-
-    page_template = (
-        "<!doctype html>\n"
-        "<html lang='nl'>\n"
-        "<head>\n"
-        "  <meta charset='utf-8'>\n"
-        "  <title>CyNiT VOICA1 Tool</title>\n"
-        "  <style>\n"
-        f"{base_css}\n{extra_css}\n"
-        "  </style>\n"
-        "  <script>\n"
-        f"{common_js}\n{js_helpers}\n"
-        "  </script>\n"
-        "</head>\n"
-        "<body>\n"
-        f"{header}\n"
-        "<div class='page'>\n"
-        "{% if error %}<div class='flash'>{{ error }}</div>{% endif %}\n"
-        "<div class='card'>\n"
-        "  <h1>VOICA1 Device certificaten</h1>\n"
-        "  <p class='muted'>Per device een eigen key + CSR. "
-        "Phones → gecombineerde PEM + ZIP, PCs/VMs → PKCS#12 .p12.</p>\n"
-        "  <form method='post' action='{{ url_for(\"voica1_generate\") }}'>\n"
-        "    <label>Map (volledig pad)</label>\n"
-        "    <input type='text' name='base_dir' value='{{ base_dir or \"\" }}' required>\n"
-        "    <label>Type devices</label>\n"
-        "    <select name='device_type'>\n"
-        "      <option value='pc' {% if device_type == 'pc' %}selected{% endif %}>"
-        "PC / VM (*.alfa.top.vlaanderen.be)</option>\n"
-        "      <option value='ip_phone' {% if device_type == 'ip_phone' %}selected{% endif %}>"
-        "IP-telefoon (Pxxxxx@gidphones.vlaanderen.be)</option>\n"
-        "    </select>\n"
-        "    <label>Key size</label>\n"
-        "    <label><input type='radio' name='key_size' value='2048' "
-        "{% if key_size == 2048 %}checked{% endif %}> 2048 bits</label>\n"
-        "    <label><input type='radio' name='key_size' value='4096' "
-        "{% if key_size == 4096 %}checked{% endif %}> 4096 bits</label>\n"
-        "    <label>Devices (één per lijn)</label>\n"
-        "    <textarea name='devices' "
-        "placeholder='S343880&#10;VM123456&#10;P602233'>{{ devices_input or \"\" }}</textarea>\n"
-        "    <p class='muted'>PCs/VMs: S-nummer / VM-naam / M-naam / 7 cijfers. "
-        "Phones: P-nummer (domein wordt automatisch toegevoegd).</p>\n"
-        "    <button type='submit' class='btn'>Stap 1 – Maak keys &amp; CSRs</button>\n"
-        "  </form>\n"
-        "</div>\n"
-        "{% if step1_done %}\n"
-        "<div class='card'>\n"
-        "  <h2>Stap 1 – Resultaat</h2>\n"
-        "  <p><strong>Map:</strong> {{ base_dir }}</p>\n"
-        "  <p><strong>Type:</strong> "
-        "{% if device_type == 'pc' %}PC / .p12{% else %}IP-telefoon / .pem + ZIP{% endif %}</p>\n"
-        "  <p><strong>Key size:</strong> {{ key_size }} bits</p>\n"
-        "  <h3>Batch-wachtwoord</h3>\n"
-        "  <textarea id='pwd' rows='1' readonly>{{ password }}</textarea>\n"
-        "  <button type='button' class='btn' onclick='copyText(\"pwd\")'>Kopieer wachtwoord</button>\n"
-        "  <h3>Devices</h3>\n"
-        "  <ul>\n"
-        "  {% for d in devices_list %}\n"
-        "    <li>{{ d }} → CN: {{ cns[d] }}</li>\n"
-        "  {% endfor %}\n"
-        "  </ul>\n"
-        "  <h3>Devices-string</h3>\n"
-        "  <textarea id='devs' rows='2' readonly>{{ devices_str }}</textarea>\n"
-        "  <button type='button' class='btn' onclick='copyText(\"devs\")'>Kopieer devices-string</button>\n"
-        "  <p class='muted'>In de map staan nu per device "
-        "<code>CN.key.pem</code> en <code>CN.csr</code> (PEM). "
-        "Gebruik deze CSR's in AEG en sla de .CER per device in dezelfde map op.</p>\n"
-        "  <form method='post' action='{{ url_for(\"voica1_process\") }}'>\n"
-        "    <input type='hidden' name='base_dir' value='{{ base_dir }}'>\n"
-        "    <input type='hidden' name='device_type' value='{{ device_type }}'>\n"
-        "    <input type='hidden' name='key_size' value='{{ key_size }}'>\n"
-        "    <input type='hidden' name='devices' value='{{ devices_hidden }}'>\n"
-        "    <input type='hidden' name='password' value='{{ password }}'>\n"
-        "    <button type='submit' class='btn'>Stap 2 – Verwerk certificaten</button>\n"
-        "  </form>\n"
-        "</div>\n"
-        "{% endif %}\n"
-        "{% if step2_done %}\n"
-        "<div class='card'>\n"
-        "  <h2>Stap 2 – Verwerking</h2>\n"
-        "  <p><strong>Map:</strong> {{ base_dir }}</p>\n"
-        "  <div id='progress-container' data-total='{{ results|length }}' "
-        "data-processed='{{ results|length }}'>\n"
-        "    <div id='progress-bar'></div>\n"
-        "  </div>\n"
-        "  <p id='progress-text' class='muted'></p>\n"
-        "  <h3>Resultaten per device</h3>\n"
-        "  <ul>\n"
-        "  {% for r in results %}\n"
-        "    <li>{% if r.ok %}<span class='ok'>[OK]</span>{% else %}"
-        "<span class='err'>[FOUT]</span>{% endif %} "
-        "{{ r.device }} – {{ r.message }}</li>\n"
-        "  {% endfor %}\n"
-        "  </ul>\n"
-        "  {% if missing_certs %}\n"
-        "  <h3>Ontbrekende certificaten</h3>\n"
-        "  <p class='err'>Voor de volgende devices werd geen .CER/.CRT/.PEM gevonden in de map:</p>\n"
-        "  <ul>\n"
-        "  {% for mc in missing_certs %}\n"
-        "    <li>{{ mc.device }} → CN: {{ mc.cn }}</li>\n"
-        "  {% endfor %}\n"
-        "  </ul>\n"
-        "  {% endif %}\n"
-        "  {% if zip_path %}\n"
-        "  <h3>ZIP-bestand (phones)</h3>\n"
-        "  <p>{{ zip_path }}</p>\n"
-        "  <p class='muted'>Naam = mapnaam. Wachtwoord = batch-wachtwoord.</p>\n"
-        "  {% endif %}\n"
-        "  <hr>\n"
-        "  <h3>Certificatenmail (certmail)</h3>\n"
-        "  <textarea id='certmail' rows='8' readonly>{{ certmail_text }}</textarea>\n"
-        "  <button type='button' class='btn' onclick='copyText(\"certmail\")'>"
-        "Kopieer cert-mail</button>\n"
-        "  <h3 style='margin-top:20px;'>Wachtwoordkanaal</h3>\n"
-        "  <p class='muted'>Kies OTS / WhatsApp / Signal en kopieer de tekst.</p>\n"
-        "  <label><input type='radio' name='kanaal' value='OTS' checked "
-        "onchange='updatePwText()'> OTS</label>\n"
-        "  <label><input type='radio' name='kanaal' value='WA' onchange='updatePwText()'> "
-        "WhatsApp</label>\n"
-        "  <label><input type='radio' name='kanaal' value='SIGNAL' onchange='updatePwText()'> "
-        "Signal</label>\n"
-        "  <textarea id='pw_text' rows='10' readonly "
-        "style='margin-top:8px;'></textarea>\n"
-        "  <button type='button' class='btn' onclick='copyText(\"pw_text\")'>"
-        "Kopieer wachtwoordtekst</button>\n"
-        "  <p class='muted' style='margin-top:16px;'>Teksten komen uit "
-        "<code>config/voica1_messages.md</code> (blocks CERTMAIL / OTS / WA / SIGNAL) "
-        "met automatisch ingevulde devices en wachtwoord.</p>\n"
-        "</div>\n"
-        "{% endif %}\n"
-        "</div>\n"
-        f"{footer}\n"
-        "</body>\n"
-        "</html>\n"
-    )
+    function updatePwText() {
+      const kanaal = document.querySelector('input[name="kanaal"]:checked');
+      if (!kanaal) return;
+      const v = kanaal.value;
+      const ots = {{ ots_text | tojson }};
+      const wa = {{ wa_text | tojson }};
+      const sig = {{ signal_text | tojson }};
+      const el = document.getElementById("pw_text");
+      if (!el) return;
+      if (v === "OTS") el.value = ots;
+      else if (v === "WA") el.value = wa;
+      else el.value = sig;
+    }
+
+    function initProgress() {
+      const container = document.getElementById("progress-container");
+      const bar = document.getElementById("progress-bar");
+      const text = document.getElementById("progress-text");
+      if (!container || !bar || !text) return;
+      const total = parseInt(container.getAttribute("data-total") || "0");
+      const processed = parseInt(container.getAttribute("data-processed") || "0");
+      if (!total) return;
+      text.textContent = processed + "/" + total + " devices verwerkt";
+      let current = 0;
+      const target = Math.round((processed / total) * 100);
+      const interval = setInterval(function() {
+        current += 5;
+        if (current >= target) {
+          current = target;
+          clearInterval(interval);
+        }
+        bar.style.width = current + "%";
+      }, 30);
+    }
+
+    document.addEventListener("DOMContentLoaded", function() {
+      initProgress();
+      updatePwText();
+    });
+    """
+
+        header = cynit_layout.header_html(
+            settings,
+            tools=tools,
+            title="CyNiT VOICA1 Device Certs",
+            right_html="",
+        )
+        footer = cynit_layout.footer_html()
+
+        page_template = (
+            "<!doctype html>\n"
+            "<html lang='nl'>\n"
+            "<head>\n"
+            "  <meta charset='utf-8'>\n"
+            "  <title>CyNiT VOICA1 Tool</title>\n"
+            "  <style>\n"
+            f"{base_css}\n{extra_css}\n"
+            "  </style>\n"
+            "  <script>\n"
+            f"{common_js}\n{js_helpers}\n"
+            "  </script>\n"
+            "</head>\n"
+            "<body>\n"
+            f"{header}\n"
+            "<div class='page'>\n"
+            "{% if error %}<div class='flash'>{{ error }}</div>{% endif %}\n"
+            "<div class='card'>\n"
+            "  <h1>VOICA1 Device certificaten</h1>\n"
+            "  <p class='muted'>Per device een eigen key + CSR. "
+            "Phones → gecombineerde PEM + ZIP, PCs/VMs → PKCS#12 .p12.</p>\n"
+            "  <form method='post' action='{{ url_for(\"voica1_generate\") }}'>\n"
+            "    <label>Map (volledig pad)</label>\n"
+            "    <input type='text' name='base_dir' value='{{ base_dir or \"\" }}' required>\n"
+            "    <label>Type devices</label>\n"
+            "    <select name='device_type'>\n"
+            "      <option value='pc' {% if device_type == 'pc' %}selected{% endif %}>"
+            "PC / VM (*.alfa.top.vlaanderen.be)</option>\n"
+            "      <option value='ip_phone' {% if device_type == 'ip_phone' %}selected{% endif %}>"
+            "IP-telefoon (Pxxxxx@gidphones.vlaanderen.be)</option>\n"
+            "    </select>\n"
+            "    <label>Key size</label>\n"
+            "    <label><input type='radio' name='key_size' value='2048' "
+            "{% if key_size == 2048 %}checked{% endif %}> 2048 bits</label>\n"
+            "    <label><input type='radio' name='key_size' value='4096' "
+            "{% if key_size == 4096 %}checked{% endif %}> 4096 bits</label>\n"
+            "    <label>Devices (één per lijn)</label>\n"
+            "    <textarea name='devices' "
+            "placeholder='S343880&#10;VM123456&#10;P602233'>{{ devices_input or \"\" }}</textarea>\n"
+            "    <p class='muted'>PCs/VMs: S-nummer / VM-naam / M-naam / 7 cijfers. "
+            "Phones: P-nummer (domein wordt automatisch toegevoegd).</p>\n"
+            "    <button type='submit' class='btn'>Stap 1 – Maak keys &amp; CSRs</button>\n"
+            "  </form>\n"
+            "</div>\n"
+            "{% if step1_done %}\n"
+            "<div class='card'>\n"
+            "  <h2>Stap 1 – Resultaat</h2>\n"
+            "  <p><strong>Map:</strong> {{ base_dir }}</p>\n"
+            "  <p><strong>Type:</strong> "
+            "{% if device_type == 'pc' %}PC / .p12{% else %}IP-telefoon / .pem + ZIP{% endif %}</p>\n"
+            "  <p><strong>Key size:</strong> {{ key_size }} bits</p>\n"
+            "  <h3>Batch-wachtwoord</h3>\n"
+            "  <textarea id='pwd' rows='1' readonly>{{ password }}</textarea>\n"
+            "  <button type='button' class='btn' onclick='copyText(\"pwd\")'>Kopieer wachtwoord</button>\n"
+            "  <h3>Devices</h3>\n"
+            "  <ul>\n"
+            "  {% for d in devices_list %}\n"
+            "    <li>{{ d }} → CN: {{ cns[d] }}</li>\n"
+            "  {% endfor %}\n"
+            "  </ul>\n"
+            "  <h3>Devices-string</h3>\n"
+            "  <textarea id='devs' rows='2' readonly>{{ devices_str }}</textarea>\n"
+            "  <button type='button' class='btn' onclick='copyText(\"devs\")'>Kopieer devices-string</button>\n"
+            "  <p class='muted'>In de map staan nu per device "
+            "<code>CN.key.pem</code> en <code>CN.csr</code> (PEM). "
+            "Gebruik deze CSR's in AEG en sla de .CER per device in dezelfde map op, "
+            "of laat ze via DCBaaS indienen: de uitgereikte certificaten komen dan "
+            "vanzelf als <code>CN.cer</code> in de map.</p>\n"
+            "  <form method='post' action='{{ url_for(\"voica1_dcbaas\") }}'>\n"
+            "    <input type='hidden' name='base_dir' value='{{ base_dir }}'>\n"
+            "    <input type='hidden' name='device_type' value='{{ device_type }}'>\n"
+            "    <input type='hidden' name='key_size' value='{{ key_size }}'>\n"
+            "    <input type='hidden' name='devices' value='{{ devices_hidden }}'>\n"
+            "    <input type='hidden' name='password' value='{{ password }}'>\n"
+            "    <button type='submit' class='btn'>Stap 1b – CSR's indienen bij DCBaaS</button>\n"
+            "  </form>\n"
+            "  {% if dcbaas_job %}\n"
+            "  <h3>DCBaaS</h3>\n"
+            "  <p class='muted'>Job {{ dcbaas_job.id }}: "
+            "<span id='dcbaas-status'>{{ dcbaas_job.message }}</span></p>\n"
+            "  <ul id='dcbaas-items'>\n"
+            "  {% for cn, st in dcbaas_job['items'].items() %}<li>{{ cn }} – {{ st }}</li>{% endfor %}\n"
+            "  </ul>\n"
+            "  <script>\n"
+            "  (function poll() {\n"
+            "    fetch('{{ url_for(\"voica1_dcbaas_status\", job_id=dcbaas_job.id) }}')\n"
+            "      .then(r => r.json()).then(job => {\n"
+            "        document.getElementById('dcbaas-status').textContent =\n"
+            "          job.message + ' (' + job.done + '/' + job.total + ')' + (job.error ? ' – ' + job.error : '');\n"
+            "        const ul = document.getElementById('dcbaas-items');\n"
+            "        ul.innerHTML = '';\n"
+            "        for (const [cn, st] of Object.entries(job.items)) {\n"
+            "          const li = document.createElement('li');\n"
+            "          li.textContent = cn + ' – ' + st;\n"
+            "          ul.appendChild(li);\n"
+            "        }\n"
+            "        if (job.status === 'queued' || job.status === 'running') setTimeout(poll, 3000);\n"
+            "      });\n"
+            "  })();\n"
+            "  </script>\n"
+            "  {% endif %}\n"
+            "  <form method='post' action='{{ url_for(\"voica1_process\") }}'>\n"
+            "    <input type='hidden' name='base_dir' value='{{ base_dir }}'>\n"
+            "    <input type='hidden' name='device_type' value='{{ device_type }}'>\n"
+            "    <input type='hidden' name='key_size' value='{{ key_size }}'>\n"
+            "    <input type='hidden' name='devices' value='{{ devices_hidden }}'>\n"
+            "    <input type='hidden' name='password' value='{{ password }}'>\n"
+            "    <button type='submit' class='btn'>Stap 2 – Verwerk certificaten</button>\n"
+            "  </form>\n"
+            "</div>\n"
+            "{% endif %}\n"
+            "{% if step2_done %}\n"
+            "<div class='card'>\n"
+            "  <h2>Stap 2 – Verwerking</h2>\n"
+            "  <p><strong>Map:</strong> {{ base_dir }}</p>\n"
+            "  <div id='progress-container' data-total='{{ results|length }}' "
+            "data-processed='{{ results|length }}'>\n"
+            "    <div id='progress-bar'></div>\n"
+            "  </div>\n"
+            "  <p id='progress-text' class='muted'></p>\n"
+            "  <h3>Resultaten per device</h3>\n"
+            "  <ul>\n"
+            "  {% for r in results %}\n"
+            "    <li>{% if r.ok %}<span class='ok'>[OK]</span>{% else %}"
+            "<span class='err'>[FOUT]</span>{% endif %} "
+            "{{ r.device }} – {{ r.message }}</li>\n"
+            "  {% endfor %}\n"
+            "  </ul>\n"
+            "  {% if missing_certs %}\n"
+            "  <h3>Ontbrekende certificaten</h3>\n"
+            "  <p class='err'>Voor de volgende devices werd geen .CER/.CRT/.PEM gevonden in de map:</p>\n"
+            "  <ul>\n"
+            "  {% for mc in missing_certs %}\n"
+            "    <li>{{ mc.device }} → CN: {{ mc.cn }}</li>\n"
+            "  {% endfor %}\n"
+            "  </ul>\n"
+            "  {% endif %}\n"
+            "  {% if zip_path %}\n"
+            "  <h3>ZIP-bestand (phones)</h3>\n"
+            "  <p>{{ zip_path }}</p>\n"
+            "  <p class='muted'>Naam = mapnaam. Wachtwoord = batch-wachtwoord.</p>\n"
+            "  {% endif %}\n"
+            "  <hr>\n"
+            "  <h3>Certificatenmail (certmail)</h3>\n"
+            "  <textarea id='certmail' rows='8' readonly>{{ certmail_text }}</textarea>\n"
+            "  <button type='button' class='btn' onclick='copyText(\"certmail\")'>"
+            "Kopieer cert-mail</button>\n"
+            "  <h3 style='margin-top:20px;'>Wachtwoordkanaal</h3>\n"
+            "  <p class='muted'>Kies OTS / WhatsApp / Signal en kopieer de tekst.</p>\n"
+            "  <label><input type='radio' name='kanaal' value='OTS' checked "
+            "onchange='updatePwText()'> OTS</label>\n"
+            "  <label><input type='radio' name='kanaal' value='WA' onchange='updatePwText()'> "
+            "WhatsApp</label>\n"
+            "  <label><input type='radio' name='kanaal' value='SIGNAL' onchange='updatePwText()'> "
+            "Signal</label>\n"
+            "  <textarea id='pw_text' rows='10' readonly "
+            "style='margin-top:8px;'></textarea>\n"
+            "  <button type='button' class='btn' onclick='copyText(\"pw_text\")'>"
+            "Kopieer wachtwoordtekst</button>\n"
+            "  <p class='muted' style='margin-top:16px;'>Teksten komen uit "
+            "<code>config/voica1_messages.md</code> (blocks CERTMAIL / OTS / WA / SIGNAL) "
+            "met automatisch ingevulde devices en wachtwoord.</p>\n"
+            "</div>\n"
+            "{% endif %}\n"
+            "</div>\n"
+            f"{footer}\n"
+            "</body>\n"
+            "</html>\n"
+        )
+        return page_template
+
+    page_template = _build_page(settings, tools)
+
+    def apply_config(snapshot) -> None:
+        """cynit_config-subscriber: layout en voica1.json live bijwerken."""
+        nonlocal settings, tools, voica_cfg, page_template
+        global OPENSSL_BIN, PASS_LENGTH, KEY_SIZE_DEFAULT
+        settings = snapshot.settings
+        tools = snapshot.tools
+        new_cfg = snapshot.get("voica1.json")
+        if isinstance(new_cfg, dict):
+            voica_cfg = new_cfg
+            OPENSSL_BIN = voica_cfg.get("openssl_bin", OPENSSL_BIN)
+            PASS_LENGTH = int(voica_cfg.get("pass_length", PASS_LENGTH))
+            KEY_SIZE_DEFAULT = int(voica_cfg.get("default_key_size", KEY_SIZE_DEFAULT))
+        page_template = _build_page(settings, tools)
+
+    cynit_config.subscribe(apply_config, name="voica1")
 
     def _render(**ctx):
-        return render_template_string(page_template, tools=tools, **ctx)
+        return cynit_layout.render_page(page_template, tools=tools, **ctx)
 
     @app.route("/voica1", methods=["GET"])
     def voica1_index():
@@ -828,6 +907,77 @@ document.addEventListener("DOMContentLoaded", function() {
             missing_certs=missing_certs,
         )
 
+    # --- stap 1b: CSR's indienen bij DCBaaS (achtergrond-job) ---
+
+    dcbaas_jobs = cynit_jobs.JobQueue("voica1_dcbaas", workers=2)
+
+    @app.route("/voica1/dcbaas", methods=["POST"])
+    def voica1_dcbaas():
+        import dcb_csr_pipeline      # lazy: importeert zelf voica1
+
+        base_dir = Path((request.form.get("base_dir") or "").strip())
+        device_type = request.form.get("device_type") or "pc"
+        devices_hidden = request.form.get("devices") or ""
+        password = request.form.get("password") or ""
+        try:
+            key_size = int(request.form.get("key_size") or KEY_SIZE_DEFAULT)
+        except ValueError:
+            key_size = KEY_SIZE_DEFAULT
+        devices = [line.strip() for line in devices_hidden.splitlines() if line.strip()]
+        cns = {d: build_cn(d, device_type) for d in devices}
+
+        error = None
+        job = None
+        opts = dcb_csr_pipeline.load_options(voica_cfg)
+        if not base_dir.is_dir():
+            error = f"Map bestaat niet: {base_dir}"
+        elif not (opts.application_name and opts.organization_code):
+            error = "Vul dcbaas.application_name en dcbaas.organization_code in config/voica1.json in."
+        else:
+            def run(ctx: cynit_jobs.JobContext):
+                ctx.message("CSR's indienen en certificaten opvolgen")
+                counts = dcb_csr_pipeline.run_batch(
+                    base_dir, opts, progress=lambda cn, text, ok: ctx.item(cn, text, ok),
+                )
+                ctx.message(", ".join(f"{n} {status}" for status, n in counts.items()))
+                data = json.dumps({"base_dir": str(base_dir), "counts": counts}, indent=2)
+                return data.encode("utf-8"), f"dcbaas_{base_dir.name}.json"
+
+            job = dcbaas_jobs.submit(
+                "voica1_dcbaas", f"{base_dir.name}: {len(cns)} CSR's", run,
+                keys=cns.values(), meta={"base_dir": str(base_dir)},
+            ).to_dict()
+
+        return _render(
+            error=error,
+            base_dir=str(base_dir),
+            device_type=device_type,
+            key_size=key_size,
+            devices_input="\n".join(devices),
+            devices_hidden=devices_hidden,
+            step1_done=True,
+            step2_done=False,
+            devices_list=devices,
+            cns=cns,
+            devices_str=build_devices_string(devices),
+            password=password,
+            results=[],
+            zip_path=None,
+            certmail_text="",
+            ots_text="",
+            wa_text="",
+            signal_text="",
+            missing_certs=[],
+            dcbaas_job=job,
+        )
+
+    @app.route("/voica1/dcbaas/<job_id>")
+    def voica1_dcbaas_status(job_id: str):
+        job = dcbaas_jobs.get(job_id)
+        if job is None:
+            abort(404)
+        return jsonify(job.to_dict())
+
 
 # ===== STANDALONE RUN =====
 
@@ -838,8 +988,6 @@ if __name__ == "__main__":
     tools = tools_cfg.get("tools", [])
 
     # voica-config uit config/voica1.json
-    import json
-
     cfg_path = Path(__file__).parent / "config" / "voica1.json"
     if cfg_path.exists():
         voica_cfg = json.loads(cfg_path.read_text(encoding="utf-8"))
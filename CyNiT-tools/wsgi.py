@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""
+wsgi.py
+
+WSGI entrypoint voor CyNiT Tools (productie).
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+    waitress-serve --listen=0.0.0.0:5000 --threads=8 wsgi:application
+
+Registreert alle tool-routes via ctools.init_app().
+"""
+
+from __future__ import annotations
+
+import ctools
+
+application = ctools.init_app()
+app = application  # alias voor tools die 'wsgi:app' verwachten
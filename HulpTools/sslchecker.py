@@ -3,76 +3,87 @@ from tkinter import filedialog, messagebox, ttk
 import subprocess
 import os
 import threading
+import sys
+from pathlib import Path
+
+# Gedeelde TLS-fetcher uit CyNiT-tools (geen openssl.exe meer nodig)
+CYNIT_TOOLS_DIR = Path(__file__).resolve().parent.parent / "CyNiT-tools"
+if str(CYNIT_TOOLS_DIR) not in sys.path:
+    sys.path.insert(0, str(CYNIT_TOOLS_DIR))
+import cynit_tls  # noqa: E402
 
 def fetch_certificate():
-    servername = entry.get().strip()
-    if not servername:
+    target_text = entry.get().strip()
+    if not target_text:
         messagebox.showerror("Fout", "Voer een geldige servernaam in.")
         print("[FOUT] Geen servernaam ingevoerd.")
         return
-    
-    # OpenSSL command with full path and -ign_eof to ignore EOF errors
-    command = [
-        "C:\\openssl\\x64\\bin\\openssl.exe", "s_client", 
-        "-connect", f"{servername}:443",
-        "-servername", servername,
-        "-showcerts",
-        "-ign_eof"
-    ]
-    
-    print(f"[INFO] OpenSSL commando wordt uitgevoerd: {' '.join(command)}")
-    
+
+    try:
+        target = cynit_tls.parse_target(target_text)
+    except ValueError as e:
+        messagebox.showerror("Fout", f"Ongeldige servernaam: {e}")
+        return
+
+    print(f"[INFO] TLS-keten ophalen bij {target.label} (SNI: {target.sni or '-'})")
+
     # Show progress bar
     progress_bar.pack(pady=10)
     progress_bar.start(10)
-    
+
     def run_command():
         try:
-            # Run the OpenSSL command and capture output
-            result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=None)
-            
-            print(f"[INFO] OpenSSL commando uitgevoerd met returncode: {result.returncode}")
-            
-            if result.returncode != 0:
-                print(f"[FOUT] Standaardfout output:\n{result.stderr}")
-                messagebox.showerror("Fout", f"Er trad een fout op:\n{result.stderr}")
-                return
-            
-            # Ask the user where to save the output
-            file_path = filedialog.asksaveasfilename(
-                defaultextension=".txt",
-                filetypes=[("Text files", "*.txt"), ("All files", "*.*")],
-                title="Opslaan als"
-            )
-            
-            if not file_path:
-                print("[INFO] Opslaan geannuleerd door gebruiker.")
+            # Native TLS-handshake (timeout, SNI) i.p.v. openssl.exe s_client
+            result = cynit_tls.fetch_chain(target)
+
+            if not result.ok:
+                print(f"[FOUT] {result.error}")
+                root.after(0, lambda: messagebox.showerror("Fout", f"Er trad een fout op:\n{result.error}"))
                 return
-            
-            # Write the output to the selected file
-            with open(file_path, "w") as file:
-                file.write(result.stdout)
-            
-            print(f"[INFO] Certificaat opgeslagen in: {file_path}")
-            messagebox.showinfo("Succes", f"Certificaat opgeslagen in {file_path}")
-            
-            # Open the file in the default text editor
-            os.startfile(file_path) if os.name == 'nt' else subprocess.run(["open", file_path] if os.name == 'darwin' else ["xdg-open", file_path])
-        
+
+            print(f"[INFO] {len(result.chain)} certificaten ontvangen ({result.tls_version}, {result.elapsed_ms} ms)")
+            root.after(0, lambda: save_result(result))
+
         except Exception as e:
-            print(f"[FOUT] Onverwachte fout:\n{e}")
-            messagebox.showerror("Fout", f"Er trad een onverwachte fout op:\n{e}")
+            msg = str(e)  # e is na het except-blok niet meer gebonden
+            print(f"[FOUT] Onverwachte fout:\n{msg}")
+            root.after(0, lambda: messagebox.showerror("Fout", f"Er trad een onverwachte fout op:\n{msg}"))
         finally:
-            progress_bar.stop()
-            progress_bar.pack_forget()
-    
-    threading.Thread(target=run_command).start()
+            root.after(0, progress_bar.stop)
+            root.after(0, progress_bar.pack_forget)
+
+    threading.Thread(target=run_command, daemon=True).start()
+
+
+def save_result(result):
+    # Ask the user where to save the output
+    file_path = filedialog.asksaveasfilename(
+        defaultextension=".pem",
+        initialfile=f"{result.target.host}_{result.target.port}.pem",
+        filetypes=[("PEM chain", "*.pem"), ("Text files", "*.txt"), ("All files", "*.*")],
+        title="Opslaan als"
+    )
+
+    if not file_path:
+        print("[INFO] Opslaan geannuleerd door gebruiker.")
+        return
+
+    # Handshake-info als commentaar bovenaan, daarna de keten (leaf eerst)
+    header = "".join(f"# {k}: {v}\n" for k, v in result.summary().items())
+    with open(file_path, "w", encoding="utf-8") as file:
+        file.write(header + "\n" + result.pem_bundle().decode("ascii"))
+
+    print(f"[INFO] Certificaat opgeslagen in: {file_path}")
+    messagebox.showinfo("Succes", f"Certificaat opgeslagen in {file_path}")
+
+    # Open the file in the default text editor
+    os.startfile(file_path) if os.name == 'nt' else subprocess.run(["open", file_path] if os.name == 'darwin' else ["xdg-open", file_path])
 
 # GUI setup
 root = tk.Tk()
 root.title("OpenSSL Certificaat Ophaler")
 
-label = tk.Label(root, text="Voer de servernaam in (bijv. vlot.onlinesmartcities.be):")
+label = tk.Label(root, text="Voer de servernaam in (bijv. vlot.onlinesmartcities.be of host:poort):")
 label.pack(pady=10)
 
 entry = tk.Entry(root, width=50)
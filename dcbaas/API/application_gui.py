@@ -7,6 +7,8 @@ import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from tkinter import messagebox
 
+import bulk_ops
+
 
 APP_TITLE = "DCBaaS Application Manager"
 
@@ -45,12 +47,12 @@ class AppGUI(ttk.Window):
         import json
 
         debug_file = Path(__file__).with_name(".debug_context.json")
-        self._base_url = ""  # default
+        self._base_url = base_url.rstrip("/")  # --base-url (bv. dcb_mock.py) gaat voor
         if debug_file.exists():
             try:
                 ctx = json.loads(debug_file.read_text(encoding="utf-8"))
                 expected_token = ctx.get("access_token", "")
-                self._base_url = ctx.get("base_url", "")
+                self._base_url = self._base_url or ctx.get("base_url", "")
                 print("[DEBUG] application_gui.py loaded context:")
                 print("       expected_token(first 50):", expected_token[:50], "...")
                 print("       token_received(first 50):", token[:50], "...")
@@ -160,6 +162,8 @@ class AppGUI(ttk.Window):
         mid_frame = ttk.Frame(btns)
         mid_frame.pack(side="left", padx=12)
         ttk.Button(mid_frame, text="Health", command=self.do_health, bootstyle="success").pack(side="left", padx=4)
+        self.btn_bulk = ttk.Button(mid_frame, text="Bulk (CSV/XLSX)", command=self.do_bulk)
+        self.btn_bulk.pack(side="left", padx=4)
 
 
         # Rechts subframe (Sluiten)
@@ -217,8 +221,8 @@ class AppGUI(ttk.Window):
     def _post(self, path: str, payload: dict, button=None):
         def task():
             self.status_var.set("⏳ Bezig met POST...")
-            base = self.master_base_url()
-            url = f"{self._base_url}/dev/{path.lstrip('/')}"
+            base = self._base_url or self.master_base_url()
+            url = f"{base}/dev/{path.lstrip('/')}"
 
             if not base:
                 messagebox.showerror("Fout", "Base URL is leeg.")
@@ -256,8 +260,8 @@ class AppGUI(ttk.Window):
     def _get(self, path: str):
         def task():
             self.status_var.set("⏳ Bezig met GET...")
-            base = self.master_base_url()
-            url = f"{self._base_url}/dev/{path.lstrip('/')}"
+            base = self._base_url or self.master_base_url()
+            url = f"{base}/dev/{path.lstrip('/')}"
             if not base:
                 messagebox.showerror("Fout", "Base URL is leeg.")
                 self.status_var.set("")
@@ -352,6 +356,11 @@ class AppGUI(ttk.Window):
         self._post("application/delete", payload, button=self.btn_delete)
 
 
+    def do_bulk(self):
+        # Zelfde calls als de knoppen hierboven, voor alle rijen van een CSV/XLSX (zie bulk_ops.py)
+        base = self._base_url or self.master_base_url()
+        bulk_ops.gui_bulk(self, base, self.token_var.get().strip(), button=self.btn_bulk)
+
     def do_health(self):
         # GET {{url}}/dev/health — in Postman zonder headers; vaak publiek. :contentReference[oaicite:5]{index=5}
         self._get("health")
@@ -360,11 +369,13 @@ def parse_args():
     p = argparse.ArgumentParser(description=APP_TITLE)
     p.add_argument("--token", dest="token", default="", help="Access token")
     p.add_argument("--access-token", dest="token", help="Alias voor --token")  # accepteer ook --access-token
+    p.add_argument("--base-url", dest="base_url", default="", help="Base URL (bv. http://127.0.0.1:8765 voor dcb_mock.py)")
     return p.parse_args()
 
 def main():
     args = parse_args()
     gui = AppGUI(
+        base_url=args.base_url,
         token=args.token,
     )
     gui.mainloop()
@@ -0,0 +1,612 @@
+#!/usr/bin/env python3
+"""
+bulk_ops.py
+
+Bulk-acties op de DCBaaS API vanuit een CSV of XLSX: dezelfde calls als
+application_gui.py (add / update / delegate / delete) en certificates_gui.py
+(cert_add), maar voor veel rijen tegelijk.
+
+- Eén gedeelde keep-alive Session, begrensd aantal workers en een rate limit
+  (requests per seconde over alle workers samen).
+- Rijen van dezelfde applicatie lopen na elkaar in bestandsvolgorde (eerst
+  add, dan delegate, ...); verschillende applicaties lopen parallel. Mislukt
+  een stap, dan worden de volgende stappen van die applicatie overgeslagen.
+- Alle acties wijzigen iets, dus er wordt enkel herhaald als de server de
+  call zeker niet uitvoerde: geen verbinding, of 429/503 met Retry-After.
+  Bij een read-timeout of een andere 5xx kan de wijziging al gebeurd zijn:
+  die rij krijgt status "onbekend" en wordt niet herhaald.
+- Rapport (CSV) wordt per rij bijgeschreven; met --resume worden rijen die
+  daarin al "ok" staan (zelfde rij + zelfde payload) overgeslagen. Rijen met
+  "onbekend" worden ook niet opnieuw verstuurd: eerst in DCBaaS nakijken,
+  daarna eventueel --retry-unknown.
+- --dry-run valideert en toont de payloads zonder iets te versturen.
+
+Kolommen (hoofdletters/spaties maken niet uit, lege cellen = default):
+
+    operation              add | update | delegate | delete | cert_add
+    name                   applicatienaam (add/update/delegate/delete)
+    reason                 add/update
+    organization_code      delegate (gedelegeerde org) of cert_add
+    duration               maanden (delegate: 1, cert_add: 12)
+    application_name       cert_add (anders wordt 'name' gebruikt)
+    description            cert_add
+    certificate_template   cert_add (default "SSL Server")
+    csr                    cert_add: Base64 van het CSR-bestand
+    csr_file               cert_add: pad naar .csr (relatief t.o.v. het invoerbestand)
+
+Gebruik:
+
+    python bulk_ops.py ops.csv --base-url https://... --token "<token>"
+    python bulk_ops.py ops.xlsx --dry-run
+    python bulk_ops.py ops.csv --resume --workers 4 --rate 2
+    python bulk_ops.py ops.csv --resume --retry-unknown   # nagekeken: "onbekend" opnieuw
+    python bulk_ops.py --template ops.csv        # voorbeeldbestand schrijven
+
+Token: --token, anders de omgevingsvariabele DCBAAS_TOKEN. Base URL: --base-url,
+anders base_url uit ~/.jwt_gui_config.json (zoals jwt_gui.py die bewaart).
+"""
+
+import argparse
+import base64
+import csv
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+
+OPERATIONS = {
+    "add": "application/add",
+    "update": "application/update",
+    "delegate": "application/delegate",
+    "delete": "application/delete",
+    "cert_add": "application/certificate/add",
+}
+RETRY_STATUSES = {429, 503}          # enkel mét Retry-After: de server voerde niets uit
+REPORT_FIELDS = ["row", "key", "operation", "target", "status", "http_status", "message", "timestamp"]
+
+STATUS_OK = "ok"
+STATUS_ERROR = "fout"
+STATUS_UNKNOWN = "onbekend"          # verstuurd, maar geen (bruikbaar) antwoord: misschien uitgevoerd
+STATUS_INVALID = "ongeldig"
+STATUS_SKIPPED = "overgeslagen"
+STATUS_DRY_RUN = "dry-run"
+
+TEMPLATE_ROWS = [
+    ["operation", "name", "reason", "organization_code", "duration",
+     "application_name", "description", "certificate_template", "csr_file"],
+    ["add", "dcbaas-ext-api.nu/test1", "API Test", "", "", "", "", "", ""],
+    ["delegate", "dcbaas-ext-api.nu/test1", "", "dcbaasbeheer", "1", "", "", "", ""],
+    ["cert_add", "", "", "dcbaasbeheer", "12", "dcbaas-ext-api.nu/test1", "Test-cert", "SSL Server", "test1.csr"],
+]
+
+
+@dataclass
+class Operation:
+    row: int                     # rijnummer in het bestand (header = 1)
+    op: str
+    payload: Dict = field(default_factory=dict)
+    target: str = ""             # applicatienaam: bepaalt de volgorde
+    error: str = ""              # validatiefout
+
+    @property
+    def key(self) -> str:
+        """Rij + inhoud: wijzigt de rij in het bestand, dan telt een vroeger 'ok' niet meer."""
+        data = json.dumps([self.op, self.payload], sort_keys=True, ensure_ascii=False)
+        return f"{self.row}:{hashlib.sha1(data.encode('utf-8')).hexdigest()[:12]}"
+
+
+@dataclass
+class Result:
+    operation: Operation
+    status: str
+    http_status: Optional[int] = None
+    message: str = ""
+
+
+# ------------------------------------------------------------
+#  Invoer
+# ------------------------------------------------------------
+
+def _norm(header: str) -> str:
+    return str(header or "").strip().lower().replace(" ", "_").replace("-", "_")
+
+
+def read_rows(path: Path) -> List[Tuple[int, Dict[str, str]]]:
+    """(rijnummer, {kolom: waarde}) uit een CSV (; of ,) of XLSX (eerste sheet)."""
+    if path.suffix.lower() in (".xlsx", ".xlsm"):
+        try:
+            import openpyxl
+        except ImportError:
+            raise RuntimeError("XLSX lezen vraagt openpyxl (pip install openpyxl) – of bewaar als CSV.")
+        wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        raw = [["" if v is None else str(v) for v in r] for r in wb.worksheets[0].iter_rows(values_only=True)]
+        wb.close()
+    else:
+        text = path.read_text(encoding="utf-8-sig")
+        try:
+            dialect = csv.Sniffer().sniff(text[:4096], delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        raw = list(csv.reader(text.splitlines(), dialect))
+
+    if not raw:
+        return []
+    headers = [_norm(h) for h in raw[0]]
+    rows = []
+    for i, values in enumerate(raw[1:], start=2):
+        if not any(str(v).strip() for v in values):
+            continue
+        rows.append((i, {h: str(v).strip() for h, v in zip(headers, values) if h}))
+    return rows
+
+
+def _int(value: str, default: int, label: str) -> int:
+    if not value:
+        return default
+    try:
+        return int(float(value))
+    except ValueError:
+        raise ValueError(f"{label} moet een geheel getal zijn (kreeg {value!r}).")
+
+
+def _csr(row: Dict[str, str], base_dir: Path) -> str:
+    if row.get("csr"):
+        return row["csr"]
+    if row.get("csr_file"):
+        p = Path(row["csr_file"])
+        if not p.is_absolute():
+            p = base_dir / p
+        try:
+            return base64.b64encode(p.read_bytes()).decode("utf-8")   # zoals certificates_gui
+        except OSError as exc:
+            raise ValueError(f"CSR-bestand niet leesbaar: {exc}")
+    raise ValueError("csr of csr_file is verplicht voor cert_add.")
+
+
+def build_operation(row_no: int, row: Dict[str, str], base_dir: Path) -> Operation:
+    """Rij -> payload, met dezelfde verplichte velden en defaults als de GUI's."""
+    op = _norm(row.get("operation") or row.get("actie") or "")
+    name = row.get("name", "")
+    result = Operation(row=row_no, op=op, target=name)
+    try:
+        if op not in OPERATIONS:
+            raise ValueError(f"onbekende operation {op!r} (verwacht: {', '.join(OPERATIONS)}).")
+        if op == "cert_add":
+            app = row.get("application_name") or name
+            if not app:
+                raise ValueError("application_name is verplicht.")
+            result.target = app
+            result.payload = {
+                "application_name": app,
+                "description": row.get("description") or f"Certificaat {app}",
+                "organization_code": row.get("organization_code", ""),
+                "duration": _int(row.get("duration", ""), 12, "duration"),
+                "certificate_template": row.get("certificate_template") or "SSL Server",
+                "csr": _csr(row, base_dir),
+            }
+            return result
+        if not name:
+            raise ValueError("name is verplicht.")
+        if op == "add":
+            result.payload = {"name": name, "reason": row.get("reason") or "API Test"}
+        elif op == "update":
+            result.payload = {"name": name, "reason": row.get("reason") or "API aanpassing in informatie"}
+        elif op == "delegate":
+            org = row.get("organization_code", "")
+            if not org:
+                raise ValueError("organization_code is verplicht voor delegate.")
+            result.payload = {
+                "name": name,
+                "organization_code_delegated": org,
+                "duration": _int(row.get("duration", ""), 1, "duration"),
+            }
+        else:
+            result.payload = {"name": name}
+    except ValueError as exc:
+        result.error = str(exc)
+    return result
+
+
+def load_operations(path: Path) -> List[Operation]:
+    return [build_operation(no, row, path.parent) for no, row in read_rows(path)]
+
+
+# ------------------------------------------------------------
+#  Rapport / resume
+# ------------------------------------------------------------
+
+def default_report_path(path: Path, dry_run: bool = False) -> Path:
+    """<bestand>.report.csv; een dry-run krijgt een eigen rapport (laat de resume-status intact)."""
+    return path.with_name(path.stem + (".dryrun.csv" if dry_run else ".report.csv"))
+
+
+def load_previous(report: Path) -> Dict[str, str]:
+    """
+    Laatste status per key in een vorig rapport (resume voegt regels toe).
+    "overgeslagen" verandert niets aan de status van een vorige run.
+    """
+    if not report.exists():
+        return {}
+    with report.open(encoding="utf-8", newline="") as f:
+        return {r["key"]: r.get("status", "") for r in csv.DictReader(f) if r.get("status") != STATUS_SKIPPED}
+
+
+def load_done(report: Path) -> set:
+    """Keys van rijen die in een vorig rapport al geslaagd zijn."""
+    return {k for k, status in load_previous(report).items() if status == STATUS_OK}
+
+
+def load_unknown(report: Path) -> set:
+    """Keys van rijen waarvan de uitkomst in een vorig rapport onbekend bleef."""
+    return {k for k, status in load_previous(report).items() if status == STATUS_UNKNOWN}
+
+
+class ReportWriter:
+    """Rapport-CSV; elke rij wordt meteen weggeschreven (overleeft een crash)."""
+
+    def __init__(self, path: Path, append: bool):
+        self.path = path
+        self._lock = threading.Lock()
+        new = not (append and path.exists())
+        self._f = path.open("w" if new else "a", encoding="utf-8", newline="")
+        self._w = csv.DictWriter(self._f, fieldnames=REPORT_FIELDS)
+        if new:
+            self._w.writeheader()
+
+    def write(self, res: Result) -> None:
+        with self._lock:
+            self._w.writerow({
+                "row": res.operation.row,
+                "key": res.operation.key,
+                "operation": res.operation.op,
+                "target": res.operation.target,
+                "status": res.status,
+                "http_status": res.http_status or "",
+                "message": res.message[:500],
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+            })
+            self._f.flush()
+
+    def close(self) -> None:
+        self._f.close()
+
+
+# ------------------------------------------------------------
+#  Engine
+# ------------------------------------------------------------
+
+class RateLimiter:
+    """Hoogstens 'rate' starts per seconde, gedeeld over alle threads (0 = onbeperkt)."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def _never_sent(exc: requests.RequestException) -> bool:
+    """True als de verbinding nooit opgezet werd (dus zeker niets uitgevoerd)."""
+    if isinstance(exc, requests.ConnectTimeout):
+        return True
+    if not isinstance(exc, requests.ConnectionError):
+        return False
+    reason = getattr(exc.args[0], "reason", None) if exc.args else None
+    return isinstance(reason, urllib3.exceptions.NewConnectionError)
+
+
+def _retry_after(resp: requests.Response) -> Optional[float]:
+    value = resp.headers.get("Retry-After", "").strip()
+    if not value:
+        return None
+    return float(value) if value.isdigit() else 1.0
+
+
+class BulkRunner:
+    def __init__(
+        self,
+        base_url: str,
+        token: str,
+        workers: int = 4,
+        rate: float = 5.0,
+        retries: int = 3,
+        timeout: float = 30.0,
+        dry_run: bool = False,
+        on_result: Optional[Callable[[Result], None]] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.token = token.strip()
+        self.workers = max(1, workers)
+        self.retries = max(0, retries)
+        self.timeout = timeout
+        self.dry_run = dry_run
+        self.on_result = on_result
+        self.limiter = RateLimiter(rate)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=self.workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        """Geen nieuwe calls meer starten (lopende calls werken af)."""
+        self._stop.set()
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Origin": "localhost",
+            "Accept": "application/json",
+            "Content-Type": "application/json",
+            "Authorization": self.token,        # RAW token, zoals de GUI's
+        }
+
+    def _send(self, op: Operation) -> Result:
+        """
+        Eén POST. Herhaald enkel als de server niets uitvoerde (geen verbinding,
+        429/503 met Retry-After); read-timeout en andere 5xx -> STATUS_UNKNOWN.
+        """
+        url = f"{self.base_url}/dev/{OPERATIONS[op.op]}"
+        for attempt in range(self.retries + 1):
+            self.limiter.wait()
+            try:
+                resp = self.session.post(url, headers=self._headers(), json=op.payload, timeout=self.timeout)
+            except requests.RequestException as exc:
+                if not _never_sent(exc):
+                    return Result(op, STATUS_UNKNOWN, None, f"Geen antwoord, mogelijk uitgevoerd: {exc}")
+                if attempt < self.retries:
+                    time.sleep(min(30.0, 2 ** attempt) * random.uniform(0.8, 1.2))
+                    continue
+                return Result(op, STATUS_ERROR, None, f"Geen verbinding: {exc}")
+            delay = _retry_after(resp) if resp.status_code in RETRY_STATUSES else None
+            if delay is not None and attempt < self.retries:
+                time.sleep(min(30.0, delay) * random.uniform(0.8, 1.2))
+                continue
+            if 200 <= resp.status_code < 300:
+                status = STATUS_OK
+            elif resp.status_code >= 500 and delay is None:
+                status = STATUS_UNKNOWN
+            else:
+                status = STATUS_ERROR
+            return Result(op, status, resp.status_code, resp.text.strip())
+        return Result(op, STATUS_ERROR, None, "geen antwoord")
+
+    def _run_group(self, ops: List[Operation], done: set, unknown: set) -> List[Result]:
+        results = []
+        failed = ""
+        for op in ops:
+            if op.error:
+                res = Result(op, STATUS_INVALID, None, op.error)
+            elif op.key in done:
+                res = Result(op, STATUS_SKIPPED, None, "al geslaagd in vorige run")
+            elif op.key in unknown:
+                res = Result(op, STATUS_UNKNOWN, None,
+                             "uitkomst vorige run onbekend: nakijken in DCBaaS, dan --retry-unknown")
+            elif failed:
+                res = Result(op, STATUS_SKIPPED, None, f"vorige stap voor {op.target} mislukt ({failed})")
+            elif self._stop.is_set():
+                res = Result(op, STATUS_SKIPPED, None, "gestopt")
+            elif self.dry_run:
+                res = Result(op, STATUS_DRY_RUN, None,
+                             f"POST /dev/{OPERATIONS[op.op]} {json.dumps(op.payload, ensure_ascii=False)[:300]}")
+            else:
+                res = self._send(op)
+            if res.status in (STATUS_ERROR, STATUS_INVALID, STATUS_UNKNOWN):
+                failed = failed or f"rij {op.row}"
+            results.append(res)
+            if self.on_result is not None:
+                self.on_result(res)
+        return results
+
+    def run(self, ops: List[Operation], done: Optional[set] = None,
+            unknown: Optional[set] = None) -> List[Result]:
+        """
+        Alle operaties uitvoeren; resultaten in bestandsvolgorde. Keys in 'done'
+        worden overgeslagen, keys in 'unknown' niet opnieuw verstuurd.
+        """
+        done = done or set()
+        unknown = unknown or set()
+        groups: "OrderedDict[str, List[Operation]]" = OrderedDict()
+        for op in ops:
+            groups.setdefault(op.target or f"#rij{op.row}", []).append(op)
+        with ThreadPoolExecutor(max_workers=min(self.workers, max(1, len(groups))),
+                                thread_name_prefix="bulk") as pool:
+            chunks = list(pool.map(lambda g: self._run_group(g, done, unknown), groups.values()))
+        return sorted((r for chunk in chunks for r in chunk), key=lambda r: r.operation.row)
+
+
+def run_file(
+    path: Path,
+    base_url: str,
+    token: str,
+    report: Optional[Path] = None,
+    resume: bool = False,
+    retry_unknown: bool = False,
+    on_result: Optional[Callable[[Result], None]] = None,
+    **runner_kwargs,
+) -> Tuple[List[Result], Path]:
+    """
+    Bestand inlezen, uitvoeren en het rapport schrijven. Geeft (resultaten, rapportpad).
+    Met resume worden "ok"-rijen overgeslagen en "onbekend"-rijen niet opnieuw
+    verstuurd, tenzij retry_unknown.
+    """
+    ops = load_operations(path)
+    report = report or default_report_path(path, dry_run=runner_kwargs.get("dry_run", False))
+    done = load_done(report) if resume else set()
+    unknown = load_unknown(report) if resume and not retry_unknown else set()
+    writer = ReportWriter(report, append=resume)
+
+    def record(res: Result) -> None:
+        writer.write(res)
+        if on_result is not None:
+            on_result(res)
+
+    try:
+        results = BulkRunner(base_url, token, on_result=record, **runner_kwargs).run(ops, done, unknown)
+    finally:
+        writer.close()
+    return results, report
+
+
+def summarize(results: List[Result]) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for r in results:
+        counts[r.status] = counts.get(r.status, 0) + 1
+    return counts
+
+
+def default_base_url() -> str:
+    cfg_path = Path.home() / ".jwt_gui_config.json"
+    try:
+        return json.loads(cfg_path.read_text(encoding="utf-8")).get("base_url", "").rstrip("/")
+    except (OSError, ValueError):
+        return ""
+
+
+# ------------------------------------------------------------
+#  GUI (application_gui / certificates_gui)
+# ------------------------------------------------------------
+
+def gui_bulk(gui, base_url: str, token: str, button=None) -> None:
+    """
+    Knop "Bulk (CSV/XLSX)": bestand kiezen, dry-run of echt (met resume als
+    er al een rapport is), uitvoeren op een achtergrond-thread. Voortgang
+    komt via gui.after() in het output-venster (gui.log).
+    """
+    from tkinter import filedialog, messagebox
+
+    path = filedialog.askopenfilename(
+        title="Kies bulk-bestand",
+        filetypes=[("CSV / Excel", "*.csv *.xlsx"), ("Alle bestanden", "*.*")],
+    )
+    if not path:
+        return
+    path = Path(path)
+    dry_run = messagebox.askyesnocancel(
+        "Bulk", "Eerst een dry-run (enkel valideren, niets versturen)?\n\nJa = dry-run, Nee = uitvoeren"
+    )
+    if dry_run is None:
+        return
+    if not dry_run and (not base_url or not token):
+        messagebox.showerror("Fout", "Base URL en access token zijn nodig om uit te voeren.")
+        return
+    resume = False
+    if not dry_run and default_report_path(path).exists():
+        resume = messagebox.askyesno(
+            "Bulk", "Er bestaat al een rapport voor dit bestand.\n"
+                    "Rijen die toen al gelukt zijn overslaan (resume)?"
+        )
+
+    def show(res: Result) -> None:
+        code = f" {res.http_status}" if res.http_status else ""
+        line = (f"[{res.status}{code}] rij {res.operation.row} {res.operation.op} "
+                f"{res.operation.target}: {res.message[:200]}")
+        gui.after(0, gui.log, line)
+
+    def task() -> None:
+        # Tk-widgets en -variabelen enkel vanuit de GUI-thread (via gui.after)
+        gui.after(0, gui.status_var.set, "⏳ Bulk bezig...")
+        try:
+            results, report = run_file(path, base_url, token, resume=resume, on_result=show, dry_run=dry_run)
+            counts = summarize(results)
+            ok = not (counts.get(STATUS_ERROR) or counts.get(STATUS_INVALID) or counts.get(STATUS_UNKNOWN))
+            summary = f"{len(results)} rijen: " + ", ".join(f"{k}={v}" for k, v in sorted(counts.items()))
+            gui.after(0, gui.log, f"\n{summary}\nRapport: {report}")
+            if button is not None:
+                gui.after(0, gui.flash_button, button, ok)
+        except Exception as exc:
+            gui.after(0, gui.log, f"Bulk mislukt: {exc}")
+            if button is not None:
+                gui.after(0, gui.flash_button, button, False)
+        finally:
+            gui.after(0, gui.status_var.set, "")
+
+    gui._clear_output()
+    gui.log(f"Bulk {'dry-run' if dry_run else 'uitvoeren'}{' (resume)' if resume else ''}: {path}")
+    threading.Thread(target=task, daemon=True).start()
+
+
+# ------------------------------------------------------------
+#  CLI
+# ------------------------------------------------------------
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="DCBaaS bulk-acties uit CSV/XLSX")
+    p.add_argument("file", help="CSV/XLSX met operaties (of doelbestand met --template)")
+    p.add_argument("--base-url", default="", help="Base URL (default: ~/.jwt_gui_config.json)")
+    p.add_argument("--token", default="", help="Access token (default: env DCBAAS_TOKEN)")
+    p.add_argument("--workers", type=int, default=4, help="applicaties parallel")
+    p.add_argument("--rate", type=float, default=5.0, help="max requests per seconde (0 = onbeperkt)")
+    p.add_argument("--retries", type=int, default=3,
+                   help="herhalingen als de server niets uitvoerde (geen verbinding, 429/503 met Retry-After)")
+    p.add_argument("--report", default="", help="rapport-CSV (default: <bestand>.report.csv / .dryrun.csv)")
+    p.add_argument("--resume", action="store_true", help="rijen die al ok staan in het rapport overslaan")
+    p.add_argument("--retry-unknown", action="store_true",
+                   help="met --resume: rijen met uitkomst 'onbekend' toch opnieuw versturen")
+    p.add_argument("--dry-run", action="store_true", help="enkel valideren en payloads tonen")
+    p.add_argument("--template", action="store_true", help="voorbeeldbestand (CSV) schrijven en stoppen")
+    args = p.parse_args(argv)
+
+    path = Path(args.file)
+    if args.template:
+        with path.open("w", encoding="utf-8", newline="") as f:
+            csv.writer(f, delimiter=";").writerows(TEMPLATE_ROWS)
+        print(f"Voorbeeld geschreven: {path}")
+        return 0
+
+    base_url = args.base_url or default_base_url()
+    token = args.token or os.getenv("DCBAAS_TOKEN", "")
+    if not args.dry_run and (not base_url or not token):
+        print("[FOUT] --base-url en --token (of DCBAAS_TOKEN) zijn verplicht, behalve bij --dry-run.")
+        return 2
+
+    def show(res: Result) -> None:
+        code = f" {res.http_status}" if res.http_status else ""
+        print(f"[{res.status}{code}] rij {res.operation.row} {res.operation.op} {res.operation.target}: "
+              f"{res.message[:200]}", flush=True)
+
+    try:
+        results, report = run_file(
+            path, base_url, token,
+            report=Path(args.report) if args.report else None,
+            resume=args.resume,
+            retry_unknown=args.retry_unknown,
+            on_result=show,
+            workers=args.workers,
+            rate=args.rate,
+            retries=args.retries,
+            dry_run=args.dry_run,
+        )
+    except (OSError, RuntimeError) as exc:
+        print(f"[FOUT] {exc}")
+        return 2
+
+    counts = summarize(results)
+    print(f"\n{len(results)} rijen: " + ", ".join(f"{k}={v}" for k, v in sorted(counts.items())))
+    print(f"Rapport: {report}")
+    return 1 if counts.get(STATUS_ERROR) or counts.get(STATUS_INVALID) or counts.get(STATUS_UNKNOWN) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,6 +8,8 @@ import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from tkinter import filedialog, messagebox
 
+import bulk_ops
+
 
 APP_TITLE = "DCBaaS Certificate Manager"
 
@@ -104,6 +106,9 @@ class CertificateGUI(ttk.Window):
         self.btn_add = ttk.Button(btns, text="Add Certificate", command=self.do_add)
         self.btn_add.pack(side="left", padx=4)
 
+        self.btn_bulk = ttk.Button(btns, text="Bulk (CSV/XLSX)", command=self.do_bulk)
+        self.btn_bulk.pack(side="left", padx=4)
+
         ttk.Button(btns, text="Sluiten", command=self.destroy, bootstyle="danger").pack(side="right", padx=4)
 
         self.status_label = ttk.Label(self, textvariable=self.status_var)
@@ -202,6 +207,10 @@ class CertificateGUI(ttk.Window):
 
         self._post("application/certificate/add", payload, self.btn_add)
 
+    def do_bulk(self):
+        # cert_add-rijen (en eventueel application-acties) uit een CSV/XLSX, zie bulk_ops.py
+        bulk_ops.gui_bulk(self, self._base_url, self.token_var.get().strip(), button=self.btn_bulk)
+
     # ---------- Networking ----------
     def _post(self, path: str, payload: dict, button=None):
         def task():
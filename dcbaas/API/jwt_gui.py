@@ -11,13 +11,16 @@ from ttkbootstrap.constants import *
 from tkinter import filedialog, messagebox
 from tkinter.scrolledtext import ScrolledText
 
-import jwt
 from jwt import PyJWTError
 
-from cryptography.hazmat.primitives.serialization import load_pem_private_key
-from cryptography.hazmat.primitives.serialization.pkcs12 import load_key_and_certificates
 from jwcrypto import jwk
 
+# Gedeelde sleutel-cache en JWT-signer uit CyNiT-tools
+CYNIT_TOOLS_DIR = Path(__file__).resolve().parent.parent.parent / "CyNiT-tools"
+if str(CYNIT_TOOLS_DIR) not in sys.path:
+    sys.path.insert(0, str(CYNIT_TOOLS_DIR))
+import cynit_signing  # noqa: E402
+
 APP_TITLE = "JWT Generator (RS256) — JWK/PEM/PFX"
 DEFAULT_EXP_OFFSET = 300  # 5 minuten
 CONFIG_PATH = Path.home() / ".jwt_gui_config.json"
@@ -394,53 +397,32 @@ class JWTApp(ttk.Window):
         messagebox.showinfo("Opgeslagen", f"Instellingen opgeslagen naar:\n{CONFIG_PATH}")
 
     # ---- Key loading (JWK / PEM / PFX) ----
-    def load_private_key(self):
+    def load_signer(self):
+        """Gecachete signer (cynit_signing): het sleutelbestand wordt enkel opnieuw ingelezen als het wijzigt."""
         path = self.key_path.get().strip()
         if not path:
             raise ValueError("Geen private key geselecteerd.")
 
-        p = Path(path)
-        ext = p.suffix.lower()
+        ext = Path(path).suffix.lower()
+        kinds = {".jwk": "JWK", ".json": "JWK", ".pem": "PEM/KEY", ".key": "PEM/KEY",
+                 ".pfx": "PKCS#12 (.pfx/.p12)", ".p12": "PKCS#12 (.pfx/.p12)"}
+        if ext not in kinds:
+            raise ValueError("Onbekend sleuteltype. Gebruik .jwk/.json, .pem/.key of .pfx/.p12")
 
-        if ext in [".jwk", ".json"]:
-            try:
-                data_text = p.read_text(encoding="utf-8")
-                key = jwk.JWK.from_json(data_text)
-
-                # kid overnemen of thumbprint gebruiken
-                try:
-                    exported = key.export(as_dict=True)
-                    data = exported if isinstance(exported, dict) else json.loads(exported)
-                    if not self.kid.get().strip():
-                        kid_val = data.get("kid") or key.thumbprint()
-                        if kid_val:
-                            self.kid.set(kid_val)
-                except Exception:
-                    pass
-
-                pem_key_bytes = key.export_to_pem(private_key=True, password=None)
-                return load_pem_private_key(pem_key_bytes, password=None)
-            except Exception as e:
-                raise ValueError(f"Kon JWK niet laden: {e}")
-
-        if ext in [".pem", ".key"]:
-            try:
-                pwd = self.key_password.get().encode("utf-8") if self.key_password.get() else None
-                return load_pem_private_key(p.read_bytes(), password=pwd)
-            except Exception as e:
-                raise ValueError(f"Kon PEM/KEY niet laden: {e}")
+        pwd = self.key_password.get() or None
+        try:
+            signing_key = cynit_signing.load_signing_key(path, None if kinds[ext] == "JWK" else pwd)
+        except Exception as e:
+            raise ValueError(f"Kon {kinds[ext]} niet laden: {e}")
 
-        if ext in [".pfx", ".p12"]:
-            try:
-                pwd = self.key_password.get().encode("utf-8") if self.key_password.get() else None
-                key, cert, addl = load_key_and_certificates(p.read_bytes(), pwd)
-                if key is None:
-                    raise ValueError("Geen private key gevonden in PKCS#12.")
-                return key
-            except Exception as e:
-                raise ValueError(f"Kon PKCS#12 (.pfx/.p12) niet laden: {e}")
+        # kid overnemen uit de JWK of thumbprint gebruiken
+        if not self.kid.get().strip():
+            kid_val = signing_key.kid or signing_key.thumbprint
+            if kid_val:
+                self.kid.set(kid_val)
 
-        raise ValueError("Onbekend sleuteltype. Gebruik .jwk/.json, .pem/.key of .pfx/.p12")
+        return cynit_signing.signer_for(path, None if kinds[ext] == "JWK" else pwd,
+                                        alg=self.alg.get(), kid=self.kid.get().strip())
 
     def build_claims(self):
         try:
@@ -475,19 +457,10 @@ class JWTApp(ttk.Window):
     # -------------- Generate / Output --------------
     def generate_jwt(self):
         try:
-            key = self.load_private_key()
+            signer = self.load_signer()
             claims = self.build_claims()
 
-            headers = {"typ": "JWT", "alg": self.alg.get()}
-            if self.kid.get().strip():
-                headers["kid"] = self.kid.get().strip()
-
-            token = jwt.encode(
-                payload=claims,
-                key=key,
-                algorithm=self.alg.get(),
-                headers=headers
-            )
+            token = signer.sign(claims)
 
             self.jwt_text.delete("1.0", "end")
             self.jwt_text.insert("1.0", token)
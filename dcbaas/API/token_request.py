@@ -1,36 +1,25 @@
 #!/usr/bin/env python3
 import argparse
+import sys
 import time
-import json
 from pathlib import Path
 
 import jwt
 import requests
 import pyperclip
-from cryptography.hazmat.primitives.serialization import load_pem_private_key
-from cryptography.hazmat.primitives.serialization.pkcs12 import load_key_and_certificates
-from jwcrypto import jwk
+
+# Gedeelde sleutel-cache en JWT-signer uit CyNiT-tools
+CYNIT_TOOLS_DIR = Path(__file__).resolve().parent.parent.parent / "CyNiT-tools"
+if str(CYNIT_TOOLS_DIR) not in sys.path:
+    sys.path.insert(0, str(CYNIT_TOOLS_DIR))
+import cynit_signing  # noqa: E402
 
 DEFAULT_EXP_OFFSET = 300  # 5 minuten
 
 
 def load_private_key(path: Path, password: str = None):
-    ext = path.suffix.lower()
-    if ext in [".jwk", ".json"]:
-        data_text = path.read_text(encoding="utf-8")
-        key = jwk.JWK.from_json(data_text)
-        pem_key_bytes = key.export_to_pem(private_key=True, password=None)
-        return load_pem_private_key(pem_key_bytes, password=None)
-    if ext in [".pem", ".key"]:
-        pwd = password.encode("utf-8") if password else None
-        return load_pem_private_key(path.read_bytes(), password=pwd)
-    if ext in [".pfx", ".p12"]:
-        pwd = password.encode("utf-8") if password else None
-        key, cert, addl = load_key_and_certificates(path.read_bytes(), pwd)
-        if key is None:
-            raise ValueError("Geen private key gevonden in PKCS#12.")
-        return key
-    raise ValueError("Onbekend sleuteltype: gebruik .jwk/.json, .pem/.key of .pfx/.p12")
+    """Private key uit .jwk/.json, .pem/.key of .pfx/.p12 (gecachet op pad + mtime)."""
+    return cynit_signing.load_signing_key(path, password).key
 
 
 def build_jwt(iss_sub: str, aud: str, key, alg="RS256", kid=None):
@@ -55,6 +44,12 @@ def build_jwt(iss_sub: str, aud: str, key, alg="RS256", kid=None):
     return token
 
 
+def build_jwt_from_file(iss_sub: str, aud: str, key_path: Path, password: str = None, alg="RS256", kid=None):
+    """Zelfde JWT als build_jwt, maar sleutel + header gecachet per bestand (cynit_signing)."""
+    signer = cynit_signing.signer_for(key_path, password, alg=alg, kid=kid or "")
+    return signer.assertion(iss_sub, aud, lifetime_sec=DEFAULT_EXP_OFFSET, skew_sec=0)
+
+
 def request_access_token(jwt_token: str, audience: str):
     url = "https://authenticatie-ti.vlaanderen.be/op/v1/token"
     headers = {"Content-Type": "application/x-www-form-urlencoded"}
@@ -86,10 +81,8 @@ def main():
     if not key_path.exists():
         raise FileNotFoundError(f"Key file niet gevonden: {key_path}")
 
-    key = load_private_key(key_path, args.password)
-
     # Stap 1: JWT maken
-    jwt_token = build_jwt(args.iss, args.aud, key, kid=args.kid)
+    jwt_token = build_jwt_from_file(args.iss, args.aud, key_path, args.password, kid=args.kid)
     print("\n=== JWT (client_assertion) ===\n")
     print(jwt_token)
 
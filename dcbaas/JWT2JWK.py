@@ -1,5 +1,6 @@
 import json
 import os
+import sys
 import time
 import traceback
 import subprocess
@@ -8,10 +9,15 @@ from tkinter import filedialog, messagebox, scrolledtext, simpledialog
 import webbrowser
 from urllib.parse import urlparse, parse_qs
 from email.utils import parsedate_to_datetime  # voor Date-header -> datetime
+from pathlib import Path
 
-import jwt
 import requests
-from jwt.algorithms import RSAAlgorithm  # voor JWK -> key object
+
+# Gedeelde sleutel-cache en JWT-signer uit CyNiT-tools
+CYNIT_TOOLS_DIR = Path(__file__).resolve().parent.parent / "CyNiT-tools"
+if str(CYNIT_TOOLS_DIR) not in sys.path:
+    sys.path.insert(0, str(CYNIT_TOOLS_DIR))
+import cynit_signing  # noqa: E402
 
 import urllib3
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -477,9 +483,7 @@ class JWTBuilderApp:
             return
 
         try:
-            with open(self.jwk_path, "r", encoding="utf-8") as f:
-                jwk_dict = json.load(f)
-            kid = jwk_dict.get("kid")
+            kid, _thumbprint = cynit_signing.load_jwk_ids(self.jwk_path)
             if not kid:
                 raise ValueError("Geen 'kid' gevonden in de JWK.")
             self.current_issuer = kid
@@ -750,19 +754,11 @@ class JWTBuilderApp:
         print("[DEBUG] JWT payload:", payload)
 
         try:
-            with open(self.jwk_path, "r", encoding="utf-8") as f:
-                jwk_dict = json.load(f)
-
-            jwk_json = json.dumps(jwk_dict)
-            key = RSAAlgorithm.from_jwk(jwk_json)
-
-            headers = {"typ": "JWT", "alg": "RS256"}
-            kid = jwk_dict.get("kid")
-            if kid:
-                headers["kid"] = kid
-            print("[DEBUG] JWT headers:", headers)
+            # sleutel + header gecachet op pad + mtime (cynit_signing)
+            signer = cynit_signing.signer_for(self.jwk_path, alg="RS256")
+            print("[DEBUG] JWT headers:", signer.headers)
 
-            token = jwt.encode(payload, key, algorithm="RS256", headers=headers)
+            token = signer.sign(payload)
             print("[DEBUG] JWT succesvol gegenereerd.")
 
         except Exception as e:
@@ -34,14 +34,14 @@ CONFIG_PATH = BASE_DIR / "config" / "settings.json"
 # ============================================================
 
 # ---- Crypto imports ----
-from cryptography import x509
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.asymmetric import rsa, dsa, ec
-from cryptography.x509.oid import NameOID
 
-# ---- XLSX export ----
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill
+# Gedeelde loader (PEM-bundles, DER, PKCS#7, PKCS#12) en decoder uit CyNiT-tools
+CYNIT_TOOLS_DIR = Path(__file__).resolve().parent.parent / "CyNiT-tools"
+if str(CYNIT_TOOLS_DIR) not in sys.path:
+    sys.path.insert(0, str(CYNIT_TOOLS_DIR))
+from cynit_certcore import DECODE_VERSION, decode_object, load_cert_or_csr  # noqa: E402
+import cynit_cache  # noqa: E402
+import cynit_xlsx  # noqa: E402
 
 # ---- Tkinter GUI imports ----
 import tkinter as tk
@@ -290,6 +290,12 @@ _web_running = False
 # Laatste gedecodeerde cert (alleen voor web-downloads)
 LAST_INFO = None
 
+# Decode- en export-cache op inhoud-hash (zie CyNiT-tools/cynit_cache.py)
+DECODE_CACHE = cynit_cache.LRUCache(
+    "cert_tool_decode", maxsize=512, disk_dir=BASE_DIR / "runtime" / "decode_cache"
+)
+EXPORT_CACHE = cynit_cache.LRUCache("cert_tool_export", maxsize=128)
+
 
 def start_web_in_background():
     """Start de Flask webserver in een background thread (voor GUI+Web)."""
@@ -363,152 +369,6 @@ def generate_ico_bytes():
 #   CORE: X.509 / CSR DECODER
 # ============================================================
 
-def load_cert_or_csr(data: bytes):
-    """
-    Probeert PEM/DER voor Certificate of CSR.
-    Return:
-      ("cert", x509.Certificate) of ("csr", x509.CertificateSigningRequest)
-    Raise:
-      ValueError bij mislukking.
-    """
-    text = None
-    try:
-        text = data.decode("utf-8", errors="ignore")
-    except Exception:
-        pass
-
-    # PEM CSR
-    if text and "BEGIN CERTIFICATE REQUEST" in text:
-        try:
-            csr = x509.load_pem_x509_csr(data)
-            return "csr", csr
-        except Exception:
-            pass
-
-    # PEM CERT
-    if text and "BEGIN CERTIFICATE" in text:
-        try:
-            cert = x509.load_pem_x509_certificate(data)
-            return "cert", cert
-        except Exception:
-            pass
-
-    # DER CERT
-    try:
-        cert = x509.load_der_x509_certificate(data)
-        return "cert", cert
-    except Exception:
-        pass
-
-    # DER CSR
-    try:
-        csr = x509.load_der_x509_csr(data)
-        return "csr", csr
-    except Exception:
-        pass
-
-    raise ValueError("Bestand is geen geldige X.509 certificate of CSR (PEM/DER).")
-
-
-def get_name_attr(name: x509.Name, oid) -> str:
-    try:
-        attrs = name.get_attributes_for_oid(oid)
-        if attrs:
-            return attrs[0].value
-    except Exception:
-        pass
-    return "-"
-
-
-def subject_fields(name: x509.Name) -> dict:
-    return {
-        "Common Name":         get_name_attr(name, NameOID.COMMON_NAME),
-        "emailAddress":        get_name_attr(name, NameOID.EMAIL_ADDRESS),
-        "Organizational Unit": get_name_attr(name, NameOID.ORGANIZATIONAL_UNIT_NAME),
-        "Organization":        get_name_attr(name, NameOID.ORGANIZATION_NAME),
-        "Locality":            get_name_attr(name, NameOID.LOCALITY_NAME),
-        "State or Province":   get_name_attr(name, NameOID.STATE_OR_PROVINCE_NAME),
-        "Country":             get_name_attr(name, NameOID.COUNTRY_NAME),
-    }
-
-
-def issuer_fields(name: x509.Name) -> dict:
-    return {
-        "Issuer Common Name":      get_name_attr(name, NameOID.COMMON_NAME),
-        "Issuer emailAddress":     get_name_attr(name, NameOID.EMAIL_ADDRESS),
-        "Issuer Organization":     get_name_attr(name, NameOID.ORGANIZATION_NAME),
-        "Issuer Locality":         get_name_attr(name, NameOID.LOCALITY_NAME),
-        "Issuer State or Province": get_name_attr(name, NameOID.STATE_OR_PROVINCE_NAME),
-        "Issuer Country":          get_name_attr(name, NameOID.COUNTRY_NAME),
-    }
-
-
-def format_name(name: x509.Name) -> str:
-    parts = []
-    for rdn in name.rdns:
-        for attr in rdn:
-            parts.append(f"{attr.oid._name}={attr.value}")
-    return ", ".join(parts) if parts else "-"
-
-
-def get_key_info(public_key):
-    if isinstance(public_key, rsa.RSAPublicKey):
-        return "RSA", str(public_key.key_size)
-    if isinstance(public_key, dsa.DSAPublicKey):
-        return "DSA", str(public_key.key_size)
-    if isinstance(public_key, ec.EllipticCurvePublicKey):
-        try:
-            size = public_key.key_size
-        except Exception:
-            size = "-"
-        return f"EC ({public_key.curve.name})", str(size)
-    return public_key.__class__.__name__, "-"
-
-
-def get_signature_algorithm(obj) -> str:
-    try:
-        sig_hash = obj.signature_hash_algorithm.name
-    except Exception:
-        sig_hash = "-"
-
-    algo_name = "-"
-    try:
-        algo_name = obj.signature_algorithm_oid._name
-    except Exception:
-        pass
-
-    if algo_name == "-":
-        return sig_hash if sig_hash != "-" else "-"
-    if sig_hash != "-":
-        return f"{algo_name} ({sig_hash})"
-    return algo_name
-
-
-def compute_thumbprint(cert: x509.Certificate) -> str:
-    try:
-        fp = cert.fingerprint(hashes.SHA1())
-        return fp.hex().upper()
-    except Exception:
-        return "-"
-
-
-def get_validity_utc(obj):
-    """
-    Geeft (valid_from_iso, valid_to_iso) terug.
-    Gebruikt *_utc als die bestaan (nieuwe cryptography),
-    anders de oude not_valid_before / not_valid_after.
-    """
-    start = getattr(obj, "not_valid_before_utc", None)
-    end = getattr(obj, "not_valid_after_utc", None)
-
-    if start is None:
-        start = obj.not_valid_before
-    if end is None:
-        end = obj.not_valid_after
-
-    return start.isoformat(), end.isoformat()
-
-
 def decode_file(path: Path) -> dict:
     """Decode een cert/CSR vanaf een bestandspad naar een gestructureerd dict."""
     data = path.read_bytes()
@@ -516,49 +376,22 @@ def decode_file(path: Path) -> dict:
 
 
 def decode_file_from_bytes(data: bytes, fake_path: Path) -> dict:
-    """Decode een cert/CSR vanuit bytes (voor web uploads)."""
-    obj_type, obj = load_cert_or_csr(data)
-
-    subj_map = subject_fields(obj.subject)
+    """
+    Decode een cert/CSR vanuit bytes (voor web uploads).
+    Zelfde bytes -> resultaat uit DECODE_CACHE (enkel filename wordt aangepast).
+    """
+    key = cynit_cache.content_key(DECODE_VERSION, data)
+    cached = DECODE_CACHE.get(key)
+    if cached is not None:
+        return dict(cached, filename=str(fake_path))
+    info = _decode_bytes(data, fake_path)
+    DECODE_CACHE.put(key, info)
+    return info
 
-    if obj_type == "cert":
-        issuer_map = issuer_fields(obj.issuer)
-        valid_from, valid_to = get_validity_utc(obj)
-        serial = hex(obj.serial_number).upper().replace("X", "x")
-        thumb = compute_thumbprint(obj)
-        issuer_str = format_name(obj.issuer)
-    else:
-        issuer_map = None
-        valid_from = "-"
-        valid_to = "-"
-        serial = "-"
-        thumb = "-"
-        issuer_str = "-"
-
-    pub = obj.public_key()
-    key_algo, key_size = get_key_info(pub)
-    sig_algo = get_signature_algorithm(obj)
-
-    props = {
-        "Subject":        format_name(obj.subject),
-        "Issuer":         issuer_str,
-        "Valid From":     valid_from,
-        "Valid To":       valid_to,
-        "Key Size":       key_size,
-        "Key Algorithm":  key_algo,
-        "Sig. Algorithm": sig_algo,
-        "Serial Number":  serial,
-        "Thumbprint":     thumb,
-    }
 
-    info = {
-        "filename": str(fake_path),
-        "type": "Certificate" if obj_type == "cert" else "CSR",
-        "subject": subj_map,
-        "issuer": issuer_map,
-        "properties": props,
-    }
-    return info
+def _decode_bytes(data: bytes, fake_path: Path) -> dict:
+    obj_type, obj = load_cert_or_csr(data)
+    return decode_object(obj_type, obj).to_info(fake_path)
 
 
 # ============================================================
@@ -673,57 +506,36 @@ def export_markdown(info: dict, dest: Path):
 
 
 def export_xlsx(info: dict, dest: Path):
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Certificate"
-
-    title_font = Font(color=TITLE_COLOR_XLSX, bold=True)
-    yellow_fill = PatternFill(
-        start_color=TABLE_COL1_BG.lstrip("#"),
-        end_color=TABLE_COL1_BG.lstrip("#"),
-        fill_type="solid"
-    )
-    main_font = Font(color=MAIN_COLOR_XLSX)
+    # Streaming writer uit CyNiT-tools (XlsxWriter constant_memory, geen celmodel)
+    title_style = cynit_xlsx.Style(color=TITLE_COLOR_XLSX, bold=True)
+    fill = cynit_xlsx.Style(bg=TABLE_COL1_BG)
+    value_style = cynit_xlsx.Style(color=MAIN_COLOR_XLSX)
 
-    row = 1
-    ws["A1"] = "CyNiT Certificate Decoder Export"
-    ws["A1"].font = title_font
-    row += 2
+    book = cynit_xlsx.Book()
+    ws = book.sheet("Certificate")
 
-    ws[f"A{row}"] = "Bestand"
-    ws[f"B{row}"] = info.get("filename", "")
-    row += 1
-    ws[f"A{row}"] = "Type"
-    ws[f"B{row}"] = info.get("type", "")
-    row += 2
+    ws.append(["CyNiT Certificate Decoder Export"], style=title_style)
+    ws.append([])
+    ws.append(["Bestand", info.get("filename", "")])
+    ws.append(["Type", info.get("type", "")])
+    ws.append([])
 
     def write_section(title, mapping):
-        nonlocal row
-        ws[f"A{row}"] = title
-        ws[f"A{row}"].font = title_font
-        row += 1
+        ws.append([title], style=title_style)
         if mapping is None:
-            ws[f"A{row}"] = "CSR heeft geen issuer; dit wordt pas ingevuld na uitgifte van het certificaat."
-            row += 2
+            ws.append(["CSR heeft geen issuer; dit wordt pas ingevuld na uitgifte van het certificaat."])
+            ws.append([])
             return
-        ws[f"A{row}"] = "Field"
-        ws[f"B{row}"] = "Value"
-        ws[f"A{row}"].fill = yellow_fill
-        ws[f"B{row}"].fill = yellow_fill
-        row += 1
+        ws.append(["Field", "Value"], style=fill)
         for k, v in mapping.items():
-            ws[f"A{row}"] = k
-            ws[f"A{row}"].fill = yellow_fill
-            ws[f"B{row}"] = v
-            ws[f"B{row}"].font = main_font
-            row += 1
-        row += 1
+            ws.append([k, v], style=[fill, value_style])
+        ws.append([])
 
     write_section("Certificate Subject", info["subject"])
     write_section("Certificate Issuer", info["issuer"])
     write_section("Certificate Properties", info["properties"])
 
-    wb.save(dest)
+    book.save(dest)
 
 
 def export_all_formats(info: dict, base_path: Path):
@@ -754,6 +566,8 @@ def run_pyinstaller_build():
             "PyInstaller",
             "--onefile",
             "--noconsole",
+            f"--paths={CYNIT_TOOLS_DIR}",   # cynit_certcore mee inpakken
+            "--hidden-import=xlsxwriter",   # cynit_xlsx importeert xlsxwriter pas bij export
         ]
 
         # Icon op basis van master-logo -> tijdelijke ico op schijf
@@ -2004,6 +1818,39 @@ def web_build_exe():
     )
 
 
+DOWNLOAD_TYPES = {
+    "json": "application/json",
+    "csv": "text/csv",
+    "html": "text/html",
+    "md": "text/markdown",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def render_download(fmt: str, info: dict):
+    """
+    Export als str/bytes voor /download/<fmt>, gecachet op (formaat, info).
+    HTML/MD/XLSX gaan nog altijd via de export_*-functies (tijdelijk bestand),
+    maar enkel de eerste keer per certificaat.
+    """
+    key = cynit_cache.content_key(fmt, cynit_cache.json_key(info))
+
+    def _render():
+        if fmt == "json":
+            return json.dumps(info, indent=2, ensure_ascii=False)
+        if fmt == "csv":
+            return info_to_inmemory_exports(info)["csv"]
+        exporter = {"html": export_html, "md": export_markdown, "xlsx": export_xlsx}[fmt]
+        tmp = BASE_DIR / f"_tmp_export_{os.getpid()}_{threading.get_ident()}.{fmt}"
+        try:
+            exporter(info, tmp)
+            return tmp.read_bytes() if fmt == "xlsx" else tmp.read_text(encoding="utf-8")
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    return EXPORT_CACHE.get_or_compute(key, _render)
+
+
 @app.route("/download/<fmt>", methods=["GET"])
 def web_download(fmt):
     global LAST_INFO
@@ -2012,57 +1859,23 @@ def web_download(fmt):
 
     base_name = Path(LAST_INFO.get("filename", "certificate")).stem or "certificate"
 
-    if fmt == "json":
-        content = json.dumps(LAST_INFO, indent=2, ensure_ascii=False)
-        resp = make_response(content)
-        resp.headers["Content-Type"] = "application/json; charset=utf-8"
-        resp.headers["Content-Disposition"] = f'attachment; filename="{base_name}.json"'
-        return resp
-
-    if fmt == "csv":
-        exports = info_to_inmemory_exports(LAST_INFO)
-        content = exports["csv"]
-        resp = make_response(content)
-        resp.headers["Content-Type"] = "text/csv; charset=utf-8"
-        resp.headers["Content-Disposition"] = f'attachment; filename="{base_name}.csv"'
-        return resp
-
-    if fmt == "html":
-        tmp = BASE_DIR / "_tmp_export.html"
-        export_html(LAST_INFO, tmp)
-        content = tmp.read_text(encoding="utf-8")
-        tmp.unlink(missing_ok=True)
-        resp = make_response(content)
-        resp.headers["Content-Type"] = "text/html; charset=utf-8"
-        resp.headers["Content-Disposition"] = f'attachment; filename="{base_name}.html"'
-        return resp
-
-    if fmt == "md":
-        tmp = BASE_DIR / "_tmp_export.md"
-        export_markdown(LAST_INFO, tmp)
-        content = tmp.read_text(encoding="utf-8")
-        tmp.unlink(missing_ok=True)
-        resp = make_response(content)
-        resp.headers["Content-Type"] = "text/markdown; charset=utf-8"
-        resp.headers["Content-Disposition"] = f'attachment; filename="{base_name}.md"'
-        return resp
+    if fmt not in DOWNLOAD_TYPES:
+        return make_response("Onbekend exporttype.", 400)
+
+    content = render_download(fmt, LAST_INFO)
 
     if fmt == "xlsx":
-        tmp = BASE_DIR / "_tmp_export.xlsx"
-        export_xlsx(LAST_INFO, tmp)
-        with tmp.open("rb") as f:
-            data = f.read()
-        tmp.unlink(missing_ok=True)
-        buf = BytesIO(data)
-        buf.seek(0)
         return send_file(
-            buf,
+            BytesIO(content),
             as_attachment=True,
             download_name=f"{base_name}.xlsx",
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            mimetype=DOWNLOAD_TYPES[fmt],
         )
 
-    return make_response("Onbekend exporttype.", 400)
+    resp = make_response(content)
+    resp.headers["Content-Type"] = f"{DOWNLOAD_TYPES[fmt]}; charset=utf-8"
+    resp.headers["Content-Disposition"] = f'attachment; filename="{base_name}.{fmt}"'
+    return resp
 
 
 @app.route("/favicon.ico")